@@ -5,15 +5,16 @@ This test simulates the exact data flow from JSON → drugRules.ts → DecisionS
 to identify why users might still see old severity levels.
 """
 
-import json
 import os
 import re
 from typing import Dict, List, Any, Optional
 
+from verification_fixtures import load_json, read_text
+
 class AdvancedDrugInteractionDebugger:
     def __init__(self):
-        self.app_path = "/app"
-        self.json_rules_path = "/app/assets/rules/drug_interactions.json"
+        self.app_path = os.path.dirname(os.path.abspath(__file__))
+        self.json_rules_path = os.path.join(self.app_path, "assets", "rules", "drug_interactions.json")
         self.test_results = []
         
     def log_test(self, test_name: str, status: str, details: str = ""):
@@ -37,8 +38,7 @@ class AdvancedDrugInteractionDebugger:
         
         try:
             # Step 1: Load JSON rules (simulating drugRules.ts loadLocalRules)
-            with open(self.json_rules_path, 'r') as f:
-                json_data = json.load(f)
+            json_data = load_json(self.json_rules_path)
             rules = json_data['rules']
             
             # Step 2: Simulate findInteractionsForSelection with real test case
@@ -147,10 +147,9 @@ class AdvancedDrugInteractionDebugger:
         
         try:
             # Check if there are any cached analysis results that might be interfering
-            decision_support_path = "/app/screens/DecisionSupportScreen.tsx"
+            decision_support_path = os.path.join(self.app_path, "screens/DecisionSupportScreen.tsx")
             
-            with open(decision_support_path, 'r') as f:
-                content = f.read()
+            content = read_text(decision_support_path)
             
             # Look for caching mechanisms
             caching_indicators = []
@@ -191,10 +190,9 @@ class AdvancedDrugInteractionDebugger:
         test_name = "Component State Management"
         
         try:
-            decision_support_path = "/app/screens/DecisionSupportScreen.tsx"
+            decision_support_path = os.path.join(self.app_path, "screens/DecisionSupportScreen.tsx")
             
-            with open(decision_support_path, 'r') as f:
-                content = f.read()
+            content = read_text(decision_support_path)
             
             # Check for potential state issues
             state_issues = []
@@ -239,10 +237,9 @@ class AdvancedDrugInteractionDebugger:
         test_name = "Fallback Mechanisms"
         
         try:
-            decision_support_path = "/app/screens/DecisionSupportScreen.tsx"
+            decision_support_path = os.path.join(self.app_path, "screens/DecisionSupportScreen.tsx")
             
-            with open(decision_support_path, 'r') as f:
-                content = f.read()
+            content = read_text(decision_support_path)
             
             # Look for fallback code that might use old systems
             fallback_patterns = [
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Analysis Jobs - background batch analyses with a server-sent events stream
+A job runs one analysis (clinical rules, interaction check or treatment plan)
+over a list of patients in slices off the event loop, sized so each slice
+takes about 50 ms. Every per-patient result is appended to the job's event
+log as soon as its slice finishes.
+
+Subscribers read the shared log with their own cursor instead of owning a
+queue, so a slow client never makes the server buffer more than the job's
+results. The SSE generator is only advanced as fast as the client's socket
+drains. Progress (done, total, throughput, ETA) is a snapshot: a client
+that falls behind gets the latest one, not every intermediate update.
+Event ids are log positions, so a reconnect with Last-Event-ID resumes
+where the stream stopped.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from rule_overlays import get_overlays
+from treatment_plan_service import get_service
+
+MAX_ITEMS = 100000
+MAX_JOBS = 64
+# Finished jobs are kept this long for late subscribers and result downloads
+JOB_TTL_SECONDS = 3600
+SLICE_SECONDS = 0.05
+MAX_SLICE = 1000
+HEARTBEAT_SECONDS = 15.0
+# Log events sent between progress snapshots
+STREAM_BATCH = 64
+
+
+def _item_label(item: Dict[str, Any], index: int) -> Any:
+    return item.get("id", item.get("patientId", index))
+
+
+def job_handler(kind: str, tenant: Optional[str] = None) -> Callable[[Dict[str, Any]], Any]:
+    """Per-item analysis for a job kind; ValueError for an unknown kind, KeyError for an unknown tenant"""
+    if kind == "clinical-rules":
+        return get_overlays().resolve(tenant).clinical_index.evaluate
+    if kind == "interactions":
+        index = get_overlays().resolve(tenant).drug_index
+
+        def check(item):
+            primaries = item.get("primaries", item.get("primary_therapies"))
+            medications = item.get("medications", item.get("selected_medications"))
+            if not isinstance(primaries, list) or not isinstance(medications, list):
+                raise ValueError("primaries and medications must be lists")
+            return index.find_interactions(primaries, medications)
+        return check
+    if kind == "treatment-plan":
+        if tenant:
+            raise ValueError("treatment-plan jobs do not support tenant overlays")
+        service = get_service()
+        return lambda item: service.generate(item.get("inputs", item))
+    raise ValueError(f"Unknown job kind '{kind}' (expected clinical-rules, interactions or treatment-plan)")
+
+
+def _run_slice(handler: Callable[[Dict[str, Any]], Any], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    outcomes = []
+    for item in items:
+        try:
+            outcomes.append({"result": handler(item)})
+        except Exception as e:
+            outcomes.append({"error": f"{type(e).__name__}: {e}"})
+    return outcomes
+
+
+class AnalysisJob:
+    """One batch analysis: its items, its event log and a wake-up for subscribers"""
+
+    def __init__(self, kind: str, items: List[Dict[str, Any]], handler: Callable[[Dict[str, Any]], Any],
+                 tenant: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.tenant = tenant
+        self.items = items
+        self.handler = handler
+        self.total = len(items)
+        self.done = 0
+        self.failed = 0
+        self.status = "running"
+        self.created = time.time()
+        self.started = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.elapsed = 0.0
+        # Append-only: one "result" event per item, then one "done" event
+        self.events: List[Dict[str, Any]] = []
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def _notify(self):
+        self._wake.set()
+        self._wake = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+
+    def progress(self) -> Dict[str, Any]:
+        elapsed = self.elapsed if self.finished else time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        return {
+            "jobId": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "failed": self.failed,
+            "elapsedMs": round(elapsed * 1000, 1),
+            "perSecond": round(rate, 1),
+            "etaMs": round((self.total - self.done) / rate * 1000) if rate and not self.finished else None,
+        }
+
+    def results(self) -> List[Dict[str, Any]]:
+        return [event["data"] for event in self.events if event["event"] == "result"]
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def stop(self, timeout: float = 1.0):
+        """Cancel and wait for the job to record it; a slice already running finishes in its thread"""
+        self.cancel()
+        if self._task is not None:
+            await asyncio.wait({self._task}, timeout=timeout)
+
+    async def _run(self):
+        size = 1
+        try:
+            while self.done < self.total:
+                batch = self.items[self.done:self.done + size]
+                started = time.perf_counter()
+                outcomes = await asyncio.to_thread(_run_slice, self.handler, batch)
+                took = time.perf_counter() - started
+                # Aim each slice at SLICE_SECONDS, growing at most 4x per step
+                size = max(1, min(MAX_SLICE, size * 4, int(size * SLICE_SECONDS / max(took, 1e-6))))
+                for offset, outcome in enumerate(outcomes):
+                    index = self.done + offset
+                    self.failed += "error" in outcome
+                    self.events.append({"event": "result",
+                                        "data": {"index": index, "id": _item_label(self.items[index], index),
+                                                 **outcome}})
+                self.done += len(batch)
+                self._notify()
+            self.status = "done"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+        except Exception as e:
+            self.status = "failed"
+            self.events.append({"event": "error", "data": {"message": f"{type(e).__name__}: {e}"}})
+        finally:
+            self.elapsed = time.perf_counter() - self.started
+            self.finished_at = time.time()
+            # Results live in the event log; the inputs are no longer needed
+            self.items = []
+            self.events.append({"event": "done", "data": self.progress()})
+            self._notify()
+
+    async def stream(self, cursor: int = 0, heartbeat: float = HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+        """SSE frames from log position cursor onwards, with coalesced progress snapshots"""
+        last_progress = None
+        while True:
+            wake = self._wake
+            if cursor < len(self.events):
+                for event in self.events[cursor:cursor + STREAM_BATCH]:
+                    cursor += 1
+                    yield sse_frame(event["event"], event["data"], cursor)
+            if not self.finished:
+                snapshot = self.progress()
+                if snapshot["done"] != (last_progress or {}).get("done"):
+                    last_progress = snapshot
+                    yield sse_frame("progress", snapshot)
+            if cursor < len(self.events):
+                continue
+            if self.finished:
+                return
+            try:
+                await asyncio.wait_for(wake.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+
+def sse_frame(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+class JobRegistry:
+    """Running and recently finished jobs, oldest evicted first"""
+
+    def __init__(self, max_jobs: int = MAX_JOBS, ttl: float = JOB_TTL_SECONDS):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > self.ttl:
+                del self._jobs[job_id]
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        while len(self._jobs) >= self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
+
+    def submit(self, kind: str, items: Any, tenant: Optional[str] = None) -> AnalysisJob:
+        """Start a job; ValueError for bad input or a full registry, KeyError for an unknown tenant"""
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValueError("items must be a list of objects")
+        if not items or len(items) > MAX_ITEMS:
+            raise ValueError(f"items must hold 1 to {MAX_ITEMS} entries")
+        job = AnalysisJob(kind, items, job_handler(kind, tenant), tenant)
+        with self._lock:
+            self._evict()
+            if len(self._jobs) >= self.max_jobs:
+                raise ValueError(f"{self.max_jobs} jobs are already running")
+            self._jobs[job.id] = job
+        job.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._evict()
+            return [job.progress() for job in self._jobs.values()]
+
+    def cancel_all(self):
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel()
+
+
+_registry: Optional[JobRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_jobs() -> JobRegistry:
+    """Process-wide job registry used by the backend"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = JobRegistry()
+        return _registry
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+API Batch - several API calls in one round trip
+A screen such as the clinical decision summary needs patient data, risk
+scores, interaction results and decision rules at once. Over a mobile link
+each of those is a full round trip, so the client sends them together:
+
+    {"requests": [
+        {"id": "risk", "method": "POST", "path": "/api/risk/calculate", "body": {...}},
+        {"id": "rules", "method": "POST", "path": "/api/clinical-rules/evaluate", "body": {...}},
+        {"id": "plan", "method": "POST", "path": "/api/treatment-plan", "body": {...},
+         "dependsOn": ["risk"]}
+    ]}
+
+Each sub-request is dispatched in-process through the ASGI app itself, so
+it gets exactly the routing, validation and errors of a direct call.
+Sub-requests run concurrently unless they list dependsOn; one whose
+dependency failed is not run and answers 424. Responses come back in
+request order with their own status, so one failing call does not fail
+the batch.
+"""
+
+import asyncio
+import json
+import re
+from typing import Any, Dict, List
+
+import httpx
+
+MAX_BATCH_REQUESTS = 20
+BATCH_METHODS = ("GET", "POST", "DELETE")
+# Paths that cannot be answered inside a batch: the batch itself and event streams
+UNBATCHABLE_SUFFIXES = ("/api/batch", "/events")
+# Sub-request headers go out through httpx, which only sends ASCII: a token name
+# and a value of visible characters, spaces and tabs
+HEADER_NAME = re.compile(r"[!#$%&'*+.^_`|~0-9A-Za-z-]+")
+HEADER_VALUE = re.compile(r"[\t\x20-\x7e]*")
+# Response headers worth passing back per sub-request
+FORWARDED_HEADERS = ("etag", "cache-control", "location")
+
+
+def validate_batch(requests: Any) -> List[Dict[str, Any]]:
+    """Normalized sub-requests; ValueError describing the first problem"""
+    if not isinstance(requests, list) or not requests:
+        raise ValueError("requests must be a non-empty list")
+    if len(requests) > MAX_BATCH_REQUESTS:
+        raise ValueError(f"A batch holds at most {MAX_BATCH_REQUESTS} requests")
+    normalized = []
+    for position, request in enumerate(requests):
+        if not isinstance(request, dict):
+            raise ValueError(f"requests[{position}] must be an object")
+        request_id = str(request.get("id", position))
+        method = str(request.get("method", "GET")).upper()
+        path = request.get("path")
+        depends_on = request.get("dependsOn", [])
+        headers = request.get("headers", {})
+        if method not in BATCH_METHODS:
+            raise ValueError(f"{request_id}: method must be one of {', '.join(BATCH_METHODS)}")
+        if not isinstance(path, str) or not path.startswith("/api/"):
+            raise ValueError(f"{request_id}: path must start with /api/")
+        try:
+            # Match what the app will route on, so %62atch or x/../batch cannot slip past
+            routed = httpx.URL(f"http://batch{path}").path
+        except httpx.InvalidURL:
+            raise ValueError(f"{request_id}: {path!r} is not a valid path")
+        if routed.rstrip("/").endswith(UNBATCHABLE_SUFFIXES):
+            raise ValueError(f"{request_id}: {path} cannot be batched")
+        if not isinstance(depends_on, list) or not isinstance(headers, dict):
+            raise ValueError(f"{request_id}: dependsOn must be a list and headers an object")
+        headers = {str(k): str(v) for k, v in headers.items()}
+        for name, value in headers.items():
+            if not HEADER_NAME.fullmatch(name) or not HEADER_VALUE.fullmatch(value):
+                raise ValueError(f"{request_id}: header {name!r} must be an ASCII token with a printable ASCII value")
+        normalized.append({"id": request_id, "method": method, "path": path, "body": request.get("body"),
+                           "headers": headers,
+                           "dependsOn": [str(d) for d in depends_on]})
+
+    ids = [request["id"] for request in normalized]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Request ids must be unique")
+    known = set(ids)
+    for request in normalized:
+        missing = [d for d in request["dependsOn"] if d not in known]
+        if missing:
+            raise ValueError(f"{request['id']}: unknown dependsOn {', '.join(missing)}")
+    _check_acyclic(normalized)
+    return normalized
+
+
+def _check_acyclic(requests: List[Dict[str, Any]]):
+    depends = {request["id"]: request["dependsOn"] for request in requests}
+    state: Dict[str, int] = {}
+
+    def visit(request_id: str):
+        if state.get(request_id) == 2:
+            return
+        if state.get(request_id) == 1:
+            raise ValueError(f"dependsOn cycle through {request_id}")
+        state[request_id] = 1
+        for dependency in depends[request_id]:
+            visit(dependency)
+        state[request_id] = 2
+
+    for request_id in depends:
+        visit(request_id)
+
+
+def _response_body(response: httpx.Response) -> Any:
+    if response.headers.get("content-type", "").startswith("application/json"):
+        try:
+            return response.json()
+        except json.JSONDecodeError:
+            pass
+    return response.text
+
+
+async def run_batch(app, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Dispatch validated sub-requests against app; {"responses": [...]} in request order"""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    # App errors come back as 500 sub-responses instead of failing the batch
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://batch") as client:
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def dispatch(request: Dict[str, Any]) -> Dict[str, Any]:
+            failed = []
+            for dependency in request["dependsOn"]:
+                outcome = await tasks[dependency]
+                if not 200 <= outcome["status"] < 300:
+                    failed.append(dependency)
+            if failed:
+                return {"id": request["id"], "status": 424,
+                        "body": {"detail": f"Dependency failed: {', '.join(failed)}"}}
+            request_started = loop.time()
+            kwargs = {"headers": request["headers"]}
+            if request["body"] is not None:
+                kwargs["json"] = request["body"]
+            try:
+                response = await client.request(request["method"], request["path"], **kwargs)
+            except Exception as e:
+                # Only this sub-request failed to go out; its siblings still answer
+                return {"id": request["id"], "status": 400,
+                        "body": {"detail": f"Request could not be sent: {type(e).__name__}: {e}"},
+                        "elapsedMs": round((loop.time() - request_started) * 1000, 1)}
+            outcome = {"id": request["id"], "status": response.status_code, "body": _response_body(response),
+                       "elapsedMs": round((loop.time() - request_started) * 1000, 1)}
+            forwarded = {name: response.headers[name] for name in FORWARDED_HEADERS if name in response.headers}
+            if forwarded:
+                outcome["headers"] = forwarded
+            return outcome
+
+        # Every task exists before any runs, so dependents can await by id
+        for request in requests:
+            tasks[request["id"]] = loop.create_task(dispatch(request))
+        responses = await asyncio.gather(*tasks.values())
+    return {"responses": responses, "elapsedMs": round((loop.time() - started) * 1000, 1)}
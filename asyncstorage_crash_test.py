@@ -14,10 +14,14 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
+from source_scanner import get_scanner
+from verification_fixtures import read_text
+
 class AsyncStorageCrashFixTester:
     def __init__(self):
         self.test_results = []
         self.app_root = Path(__file__).parent
+        self.scanner = get_scanner()
         
     def log_test(self, test_name, success, message, details=None):
         """Log test results"""
@@ -42,8 +46,6 @@ class AsyncStorageCrashFixTester:
                 self.log_test("Dynamic Initialization", False, "asyncStorageUtils.ts file not found")
                 return False
             
-            content = utils_file.read_text()
-            
             # Check for dynamic initialization features
             dynamic_features = [
                 "initializeAsyncStorage",
@@ -54,10 +56,7 @@ class AsyncStorageCrashFixTester:
                 "AsyncStorage = null"
             ]
             
-            found_features = []
-            for feature in dynamic_features:
-                if feature.lower().replace(" ", "").replace("-", "").replace("'", "") in content.lower().replace(" ", "").replace("-", "").replace("'", ""):
-                    found_features.append(feature)
+            found_features = self.scanner.found(utils_file, dynamic_features, strip=" -'")
             
             # Check for initialization error handling
             error_handling = [
@@ -68,10 +67,7 @@ class AsyncStorageCrashFixTester:
                 "fallback require"
             ]
             
-            found_error_handling = []
-            for pattern in error_handling:
-                if pattern.lower() in content.lower():
-                    found_error_handling.append(pattern)
+            found_error_handling = self.scanner.found(utils_file, error_handling)
             
             success_rate = len(found_features) / len(dynamic_features)
             error_rate = len(found_error_handling) / len(error_handling)
@@ -98,7 +94,7 @@ class AsyncStorageCrashFixTester:
                 self.log_test("Retry Mechanisms", False, "asyncStorageUtils.ts file not found")
                 return False
             
-            content = utils_file.read_text()
+            content = read_text(utils_file)
             
             # Check for retry patterns
             retry_patterns = [
@@ -110,10 +106,7 @@ class AsyncStorageCrashFixTester:
                 "initializeAsyncStorage()"
             ]
             
-            found_patterns = []
-            for pattern in retry_patterns:
-                if pattern.lower() in content.lower():
-                    found_patterns.append(pattern)
+            found_patterns = self.scanner.found(utils_file, retry_patterns)
             
             # Check for method-level retry logic
             method_retry_checks = [
@@ -150,8 +143,6 @@ class AsyncStorageCrashFixTester:
                 self.log_test("Safe Rehydration", False, "assessmentStore.ts file not found")
                 return False
             
-            content = store_file.read_text()
-            
             # Check for safe rehydration features
             rehydration_features = [
                 "onRehydrateStorage",
@@ -164,10 +155,7 @@ class AsyncStorageCrashFixTester:
                 "version"
             ]
             
-            found_features = []
-            for feature in rehydration_features:
-                if feature.lower().replace(" ", "") in content.lower().replace(" ", ""):
-                    found_features.append(feature)
+            found_features = self.scanner.found(store_file, rehydration_features, strip=" ")
             
             # Check for error recovery in storage operations
             storage_safety = [
@@ -180,10 +168,7 @@ class AsyncStorageCrashFixTester:
                 "Don't throw error"
             ]
             
-            found_safety = []
-            for pattern in storage_safety:
-                if pattern.lower() in content.lower():
-                    found_safety.append(pattern)
+            found_safety = self.scanner.found(store_file, storage_safety)
             
             success_rate = len(found_features) / len(rehydration_features)
             safety_rate = len(found_safety) / len(storage_safety)
@@ -210,7 +195,7 @@ class AsyncStorageCrashFixTester:
                 self.log_test("Interactive Retry", False, "SafeFlatList.tsx file not found")
                 return False
             
-            content = component_file.read_text()
+            content = read_text(component_file)
             
             # Check for interactive retry features
             retry_features = [
@@ -231,7 +216,7 @@ class AsyncStorageCrashFixTester:
                     if re.search(feature, content, re.IGNORECASE):
                         found_features.append(feature)
                 else:
-                    if feature.lower() in content.lower():
+                    if self.scanner.contains(component_file, feature):
                         found_features.append(feature)
             
             # Check for retry state management
@@ -243,10 +228,7 @@ class AsyncStorageCrashFixTester:
                 "error: undefined"
             ]
             
-            found_state = []
-            for pattern in state_management:
-                if pattern.lower() in content.lower():
-                    found_state.append(pattern)
+            found_state = self.scanner.found(component_file, state_management)
             
             # Check for user feedback
             user_feedback = [
@@ -257,10 +239,7 @@ class AsyncStorageCrashFixTester:
                 "errorContainer"
             ]
             
-            found_feedback = []
-            for pattern in user_feedback:
-                if pattern.lower() in content.lower():
-                    found_feedback.append(pattern)
+            found_feedback = self.scanner.found(component_file, user_feedback)
             
             total_score = len(found_features) + len(found_state) + len(found_feedback)
             max_score = len(retry_features) + len(state_management) + len(user_feedback)
@@ -289,8 +268,6 @@ class AsyncStorageCrashFixTester:
                 self.log_test("Patient Data Persistence", False, "PatientListScreen.tsx not found")
                 return False
             
-            content = patient_screen.read_text()
-            
             # Check for data loading safety
             loading_safety = [
                 "SafeFlatList",
@@ -303,16 +280,11 @@ class AsyncStorageCrashFixTester:
                 "Invalid Date"
             ]
             
-            found_safety = []
-            for pattern in loading_safety:
-                if pattern.lower() in content.lower():
-                    found_safety.append(pattern)
+            found_safety = self.scanner.found(patient_screen, loading_safety)
             
             # Check store integration
             store_file = self.app_root / "store" / "assessmentStore.ts"
             if store_file.exists():
-                store_content = store_file.read_text()
-                
                 persistence_features = [
                     "savePatient",
                     "loadPatients", 
@@ -322,10 +294,7 @@ class AsyncStorageCrashFixTester:
                     "persist"
                 ]
                 
-                found_persistence = []
-                for feature in persistence_features:
-                    if feature.lower() in store_content.lower():
-                        found_persistence.append(feature)
+                found_persistence = self.scanner.found(store_file, persistence_features)
             else:
                 found_persistence = []
             
@@ -355,8 +324,6 @@ class AsyncStorageCrashFixTester:
                 self.log_test("Guidelines Data Access", False, "GuidelinesScreen.tsx not found")
                 return False
             
-            content = guidelines_screen.read_text()
-            
             # Check for guidelines data access safety
             access_safety = [
                 "crashProofStorage",
@@ -370,10 +337,7 @@ class AsyncStorageCrashFixTester:
                 "JSON.stringify"
             ]
             
-            found_safety = []
-            for pattern in access_safety:
-                if pattern.lower() in content.lower():
-                    found_safety.append(pattern)
+            found_safety = self.scanner.found(guidelines_screen, access_safety)
             
             # Check for data validation
             validation_patterns = [
@@ -384,10 +348,7 @@ class AsyncStorageCrashFixTester:
                 "bookmarks.includes"
             ]
             
-            found_validation = []
-            for pattern in validation_patterns:
-                if pattern.lower() in content.lower():
-                    found_validation.append(pattern)
+            found_validation = self.scanner.found(guidelines_screen, validation_patterns)
             
             success_rate = (len(found_safety) + len(found_validation)) / (len(access_safety) + len(validation_patterns))
             
@@ -413,8 +374,6 @@ class AsyncStorageCrashFixTester:
                 self.log_test("Error Conditions Handling", False, "asyncStorageUtils.ts not found")
                 return False
             
-            content = utils_file.read_text()
-            
             # Check for comprehensive error handling
             error_conditions = [
                 "AsyncStorage not available",
@@ -427,10 +386,7 @@ class AsyncStorageCrashFixTester:
                 "initializationError"
             ]
             
-            found_conditions = []
-            for condition in error_conditions:
-                if condition.lower() in content.lower():
-                    found_conditions.append(condition)
+            found_conditions = self.scanner.found(utils_file, error_conditions)
             
             # Check for method availability checks
             availability_checks = [
@@ -440,10 +396,7 @@ class AsyncStorageCrashFixTester:
                 "method existence"
             ]
             
-            found_checks = []
-            for check in availability_checks:
-                if check.lower().replace(" ", "") in content.lower().replace(" ", ""):
-                    found_checks.append(check)
+            found_checks = self.scanner.found(utils_file, availability_checks, strip=" ")
             
             success_rate = len(found_conditions) / len(error_conditions)
             
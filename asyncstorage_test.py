@@ -11,10 +11,13 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
+from source_scanner import get_scanner
+
 class AsyncStorageTestSuite:
     def __init__(self):
         self.test_results = []
         self.app_root = Path(__file__).parent
+        self.scanner = get_scanner()
         
     def log_test(self, test_name, success, message, details=None):
         """Log test results"""
@@ -39,8 +42,6 @@ class AsyncStorageTestSuite:
                 self.log_test("AsyncStorage Utils", False, "asyncStorageUtils.ts file not found")
                 return False
             
-            content = utils_file.read_text()
-            
             # Check for key implementation features
             required_features = [
                 "initializeAsyncStorage",
@@ -54,10 +55,7 @@ class AsyncStorageTestSuite:
                 "isAvailable"
             ]
             
-            missing_features = []
-            for feature in required_features:
-                if feature.lower().replace(" ", "") not in content.lower().replace(" ", ""):
-                    missing_features.append(feature)
+            missing_features = self.scanner.missing(utils_file, required_features, strip=" ")
             
             if missing_features:
                 self.log_test("AsyncStorage Utils", False, f"Missing features: {missing_features}")
@@ -72,10 +70,7 @@ class AsyncStorageTestSuite:
                 "null checks"
             ]
             
-            found_patterns = []
-            for pattern in crash_prevention_patterns:
-                if pattern.lower() in content.lower():
-                    found_patterns.append(pattern)
+            found_patterns = self.scanner.found(utils_file, crash_prevention_patterns)
             
             self.log_test("AsyncStorage Utils", True, 
                          f"Implementation verified with {len(found_patterns)}/{len(crash_prevention_patterns)} safety patterns",
@@ -94,8 +89,6 @@ class AsyncStorageTestSuite:
                 self.log_test("Zustand Store Config", False, "assessmentStore.ts file not found")
                 return False
             
-            content = store_file.read_text()
-            
             # Check for safe rehydration features
             rehydration_features = [
                 "crashProofStorage",
@@ -107,10 +100,7 @@ class AsyncStorageTestSuite:
                 "persist"
             ]
             
-            found_features = []
-            for feature in rehydration_features:
-                if feature.lower().replace(" ", "") in content.lower().replace(" ", ""):
-                    found_features.append(feature)
+            found_features = self.scanner.found(store_file, rehydration_features, strip=" ")
             
             # Check for specific error recovery patterns
             error_recovery_patterns = [
@@ -123,10 +113,7 @@ class AsyncStorageTestSuite:
                 "JSON.stringify"
             ]
             
-            found_recovery = []
-            for pattern in error_recovery_patterns:
-                if pattern.lower() in content.lower():
-                    found_recovery.append(pattern)
+            found_recovery = self.scanner.found(store_file, error_recovery_patterns)
             
             success_rate = (len(found_features) + len(found_recovery)) / (len(rehydration_features) + len(error_recovery_patterns))
             
@@ -153,8 +140,6 @@ class AsyncStorageTestSuite:
                 self.log_test("SafeFlatList Component", False, "SafeFlatList.tsx file not found")
                 return False
             
-            content = component_file.read_text()
-            
             # Check for error boundary features
             error_boundary_features = [
                 "getDerivedStateFromError",
@@ -167,10 +152,7 @@ class AsyncStorageTestSuite:
                 "Try Again"
             ]
             
-            found_features = []
-            for feature in error_boundary_features:
-                if feature.lower().replace(" ", "") in content.lower().replace(" ", ""):
-                    found_features.append(feature)
+            found_features = self.scanner.found(component_file, error_boundary_features, strip=" ")
             
             # Check for specific AsyncStorage error handling
             asyncstorage_patterns = [
@@ -182,10 +164,7 @@ class AsyncStorageTestSuite:
                 "storage error"
             ]
             
-            found_patterns = []
-            for pattern in asyncstorage_patterns:
-                if pattern.lower().replace(" ", "") in content.lower().replace(" ", ""):
-                    found_patterns.append(pattern)
+            found_patterns = self.scanner.found(component_file, asyncstorage_patterns, strip=" ")
             
             if len(found_features) >= 6 and len(found_patterns) >= 3:
                 self.log_test("SafeFlatList Component", True, 
@@ -209,8 +188,6 @@ class AsyncStorageTestSuite:
                 self.log_test("Patient Records Integration", False, "PatientListScreen.tsx file not found")
                 return False
             
-            content = screen_file.read_text()
-            
             # Check for proper AsyncStorage integration
             integration_features = [
                 "useAssessmentStore",
@@ -223,10 +200,7 @@ class AsyncStorageTestSuite:
                 "formatDate"
             ]
             
-            found_features = []
-            for feature in integration_features:
-                if feature.lower().replace(" ", "") in content.lower().replace(" ", ""):
-                    found_features.append(feature)
+            found_features = self.scanner.found(screen_file, integration_features, strip=" ")
             
             # Check for crash prevention in data handling
             crash_prevention = [
@@ -239,10 +213,7 @@ class AsyncStorageTestSuite:
                 "Invalid Date"
             ]
             
-            found_prevention = []
-            for pattern in crash_prevention:
-                if pattern.lower() in content.lower():
-                    found_prevention.append(pattern)
+            found_prevention = self.scanner.found(screen_file, crash_prevention)
             
             success_rate = len(found_features) / len(integration_features)
             
@@ -268,8 +239,6 @@ class AsyncStorageTestSuite:
                 self.log_test("Guidelines Integration", False, "GuidelinesScreen.tsx file not found")
                 return False
             
-            content = screen_file.read_text()
-            
             # Check for proper AsyncStorage integration
             integration_features = [
                 "crashProofStorage",
@@ -282,10 +251,7 @@ class AsyncStorageTestSuite:
                 "catch"
             ]
             
-            found_features = []
-            for feature in integration_features:
-                if feature.lower().replace(" ", "") in content.lower().replace(" ", ""):
-                    found_features.append(feature)
+            found_features = self.scanner.found(screen_file, integration_features, strip=" ")
             
             # Check for specific AsyncStorage operations
             storage_operations = [
@@ -296,10 +262,7 @@ class AsyncStorageTestSuite:
                 "console.error"
             ]
             
-            found_operations = []
-            for op in storage_operations:
-                if op.lower() in content.lower():
-                    found_operations.append(op)
+            found_operations = self.scanner.found(screen_file, storage_operations)
             
             success_rate = len(found_features) / len(integration_features)
             
@@ -340,15 +303,12 @@ class AsyncStorageTestSuite:
             for file_path in key_files:
                 full_path = self.app_root / file_path
                 if full_path.exists():
-                    content = full_path.read_text().lower()
-                    
                     for mechanism, patterns in recovery_mechanisms.items():
                         if mechanism not in found_mechanisms:
                             found_mechanisms[mechanism] = []
                         
-                        for pattern in patterns:
-                            if pattern.lower() in content:
-                                found_mechanisms[mechanism].append(f"{file_path}:{pattern}")
+                        for pattern in self.scanner.found(full_path, patterns):
+                            found_mechanisms[mechanism].append(f"{file_path}:{pattern}")
             
             # Calculate coverage
             total_mechanisms = len(recovery_mechanisms)
@@ -378,8 +338,6 @@ class AsyncStorageTestSuite:
                 self.log_test("Data Persistence Safety", False, "Store file not found")
                 return False
             
-            content = store_file.read_text()
-            
             # Check for data safety patterns
             safety_patterns = [
                 "JSON.parse",
@@ -394,10 +352,7 @@ class AsyncStorageTestSuite:
                 "typeof"
             ]
             
-            found_patterns = []
-            for pattern in safety_patterns:
-                if pattern.lower().replace(" ", "") in content.lower().replace(" ", ""):
-                    found_patterns.append(pattern)
+            found_patterns = self.scanner.found(store_file, safety_patterns, strip=" ")
             
             # Check for specific data validation
             validation_patterns = [
@@ -410,10 +365,7 @@ class AsyncStorageTestSuite:
                 "default"
             ]
             
-            found_validation = []
-            for pattern in validation_patterns:
-                if pattern.lower() in content.lower():
-                    found_validation.append(pattern)
+            found_validation = self.scanner.found(store_file, validation_patterns)
             
             total_safety = len(found_patterns) + len(found_validation)
             expected_safety = len(safety_patterns) + len(validation_patterns)
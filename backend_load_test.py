@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Backend Load Testing for MHT Assessment App
+Starts simple_backend locally (or targets a running server) and drives every
+parameter-free GET endpoint plus the requests in load_test_requests.json (POST
+bodies, path parameters) from an asyncio client with configurable concurrency
+and rate. Routes in the app's OpenAPI schema that are neither driven nor listed
+under "skip" in the request file are reported, so new endpoints are not missed.
+Reports throughput, p50/p95/p99 latency and error rate, and saves a JSON result
+that can be diffed between builds.
+
+Usage:
+    python backend_load_test.py --concurrency 50 --rate 500 --duration 20
+    python backend_load_test.py --url http://localhost:8001 --compare previous.json
+    python backend_load_test.py --requests my_requests.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8011
+DEFAULT_ENDPOINTS = ["/", "/api/health", "/api/patients"]
+DEFAULT_OUTPUT = APP_ROOT / "load_test_results.json"
+DEFAULT_REQUESTS = APP_ROOT / "load_test_requests.json"
+HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    """Build the latency/throughput summary for one group of requests"""
+    ordered = sorted(latencies)
+    total = len(ordered) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "min": round(ordered[0], 3) if ordered else 0.0,
+            "mean": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50), 3),
+            "p95": round(percentile(ordered, 95), 3),
+            "p99": round(percentile(ordered, 99), 3),
+            "max": round(ordered[-1], 3) if ordered else 0.0,
+        },
+    }
+
+
+class HttpConnection:
+    """Minimal keep-alive HTTP/1.1 client built on asyncio streams"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, bytes]:
+        return await asyncio.wait_for(self._request(method, path, body), self.timeout)
+
+    async def _request(self, method: str, path: str, body: Optional[bytes]) -> Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        request = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Accept: application/json\r\n"
+            "Connection: keep-alive\r\n"
+        )
+        if body is not None:
+            request += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self.writer.write(request.encode("ascii") + b"\r\n" + (body or b""))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+        else:
+            body = await self.reader.readexactly(int(headers.get("content-length", "0")))
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, body
+
+
+def request_spec(path: str, method: str = "GET", body: Any = None, name: Optional[str] = None) -> Dict:
+    """One request to drive; results are reported under name (the path for a plain GET)"""
+    method = method.upper()
+    return {
+        "name": name or (path if method == "GET" else f"{method} {path}"),
+        "method": method,
+        "path": path,
+        "body": None if body is None else json.dumps(body).encode("utf-8"),
+    }
+
+
+def load_request_file(path: Path) -> Tuple[List[Dict], Dict[str, str]]:
+    """Request specs and {"METHOD /route": reason} skips from a request file"""
+    with open(path, "r") as f:
+        data = json.load(f)
+    specs = [request_spec(entry["path"], entry.get("method", "GET"), entry.get("body"), entry.get("name"))
+             for entry in data.get("requests", [])]
+    return specs, dict(data.get("skip", {}))
+
+
+class LoadTester:
+    def __init__(self, base_url: str, requests: List[Dict], concurrency: int = 10,
+                 rate: float = 0.0, duration: float = 10.0, timeout: float = 10.0):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.host = parts.hostname or DEFAULT_HOST
+        self.port = parts.port or 80
+        self.requests = requests
+        self.endpoints = [spec["name"] for spec in requests]
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.timeout = timeout
+        self.samples: Dict[str, List[float]] = {path: [] for path in self.endpoints}
+        self.errors: Dict[str, int] = {path: 0 for path in self.endpoints}
+        self.error_messages: Dict[str, str] = {}
+        self._issued = 0
+
+    def _next_slot(self, start: float) -> Optional[Tuple[int, float]]:
+        """Claim the next request slot; returns (index, scheduled send time)"""
+        index = self._issued
+        if self.rate > 0:
+            send_at = start + index / self.rate
+        else:
+            send_at = time.perf_counter()
+        if send_at - start >= self.duration:
+            return None
+        self._issued += 1
+        return index, send_at
+
+    async def _worker(self, start: float):
+        connection = HttpConnection(self.host, self.port, self.timeout)
+        try:
+            while True:
+                slot = self._next_slot(start)
+                if slot is None:
+                    return
+                index, send_at = slot
+                delay = send_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                spec = self.requests[index % len(self.requests)]
+                path = spec["name"]
+                # Open-loop latency: measured from the scheduled send time when
+                # rate limited, so a stalled server is not hidden by queueing
+                began = send_at if self.rate > 0 else time.perf_counter()
+                try:
+                    status, _ = await connection.request(spec["method"], spec["path"], spec["body"])
+                    if status >= 400:
+                        raise RuntimeError(f"HTTP {status}")
+                    self.samples[path].append((time.perf_counter() - began) * 1000.0)
+                except (asyncio.TimeoutError, ConnectionError, OSError, RuntimeError, ValueError) as e:
+                    self.errors[path] += 1
+                    self.error_messages[path] = str(e) or type(e).__name__
+                    await connection.close()
+        finally:
+            await connection.close()
+
+    async def run(self) -> Dict:
+        """Run the load test and return the JSON-serialisable result"""
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker(start) for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - start
+
+        all_latencies = [value for values in self.samples.values() for value in values]
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "base_url": self.base_url,
+            "config": {
+                "concurrency": self.concurrency,
+                "rate": self.rate,
+                "duration": self.duration,
+                "timeout": self.timeout,
+                "endpoints": self.endpoints,
+            },
+            "elapsed_s": round(elapsed, 3),
+            "overall": summarize(all_latencies, sum(self.errors.values()), elapsed),
+            "endpoints": {
+                path: dict(summarize(self.samples[path], self.errors[path], elapsed),
+                           last_error=self.error_messages.get(path))
+                for path in self.endpoints
+            },
+        }
+
+
+def discover_routes(base_url: str) -> List[Tuple[str, str]]:
+    """(METHOD, path template) for every route in the app's OpenAPI schema"""
+    try:
+        with urlopen(f"{base_url.rstrip('/')}/openapi.json", timeout=5) as response:
+            schema = json.load(response)
+    except (OSError, ValueError):
+        return []
+    return sorted((method.upper(), path) for path, operations in schema.get("paths", {}).items()
+                  for method in operations if method in HTTP_METHODS)
+
+
+def discover_endpoints(routes: List[Tuple[str, str]]) -> List[str]:
+    """Parameter-free GET routes, which need no request file entry"""
+    endpoints = [path for method, path in routes if method == "GET" and "{" not in path]
+    return endpoints or list(DEFAULT_ENDPOINTS)
+
+
+def uncovered_routes(routes: List[Tuple[str, str]], specs: List[Dict], skip: Dict[str, str]) -> List[str]:
+    """Routes that no spec drives and the request file does not skip"""
+    missing = []
+    for method, template in routes:
+        route = f"{method} {template}"
+        pattern = re.compile("^" + re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(template)) + "$")
+        driven = any(spec["method"] == method and pattern.match(spec["path"].split("?", 1)[0]) for spec in specs)
+        if not driven and route not in skip:
+            missing.append(route)
+    return missing
+
+
+def start_backend(host: str, port: int, startup_timeout: float = 20.0) -> subprocess.Popen:
+    """Start simple_backend under uvicorn and wait for it to answer"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "simple_backend:app",
+         "--host", host, "--port", str(port), "--log-level", "warning"],
+        cwd=str(APP_ROOT),
+    )
+    deadline = time.time() + startup_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited during startup with code {process.returncode}")
+        try:
+            with urlopen(f"http://{host}:{port}/api/health", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Backend did not start within {startup_timeout}s")
+
+
+def print_report(result: Dict):
+    overall = result["overall"]
+    print("=" * 78)
+    print("MHT Assessment App - Backend Load Test")
+    print("=" * 78)
+    config = result["config"]
+    rate = f"{config['rate']:g} req/s" if config["rate"] > 0 else "unlimited"
+    print(f"Target: {result['base_url']}  concurrency={config['concurrency']}  rate={rate}  "
+          f"duration={config['duration']:g}s")
+    print()
+    print(f"{'Endpoint':<40}{'Reqs':>8}{'Err%':>8}{'RPS':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+    rows = list(result["endpoints"].items()) + [("TOTAL", overall)]
+    for path, stats in rows:
+        latency = stats["latency_ms"]
+        print(f"{path:<40}{stats['requests']:>8}{stats['error_rate'] * 100:>7.2f}%"
+              f"{stats['throughput_rps']:>10.1f}{latency['p50']:>9.2f}{latency['p95']:>9.2f}"
+              f"{latency['p99']:>9.2f}")
+    print("(latencies in ms)")
+    for path, stats in result["endpoints"].items():
+        if stats.get("last_error"):
+            print(f"   ❌ {path}: last error: {stats['last_error']}")
+
+
+def print_comparison(result: Dict, previous: Dict):
+    """Print throughput and tail-latency deltas against an earlier result"""
+    print("\nComparison with previous run:")
+    for path in ["TOTAL"] + list(result["endpoints"]):
+        current = result["overall"] if path == "TOTAL" else result["endpoints"].get(path)
+        before = previous.get("overall") if path == "TOTAL" else previous.get("endpoints", {}).get(path)
+        if not current or not before:
+            print(f"   {path}: no previous data")
+            continue
+        rps_delta = current["throughput_rps"] - before["throughput_rps"]
+        p95_delta = current["latency_ms"]["p95"] - before["latency_ms"]["p95"]
+        p99_delta = current["latency_ms"]["p99"] - before["latency_ms"]["p99"]
+        print(f"   {path:<38} rps {rps_delta:+9.1f}   p95 {p95_delta:+8.2f} ms   p99 {p99_delta:+8.2f} ms")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Asyncio load generator for the MHT Assessment backend")
+    parser.add_argument("--url", help="Target an already running backend instead of starting one")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port for the locally started backend")
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="GET path to drive (repeatable); default: all GET routes from /openapi.json "
+                             "plus the request file")
+    parser.add_argument("--requests", default=str(DEFAULT_REQUESTS),
+                        help="JSON file of {\"requests\": [{method, path, body}], \"skip\": {route: reason}}")
+    parser.add_argument("--concurrency", type=int, default=10, help="Number of concurrent connections")
+    parser.add_argument("--rate", type=float, default=0.0, help="Total request rate in req/s (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test duration in seconds")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Where to save the JSON result")
+    parser.add_argument("--compare", help="Previous JSON result to diff against")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main load test execution"""
+    args = parse_args(argv)
+
+    process = None
+    base_url = args.url
+    if not base_url:
+        process = start_backend(DEFAULT_HOST, args.port)
+        base_url = f"http://{DEFAULT_HOST}:{args.port}"
+
+    try:
+        if args.endpoints:
+            specs = [request_spec(path) for path in args.endpoints]
+        else:
+            routes = discover_routes(base_url)
+            specs, skip = load_request_file(Path(args.requests)) if os.path.exists(args.requests) else ([], {})
+            named = {spec["name"] for spec in specs}
+            specs = [request_spec(path) for path in discover_endpoints(routes) if path not in named] + specs
+            for route in uncovered_routes(routes, specs, skip):
+                print(f"⚠️  Not load tested: {route} (add it to {args.requests} under requests or skip)")
+        tester = LoadTester(base_url, specs, concurrency=args.concurrency, rate=args.rate,
+                            duration=args.duration, timeout=args.timeout)
+        result = asyncio.run(tester.run())
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print_report(result)
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare, "r") as f:
+            print_comparison(result, json.load(f))
+
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\n💾 Results saved to {args.output}")
+
+    return 0 if result["overall"]["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
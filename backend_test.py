@@ -2,6 +2,8 @@
 """
 Backend Testing Suite for MHT Assessment App
 Tests all backend API endpoints and database functionality
+
+Run with --load to switch to the asyncio load generator (see backend_load_test.py)
 """
 
 import requests
@@ -217,6 +219,11 @@ class BackendTester:
 
 def main():
     """Main test execution"""
+    if "--load" in sys.argv[1:]:
+        # Load-test mode: start the app locally and drive it under concurrency
+        from backend_load_test import main as load_test_main
+        sys.exit(load_test_main([arg for arg in sys.argv[1:] if arg != "--load"]))
+
     tester = BackendTester()
     success = tester.run_all_tests()
     
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Clinical Calculators - Python implementation of utils/clinicalCalculators.ts
+BMI (WHO classes), BSA (Du Bois), eGFR (CKD-EPI 2021 race-free, CKD stage)
+and the HRT relative-risk assessment validated by utils/testVectorsExtended.json.
+"""
+
+import math
+from typing import Any, Dict
+
+from risk_calculators import js_round
+
+# (upper bound, category, health risk, interpretation)
+_BMI_CLASSES = [
+    (18.5, "Underweight", "Moderate", "Below normal weight. May indicate malnutrition or underlying health issues."),
+    (25, "Normal", "Low", "Normal healthy weight. Maintain current lifestyle and diet."),
+    (30, "Overweight", "Moderate", "Above normal weight. Consider lifestyle modifications to reduce cardiovascular risk."),
+    (35, "Obese Class I", "High", "Obesity Class I. Significant health risks. Weight loss recommended."),
+    (40, "Obese Class II", "Very High", "Obesity Class II. Very high health risks. Medical evaluation recommended."),
+    (math.inf, "Obese Class III", "Very High",
+     "Obesity Class III (Morbid Obesity). Extreme health risks. Urgent medical intervention needed."),
+]
+
+# (lower bound, stage, category, interpretation)
+_EGFR_STAGES = [
+    (90, "Normal", "Normal", "Normal kidney function. No evidence of kidney disease."),
+    (60, "Mild Decrease", "Mild", "Mild decrease in kidney function. Monitor and address risk factors."),
+    (30, "Moderate Decrease", "Moderate", "Moderate decrease in kidney function. Nephrology referral may be considered."),
+    (15, "Severe Decrease", "Severe", "Severe decrease in kidney function. Nephrology referral recommended."),
+    (-math.inf, "Kidney Failure", "Failure",
+     "Kidney failure. Urgent nephrology referral and preparation for renal replacement therapy."),
+]
+
+
+def calculate_bmi(weight: float, height: float) -> Dict[str, Any]:
+    """BMI from weight (kg) and height (cm)"""
+    if not weight or not height or weight <= 0 or height <= 0:
+        return {"bmi": 0, "category": "Normal", "healthRisk": "Low",
+                "interpretation": "Invalid input - please enter valid weight and height"}
+
+    bmi = weight / ((height / 100) * (height / 100))
+    _, category, health_risk, interpretation = next(c for c in _BMI_CLASSES if bmi < c[0])
+    return {"bmi": js_round(bmi, 1), "category": category, "interpretation": interpretation,
+            "healthRisk": health_risk}
+
+
+def calculate_bsa(weight: float, height: float) -> Dict[str, Any]:
+    """Body surface area (Du Bois formula)"""
+    if not weight or not height or weight <= 0 or height <= 0:
+        return {"bsa": 0, "method": "Du Bois Formula",
+                "interpretation": "Invalid input - please enter valid weight and height"}
+
+    bsa = 0.007184 * math.pow(weight, 0.425) * math.pow(height, 0.725)
+    if bsa < 1.5:
+        interpretation = "Below average body surface area. May require dose adjustments for medications."
+    elif bsa <= 2.0:
+        interpretation = "Normal body surface area. Standard medication dosing typically appropriate."
+    else:
+        interpretation = "Above average body surface area. May require higher medication doses."
+    return {"bsa": js_round(bsa, 2), "method": "Du Bois Formula", "interpretation": interpretation}
+
+
+def calculate_egfr(age: float, gender: str, creatinine: float) -> Dict[str, Any]:
+    """eGFR (CKD-EPI 2021, without race) with CKD stage"""
+    if not age or not creatinine or age <= 0 or creatinine <= 0:
+        return {"egfr": 0, "stage": "Normal", "category": "Normal",
+                "interpretation": "Invalid input - please enter valid age and creatinine"}
+
+    if gender == "female":
+        exponent = -0.241 if creatinine <= 0.7 else -1.200
+        egfr = 142 * math.pow(creatinine / 0.7, exponent) * math.pow(0.9938, age)
+    else:
+        exponent = -0.302 if creatinine <= 0.9 else -1.200
+        egfr = 142 * math.pow(creatinine / 0.9, exponent) * math.pow(0.9938, age)
+
+    _, stage, category, interpretation = next(s for s in _EGFR_STAGES if egfr >= s[0])
+    return {"egfr": js_round(egfr), "stage": stage, "category": category, "interpretation": interpretation}
+
+
+def calculate_hrt_risk(age: float, time_since_menopause: float, personal_history_bc: bool,
+                       family_history_bc: bool, personal_history_vte: bool, smoking: bool,
+                       hypertension: bool, diabetes: bool, bmi: float) -> Dict[str, Any]:
+    """HRT relative risks (breast cancer, VTE, stroke) and contraindications"""
+    breast_cancer_risk = vte_risk = stroke_risk = 1.0
+    contraindications = []
+    recommendations = []
+
+    if personal_history_bc:
+        contraindications.append("Personal history of breast cancer")
+        breast_cancer_risk = 0
+    if personal_history_vte:
+        contraindications.append("Personal history of venous thromboembolism")
+        vte_risk = 0
+
+    if age >= 60:
+        breast_cancer_risk *= 1.3
+        vte_risk *= 2.0
+        stroke_risk *= 1.5
+        recommendations.append("Consider transdermal estrogen to reduce VTE risk")
+    if time_since_menopause > 10:
+        vte_risk *= 1.4
+        stroke_risk *= 1.2
+        recommendations.append("Window of opportunity may have passed - discuss risks vs benefits")
+    if family_history_bc:
+        breast_cancer_risk *= 1.2
+        recommendations.append("Enhanced breast cancer screening recommended")
+    if smoking:
+        vte_risk *= 2.0
+        stroke_risk *= 1.8
+        contraindications.append("Smoking increases cardiovascular risks")
+        recommendations.append("Smoking cessation strongly recommended before HRT")
+    if bmi >= 30:
+        breast_cancer_risk *= 1.2
+        vte_risk *= 1.5
+        recommendations.append("Weight loss may reduce risks")
+    if hypertension:
+        stroke_risk *= 1.3
+        recommendations.append("Blood pressure control essential")
+    if diabetes:
+        stroke_risk *= 1.4
+        recommendations.append("Glucose control optimization important")
+
+    if contraindications:
+        overall_risk = "High"
+        interpretation = "HRT may not be appropriate due to contraindications. Consider alternatives."
+    elif age >= 60 or time_since_menopause > 10 or breast_cancer_risk > 1.5 or vte_risk > 2.0:
+        overall_risk = "Moderate"
+        interpretation = "HRT may be considered with caution. Enhanced monitoring required."
+    else:
+        overall_risk = "Low"
+        interpretation = "HRT appears appropriate. Standard monitoring recommended."
+
+    if not contraindications:
+        recommendations.append("Regular follow-up every 3-6 months initially")
+        recommendations.append("Annual mammograms and breast exams")
+        recommendations.append("Use lowest effective dose for shortest duration")
+
+    return {
+        "overallRisk": overall_risk,
+        "breastCancerRisk": js_round(breast_cancer_risk, 2),
+        "vteRisk": js_round(vte_risk, 2),
+        "strokeRisk": js_round(stroke_risk, 2),
+        "contraindications": contraindications,
+        "recommendations": recommendations,
+        "interpretation": interpretation,
+    }
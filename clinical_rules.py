@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Clinical Rules - Python implementation of utils/ruleEngine.ts
+Evaluates assets/rules/decision_rules.json (all/any/none condition groups
+with comparison operators and contains/contains_any/contains_multiple list
+checks) against a PatientContext with the same semantics as
+ClinicalRuleEngine.evaluateAllRules, rules in severity_priority order.
+"""
+
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_DECISION_RULES_PATH = APP_ROOT / "assets" / "rules" / "decision_rules.json"
+
+SEVERITY_ORDER = ("Critical", "Major", "Moderate", "Minor")
+
+
+def get_field_value(patient: Dict[str, Any], field: str) -> Any:
+    """getFieldValue: dotted paths, missing steps read as undefined"""
+    value: Any = patient
+    for key in field.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def _js_number(value: Any) -> float:
+    """Number(value) for the values a PatientContext holds"""
+    if value is None:
+        return 0.0
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip() or 0)
+        except ValueError:
+            return float("nan")
+    return float("nan")
+
+
+def _strict_equal(a: Any, b: Any) -> bool:
+    """=== : booleans never equal numbers"""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, (list, dict)) or isinstance(b, (list, dict)):
+        return a is b
+    return a == b
+
+
+def _js_string(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return ",".join(_js_string(item) for item in value)
+    return str(value)
+
+
+def evaluate_operator(field_value: Any, op: str, compare_value: Any) -> bool:
+    """evaluateOperator"""
+    if field_value is None:
+        return False
+    if op in ("=", "=="):
+        return _strict_equal(field_value, compare_value)
+    if op == "!=":
+        return not _strict_equal(field_value, compare_value)
+    if op == ">":
+        return _js_number(field_value) > _js_number(compare_value)
+    if op == ">=":
+        return _js_number(field_value) >= _js_number(compare_value)
+    if op == "<":
+        return _js_number(field_value) < _js_number(compare_value)
+    if op == "<=":
+        return _js_number(field_value) <= _js_number(compare_value)
+    if op == "contains":
+        return _js_string(compare_value).lower() in _js_string(field_value).lower()
+    if op == "not_contains":
+        return _js_string(compare_value).lower() not in _js_string(field_value).lower()
+    return False
+
+
+def evaluate_single_condition(condition: Dict[str, Any], patient: Dict[str, Any]) -> bool:
+    """evaluateSingleCondition"""
+    field_value = get_field_value(patient, condition["field"])
+    if "contains" in condition:
+        return isinstance(field_value, list) and condition["contains"] in field_value
+    if "contains_any" in condition:
+        return isinstance(field_value, list) and any(item in field_value for item in condition["contains_any"])
+    if "contains_multiple" in condition:
+        return (isinstance(field_value, list)
+                and sum(1 for item in condition["contains_multiple"] if item in field_value) >= 2)
+    if condition.get("op") and "value" in condition:
+        return evaluate_operator(field_value, condition["op"], condition["value"])
+    return False
+
+
+def evaluate_conditions(conditions: Dict[str, Any], patient: Dict[str, Any]) -> bool:
+    """evaluateConditions: empty groups are ignored"""
+    if conditions.get("all") and not all(evaluate_single_condition(c, patient) for c in conditions["all"]):
+        return False
+    if conditions.get("any") and not any(evaluate_single_condition(c, patient) for c in conditions["any"]):
+        return False
+    if conditions.get("none") and any(evaluate_single_condition(c, patient) for c in conditions["none"]):
+        return False
+    return True
+
+
+def triggered_fields(rule: Dict[str, Any], patient: Dict[str, Any]) -> List[str]:
+    """getTriggeredFields: fields of the all/any conditions that hold, first occurrence order"""
+    fields: List[str] = []
+    for group in ("all", "any"):
+        for condition in rule["conditions"].get(group) or ():
+            if condition["field"] not in fields and evaluate_single_condition(condition, patient):
+                fields.append(condition["field"])
+    return fields
+
+
+def load_decision_rules(path=DEFAULT_DECISION_RULES_PATH) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError("Rules file does not contain valid array")
+    return rules
+
+
+class ClinicalRuleIndex:
+    """ClinicalRuleEngine over one rule list"""
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        # Stable sort, highest severity_priority first
+        self.rules = sorted(rules, key=lambda rule: rule["severity_priority"], reverse=True)
+        self.by_id: Dict[str, Dict[str, Any]] = {rule["id"]: rule for rule in self.rules}
+
+    def overlay(self, replacements: Dict[str, Dict[str, Any]]) -> "ClinicalRuleIndex":
+        """Index sharing every rule with this one except the replaced ids"""
+        view = copy.copy(self)
+        view.rules = sorted((replacements.get(rule["id"], rule) for rule in self.rules),
+                            key=lambda rule: rule["severity_priority"], reverse=True)
+        view.by_id = {**self.by_id, **replacements}
+        return view
+
+    def evaluate(self, patient: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Triggered rules in evaluation order, with the fields that triggered them"""
+        results = []
+        for rule in self.rules:
+            try:
+                triggered = evaluate_conditions(rule["conditions"], patient)
+            except (KeyError, TypeError):
+                # evaluateRule logs and treats a broken rule as not triggered
+                triggered = False
+            if triggered:
+                results.append({
+                    "id": rule["id"],
+                    "severity": rule["severity"],
+                    "severity_priority": rule["severity_priority"],
+                    "title": rule["title"],
+                    "message": rule["message"],
+                    "action": rule["action"],
+                    "source": rule["source"],
+                    "triggeredFields": triggered_fields(rule, patient),
+                })
+        return results
+
+    def evaluate_grouped(self, patient: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """formatResultsForDisplay: triggered rules by severity"""
+        grouped: Dict[str, List[Dict[str, Any]]] = {severity.lower(): [] for severity in SEVERITY_ORDER}
+        for result in self.evaluate(patient):
+            grouped.setdefault(result["severity"].lower(), []).append(result)
+        return grouped
+
+
+_INDEXES: Dict[str, ClinicalRuleIndex] = {}
+
+
+def get_clinical_rules(path=DEFAULT_DECISION_RULES_PATH) -> ClinicalRuleIndex:
+    """Index for a decision rule file, built once per process"""
+    key = str(path)
+    if key not in _INDEXES:
+        _INDEXES[key] = ClinicalRuleIndex(load_decision_rules(path))
+    return _INDEXES[key]
+
+
+if __name__ == "__main__":
+    patient = {"age": 72, "ASCVD_percent": 22, "systolic_bp": 165, "wells_score": 1, "egfr": 50,
+               "selected_medications": ["HRT_Estrogen", "nsaid", "anticoagulant"], "medication_count": 3}
+    index = get_clinical_rules()
+    for severity, results in index.evaluate_grouped(patient).items():
+        for result in results:
+            print(f"🚨 {severity:<8} {result['id']} {result['title']}  ({', '.join(result['triggeredFields'])})")
+    print(f"📊 {len(index.rules)} rules")
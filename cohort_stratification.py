@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Cohort Stratification - nightly population report over data/thresholds.json
+Counts how many patients fall into each ASCVD, Framingham, FRAX_major,
+FRAX_hip, GAIL_5yr and WELLS_VTE band and how often each threshold action
+applies. The patient store (SQLite, JSON-lines or CSV) is split into row or
+byte ranges, one worker process per range; each worker streams its range in
+fixed-size chunks and bands them with np.searchsorted, so memory is bounded
+by workers x chunk size however large the store is.
+
+Bands follow TreatmentPlanEngine.check_risk_thresholds: a score belongs to
+the highest cutoff it is >= to.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+APP_ROOT = Path(__file__).parent
+THRESHOLDS_PATH = APP_ROOT / "data" / "thresholds.json"
+STORE_PATH = Path(os.environ.get("PATIENT_STORE", APP_ROOT / "patients.db"))
+REPORT_DIR = APP_ROOT / "reports"
+DEFAULT_CHUNK_SIZE = 65536
+REPORT_VERSION = 1
+
+# Score -> field names accepted in the store, in order of preference
+SCORE_FIELDS = {
+    "ASCVD": ("ASCVD", "ascvd"),
+    "Framingham": ("Framingham", "framingham"),
+    "FRAX_major": ("FRAX_major", "frax_major"),
+    "FRAX_hip": ("FRAX_hip", "frax_hip"),
+    "GAIL_5yr": ("GAIL_5yr", "gail_5yr"),
+    "WELLS_VTE": ("WELLS_VTE", "Wells", "wells"),
+}
+SCORES = tuple(SCORE_FIELDS)
+
+# Action -> (score, cutoff keys whose band triggers it), as in check_risk_thresholds
+ACTION_BANDS = {
+    "ASCVD_high": ("ASCVD", ("high",)),
+    "ASCVD_intermediate": ("ASCVD", ("low",)),
+    "FRAX_high": ("FRAX_major", ("high",)),
+    "GAIL_elevated": ("GAIL_5yr", ("elevated_5yr",)),
+    "WELLS_high": ("WELLS_VTE", ("high",)),
+}
+
+
+class BandTable:
+    """Sorted cutoffs for every score plus the band index each action fires on"""
+
+    def __init__(self, thresholds: Dict[str, Any]):
+        self.version = thresholds.get("version")
+        self.actions = [key for key in thresholds["actions"] if key in ACTION_BANDS]
+        self.edges: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, List[str]] = {}
+        self.action_bands: Dict[str, Tuple[str, np.ndarray]] = {}
+
+        risk = thresholds["risk_thresholds"]
+        for score in SCORES:
+            cutoffs = sorted(risk[score]["cutoffs"].items(), key=lambda item: item[1])
+            keys = [key for key, _ in cutoffs]
+            labels = list(risk[score].get("labels", {}))
+            if len(labels) != len(keys) + 1:
+                labels = [f"below_{keys[0]}"] + keys
+            self.edges[score] = np.array([value for _, value in cutoffs], dtype=np.float64)
+            self.labels[score] = labels + ["unknown"]
+        for action in self.actions:
+            score, keys = ACTION_BANDS[action]
+            order = [key for key, _ in sorted(risk[score]["cutoffs"].items(), key=lambda item: item[1])]
+            self.action_bands[action] = (score, np.array([order.index(key) + 1 for key in keys]))
+
+    @classmethod
+    def load(cls, path=THRESHOLDS_PATH) -> "BandTable":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def bands(self, score: str, values: np.ndarray) -> np.ndarray:
+        """Band index per value; missing (NaN) values go to the trailing "unknown" band"""
+        edges = self.edges[score]
+        index = np.searchsorted(edges, values, side="right")
+        index[np.isnan(values)] = len(edges) + 1
+        return index
+
+
+class Tally:
+    """Histogram and action counts for any number of chunks"""
+
+    def __init__(self, table: BandTable):
+        self.patients = 0
+        self.insufficient = 0
+        self.histograms = {score: np.zeros(len(table.labels[score]), dtype=np.int64) for score in SCORES}
+        self.actions = np.zeros(len(table.actions), dtype=np.int64)
+        self.any_action = 0
+
+    def add_chunk(self, table: BandTable, columns: np.ndarray):
+        """columns is a (rows, len(SCORES)) float array, NaN where a score is missing"""
+        rows = columns.shape[0]
+        if not rows:
+            return
+        self.patients += rows
+        self.insufficient += int(np.isnan(columns).all(axis=1).sum())
+        bands = {}
+        for i, score in enumerate(SCORES):
+            bands[score] = table.bands(score, np.ascontiguousarray(columns[:, i]))
+            self.histograms[score] += np.bincount(bands[score], minlength=len(table.labels[score]))
+        fired_any = np.zeros(rows, dtype=bool)
+        for i, action in enumerate(table.actions):
+            score, band_ids = table.action_bands[action]
+            fired = np.isin(bands[score], band_ids)
+            self.actions[i] += int(fired.sum())
+            fired_any |= fired
+        self.any_action += int(fired_any.sum())
+
+    def merge(self, other: "Tally"):
+        self.patients += other.patients
+        self.insufficient += other.insufficient
+        self.any_action += other.any_action
+        self.actions += other.actions
+        for score in SCORES:
+            self.histograms[score] += other.histograms[score]
+
+
+# ---------------------------------------------------------------------------
+# Patient stores: split() gives ranges, read_range() streams one in chunks
+# ---------------------------------------------------------------------------
+
+def _store_kind(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in (".db", ".sqlite", ".sqlite3"):
+        return "sqlite"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix == ".csv":
+        return "csv"
+    raise ValueError(f"Unsupported patient store {path} (expected .db/.sqlite, .jsonl or .csv)")
+
+
+def _sqlite_columns(conn: sqlite3.Connection) -> List[Optional[str]]:
+    present = {row[1] for row in conn.execute("PRAGMA table_info(patients)")}
+    if not present:
+        raise ValueError("SQLite store has no 'patients' table")
+    return [next((name for name in SCORE_FIELDS[score] if name in present), None) for score in SCORES]
+
+
+def split(path: Path, parts: int) -> List[Tuple[int, int]]:
+    """Half-open ranges covering the store: rowids for SQLite, byte offsets for text files"""
+    kind = _store_kind(path)
+    if kind == "sqlite":
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            low, high = conn.execute("SELECT MIN(rowid), MAX(rowid) FROM patients").fetchone()
+        finally:
+            conn.close()
+        if low is None:
+            return []
+        low, high = low, high + 1
+    else:
+        low, high = 0, path.stat().st_size
+    step = max(1, -(-(high - low) // parts))
+    return [(start, min(start + step, high)) for start in range(low, high, step)]
+
+
+def _read_sqlite(path: Path, start: int, end: int, chunk_size: int) -> Iterator[np.ndarray]:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        columns = _sqlite_columns(conn)
+        select = ", ".join(f'"{name}"' if name else "NULL" for name in columns)
+        cursor = conn.execute(f"SELECT {select} FROM patients WHERE rowid >= ? AND rowid < ?", (start, end))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield np.array(rows, dtype=np.float64).reshape(len(rows), len(SCORES))
+    finally:
+        conn.close()
+
+
+def _lines(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Lines whose first byte lies in [start, end); the header line is never included"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        if start:
+            f.seek(start - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+        position = f.tell()
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line
+
+
+def _number(value: Any) -> float:
+    if value is None or value == "" or isinstance(value, bool):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _read_jsonl(path: Path, start: int, end: int, chunk_size: int) -> Iterator[np.ndarray]:
+    rows = []
+    for line in _lines(path, start, end):
+        if not line.strip():
+            continue
+        patient = json.loads(line)
+        scores = patient.get("riskScores", patient)
+        rows.append([_number(next((scores[name] for name in SCORE_FIELDS[score] if name in scores), None))
+                     for score in SCORES])
+        if len(rows) == chunk_size:
+            yield np.array(rows, dtype=np.float64)
+            rows = []
+    if rows:
+        yield np.array(rows, dtype=np.float64)
+
+
+def _read_csv(path: Path, start: int, end: int, chunk_size: int) -> Iterator[np.ndarray]:
+    with open(path, "rb") as f:
+        first_line = f.readline()
+    header = next(csv.reader([first_line.decode("utf-8-sig")]))
+    positions = [next((header.index(name) for name in SCORE_FIELDS[score] if name in header), None)
+                 for score in SCORES]
+    start = max(start, len(first_line))
+    rows = []
+    for line in _lines(path, start, end):
+        record = next(csv.reader([line.decode("utf-8")]), None)
+        if not record:
+            continue
+        rows.append([_number(record[i]) if i is not None and i < len(record) else np.nan for i in positions])
+        if len(rows) == chunk_size:
+            yield np.array(rows, dtype=np.float64)
+            rows = []
+    if rows:
+        yield np.array(rows, dtype=np.float64)
+
+
+_READERS = {"sqlite": _read_sqlite, "jsonl": _read_jsonl, "csv": _read_csv}
+
+
+def read_range(path: Path, start: int, end: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[np.ndarray]:
+    return _READERS[_store_kind(path)](path, start, end, chunk_size)
+
+
+def _stratify_range(task: Tuple[str, str, int, int, int]) -> Tally:
+    store, thresholds, start, end, chunk_size = task
+    table = BandTable.load(thresholds)
+    tally = Tally(table)
+    for columns in read_range(Path(store), start, end, chunk_size):
+        tally.add_chunk(table, columns)
+    return tally
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def stratify(store=STORE_PATH, thresholds=THRESHOLDS_PATH, chunk_size: int = DEFAULT_CHUNK_SIZE,
+             workers: Optional[int] = None) -> Dict[str, Any]:
+    """Band every patient in the store and return the report"""
+    store, thresholds = Path(store), Path(thresholds)
+    if not store.exists():
+        raise FileNotFoundError(f"Patient store not found: {store}")
+    workers = max(1, workers or os.cpu_count() or 1)
+    table = BandTable.load(thresholds)
+    # A few ranges per worker so one slow range does not leave the others idle
+    ranges = split(store, workers * 4 if workers > 1 else 1)
+    tasks = [(str(store), str(thresholds), start, end, chunk_size) for start, end in ranges]
+
+    started = time.perf_counter()
+    total = Tally(table)
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            total.merge(_stratify_range(task))
+    else:
+        with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+            for tally in pool.imap_unordered(_stratify_range, tasks):
+                total.merge(tally)
+    elapsed = time.perf_counter() - started
+    return build_report(table, total, store, elapsed, workers, chunk_size)
+
+
+def build_report(table: BandTable, tally: Tally, store: Path, elapsed: float, workers: int,
+                 chunk_size: int) -> Dict[str, Any]:
+    scores = {}
+    for score in SCORES:
+        counts = tally.histograms[score].tolist()
+        scores[score] = {
+            "cutoffs": table.edges[score].tolist(),
+            "bands": dict(zip(table.labels[score], counts)),
+            "known": tally.patients - counts[-1],
+        }
+    return {
+        "version": REPORT_VERSION,
+        "generatedAt": datetime.now().isoformat(),
+        "thresholdsVersion": table.version,
+        "store": str(store),
+        "patients": tally.patients,
+        "insufficientData": tally.insufficient,
+        "withAnyAction": tally.any_action,
+        "scores": scores,
+        "actions": dict(zip(table.actions, tally.actions.tolist())),
+        "run": {"workers": workers, "chunkSize": chunk_size, "elapsedSeconds": round(elapsed, 3),
+                "patientsPerSecond": round(tally.patients / elapsed) if elapsed > 0 else None},
+    }
+
+
+def generate_store(path: Path, count: int, seed: int = 7, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Write a synthetic SQLite store of `count` patients (about 5% of each score missing)"""
+    rng = np.random.default_rng(seed)
+    if path.exists():
+        path.unlink()
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE patients (id INTEGER PRIMARY KEY, "
+                     + ", ".join(f"{score} REAL" for score in SCORES) + ")")
+        insert = f"INSERT INTO patients ({', '.join(SCORES)}) VALUES ({', '.join('?' * len(SCORES))})"
+        for offset in range(0, count, chunk_size):
+            n = min(chunk_size, count - offset)
+            columns = np.column_stack([
+                rng.gamma(2.0, 4.0, n),          # ASCVD %
+                rng.gamma(2.0, 5.0, n),          # Framingham %
+                rng.gamma(2.0, 5.0, n),          # FRAX major %
+                rng.gamma(1.5, 1.2, n),          # FRAX hip %
+                rng.gamma(3.0, 0.5, n),          # GAIL 5-year %
+                rng.integers(-2, 8, n) / 1.0,    # Wells score
+            ]).round(2)
+            columns[rng.random(columns.shape) < 0.05] = np.nan
+            rows = [tuple(None if v != v else v for v in row) for row in columns.tolist()]
+            conn.executemany(insert, rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def print_report(report: Dict[str, Any]):
+    print("=" * 70)
+    print(f"📊 COHORT STRATIFICATION - {report['patients']:,} patients")
+    print("=" * 70)
+    for score, entry in report["scores"].items():
+        bands = ", ".join(f"{label}={count:,}" for label, count in entry["bands"].items())
+        print(f"{score:<12} {bands}")
+    print("-" * 70)
+    for action, count in report["actions"].items():
+        share = count / report["patients"] * 100 if report["patients"] else 0
+        print(f"{action:<20} {count:>12,}  ({share:.1f}%)")
+    print(f"{'any action':<20} {report['withAnyAction']:>12,}")
+    print(f"{'insufficient data':<20} {report['insufficientData']:>12,}")
+    run = report["run"]
+    print(f"⏱️  {run['elapsedSeconds']}s on {run['workers']} worker(s), {run['chunkSize']:,} rows per chunk")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Stratify the patient store into thresholds.json risk bands")
+    parser.add_argument("--store", type=Path, default=STORE_PATH,
+                        help="Patient store: .db/.sqlite (patients table), .jsonl or .csv (default: $PATIENT_STORE)")
+    parser.add_argument("--thresholds", type=Path, default=THRESHOLDS_PATH)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Report path (default: reports/cohort_<date>.json)")
+    parser.add_argument("--generate", type=int, metavar="N", default=None,
+                        help="First write a synthetic SQLite store of N patients to --store")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        started = time.perf_counter()
+        generate_store(args.store, args.generate)
+        print(f"💾 Generated {args.generate:,} patients in {args.store} ({time.perf_counter() - started:.1f}s)")
+
+    try:
+        report = stratify(args.store, args.thresholds, args.chunk_size, args.workers)
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        print(f"❌ {e}")
+        return 1
+
+    output = args.output or REPORT_DIR / f"cohort_{datetime.now():%Y%m%d}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"💾 Report saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
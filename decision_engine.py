@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+MHT Decision Engine - Python implementation of mht_rules/decision_engine.js
+Categorises the risk scores against risk_thresholds.json and walks
+treatment_rules.json in priority order: the first contraindication wins,
+then high-risk rules, medication interactions, moderate-risk and default
+rules are accumulated and the most restrictive suitability is chosen.
+TieredEvaluator gives the same results from rule tiers compiled into
+per-field dispatch tables, for batches of patients.
+
+mht_rules/drug_interactions.json ships as a flat rule list without the
+drugClasses map evaluate() expects; in that case the per-medication
+interaction step is skipped instead of failing.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from rule_trace import RuleTrace, active_trace
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_RULES_DIR = APP_ROOT / "mht_rules"
+
+SUITABILITY_PRIORITY = {
+    "Contraindicated": 3,
+    "Use with caution": 2,
+    "Suitable": 1,
+    "Suitable (for osteoporosis therapy)": 1,
+}
+
+NO_MATCH_ACTION = {
+    "recommendation": "No specific recommendation",
+    "suitability": "Suitable",
+    "rationale": "No rules matched specifically.",
+}
+
+
+def categorize_risk(value: Optional[float], thresholds: Dict[str, float]) -> str:
+    if value is None:
+        return "low"
+    high = thresholds.get("high")
+    intermediate = thresholds.get("intermediate")
+    if high is not None and value >= high:
+        return "high"
+    if intermediate is not None and value >= intermediate:
+        return "intermediate"
+    return "low"
+
+
+# Patient fields compared as numbers by categorize() and the symptom_severity ranges
+NUMERIC_FIELDS = ("ASCVD", "Framingham", "Framingham_score", "Gail", "TyrerCuzick", "Wells", "FRAX",
+                  "symptom_severity")
+
+
+def patient_error(patient: Any) -> Optional[str]:
+    """Why evaluate() cannot take this patient, or None when it can"""
+    if not isinstance(patient, dict):
+        return "patient must be an object"
+    for field in NUMERIC_FIELDS:
+        value = patient.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            return f"{field} must be a number"
+    meds = patient.get("meds")
+    if meds is not None and (not isinstance(meds, list) or not all(isinstance(med, str) for med in meds)):
+        return "meds must be a list of strings"
+    therapy = patient.get("therapy_selected")
+    if therapy is not None and not isinstance(therapy, str):
+        return "therapy_selected must be a string"
+    return None
+
+
+def match_condition(cond: Dict[str, Any], patient: Dict[str, Any]) -> bool:
+    """matchCondition from decision_engine.js"""
+    for key, val in cond.items():
+        if key == "symptom_severity" and isinstance(val, dict):
+            severity = patient.get("symptom_severity")
+            if "lte" in val and not (severity is not None and severity <= val["lte"]):
+                return False
+            if "gte" in val and not (severity is not None and severity >= val["gte"]):
+                return False
+            continue
+        if key == "meds_include":
+            meds = patient.get("meds")
+            if not isinstance(meds, list) or val not in meds:
+                return False
+            continue
+        if key == "therapy_selected":
+            selected = patient.get("therapy_selected")
+            if isinstance(val, list):
+                if selected not in val:
+                    return False
+            elif selected != val:
+                return False
+            continue
+        if isinstance(val, bool):
+            if (patient.get(key) is True) != val:
+                return False
+            continue
+        if patient.get(key) != val:
+            return False
+    return True
+
+
+def _decision(action: Dict[str, Any], warnings: List[str]) -> Dict[str, Any]:
+    return {
+        "primary": action["recommendation"],
+        "suitability": action["suitability"],
+        "rationale": action["rationale"],
+        "warnings": warnings,
+    }
+
+
+def _most_restrictive(actions: List[Dict]) -> Dict[str, Any]:
+    # Array.prototype.sort is stable, as is list.sort
+    actions.sort(key=lambda action: SUITABILITY_PRIORITY.get(action["suitability"], 0), reverse=True)
+    return actions[0] if actions else NO_MATCH_ACTION
+
+
+class DecisionEngine:
+    """evaluate() over one mht_rules bundle"""
+
+    def __init__(self, rules_dir=DEFAULT_RULES_DIR):
+        rules_dir = Path(rules_dir)
+        self.risk_thresholds = self._load(rules_dir / "risk_thresholds.json")
+        self.treatment_rules = self._load(rules_dir / "treatment_rules.json")
+        drug_interactions = self._load(rules_dir / "drug_interactions.json")
+        self.drug_classes: Dict[str, Dict] = (
+            drug_interactions.get("drugClasses", {}) if isinstance(drug_interactions, dict) else {}
+        )
+        # Rule ids by condition object, so a traced matcher can name the rule it is given
+        self._condition_rules = {
+            id(rule["condition"]): rule["id"]
+            for tier in self.treatment_rules.get("priorities", []) for rule in self.treatment_rules.get(tier, [])
+        }
+
+    @staticmethod
+    def _load(path: Path) -> Any:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def categorize(self, patient: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of the input with the *_category fields filled in"""
+        thresholds = self.risk_thresholds
+        categorized = dict(patient)
+        categorized["ASCVD_category"] = categorize_risk(patient.get("ASCVD"), thresholds["ASCVD"])
+        categorized["Framingham_category"] = categorize_risk(
+            patient.get("Framingham") or patient.get("Framingham_score"), thresholds["Framingham"])
+        categorized["Gail_category"] = categorize_risk(patient.get("Gail"), thresholds["Gail"])
+        categorized["TyrerCuzick_category"] = categorize_risk(patient.get("TyrerCuzick"), thresholds["TyrerCuzick"])
+        categorized["Wells_category"] = categorize_risk(patient.get("Wells"), thresholds["Wells"])
+        categorized["FRAX_category"] = categorize_risk(patient.get("FRAX"), thresholds["FRAX"])
+        return categorized
+
+    def _medication_actions(self, patient: Dict[str, Any], accumulated: List[Dict], warnings: List[str]):
+        therapy = patient.get("therapy_selected")
+        for med in patient.get("meds") or []:
+            med_info = self.drug_classes.get(med)
+            if not med_info:
+                continue
+            interactions = med_info.get("interactions", {})
+            for key, description in interactions.items():
+                if therapy and (therapy == key or therapy == key.replace("_", "", 1)):
+                    accumulated.append({
+                        "recommendation": f"Interaction: {description}",
+                        "suitability": "Use with caution",
+                        "rationale": f"Medication interaction detected: {med} -> {description}",
+                    })
+                    warnings.append(f"interaction_{med}_{key}")
+            if med == "anticoagulants" and therapy and therapy.startswith("estrogen"):
+                accumulated.append({
+                    "recommendation": "Avoid systemic estrogen; prefer non-hormonal or consult specialist",
+                    "suitability": "Contraindicated",
+                    "rationale": "Anticoagulant present increases bleeding risk with systemic estrogen.",
+                })
+                warnings.append("anticoagulant_interaction")
+            if med == "anticonvulsants" and therapy == "estrogen_oral":
+                accumulated.append({
+                    "recommendation": "Estrogen efficacy may be reduced; consider transdermal or adjust plan",
+                    "suitability": "Use with caution",
+                    "rationale": "Anticonvulsant may reduce oral estrogen levels.",
+                })
+                warnings.append("anticonvulsant_interaction")
+
+    def _traced_matcher(self, trace: RuleTrace) -> Callable[[Dict[str, Any], Dict[str, Any]], bool]:
+        def match(cond: Dict[str, Any], patient: Dict[str, Any]) -> bool:
+            with trace.rule("mht_decision_engine", self._condition_rules.get(id(cond))) as record:
+                record.matched = all(
+                    record.check(key, val, patient.get(key), match_condition({key: val}, patient))
+                    for key, val in cond.items()
+                )
+            return record.matched
+        return match
+
+    def evaluate(self, patient: Dict[str, Any]) -> Dict[str, Any]:
+        patient = self.categorize(patient)
+        rules = self.treatment_rules
+        warnings: List[str] = []
+        accumulated: List[Dict] = []
+        trace = active_trace()
+        match = match_condition if trace is None else self._traced_matcher(trace)
+
+        for rule in rules["contraindication"]:
+            if match(rule["condition"], patient):
+                return _decision(rule["action"], warnings)
+
+        for rule in rules["high_risk"]:
+            if match(rule["condition"], patient):
+                accumulated.append(rule["action"])
+                warnings.append(rule["id"])
+
+        self._medication_actions(patient, accumulated, warnings)
+
+        for tier in ("moderate_risk", "default"):
+            for rule in rules[tier]:
+                if match(rule["condition"], patient):
+                    accumulated.append(rule["action"])
+
+        return _decision(_most_restrictive(accumulated), warnings)
+
+
+# evaluate() walks contraindication, high_risk, then moderate_risk and default, which are
+# accumulated alike after the medication step. The drug_interaction tier of
+# treatment_rules.json is not walked: medication interactions come from drugClasses.
+LATE_TIERS = ("moderate_risk", "default")
+# (score, fallback score) pairs categorize() bands, in its order
+RISK_SCORES = (("ASCVD", None), ("Framingham", "Framingham_score"), ("Gail", None),
+               ("TyrerCuzick", None), ("Wells", None), ("FRAX", None))
+
+Check = Callable[[Dict[str, Any]], bool]
+
+
+def _compile_check(key: str, val: Any) -> Check:
+    """matchCondition for a condition _dispatch cannot index (ranges, unhashable values)"""
+    if key == "symptom_severity" and isinstance(val, dict):
+        has_lte, lte = "lte" in val, val.get("lte")
+        has_gte, gte = "gte" in val, val.get("gte")
+
+        def check(patient):
+            severity = patient.get("symptom_severity")
+            if has_lte and not (severity is not None and severity <= lte):
+                return False
+            if has_gte and not (severity is not None and severity >= gte):
+                return False
+            return True
+        return check
+    if key == "meds_include":
+        return lambda patient: isinstance(patient.get("meds"), list) and val in patient["meds"]
+    if key == "therapy_selected" and isinstance(val, list):
+        return lambda patient: patient.get("therapy_selected") in val
+    return lambda patient: patient.get(key) == val
+
+
+def _all_of(checks: List[Check]) -> Optional[Check]:
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+    return lambda patient: all(check(patient) for check in checks)
+
+
+def _dispatch(key: str, val: Any) -> Optional[Tuple[Tuple[str, str], List[Any]]]:
+    """(table, values) when the condition holds exactly when the patient's value is one of values
+
+    ("meds", "meds") looks up each medication, ("flag", key) whether the field
+    is true and ("equals", key) the field itself.
+    """
+    if key == "symptom_severity" and isinstance(val, dict):
+        return None
+    values = val if key == "therapy_selected" and isinstance(val, list) else [val]
+    if any(isinstance(value, (dict, list)) for value in values):
+        return None
+    if key == "meds_include":
+        return ("meds", "meds"), values
+    if isinstance(val, bool) and key != "therapy_selected":
+        return ("flag", key), values
+    return ("equals", key), values
+
+
+class CompiledTier:
+    """One rule tier compiled into per-field dispatch tables
+
+    Each indexable condition files its rule under the values that satisfy it,
+    so one lookup per field finds the rules whose indexed conditions all hold;
+    only those have their remaining (range) conditions checked.
+    """
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        self._needed: List[int] = []
+        self._residual: List[Optional[Check]] = []
+        self._unindexed: List[int] = []
+        tables: Dict[Tuple[str, str], Dict[Any, List[int]]] = {}
+
+        for position, rule in enumerate(rules):
+            needed = 0
+            checks = []
+            for key, val in rule["condition"].items():
+                dispatch = _dispatch(key, val)
+                if dispatch is None:
+                    checks.append(_compile_check(key, val))
+                    continue
+                table_id, values = dispatch
+                table = tables.setdefault(table_id, {})
+                for value in values:
+                    table.setdefault(value, []).append(position)
+                needed += 1
+            self._needed.append(needed)
+            self._residual.append(_all_of(checks))
+            if not needed:
+                self._unindexed.append(position)
+
+        # Split every table entry into rules that one hit completes and rules that need more
+        split = {
+            table_id: {value: ([p for p in positions if self._needed[p] == 1],
+                               [p for p in positions if self._needed[p] > 1])
+                       for value, positions in table.items()}
+            for table_id, table in tables.items()
+        }
+        self._meds_table = split.pop(("meds", "meds"), {})
+        self._scalar_tables = [(key, kind == "flag", table) for (kind, key), table in split.items()]
+
+    def candidates(self, patient: Dict[str, Any]) -> List[int]:
+        """Positions whose indexed conditions all hold, in file order"""
+        if not self._scalar_tables and not self._meds_table:
+            return self._unindexed
+        get = patient.get
+        candidates = self._unindexed[:]
+        hits: Dict[int, int] = {}
+        for key, flag, table in self._scalar_tables:
+            value = get(key)
+            if flag:
+                value = value is True
+            try:
+                entry = table.get(value)
+            except TypeError:  # unhashable input never equals a rule value
+                continue
+            if entry is not None:
+                candidates += entry[0]
+                for position in entry[1]:
+                    hits[position] = hits.get(position, 0) + 1
+
+        meds = get("meds")
+        if self._meds_table and isinstance(meds, list):
+            seen = set()
+            for med in meds:
+                try:
+                    entry = self._meds_table.get(med)
+                except TypeError:
+                    continue
+                if entry is not None and med not in seen:
+                    seen.add(med)
+                    candidates += entry[0]
+                    for position in entry[1]:
+                        hits[position] = hits.get(position, 0) + 1
+
+        if hits:
+            needed = self._needed
+            candidates.extend(position for position, count in hits.items() if count == needed[position])
+        candidates.sort()
+        return candidates
+
+    def matches(self, patient: Dict[str, Any]) -> List[Dict]:
+        """Rules whose conditions hold for a categorized patient, in file order"""
+        residual = self._residual
+        return [self.rules[position] for position in self.candidates(patient)
+                if residual[position] is None or residual[position](patient)]
+
+    def first(self, patient: Dict[str, Any]) -> Optional[Dict]:
+        residual = self._residual
+        for position in self.candidates(patient):
+            if residual[position] is None or residual[position](patient):
+                return self.rules[position]
+        return None
+
+
+class TieredEvaluator:
+    """evaluate() over compiled tiers; results are identical to DecisionEngine.evaluate
+
+    The risk bands are bound at compile time and the contraindication tier is
+    probed on its own first, so a contraindicated patient never touches the
+    other tiers.
+    """
+
+    def __init__(self, engine: Optional[DecisionEngine] = None):
+        self.engine = engine or get_engine()
+        self._bands = [
+            (f"{score}_category", score, fallback,
+             self.engine.risk_thresholds[score].get("high"), self.engine.risk_thresholds[score].get("intermediate"))
+            for score, fallback in RISK_SCORES
+        ]
+        rules = self.engine.treatment_rules
+        self.contraindication = CompiledTier(rules["contraindication"])
+        self.high_risk = CompiledTier(rules["high_risk"])
+        self.late = CompiledTier([rule for tier in LATE_TIERS for rule in rules[tier]])
+
+    def categorize(self, patient: Dict[str, Any]) -> Dict[str, Any]:
+        """DecisionEngine.categorize with the thresholds bound at compile time"""
+        categorized = dict(patient)
+        get = patient.get
+        for category, score, fallback, high, intermediate in self._bands:
+            value = get(score)
+            if fallback is not None:
+                value = value or get(fallback)
+            if value is None:
+                categorized[category] = "low"
+            elif high is not None and value >= high:
+                categorized[category] = "high"
+            elif intermediate is not None and value >= intermediate:
+                categorized[category] = "intermediate"
+            else:
+                categorized[category] = "low"
+        return categorized
+
+    def evaluate(self, patient: Dict[str, Any]) -> Dict[str, Any]:
+        if active_trace() is not None:
+            # Traces show every rule the reference walk visits; the results are the same
+            return self.engine.evaluate(patient)
+        patient = self.categorize(patient)
+        warnings: List[str] = []
+
+        contraindication = self.contraindication.first(patient)
+        if contraindication is not None:
+            return _decision(contraindication["action"], warnings)
+
+        accumulated: List[Dict] = []
+        for rule in self.high_risk.matches(patient):
+            accumulated.append(rule["action"])
+            warnings.append(rule["id"])
+
+        self.engine._medication_actions(patient, accumulated, warnings)
+
+        accumulated.extend(rule["action"] for rule in self.late.matches(patient))
+
+        return _decision(_most_restrictive(accumulated), warnings)
+
+    def evaluate_batch(self, patients: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One decision per patient, in input order"""
+        evaluate = self.evaluate
+        return [evaluate(patient) for patient in patients]
+
+
+_ENGINES: Dict[str, DecisionEngine] = {}
+_EVALUATORS: Dict[str, TieredEvaluator] = {}
+
+
+def get_engine(rules_dir=DEFAULT_RULES_DIR) -> DecisionEngine:
+    key = str(rules_dir)
+    if key not in _ENGINES:
+        _ENGINES[key] = DecisionEngine(rules_dir)
+    return _ENGINES[key]
+
+
+def evaluate(patient: Dict[str, Any], rules_dir=DEFAULT_RULES_DIR) -> Dict[str, Any]:
+    return get_engine(rules_dir).evaluate(patient)
+
+
+def get_evaluator(rules_dir=DEFAULT_RULES_DIR) -> TieredEvaluator:
+    key = str(rules_dir)
+    if key not in _EVALUATORS:
+        _EVALUATORS[key] = TieredEvaluator(get_engine(rules_dir))
+    return _EVALUATORS[key]
+
+
+def evaluate_batch(patients: Iterable[Dict[str, Any]], rules_dir=DEFAULT_RULES_DIR) -> List[Dict[str, Any]]:
+    return get_evaluator(rules_dir).evaluate_batch(patients)
@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Drug API Proxy - backend side of checkDrugInteractionsOnline
+The app used to call openFDA, RxNav or DrugBank from every device with a
+fresh fetch. Here the calls go through one keep-alive connection pool and a
+persistent response cache keyed on the normalized drug set. A slow request
+is hedged with a second copy after the provider's recent p95 latency, and a
+per-provider circuit breaker stops calling a failing provider for a while.
+Whenever no provider answer is available the local rules answer instead, so
+an online check never takes longer than its timeout.
+
+Usage:
+    python drug_api_proxy.py stub --port 8099 --delay 0.05 --fail-rate 0.2
+    DRUG_API_BASE_URL=http://127.0.0.1:8099 python drug_api_proxy.py check warfarin ibuprofen --provider RxNorm
+    python drug_api_proxy_test.py         # breaker and hedging checks against stub servers
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+
+from drug_rules import LOCAL_SOURCE, normalize
+from interaction_screen import get_screen
+
+APP_ROOT = Path(__file__).parent
+CACHE_PATH = Path(os.environ.get("DRUG_API_CACHE", APP_ROOT / "drug_api_cache.db"))
+# Points every provider at one host (e.g. the stub server) while keeping their paths
+BASE_URL_OVERRIDE = os.environ.get("DRUG_API_BASE_URL")
+
+DEFAULT_TIMEOUT_MS = 6000  # drugSettings apiTimeout
+CACHE_TTL_SECONDS = 24 * 3600
+USER_AGENT = "MHT-Assessment-App/1.0"
+
+# Hedge after the provider's recent p95 latency, within these bounds
+HEDGE_MIN_SECONDS = 0.05
+HEDGE_DEFAULT_SECONDS = 0.5
+LATENCY_WINDOW = 200
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    provider TEXT NOT NULL,
+    drug_key TEXT NOT NULL,
+    results TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (provider, drug_key)
+);
+"""
+
+
+def classify_severity(value: Any) -> str:
+    """drugApiIntegration.ts classifySeverity"""
+    val = str(value).lower()
+    if "serious" in val or "severe" in val or "high" in val or val == "1":
+        return "HIGH"
+    if "moderate" in val or "medium" in val or val == "2":
+        return "MODERATE"
+    return "LOW"
+
+
+def map_rxnorm_severity(severity: Optional[str]) -> str:
+    return {"high": "HIGH", "major": "HIGH", "moderate": "MODERATE"}.get((severity or "").lower(), "LOW")
+
+
+def map_drugbank_severity(severity: Optional[str]) -> str:
+    return {"major": "HIGH", "contraindicated": "HIGH", "moderate": "MODERATE"}.get((severity or "").lower(), "LOW")
+
+
+def _result(medication1: str, medication2: str, severity: str, description: str, source: str,
+            confidence: float) -> Dict[str, Any]:
+    return {"medication1": medication1, "medication2": medication2, "severity": severity,
+            "description": description, "source": source, "confidence": confidence}
+
+
+class ProviderUnavailable(Exception):
+    pass
+
+
+def _response_object(data: Any) -> Dict[str, Any]:
+    """Every provider answers with a JSON object; anything else is a provider failure"""
+    if not isinstance(data, dict):
+        raise ProviderUnavailable(f"API returned a JSON {type(data).__name__}, not an object")
+    return data
+
+
+def parse_openfda(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    data = _response_object(data)
+    results = []
+    for item in data.get("results") or ():
+        drugs = [drug.get("medicinalproduct") for drug in (item.get("patient") or {}).get("drug") or ()]
+        if len(drugs) >= 2:
+            results.append(_result(drugs[0], drugs[1], classify_severity(item.get("serious") or "1"),
+                                   item["patient"].get("summary") or "Interaction reported in FDA database",
+                                   "FDA Adverse Event Database", 0.7))
+    return results
+
+
+def parse_rxnorm(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    data = _response_object(data)
+    results = []
+    for group in data.get("interactionTypeGroup") or ():
+        for interaction in group["interactionType"]:
+            for pair in interaction["interactionPair"]:
+                concepts = pair["interactionConcept"]
+                results.append(_result(concepts[0]["minConceptItem"]["name"], concepts[1]["minConceptItem"]["name"],
+                                       map_rxnorm_severity(pair.get("severity")), pair.get("description"),
+                                       "RxNorm/NLM", 0.8))
+    return results
+
+
+def parse_drugbank(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    data = _response_object(data)
+    return [_result(interaction["drug1"]["name"], interaction["drug2"]["name"],
+                    map_drugbank_severity(interaction.get("severity")), interaction.get("description"),
+                    "DrugBank", 0.9)
+            for interaction in data.get("interactions") or ()]
+
+
+# Request bodies and parsers as in drugApiIntegration.ts
+PROVIDERS = {
+    "OpenFDA": {
+        "url": "https://api.fda.gov/drug/event.json",
+        "body": lambda medications: {"search": " AND ".join(medications), "limit": 10},
+        "parse": parse_openfda,
+    },
+    "RxNorm": {
+        "url": "https://rxnav.nlm.nih.gov/REST/interaction/list.json",
+        "body": lambda medications: {"rxcuis": "+".join(medications)},
+        "parse": parse_rxnorm,
+    },
+    "DrugBank": {
+        "url": "https://api.drugbank.com/v1/interactions",
+        "body": lambda medications: {"drugs": medications},
+        "parse": parse_drugbank,
+    },
+}
+
+
+def provider_url(provider: str) -> str:
+    url = PROVIDERS[provider]["url"]
+    if not BASE_URL_OVERRIDE:
+        return url
+    base, target = urlsplit(BASE_URL_OVERRIDE), urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, base.path.rstrip("/") + target.path, target.query, ""))
+
+
+def drug_key(medications: List[str]) -> str:
+    """Order-, case- and duplicate-insensitive cache key of a drug set"""
+    return "+".join(sorted({normalize(medication) for medication in medications} - {""}))
+
+
+def local_results(medications: List[str]) -> List[Dict[str, Any]]:
+    """Local rule pairs in the ApiInteractionResult shape"""
+    return [_result(pair["medications"][0], pair["medications"][1], pair["severity"],
+                    pair["rules"][0]["rationale"], LOCAL_SOURCE, 1.0)
+            for pair in get_screen().screen(medications)["interactions"]]
+
+
+class CircuitBreaker:
+    """closed -> open after consecutive failures -> half-open single probe after a cool-down"""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.trips = 0
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half-open"
+        if self.state == "half-open":
+            if self.probing:
+                return False
+            self.probing = True
+            return True
+        return self.state == "closed"
+
+    def record_success(self):
+        self.state, self.failures, self.probing = "closed", 0, False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.state, self.opened_at, self.probing = "open", time.monotonic(), False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutiveFailures": self.failures, "trips": self.trips}
+
+
+class ResponseCache:
+    """Parsed provider results in SQLite, keyed on (provider, normalized drug set)"""
+
+    def __init__(self, path=CACHE_PATH, ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(Path(path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, provider: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT results, fetched_at FROM responses WHERE provider = ? AND drug_key = ?",
+                                     (provider, key)).fetchone()
+        if row is None:
+            return None
+        return {"results": json.loads(row[0]), "fresh": time.time() - row[1] < self.ttl_seconds}
+
+    def put(self, provider: str, key: str, results: List[Dict[str, Any]]):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses (provider, drug_key, results, fetched_at) "
+                               "VALUES (?, ?, ?, ?)", (provider, key, json.dumps(results), time.time()))
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DrugApiProxy:
+    """Pooled, cached, hedged and circuit-broken calls to the interaction providers"""
+
+    def __init__(self, cache: Optional[ResponseCache] = None, max_connections: int = 20):
+        self.cache = cache or ResponseCache()
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                                   keepalive_expiry=60)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self.breakers = {provider: CircuitBreaker() for provider in PROVIDERS}
+        self.latencies = {provider: deque(maxlen=LATENCY_WINDOW) for provider in PROVIDERS}
+        self.counters = {provider: {"requests": 0, "cacheHits": 0, "calls": 0, "failures": 0, "hedges": 0,
+                                    "hedgeWins": 0, "fallbacks": 0, "staleServed": 0} for provider in PROVIDERS}
+
+    def _http(self) -> httpx.AsyncClient:
+        """One pooled client per event loop (the backend runs a single loop)"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(limits=self.limits, headers={"User-Agent": USER_AGENT})
+            self._client_loop = loop
+        return self._client
+
+    def hedge_delay(self, provider: str, timeout: float) -> float:
+        samples = sorted(self.latencies[provider])
+        if len(samples) < 20:
+            delay = HEDGE_DEFAULT_SECONDS
+        else:
+            delay = samples[int(len(samples) * 0.95) - 1]
+        return min(max(delay, HEDGE_MIN_SECONDS), timeout / 2)
+
+    async def _call(self, provider: str, medications: List[str], timeout: float) -> List[Dict[str, Any]]:
+        config = PROVIDERS[provider]
+        headers = {}
+        if provider == "DrugBank" and os.environ.get("DRUGBANK_API_KEY"):
+            headers["Authorization"] = os.environ["DRUGBANK_API_KEY"]
+        started = time.perf_counter()
+        response = await self._http().post(provider_url(provider), json=config["body"](medications),
+                                           headers=headers, timeout=timeout)
+        if response.status_code >= 400:
+            raise ProviderUnavailable(f"API responded with status {response.status_code}")
+        try:
+            results = config["parse"](response.json())
+        except (AttributeError, IndexError, KeyError, TypeError) as e:
+            raise ProviderUnavailable(f"Malformed {provider} response ({type(e).__name__}: {e})") from e
+        self.latencies[provider].append(time.perf_counter() - started)
+        return results
+
+    async def _hedged(self, provider: str, medications: List[str], timeout: float) -> List[Dict[str, Any]]:
+        """First successful answer of the request and, if it is slow, one hedged copy"""
+        counters = self.counters[provider]
+        deadline = time.monotonic() + timeout
+        first = asyncio.ensure_future(self._call(provider, medications, timeout))
+        pending = {first}
+        error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay(provider, timeout))
+            if not done:
+                counters["hedges"] += 1
+                pending.add(asyncio.ensure_future(self._call(provider, medications, max(deadline - time.monotonic(), 0.001))))
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            counters["hedgeWins"] += 1
+                        return task.result()
+                    error = task.exception()
+            if error is not None:
+                raise error
+            raise asyncio.TimeoutError()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def check(self, medications: List[str], provider: str, timeout_ms: int = DEFAULT_TIMEOUT_MS,
+                    refresh: bool = False) -> Dict[str, Any]:
+        """ApiResponse for the drug set, plus where the results came from"""
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unsupported API provider: {provider}")
+        started = time.perf_counter()
+        counters = self.counters[provider]
+        counters["requests"] += 1
+        key = drug_key(medications)
+        cached = self.cache.get(provider, key)
+
+        def response(status: str, results: List[Dict[str, Any]], source: str, error: Optional[str] = None):
+            body = {"status": status, "results": results, "provider": provider,
+                    "responseTime": round((time.perf_counter() - started) * 1000), "source": source}
+            if error:
+                body["errorMessage"] = error
+            return body
+
+        if cached is not None and cached["fresh"] and not refresh:
+            counters["cacheHits"] += 1
+            return response("success", cached["results"], "cache")
+
+        breaker = self.breakers[provider]
+        if breaker.allow():
+            counters["calls"] += 1
+            succeeded = False
+            try:
+                results = await self._hedged(provider, medications, timeout_ms / 1000)
+                succeeded = True
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                status, error = "timeout", "Request timed out"
+            except (httpx.HTTPError, ProviderUnavailable, ValueError, KeyError, TypeError) as e:
+                status, error = "failure", str(e) or type(e).__name__
+            finally:
+                # A cancelled or crashed call still settles the breaker, so a half-open probe never stays claimed
+                if succeeded:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                    counters["failures"] += 1
+            if succeeded:
+                self.cache.put(provider, key, results)
+                return response("success", results, "provider")
+        else:
+            status, error = "failure", f"{provider} circuit open"
+
+        if cached is not None:
+            counters["staleServed"] += 1
+            return response(status, cached["results"], "stale-cache", error)
+        counters["fallbacks"] += 1
+        return response(status, local_results(medications), "local", error)
+
+    def stats(self) -> Dict[str, Any]:
+        providers = {}
+        for provider in PROVIDERS:
+            samples = sorted(self.latencies[provider])
+            providers[provider] = {
+                **self.counters[provider],
+                "breaker": self.breakers[provider].snapshot(),
+                "p50Ms": round(samples[len(samples) // 2] * 1000, 1) if samples else None,
+                "p95Ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 1) if len(samples) >= 20 else None,
+            }
+        return {"cachedResponses": self.cache.size(), "providers": providers}
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_proxy: Optional[DrugApiProxy] = None
+_proxy_lock = threading.Lock()
+
+
+def get_proxy() -> DrugApiProxy:
+    """Process-wide proxy used by the backend"""
+    global _proxy
+    with _proxy_lock:
+        if _proxy is None:
+            _proxy = DrugApiProxy()
+        return _proxy
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers any provider path in that provider's format, one interaction per drug pair"""
+
+    delay = 0.0
+    jitter = 0.0
+    fail_rate = 0.0
+    protocol_version = "HTTP/1.1"  # keep-alive, so the proxy's pooled connections are reused
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.delay + random.random() * self.jitter)
+        if random.random() < self.fail_rate:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if "drugs" in body:
+            drugs = body["drugs"]
+        elif "rxcuis" in body:
+            drugs = body["rxcuis"].split("+")
+        else:
+            drugs = body.get("search", "").split(" AND ")
+        pairs = list(combinations([drug for drug in drugs if drug], 2))
+        if self.path.endswith("/drug/event.json"):
+            payload = {"results": [{"serious": "2", "patient": {"drug": [{"medicinalproduct": a}, {"medicinalproduct": b}],
+                                                                "summary": f"Reports with {a} and {b}"}}
+                                   for a, b in pairs]}
+        elif self.path.endswith("/interaction/list.json"):
+            payload = {"interactionTypeGroup": [{"interactionType": [{"interactionPair": [
+                {"interactionConcept": [{"minConceptItem": {"name": a}}, {"minConceptItem": {"name": b}}],
+                 "severity": "moderate", "description": f"{a} may interact with {b}"} for a, b in pairs]}]}]}
+        else:
+            payload = {"interactions": [{"drug1": {"name": a}, "drug2": {"name": b}, "severity": "moderate",
+                                         "description": f"{a} may interact with {b}"} for a, b in pairs]}
+        data = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The proxy cancelled the losing copy of a hedged request
+            self.close_connection = True
+
+
+def run_stub(port: int, delay: float = 0.0, jitter: float = 0.0, fail_rate: float = 0.0,
+             host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start the stub provider server in a background thread"""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"delay": delay, "jitter": jitter, "fail_rate": fail_rate})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Drug interaction API proxy tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    stub = subparsers.add_parser("stub", help="serve stub openFDA/RxNav/DrugBank responses")
+    stub.add_argument("--port", type=int, default=8099)
+    stub.add_argument("--delay", type=float, default=0.0, help="seconds added to every response")
+    stub.add_argument("--jitter", type=float, default=0.0, help="random extra seconds, up to this much")
+    stub.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 503")
+    check = subparsers.add_parser("check", help="check a drug set through the proxy")
+    check.add_argument("medications", nargs="+")
+    check.add_argument("--provider", choices=list(PROVIDERS), default="RxNorm")
+    check.add_argument("--timeout-ms", type=int, default=DEFAULT_TIMEOUT_MS)
+    check.add_argument("--refresh", action="store_true", help="skip the cache")
+    args = parser.parse_args(argv)
+
+    if args.command == "stub":
+        server = run_stub(args.port, args.delay, args.jitter, args.fail_rate)
+        print(f"✅ Stub providers on http://127.0.0.1:{args.port} "
+              f"(delay {args.delay}s, jitter {args.jitter}s, fail rate {args.fail_rate})")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+            server.server_close()
+        return 0
+
+    async def run():
+        proxy = DrugApiProxy()
+        try:
+            return await proxy.check(args.medications, args.provider, args.timeout_ms, args.refresh), proxy.stats()
+        finally:
+            await proxy.aclose()
+
+    result, stats = asyncio.run(run())
+    mark = "✅" if result["status"] == "success" else "⚠️ "
+    print(f"{mark} {result['provider']} {result['status']} from {result['source']} in {result['responseTime']} ms"
+          + (f" ({result['errorMessage']})" if "errorMessage" in result else ""))
+    for item in result["results"]:
+        print(f"  {item['severity']:<8} {item['medication1']} + {item['medication2']}  [{item['source']}]")
+    print(json.dumps(stats["providers"][args.provider], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
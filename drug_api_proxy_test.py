@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Drug API Proxy Test - circuit breaker and hedging against the stub providers
+Runs DrugApiProxy against local stub servers (see drug_api_proxy.py stub):
+
+1. Breaker trip - 503s open the breaker after BREAKER_FAILURE_THRESHOLD calls
+   and later checks answer locally without calling the provider
+2. Probe and recovery - after the cool-down one probe goes out; a healthy
+   provider closes the breaker again
+3. Cancelled probe - cancelling the half-open probe re-opens the breaker
+   instead of leaving it probing for good
+4. Malformed payload - a JSON array is a provider failure, not a crash
+5. Hedging - a slow first request gets a hedged copy that wins
+
+Usage:
+    python drug_api_proxy_test.py
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import drug_api_proxy
+from drug_api_proxy import BREAKER_FAILURE_THRESHOLD, DrugApiProxy, ResponseCache, StubHandler, run_stub
+
+MEDICATIONS = ["warfarin", "ibuprofen"]
+PROVIDER = "RxNorm"
+RESET_SECONDS = 0.2
+
+
+class ArrayStubHandler(StubHandler):
+    """Answers every request with a JSON array"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        data = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class SlowFirstStubHandler(StubHandler):
+    """The first request of the server takes SLOW_SECONDS, every later one is immediate"""
+
+    SLOW_SECONDS = 1.5
+    answered = 0
+
+    def do_POST(self):
+        type(self).answered += 1
+        self.delay = self.SLOW_SECONDS if type(self).answered == 1 else 0.0
+        super().do_POST()
+
+
+def _serve(handler) -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class DrugApiProxyTester:
+    def __init__(self):
+        self.test_results = []
+        self.workdir = Path(tempfile.mkdtemp(prefix="drug_api_proxy_test_"))
+        self.failing_url = f"http://127.0.0.1:{run_stub(0, fail_rate=1.0).server_address[1]}"
+        self.healthy_url = f"http://127.0.0.1:{run_stub(0).server_address[1]}"
+        self.slow_url = f"http://127.0.0.1:{run_stub(0, delay=1.0).server_address[1]}"
+        self.array_url = _serve(ArrayStubHandler)
+        self.slow_first_url = _serve(SlowFirstStubHandler)
+
+    def log_test(self, test_name, success, message, details=None):
+        self.test_results.append({"test": test_name, "success": success, "message": message, "details": details})
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status}: {test_name} - {message}")
+        if details and not success:
+            print(f"   Details: {details}")
+
+    def proxy(self, name: str) -> DrugApiProxy:
+        proxy = DrugApiProxy(cache=ResponseCache(self.workdir / f"{name}.db"))
+        proxy.breakers[PROVIDER].reset_seconds = RESET_SECONDS
+        return proxy
+
+    async def check(self, proxy: DrugApiProxy, base_url: str, timeout_ms: int = 3000):
+        drug_api_proxy.BASE_URL_OVERRIDE = base_url
+        return await proxy.check(MEDICATIONS, PROVIDER, timeout_ms, refresh=True)
+
+    async def test_breaker_trip(self):
+        proxy = self.proxy("trip")
+        try:
+            for _ in range(BREAKER_FAILURE_THRESHOLD):
+                await self.check(proxy, self.failing_url)
+            calls = proxy.counters[PROVIDER]["calls"]
+            result = await self.check(proxy, self.failing_url)
+            breaker = proxy.breakers[PROVIDER].snapshot()
+            ok = (breaker["state"] == "open" and breaker["trips"] == 1 and proxy.counters[PROVIDER]["calls"] == calls
+                  and result["source"] == "local" and "circuit open" in result.get("errorMessage", ""))
+            self.log_test("Breaker trip", ok, f"breaker {breaker['state']} after {calls} failed calls, "
+                          f"next check answered from {result['source']}", {"breaker": breaker, "result": result})
+        finally:
+            await proxy.aclose()
+
+    async def test_probe_and_recovery(self):
+        proxy = self.proxy("recovery")
+        try:
+            for _ in range(BREAKER_FAILURE_THRESHOLD):
+                await self.check(proxy, self.failing_url)
+            await asyncio.sleep(RESET_SECONDS)
+            failed_probe = await self.check(proxy, self.failing_url)
+            reopened = proxy.breakers[PROVIDER].state == "open"
+            await asyncio.sleep(RESET_SECONDS)
+            recovered = await self.check(proxy, self.healthy_url)
+            breaker = proxy.breakers[PROVIDER].snapshot()
+            ok = (reopened and failed_probe["source"] == "local" and recovered["status"] == "success"
+                  and recovered["source"] == "provider" and breaker["state"] == "closed")
+            self.log_test("Probe and recovery", ok, f"failed probe re-opened: {reopened}, "
+                          f"healthy probe -> {recovered['status']}, breaker {breaker['state']}",
+                          {"breaker": breaker, "recovered": recovered})
+        finally:
+            await proxy.aclose()
+
+    async def test_cancelled_probe(self):
+        proxy = self.proxy("cancelled")
+        try:
+            for _ in range(BREAKER_FAILURE_THRESHOLD):
+                await self.check(proxy, self.failing_url)
+            await asyncio.sleep(RESET_SECONDS)
+            probe = asyncio.ensure_future(self.check(proxy, self.slow_url))
+            await asyncio.sleep(0.1)
+            probe.cancel()
+            try:
+                await probe
+            except asyncio.CancelledError:
+                pass
+            breaker = proxy.breakers[PROVIDER]
+            after_cancel = breaker.state
+            settled = after_cancel == "open" and not breaker.probing
+            await asyncio.sleep(RESET_SECONDS)
+            recovered = await self.check(proxy, self.healthy_url)
+            ok = settled and recovered["source"] == "provider" and breaker.state == "closed"
+            self.log_test("Cancelled probe", ok, f"breaker {after_cancel} after cancel, "
+                          f"next probe -> {recovered['status']}", {"recovered": recovered})
+        finally:
+            await proxy.aclose()
+
+    async def test_malformed_payload(self):
+        proxy = self.proxy("malformed")
+        try:
+            result = await self.check(proxy, self.array_url)
+            ok = (result["status"] == "failure" and result["source"] == "local"
+                  and proxy.counters[PROVIDER]["failures"] == 1)
+            self.log_test("Malformed payload", ok, f"JSON array -> {result['status']} ({result.get('errorMessage')})",
+                          result)
+        finally:
+            await proxy.aclose()
+
+    async def test_hedging(self):
+        proxy = self.proxy("hedging")
+        try:
+            started = time.perf_counter()
+            result = await self.check(proxy, self.slow_first_url)
+            elapsed = time.perf_counter() - started
+            counters = proxy.counters[PROVIDER]
+            ok = (result["status"] == "success" and counters["hedges"] == 1 and counters["hedgeWins"] == 1
+                  and elapsed < SlowFirstStubHandler.SLOW_SECONDS)
+            self.log_test("Hedging", ok, f"hedged copy won in {elapsed * 1000:.0f} ms "
+                          f"(first request takes {SlowFirstStubHandler.SLOW_SECONDS * 1000:.0f} ms)",
+                          {"counters": counters, "result": result})
+        finally:
+            await proxy.aclose()
+
+    async def run_all_tests(self):
+        print("🧪 Drug API proxy tests against the stub providers")
+        print("=" * 70)
+        for test in (self.test_breaker_trip, self.test_probe_and_recovery, self.test_cancelled_probe,
+                     self.test_malformed_payload, self.test_hedging):
+            try:
+                await test()
+            except Exception as e:
+                self.log_test(test.__name__, False, f"raised {type(e).__name__}: {e}")
+        passed = sum(1 for result in self.test_results if result["success"])
+        print("=" * 70)
+        print(f"{passed}/{len(self.test_results)} tests passed")
+        return passed == len(self.test_results)
+
+
+def main():
+    tester = DrugApiProxyTester()
+    all_passed = asyncio.run(tester.run_all_tests())
+    if not all_passed:
+        print(json.dumps([r for r in tester.test_results if not r["success"]], indent=2, default=str))
+    sys.exit(0 if all_passed else 1)
+
+
+if __name__ == "__main__":
+    main()
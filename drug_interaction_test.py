@@ -22,7 +22,6 @@ EXPECTED RESULTS:
 - UI should display the updated severity levels and colors
 """
 
-import json
 import os
 import sys
 import subprocess
@@ -30,10 +29,12 @@ import time
 import requests
 from typing import Dict, List, Any, Optional
 
+from verification_fixtures import load_json, read_text
+
 class DrugInteractionTester:
     def __init__(self):
-        self.app_path = "/app"
-        self.json_rules_path = "/app/assets/rules/drug_interactions.json"
+        self.app_path = os.path.dirname(os.path.abspath(__file__))
+        self.json_rules_path = os.path.join(self.app_path, "assets", "rules", "drug_interactions.json")
         self.backend_url = None
         self.test_results = []
         
@@ -64,8 +65,7 @@ class DrugInteractionTester:
                 return
             
             # Load and parse JSON
-            with open(self.json_rules_path, 'r') as f:
-                data = json.load(f)
+            data = load_json(self.json_rules_path)
             
             # Verify structure
             if 'rules' not in data:
@@ -122,8 +122,7 @@ class DrugInteractionTester:
         
         try:
             # Load rules
-            with open(self.json_rules_path, 'r') as f:
-                data = json.load(f)
+            data = load_json(self.json_rules_path)
             rules = data['rules']
             
             # Test cases as specified in the review request
@@ -187,8 +186,7 @@ class DrugInteractionTester:
             # Since we can't directly run the React Native code, we'll test the logic
             
             # Load rules to simulate drugRules.ts behavior
-            with open(self.json_rules_path, 'r') as f:
-                data = json.load(f)
+            data = load_json(self.json_rules_path)
             rules = data['rules']
             
             # Simulate patient medicines
@@ -288,14 +286,13 @@ class DrugInteractionTester:
         
         try:
             # Check if the DecisionSupportScreen.tsx is using the new comprehensive system
-            decision_support_path = "/app/screens/DecisionSupportScreen.tsx"
+            decision_support_path = os.path.join(self.app_path, "screens/DecisionSupportScreen.tsx")
             
             if not os.path.exists(decision_support_path):
                 self.log_test(test_name, "FAIL", "DecisionSupportScreen.tsx not found")
                 return
             
-            with open(decision_support_path, 'r') as f:
-                content = f.read()
+            content = read_text(decision_support_path)
             
             # Check for key indicators that the new system is being used
             indicators = {
@@ -316,10 +313,9 @@ class DrugInteractionTester:
                     missing_indicators.append(description)
             
             # Check drugRules.ts exists and has the right functions
-            drug_rules_path = "/app/utils/drugRules.ts"
+            drug_rules_path = os.path.join(self.app_path, "utils/drugRules.ts")
             if os.path.exists(drug_rules_path):
-                with open(drug_rules_path, 'r') as f:
-                    drug_rules_content = f.read()
+                drug_rules_content = read_text(drug_rules_path)
                 
                 if "findInteractionsForSelection" in drug_rules_content:
                     found_indicators.append("drugRules.ts has findInteractionsForSelection")
@@ -347,10 +343,10 @@ class DrugInteractionTester:
         try:
             # Check if all required files exist
             required_files = [
-                "/app/assets/rules/drug_interactions.json",
-                "/app/utils/drugRules.ts", 
-                "/app/components/AnalysisResultsDisplay.tsx",
-                "/app/screens/DecisionSupportScreen.tsx"
+                os.path.join(self.app_path, "assets/rules/drug_interactions.json"),
+                os.path.join(self.app_path, "utils/drugRules.ts"), 
+                os.path.join(self.app_path, "components/AnalysisResultsDisplay.tsx"),
+                os.path.join(self.app_path, "screens/DecisionSupportScreen.tsx")
             ]
             
             missing_files = []
@@ -363,8 +359,7 @@ class DrugInteractionTester:
                 return
             
             # Check if the JSON has the expected structure and content
-            with open("/app/assets/rules/drug_interactions.json", 'r') as f:
-                json_data = json.load(f)
+            json_data = load_json(self.json_rules_path)
             
             # Verify we have the specific interactions mentioned in the review
             rules = json_data.get('rules', [])
@@ -386,8 +381,7 @@ class DrugInteractionTester:
                 return
             
             # Check if drugRules.ts has the correct implementation
-            with open("/app/utils/drugRules.ts", 'r') as f:
-                drug_rules_content = f.read()
+            drug_rules_content = read_text(os.path.join(self.app_path, "utils/drugRules.ts"))
             
             # Verify key functions exist
             required_functions = [
@@ -406,8 +400,7 @@ class DrugInteractionTester:
                 return
             
             # Verify AnalysisResultsDisplay handles new severity format
-            with open("/app/components/AnalysisResultsDisplay.tsx", 'r') as f:
-                display_content = f.read()
+            display_content = read_text(os.path.join(self.app_path, "components/AnalysisResultsDisplay.tsx"))
             
             if "'high'" not in display_content.lower() or "'moderate'" not in display_content.lower() or "'low'" not in display_content.lower():
                 self.log_test(test_name, "WARN", "AnalysisResultsDisplay may not handle HIGH/MODERATE/LOW severity format")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Drug Rules - Python implementation of utils/drugRules.ts matching
+Loads assets/rules/drug_interactions.json and finds interactions for a
+primary/medication selection with the same exact → category → fallback
+semantics as findInteractionsForSelection, backed by precomputed indexes.
+"""
+
+import copy
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from rule_trace import RuleTrace, active_trace
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_RULES_PATH = APP_ROOT / "assets" / "rules" / "drug_interactions.json"
+
+SEVERITY_SCORES = {"HIGH": 3, "MODERATE": 2, "LOW": 1}
+SEVERITY_LABELS = {"HIGH": "Critical", "MODERATE": "Major", "LOW": "Minor"}
+LOCAL_SOURCE = "Rules (local)"
+
+# JavaScript's \s and String.prototype.trim: Python's \s and str.strip() also take
+# \x1c-\x1f and \x85 but miss the BOM, so a BOM-prefixed name would not match
+_JS_WHITESPACE = ("\t\n\v\f\r \u00a0\u1680" + "".join(chr(c) for c in range(0x2000, 0x200b))
+                  + "\u2028\u2029\u202f\u205f\u3000\ufeff")
+_WHITESPACE = re.compile(f"[{re.escape(_JS_WHITESPACE)}]+")
+
+
+def normalize(value: str) -> str:
+    """Normalize strings for consistent matching (drugRules.ts normalize)"""
+    return _WHITESPACE.sub(" ", value.lower().strip(_JS_WHITESPACE))
+
+
+def get_severity_score(severity: str) -> int:
+    return SEVERITY_SCORES.get(severity, 0)
+
+
+def get_severity_label(severity: str) -> str:
+    return SEVERITY_LABELS.get(severity, severity)
+
+
+def is_fallback_rule(rule: Dict) -> bool:
+    primary = rule.get("primary", "").lower()
+    return "generic" in primary or "fallback" in primary
+
+
+def create_interaction_result(rule: Dict, medication: str, match_type: str) -> Dict:
+    return {
+        "medication": medication,
+        "primary": rule["primary"],
+        "severity": rule["severity"],
+        "severityLabel": get_severity_label(rule["severity"]),
+        "rationale": rule["rationale"],
+        "recommended_action": rule["recommended_action"],
+        "source": LOCAL_SOURCE,
+        "match_type": match_type,
+    }
+
+
+class DrugRuleIndex:
+    """Precomputed lookups over one rule list"""
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        self._base_rules = rules
+        self.primary_index: Dict[str, List[Dict]] = {}
+        self.example_index: Dict[str, List[Dict]] = {}
+        # (primary, example) -> first rule in file order, for the exact step
+        self.exact_index: Dict[Tuple[str, str], Dict] = {}
+        # example -> first generic/fallback rule listing it
+        self.fallback_index: Dict[str, Dict] = {}
+        # primary -> [(normalized interaction_with, rule)] in file order
+        self.category_index: Dict[str, List[Tuple[str, Dict]]] = {}
+
+        for rule in rules:
+            primary_key = normalize(rule["primary"])
+            self.primary_index.setdefault(primary_key, []).append(rule)
+            self.category_index.setdefault(primary_key, []).append((normalize(rule["interaction_with"]), rule))
+            fallback = is_fallback_rule(rule)
+            for example in rule.get("examples", []):
+                example_key = normalize(example)
+                self.example_index.setdefault(example_key, []).append(rule)
+                self.exact_index.setdefault((primary_key, example_key), rule)
+                if fallback:
+                    self.fallback_index.setdefault(example_key, rule)
+
+        # id(base rule) -> replacement rule, for overlay views (see overlay())
+        self.overrides: Dict[int, Dict] = {}
+        self._match = lru_cache(maxsize=65536)(self._match_uncached)
+
+    def overlay(self, replacements: Dict[int, Dict]) -> "DrugRuleIndex":
+        """View sharing every index and the match cache with this one
+
+        replacements maps id() of a rule of this index to the rule that should
+        be reported instead. Replacements may change severity and wording but
+        not the matching fields (primary, interaction_with, examples).
+        """
+        view = copy.copy(self)
+        view.overrides = {**self.overrides, **replacements}
+        view.rules = [view.overrides.get(id(rule), rule) for rule in self._base_rules]
+        return view
+
+    def _match_uncached(self, primary_key: str, med_key: str) -> Optional[Tuple[Dict, str]]:
+        # Step a: exact example match for this primary group
+        rule = self.exact_index.get((primary_key, med_key))
+        if rule is not None:
+            return rule, "exact"
+
+        # Step b: interaction_with category substring match (either direction)
+        for category_key, rule in self.category_index.get(primary_key, ()):
+            if category_key in med_key or med_key in category_key:
+                return rule, "category"
+
+        # Step c: generic/fallback rules listing the medication as an example
+        rule = self.fallback_index.get(med_key)
+        if rule is not None:
+            return rule, "fallback"
+        return None
+
+    def match(self, primary: str, medication: str) -> Optional[Tuple[Dict, str]]:
+        """Matching rule and match type for one primary/medication pair"""
+        found = self._match(normalize(primary), normalize(medication))
+        if found is not None and self.overrides:
+            found = self.overrides.get(id(found[0]), found[0]), found[1]
+        return found
+
+    def _traced_match(self, trace: RuleTrace, primary_key: str, med_key: str) -> Optional[Tuple[Dict, str]]:
+        """_match_uncached with each step recorded; uncached so the timing is the real work"""
+        with trace.rule("drug_rules", f"{primary_key} / {med_key}") as record:
+            found = self._match_uncached(primary_key, med_key)
+            match_type = found[1] if found else None
+            # Each step as the medication was compared: rule field, the rule-side value(s), the medication
+            examples = list(dict.fromkeys(normalize(example) for rule in self.primary_index.get(primary_key, ())
+                                          for example in rule.get("examples", [])))
+            record.check("examples", examples, med_key, match_type == "exact")
+            if match_type != "exact":
+                for category_key, _ in self.category_index.get(primary_key, ()):
+                    if record.check("interaction_with", category_key, med_key,
+                                    category_key in med_key or med_key in category_key):
+                        break
+            if match_type not in ("exact", "category"):
+                record.check("fallback examples", sorted(self.fallback_index), med_key, match_type == "fallback")
+            record.matched = found is not None
+            if found is not None:
+                record.rule_id = f"{found[0]['primary']} / {found[0]['interaction_with']}"
+        return found
+
+    def find_interactions(self, primary_list: List[str], current_med_list: List[str]) -> List[Dict]:
+        """findInteractionsForSelection: results sorted by severity, highest first"""
+        trace = active_trace()
+        match = self._match if trace is None else lambda p, m: self._traced_match(trace, p, m)
+        meds = [(med, normalize(med)) for med in current_med_list]
+        results = []
+        for primary_key in map(normalize, primary_list):
+            for original, med_key in meds:
+                found = match(primary_key, med_key)
+                if found is not None:
+                    rule = self.overrides.get(id(found[0]), found[0]) if self.overrides else found[0]
+                    results.append(create_interaction_result(rule, original, found[1]))
+        results.sort(key=lambda r: get_severity_score(r["severity"]), reverse=True)
+        return results
+
+    def available_primary_groups(self) -> List[str]:
+        return sorted(key for key in self.primary_index if "generic" not in key and "fallback" not in key)
+
+    def stats(self) -> Dict:
+        severity_breakdown: Dict[str, int] = {}
+        for rule in self.rules:
+            severity_breakdown[rule["severity"]] = severity_breakdown.get(rule["severity"], 0) + 1
+        return {
+            "totalRules": len(self.rules),
+            "primaryGroups": len(self.primary_index),
+            "totalExamples": sum(len(rule.get("examples", [])) for rule in self.rules),
+            "severityBreakdown": severity_breakdown,
+        }
+
+
+def load_local_rules(path=DEFAULT_RULES_PATH) -> List[Dict]:
+    """Load the rule list from a drug_interactions.json file"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["rules"] if isinstance(data, dict) else data
+
+
+_INDEXES: Dict[str, DrugRuleIndex] = {}
+
+
+def get_rule_index(path=DEFAULT_RULES_PATH) -> DrugRuleIndex:
+    """Index for a rule file, built once per process"""
+    key = str(path)
+    if key not in _INDEXES:
+        _INDEXES[key] = DrugRuleIndex(load_local_rules(path))
+    return _INDEXES[key]
+
+
+def reload_rules(path=DEFAULT_RULES_PATH) -> DrugRuleIndex:
+    _INDEXES.pop(str(path), None)
+    return get_rule_index(path)
+
+
+def find_interactions_for_selection(primary_list: List[str], current_med_list: List[str],
+                                    path=DEFAULT_RULES_PATH) -> List[Dict]:
+    return get_rule_index(path).find_interactions(primary_list, current_med_list)
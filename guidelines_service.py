@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Guidelines Service - manifest plus per-section delivery of assets/guidelines.json
+The guidelines screens only need ids, titles and icons to draw the table of
+contents; section bodies (body_md, bullets, tables, citations) are fetched as
+they are opened. Each section is serialized once and addressed by a hash of
+its content, so a section URL carrying the current hash (?v=<hash>) never
+changes and can be cached for a year, while the manifest stays small and is
+revalidated by ETag. The file is re-read when it changes on disk.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+APP_ROOT = Path(__file__).parent
+GUIDELINES_PATH = Path(os.environ.get("GUIDELINES_PATH", APP_ROOT / "assets" / "guidelines.json"))
+# The guidelines file is stat'ed at most this often
+RELOAD_CHECK_SECONDS = 2.0
+
+MANIFEST_CACHE_CONTROL = "public, max-age=300"
+SECTION_CACHE_CONTROL = "public, max-age=3600"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MANIFEST_FIELDS = ("id", "title", "icon")
+
+
+def _serialize(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+class GuidelineSections:
+    """One version of the guidelines: the manifest and every section, serialized"""
+
+    def __init__(self, guidelines: Dict[str, Any], stamp: Optional[int] = None):
+        self.stamp = stamp
+        self.sections: Dict[str, Tuple[str, bytes]] = {}
+        entries: List[Dict[str, Any]] = []
+        for section in guidelines.get("sections", []):
+            body = _serialize(section)
+            digest = _digest(body)
+            self.sections[section["id"]] = (digest, body)
+            entry = {field: section.get(field) for field in MANIFEST_FIELDS}
+            entry.update({"hash": digest, "bytes": len(body),
+                          "url": f"/api/guidelines/sections/{section['id']}?v={digest}"})
+            entries.append(entry)
+        manifest = {"version": guidelines.get("version"), "lastUpdated": guidelines.get("lastUpdated"),
+                    "sections": entries}
+        self.manifest_body = _serialize(manifest)
+        self.manifest_etag = f'"{_digest(self.manifest_body)}"'
+
+    def section(self, section_id: str) -> Optional[Tuple[str, bytes]]:
+        """(content hash, serialized section) or None for an unknown id"""
+        return self.sections.get(section_id)
+
+
+class GuidelineStore:
+    """Current GuidelineSections for a guidelines file, rebuilt when the file changes"""
+
+    def __init__(self, path=GUIDELINES_PATH):
+        self.path = Path(path)
+        self._current: Optional[GuidelineSections] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> GuidelineSections:
+        with self._lock:
+            now = time.monotonic()
+            if self._current is not None and now - self._checked_at < RELOAD_CHECK_SECONDS:
+                return self._current
+            self._checked_at = now
+            stamp = self.path.stat().st_mtime_ns
+            if self._current is None or self._current.stamp != stamp:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._current = GuidelineSections(json.load(f), stamp)
+            return self._current
+
+
+_store: Optional[GuidelineStore] = None
+_store_lock = threading.Lock()
+
+
+def get_guidelines() -> GuidelineStore:
+    """Process-wide store used by the backend"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = GuidelineStore()
+        return _store
+
+
+if __name__ == "__main__":
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else GUIDELINES_PATH
+    sections = GuidelineStore(path).current()
+    total = path.stat().st_size
+    print(f"📚 {path.name}: {total:,} bytes, manifest {len(sections.manifest_body):,} bytes "
+          f"({len(sections.manifest_body) / total:.1%})")
+    for section_id, (digest, body) in sections.sections.items():
+        print(f"   {section_id:<28}{len(body):>8,} bytes  {digest}")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Image Optimizer - parallel lossless recompression of the bundled raster assets
+Every PNG under assets/ (app images, icon, adaptive icon, splash, favicon,
+play-store art) is re-encoded in a worker process per core and replaced when
+a smaller encoding is found:
+
+- metadata chunks (text, EXIF, timestamps) are dropped; ICC profiles are kept
+- an alpha channel that is fully opaque is dropped, grey RGB becomes L/LA
+- images with at most 256 colours become exact palette images
+- otherwise a 256-colour palette is used only when it is perceptually
+  lossless: PSNR against the original of at least --min-psnr (45 dB)
+
+Store-listing art (assets/play-store) is not APK content and Google Play asks
+for a 32-bit PNG with alpha, so it stays RGBA and is only recompressed.
+
+Lossless candidates are decoded and compared pixel for pixel before they are
+accepted. Results are cached by content hash in .image_cache/, so identical
+copies are optimized once and unchanged files are skipped on the next run.
+
+Usage:
+    python image_optimizer.py --dry-run
+    python image_optimizer.py
+    python image_optimizer.py --lossless --workers 4
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+APP_ROOT = Path(__file__).parent
+ASSETS_DIR = APP_ROOT / "assets"
+CACHE_DIR = APP_ROOT / ".image_cache"
+CACHE_VERSION = 1
+DEFAULT_MIN_PSNR = 45.0
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+DECODE_RUNS = 3
+# Kept as 32-bit RGBA PNGs: no palette, grey or alpha-dropping candidates
+RGBA_DIRS = (ASSETS_DIR / "play-store",)
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _pixels(image: Image.Image) -> np.ndarray:
+    """RGBA pixels, the common ground every candidate is compared on"""
+    return np.asarray(image.convert("RGBA"))
+
+
+def psnr(original: np.ndarray, candidate: np.ndarray) -> float:
+    mse = np.mean((original.astype(np.float64) - candidate.astype(np.float64)) ** 2)
+    return math.inf if mse == 0 else 10 * math.log10(255.0 ** 2 / mse)
+
+
+def decode_ms(data: bytes, runs: int = DECODE_RUNS) -> float:
+    best = math.inf
+    for _ in range(runs):
+        started = time.perf_counter()
+        with Image.open(io.BytesIO(data)) as image:
+            image.load()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+
+def _encode(image: Image.Image, icc_profile: Optional[bytes], **params) -> bytes:
+    buffer = io.BytesIO()
+    if icc_profile:
+        params["icc_profile"] = icc_profile
+    image.save(buffer, "PNG", optimize=True, **params)
+    return buffer.getvalue()
+
+
+def _exact_palette(pixels: np.ndarray) -> Optional[Tuple[Image.Image, Dict[str, Any]]]:
+    """P image with exactly the original colours, or None above 256 colours"""
+    flat = pixels.reshape(-1, 4)
+    colors, inverse = np.unique(flat, axis=0, return_inverse=True)
+    if len(colors) > 256:
+        return None
+    # Opaque entries last, so the tRNS chunk only covers the translucent ones
+    order = np.argsort(colors[:, 3] == 255, kind="stable")
+    colors = colors[order]
+    remap = np.empty(len(order), dtype=np.uint8)
+    remap[order] = np.arange(len(order), dtype=np.uint8)
+    image = Image.fromarray(remap[inverse.reshape(pixels.shape[:2])], "P")
+    image.putpalette(colors[:, :3].astype(np.uint8).tobytes())
+    params: Dict[str, Any] = {}
+    translucent = int((colors[:, 3] < 255).sum())
+    if translucent:
+        params["transparency"] = colors[:translucent, 3].astype(np.uint8).tobytes()
+    return image, params
+
+
+def keeps_rgba(path: Path) -> bool:
+    return any(path.is_relative_to(directory) for directory in RGBA_DIRS)
+
+
+def _candidates(pixels: np.ndarray, min_psnr: Optional[float], keep_rgba: bool = False):
+    """(method, image, save params, lossless) in the order they are tried"""
+    if keep_rgba:
+        yield ("recompress", Image.fromarray(pixels, "RGBA"), {}, True)
+        return
+    opaque = bool((pixels[..., 3] == 255).all())
+    grey = bool((pixels[..., 0] == pixels[..., 1]).all() and (pixels[..., 1] == pixels[..., 2]).all())
+    if grey:
+        yield ("grey", Image.fromarray(pixels[..., 0], "L") if opaque
+               else Image.fromarray(pixels[..., [0, 3]], "LA"), {}, True)
+    yield ("recompress", Image.fromarray(pixels[..., :3], "RGB") if opaque
+           else Image.fromarray(pixels, "RGBA"), {}, True)
+    palette = _exact_palette(pixels)
+    if palette is not None:
+        yield ("palette", palette[0], palette[1], True)
+    elif min_psnr is not None:
+        source = Image.fromarray(pixels[..., :3], "RGB") if opaque else Image.fromarray(pixels, "RGBA")
+        method = Image.Quantize.MEDIANCUT if opaque else Image.Quantize.FASTOCTREE
+        yield ("quantized", source.quantize(256, method=method, dither=Image.Dither.FLOYDSTEINBERG), {}, False)
+
+
+def optimize_image(data: bytes, min_psnr: Optional[float] = DEFAULT_MIN_PSNR,
+                   keep_rgba: bool = False) -> Dict[str, Any]:
+    """Smallest acceptable PNG encoding of data: {"data", "method", "psnr"}"""
+    with Image.open(io.BytesIO(data)) as image:
+        if image.format != "PNG":
+            return {"data": data, "method": f"skipped ({image.format} needs a lossless recompressor)", "psnr": None}
+        if getattr(image, "n_frames", 1) > 1 or image.mode in ("I", "I;16", "F"):
+            return {"data": data, "method": f"skipped ({image.mode}, {getattr(image, 'n_frames', 1)} frames)",
+                    "psnr": None}
+        if keep_rgba and image.mode != "RGBA":
+            return {"data": data, "method": f"skipped ({image.mode}, store art must be RGBA)", "psnr": None}
+        image.load()
+        icc_profile = image.info.get("icc_profile")
+        pixels = _pixels(image)
+
+    best = {"data": data, "method": "already optimal", "psnr": math.inf}
+    for method, candidate, params, lossless in _candidates(pixels, min_psnr, keep_rgba):
+        encoded = _encode(candidate, icc_profile, **params)
+        if len(encoded) >= len(best["data"]):
+            continue
+        with Image.open(io.BytesIO(encoded)) as check:
+            quality = psnr(pixels, _pixels(check))
+        if (lossless and quality != math.inf) or (not lossless and quality < min_psnr):
+            continue
+        best = {"data": encoded, "method": method, "psnr": quality}
+    return best
+
+
+def _optimize_job(job: Tuple[str, bytes, Optional[float], bool]) -> Tuple[str, Dict[str, Any]]:
+    digest, data, min_psnr, keep_rgba = job
+    result = optimize_image(data, min_psnr, keep_rgba)
+    result["decode_before_ms"] = decode_ms(data)
+    result["decode_after_ms"] = decode_ms(result["data"]) if result["data"] is not data else result["decode_before_ms"]
+    return digest, result
+
+
+class ResultCache:
+    """input hash -> optimized output, stored as files named by their own hash"""
+
+    def __init__(self, directory: Path, settings: str):
+        self.directory = Path(directory)
+        self.settings = settings
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        index = self.directory / "index.json"
+        if index.exists():
+            try:
+                with open(index, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            if data.get("version") == CACHE_VERSION and data.get("settings") == settings:
+                self.entries = data.get("results", {})
+        self.outputs = {entry["output"] for entry in self.entries.values()}
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Cached result for this content; an optimized output maps to itself"""
+        entry = self.entries.get(digest)
+        if entry is None:
+            return {"output": digest, "method": "already optimized", "psnr": None} if digest in self.outputs else None
+        if entry["output"] != digest and not (self.directory / f"{entry['output']}.png").exists():
+            return None
+        return entry
+
+    def read_output(self, entry: Dict[str, Any], original: bytes) -> bytes:
+        if entry["output"] == sha256(original):
+            return original
+        return (self.directory / f"{entry['output']}.png").read_bytes()
+
+    def put(self, digest: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        output = sha256(result["data"])
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if output != digest:
+            (self.directory / f"{output}.png").write_bytes(result["data"])
+        entry = {"output": output, "method": result["method"],
+                 "psnr": None if result["psnr"] in (None, math.inf) else round(result["psnr"], 2),
+                 "decode_before_ms": result["decode_before_ms"], "decode_after_ms": result["decode_after_ms"]}
+        self.entries[digest] = entry
+        self.outputs.add(output)
+        return entry
+
+    def save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        index = self.directory / "index.json"
+        tmp_path = index.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "settings": self.settings, "results": self.entries}, f, indent=1)
+        os.replace(tmp_path, index)
+
+
+def find_images(root: Path = ASSETS_DIR) -> List[Path]:
+    return sorted(path for path in root.rglob("*") if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def optimize_assets(paths: List[Path], min_psnr: Optional[float] = DEFAULT_MIN_PSNR, workers: Optional[int] = None,
+                    cache_dir: Path = CACHE_DIR, write: bool = True) -> List[Dict[str, Any]]:
+    """Optimize paths in place (unless write is False); one report row per file"""
+    # Store art gets its own cache: the same content has a different best encoding there
+    caches = {False: ResultCache(cache_dir, f"min_psnr={min_psnr}"), True: ResultCache(cache_dir / "rgba", "rgba")}
+    originals = {path: path.read_bytes() for path in paths}
+    digests = {path: sha256(data) for path, data in originals.items()}
+    modes = {path: keeps_rgba(path) for path in paths}
+
+    # Identical copies are optimized once
+    pending = {}
+    for path, digest in digests.items():
+        if caches[modes[path]].get(digest) is None and (modes[path], digest) not in pending:
+            pending[(modes[path], digest)] = originals[path]
+    computed = set(pending)
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            jobs = [(digest, data, min_psnr, keep_rgba) for (keep_rgba, digest), data in pending.items()]
+            for (keep_rgba, _), (digest, result) in zip(pending, pool.map(_optimize_job, jobs)):
+                caches[keep_rgba].put(digest, result)
+        for keep_rgba in {keep_rgba for keep_rgba, _ in pending}:
+            caches[keep_rgba].save()
+
+    rows = []
+    for path in paths:
+        original, digest, cache = originals[path], digests[path], caches[modes[path]]
+        entry = cache.get(digest)
+        optimized = cache.read_output(entry, original)
+        if write and len(optimized) < len(original):
+            path.write_bytes(optimized)
+        rows.append({
+            "path": path.relative_to(APP_ROOT).as_posix() if path.is_relative_to(APP_ROOT) else str(path),
+            "before": len(original),
+            "after": min(len(optimized), len(original)),
+            "method": entry["method"],
+            "psnr": entry.get("psnr"),
+            "decodeBeforeMs": entry.get("decode_before_ms"),
+            "decodeAfterMs": entry.get("decode_after_ms"),
+            "cached": (modes[path], digest) not in computed,
+        })
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]], elapsed: float, write: bool):
+    print(f"{'File':<46}{'before':>11}{'after':>11}{'saved':>8}  {'decode ms':>13}  method")
+    for row in rows:
+        saved = 1 - row["after"] / row["before"] if row["before"] else 0
+        decode = (f"{row['decodeBeforeMs']:.1f}→{row['decodeAfterMs']:.1f}"
+                  if row["decodeBeforeMs"] is not None else "")
+        quality = f" {row['psnr']:.1f} dB" if row["psnr"] else ""
+        print(f"{row['path']:<46}{row['before']:>11,}{row['after']:>11,}{saved:>8.0%}  {decode:>13}  "
+              f"{row['method']}{quality}{' (cached)' if row['cached'] else ''}")
+    before = sum(row["before"] for row in rows)
+    after = sum(row["after"] for row in rows)
+    print("=" * 70)
+    verb = "saved" if write else "would save"
+    print(f"🖼️  {len(rows)} images: {before:,} -> {after:,} bytes, {verb} {before - after:,} "
+          f"({(1 - after / before) if before else 0:.0%}) in {elapsed:.1f}s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recompress the bundled images losslessly, in parallel")
+    parser.add_argument("paths", nargs="*", type=Path, help="images to optimize (default: every image in assets/)")
+    parser.add_argument("--dry-run", action="store_true", help="report savings without rewriting files")
+    parser.add_argument("--lossless", action="store_true", help="never use a quantized palette")
+    parser.add_argument("--min-psnr", type=float, default=DEFAULT_MIN_PSNR,
+                        help="lowest PSNR in dB accepted for a quantized palette")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--output", help="write the per-file report as JSON")
+    args = parser.parse_args(argv)
+
+    paths = [path.resolve() for path in args.paths] or find_images()
+    started = time.perf_counter()
+    rows = optimize_assets(paths, None if args.lossless else args.min_psnr, args.workers, args.cache_dir,
+                           write=not args.dry_run)
+    print_report(rows, time.perf_counter() - started, not args.dry_run)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"💾 Report: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Differential Fuzzing for Drug Interaction Matching
+Generates large numbers of random primary/medication selections (rule
+examples, aliases, categories, case and whitespace variants, unknown drugs)
+and compares the indexed matcher in drug_rules.py against a line-by-line
+reference of the drugRules.ts exact → category → fallback semantics.
+
+The reference shares no code with drug_rules.py: it has its own normalize,
+severity tables and result builder, so a bug in either side shows up as a
+divergence. Each chunk also adds synthetic rules to the rule file: generic
+and fallback rules (the real file has none), categories that overlap other
+categories, and repeated primary/example pairs, so every branch of
+DrugRuleIndex, including first-rule-wins ordering, is compared.
+
+Usage:
+    python interaction_fuzz.py --cases 1000000 --workers 8
+    python interaction_fuzz.py --cases 20000 --seed 7 --rules path/to/drug_interactions.json
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from drug_rules import DEFAULT_RULES_PATH, DrugRuleIndex, load_local_rules
+
+APP_ROOT = Path(__file__).parent
+OPTIONAL_MEDICINES_PATH = APP_ROOT / "assets" / "rules" / "optional_medicines.json"
+CHUNK_SIZE = 5000
+MAX_REPORTED_DIVERGENCES = 20
+
+UNKNOWN_DRUGS = ["paracetamol", "metformin", "amoxicillin", "omeprazole", "levothyroxine", "vitamin d"]
+SYNTHETIC_RULES = 40
+FALLBACK_PRIMARIES = ["Generic Drug Classes", "General Herbal Supplements (Generic)", "Fallback Rules",
+                      "Common Medications (fallback)"]
+
+# JavaScript's \s and String.prototype.trim() whitespace, spelled out rather than borrowed from re
+JS_WHITESPACE = set("\t\n\v\f\r \u00a0\u1680\u2028\u2029\u202f\u205f\u3000\ufeff"
+                    + "".join(chr(c) for c in range(0x2000, 0x200b)))
+REFERENCE_SEVERITY_SCORES = {"HIGH": 3, "MODERATE": 2, "LOW": 1}
+REFERENCE_SEVERITY_LABELS = {"HIGH": "Critical", "MODERATE": "Major", "LOW": "Minor"}
+
+
+def reference_normalize(value: str) -> str:
+    """value.toLowerCase().trim().replace(/\\s+/g, ' '), character by character"""
+    out: List[str] = []
+    pending_space = False
+    for char in value.lower():
+        if char in JS_WHITESPACE:
+            pending_space = True
+            continue
+        if pending_space and out:
+            out.append(" ")
+        pending_space = False
+        out.append(char)
+    return "".join(out)
+
+
+def reference_result(rule: Dict, medication: str, match_type: str) -> Dict:
+    """createInteractionResult"""
+    return {
+        "medication": medication,
+        "primary": rule["primary"],
+        "severity": rule["severity"],
+        "severityLabel": REFERENCE_SEVERITY_LABELS.get(rule["severity"], rule["severity"]),
+        "rationale": rule["rationale"],
+        "recommended_action": rule["recommended_action"],
+        "source": "Rules (local)",
+        "match_type": match_type,
+    }
+
+
+def synthetic_rules(rules: List[Dict], rnd: random.Random, count: int = SYNTHETIC_RULES) -> List[Dict]:
+    """Extra rules that reach the branches the rule file leaves cold"""
+    primaries = sorted({rule["primary"] for rule in rules})
+    examples = sorted({example for rule in rules for example in rule["examples"]})
+    categories = sorted({rule["interaction_with"] for rule in rules})
+    pool = examples + UNKNOWN_DRUGS
+    extra = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            # Generic/fallback rule: only reachable through step c
+            primary = rnd.choice(FALLBACK_PRIMARIES)
+            interaction_with = f"Synthetic class {i}"
+        elif kind == 1:
+            # Existing primary, category overlapping another category's name
+            primary = rnd.choice(primaries)
+            category = rnd.choice(categories)
+            interaction_with = category[:rnd.randint(3, max(3, len(category)))]
+        elif kind == 2:
+            # Repeats an existing primary/example pair later in the file: first rule must win
+            source = rnd.choice(rules)
+            primary, interaction_with = source["primary"], source["interaction_with"] + " (repeat)"
+        else:
+            # Fallback-looking primary in a different case than the fallback keywords
+            primary = rnd.choice(["GENERIC ", "FallBack "]) + rnd.choice(primaries)
+            interaction_with = rnd.choice(categories)
+        chosen = rnd.sample(pool, rnd.randint(1, 4))
+        if kind == 2:
+            chosen.append(rnd.choice(source["examples"]))
+        extra.append({
+            "primary": primary,
+            "interaction_with": interaction_with,
+            "examples": chosen,
+            "severity": rnd.choice(["HIGH", "MODERATE", "LOW"]),
+            "rationale": f"Synthetic rule {i}",
+            "recommended_action": f"Synthetic action {i}",
+        })
+    return extra
+
+
+def prepare_reference_rules(rules: List[Dict]) -> List[Tuple[Dict, str, str, List[str], bool]]:
+    """Normalise rule fields once; the reference still scans linearly"""
+    return [
+        (
+            rule,
+            reference_normalize(rule["primary"]),
+            reference_normalize(rule["interaction_with"]),
+            [reference_normalize(example) for example in rule["examples"]],
+            "generic" in rule["primary"].lower() or "fallback" in rule["primary"].lower(),
+        )
+        for rule in rules
+    ]
+
+
+def reference_find_interactions(prepared: List[Tuple[Dict, str, str, List[str], bool]],
+                                primary_list: List[str], current_med_list: List[str]) -> List[Dict]:
+    """Straight transliteration of findInteractionsForSelection, no indexes"""
+    results = []
+    normalized_meds = [(med, reference_normalize(med)) for med in current_med_list]
+
+    for primary_norm in map(reference_normalize, primary_list):
+        for original, med_norm in normalized_meds:
+            # Step a: EXAMPLE_INDEX.get(med).find(rule => primary matches)
+            exact = next((
+                rule for rule, primary, _, examples, _ in prepared
+                if med_norm in examples and primary == primary_norm
+            ), None)
+            if exact is not None:
+                results.append(reference_result(exact, original, "exact"))
+                continue
+
+            # Step b: PRIMARY_INDEX.get(primary).find(interaction_with substring)
+            category = next((
+                rule for rule, primary, interaction_with, _, _ in prepared
+                if primary == primary_norm and (interaction_with in med_norm or med_norm in interaction_with)
+            ), None)
+            if category is not None:
+                results.append(reference_result(category, original, "category"))
+                continue
+
+            # Step c: generic/fallback rules with an exact example match
+            fallback = next((
+                rule for rule, _, _, examples, is_fallback in prepared
+                if is_fallback and med_norm in examples
+            ), None)
+            if fallback is not None:
+                results.append(reference_result(fallback, original, "fallback"))
+
+    # Array.prototype.sort is stable, as is sorted()
+    return sorted(results, key=lambda r: REFERENCE_SEVERITY_SCORES.get(r["severity"], 0), reverse=True)
+
+
+class SelectionGenerator:
+    """Random primary/medication selections drawn from the rule vocabulary"""
+
+    def __init__(self, rules: List[Dict], aliases: List[str], seed: int,
+                 max_primaries: int = 3, max_meds: int = 8):
+        self.random = random.Random(seed)
+        self.max_primaries = max_primaries
+        self.max_meds = max_meds
+        self.primaries = sorted({rule["primary"] for rule in rules})
+        self.examples = sorted({example for rule in rules for example in rule["examples"]})
+        self.categories = sorted({rule["interaction_with"] for rule in rules})
+        self.aliases = aliases
+
+    def _variant(self, value: str) -> str:
+        """Random case and whitespace variant of a name"""
+        rnd = self.random
+        choice = rnd.random()
+        if choice < 0.15:
+            value = value.upper()
+        elif choice < 0.3:
+            value = value.title()
+        elif choice < 0.4:
+            value = "".join(c.upper() if rnd.random() < 0.5 else c.lower() for c in value)
+
+        # JS whitespace Python's \s misses (BOM) and Python whitespace JS keeps (\x85, \x1c)
+        if rnd.random() < 0.2:
+            value = (rnd.choice([" ", "  ", "\t", "\n", "\ufeff", " \ufeff", "\u00a0", "\u2028", "\x85", "\x1c"])
+                     + value + rnd.choice(["", " ", "\t ", "\ufeff", "\u00a0", "\x85", "\x1c"]))
+        if rnd.random() < 0.1:
+            value = value.replace(" ", rnd.choice(["  ", "\t", " \n ", "\u00a0", "\u2028", "\ufeff", "\x85", "\x1c"]))
+        return value
+
+    def _unknown(self) -> str:
+        rnd = self.random
+        if rnd.random() < 0.5:
+            return rnd.choice(UNKNOWN_DRUGS)
+        return "".join(rnd.choice(string.ascii_lowercase + " ") for _ in range(rnd.randint(0, 12)))
+
+    def _fragment(self, value: str) -> str:
+        """Substring of a category name; exercises the category step both ways"""
+        start = self.random.randint(0, max(0, len(value) - 3))
+        return value[start:start + self.random.randint(3, 12)]
+
+    def primary(self) -> str:
+        rnd = self.random
+        if rnd.random() < 0.05:
+            return self._unknown()
+        return self._variant(rnd.choice(self.primaries))
+
+    def medication(self) -> str:
+        rnd = self.random
+        roll = rnd.random()
+        if roll < 0.45:
+            value = rnd.choice(self.examples)
+        elif roll < 0.6:
+            value = rnd.choice(self.aliases) if self.aliases else rnd.choice(self.examples)
+        elif roll < 0.7:
+            value = rnd.choice(self.categories)
+        elif roll < 0.8:
+            value = self._fragment(rnd.choice(self.categories))
+        elif roll < 0.82:
+            value = rnd.choice(["", " ", "\t"])
+        else:
+            value = self._unknown()
+        return self._variant(value)
+
+    def selection(self) -> Tuple[List[str], List[str]]:
+        rnd = self.random
+        primaries = [self.primary() for _ in range(rnd.randint(1, self.max_primaries))]
+        meds = [self.medication() for _ in range(rnd.randint(0, self.max_meds))]
+        return primaries, meds
+
+
+def load_aliases(path=OPTIONAL_MEDICINES_PATH) -> List[str]:
+    """Display names and aliases from optional_medicines.json"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    names = []
+    for medicine in data.get("medicines", []):
+        names.append(medicine.get("displayName", ""))
+        names.append(medicine.get("id", ""))
+        names.extend(medicine.get("aliases", []))
+    return sorted({name for name in names if name})
+
+
+def _result_key(results: List[Dict]) -> List[Tuple]:
+    return [(r["medication"], r["primary"], r["severity"], r["match_type"]) for r in results]
+
+
+def fuzz_chunk(args: Tuple[str, int, int, int, int, int]) -> Dict:
+    """Generate and compare one chunk of selections"""
+    rules_path, seed, count, max_primaries, max_meds, synthetic = args
+    rules = load_local_rules(rules_path)
+    rules = rules + synthetic_rules(rules, random.Random(seed), synthetic)
+    generator = SelectionGenerator(rules, load_aliases(), seed, max_primaries, max_meds)
+    selections = [generator.selection() for _ in range(count)]
+    index = DrugRuleIndex(rules)
+
+    start = time.perf_counter()
+    fast_results = [index.find_interactions(primaries, meds) for primaries, meds in selections]
+    fast_time = time.perf_counter() - start
+
+    prepared = prepare_reference_rules(rules)
+    start = time.perf_counter()
+    reference_results = [reference_find_interactions(prepared, primaries, meds) for primaries, meds in selections]
+    reference_time = time.perf_counter() - start
+
+    divergences = []
+    match_types: Dict[str, int] = {}
+    matches = 0
+    for (primaries, meds), fast, reference in zip(selections, fast_results, reference_results):
+        matches += len(reference)
+        for result in reference:
+            match_types[result["match_type"]] = match_types.get(result["match_type"], 0) + 1
+        if fast != reference:
+            divergences.append({
+                "primaries": primaries,
+                "medications": meds,
+                "matcher": _result_key(fast),
+                "reference": _result_key(reference),
+            })
+
+    return {
+        "cases": count,
+        "pairs": sum(len(p) * len(m) for p, m in selections),
+        "matches": matches,
+        "match_types": match_types,
+        "fast_time": fast_time,
+        "reference_time": reference_time,
+        "divergence_count": len(divergences),
+        "divergences": divergences[:MAX_REPORTED_DIVERGENCES],
+    }
+
+
+def run_fuzz(rules_path, cases: int, seed: int, workers: int,
+             max_primaries: int = 3, max_meds: int = 8, synthetic: int = SYNTHETIC_RULES) -> Dict:
+    chunks = []
+    remaining = cases
+    chunk_seed = seed
+    while remaining > 0:
+        count = min(CHUNK_SIZE, remaining)
+        chunks.append((str(rules_path), chunk_seed, count, max_primaries, max_meds, synthetic))
+        remaining -= count
+        chunk_seed += 1
+
+    start = time.perf_counter()
+    if workers > 1:
+        with Pool(workers) as pool:
+            partials = pool.map(fuzz_chunk, chunks)
+    else:
+        partials = [fuzz_chunk(chunk) for chunk in chunks]
+    wall_time = time.perf_counter() - start
+
+    summary = {
+        "cases": 0, "pairs": 0, "matches": 0, "match_types": {},
+        "fast_time": 0.0, "reference_time": 0.0, "divergence_count": 0, "divergences": [],
+    }
+    for partial in partials:
+        for key in ("cases", "pairs", "matches", "fast_time", "reference_time", "divergence_count"):
+            summary[key] += partial[key]
+        for match_type, count in partial["match_types"].items():
+            summary["match_types"][match_type] = summary["match_types"].get(match_type, 0) + count
+        remaining_slots = MAX_REPORTED_DIVERGENCES - len(summary["divergences"])
+        summary["divergences"].extend(partial["divergences"][:remaining_slots])
+
+    summary["wall_time"] = wall_time
+    summary["seed"] = seed
+    summary["workers"] = workers
+    return summary
+
+
+def print_report(summary: Dict):
+    print("=" * 70)
+    print("Drug Interaction Matching - Differential Fuzz")
+    print("=" * 70)
+    print(f"Selections: {summary['cases']:,}   pairs: {summary['pairs']:,}   "
+          f"matches: {summary['matches']:,}   seed: {summary['seed']}")
+    print(f"Match types: {summary['match_types']}")
+    print()
+    for label, key in (("Indexed matcher", "fast_time"), ("Reference (drugRules.ts)", "reference_time")):
+        elapsed = summary[key] or 1e-9
+        print(f"{label:<26} {summary['cases'] / elapsed:>14,.0f} selections/s "
+              f"{summary['pairs'] / elapsed:>14,.0f} pairs/s {summary['matches'] / elapsed:>14,.0f} matches/s")
+    if summary["fast_time"]:
+        print(f"Speedup: {summary['reference_time'] / summary['fast_time']:.1f}x   "
+              f"(wall time {summary['wall_time']:.1f}s on {summary['workers']} workers)")
+    print()
+
+    if summary["divergence_count"]:
+        print(f"❌ {summary['divergence_count']:,} divergences. First examples:")
+        for divergence in summary["divergences"]:
+            print(f"   primaries={divergence['primaries']!r} meds={divergence['medications']!r}")
+            print(f"      matcher:   {divergence['matcher']}")
+            print(f"      reference: {divergence['reference']}")
+    else:
+        print("✅ No divergences: matcher is equivalent to the reference on every selection")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Differential fuzzing of drug interaction matching")
+    parser.add_argument("--cases", type=int, default=1_000_000, help="Number of random selections")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--rules", default=str(DEFAULT_RULES_PATH), help="drug_interactions.json to fuzz")
+    parser.add_argument("--max-primaries", type=int, default=3, help="Maximum primary groups per selection")
+    parser.add_argument("--max-meds", type=int, default=8, help="Maximum medications per selection")
+    parser.add_argument("--synthetic", type=int, default=SYNTHETIC_RULES,
+                        help="Synthetic fallback/category/duplicate rules added per chunk (0 = rule file only)")
+    parser.add_argument("--output", help="Write the summary (with divergence examples) as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    summary = run_fuzz(args.rules, args.cases, args.seed, args.workers, args.max_primaries, args.max_meds,
+                       args.synthetic)
+    print_report(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["divergence_count"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Interaction Merge - server-side mergeApiResults / mergeInteractionResults
+Local rule hits and provider results are reconciled with a hash join instead
+of the nested scans in utils/drugRules.ts and utils/drugApiIntegration.ts.
+Local hits are keyed on (normalized medication, normalized primary group).
+A provider pair is probed under its drug-to-drug keys and under every
+primary group either drug belongs to. One pass over each side dedupes the
+results, keeps the highest severity and lists every source that reported
+the pair, so the merge stays linear in the number of results.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from drug_rules import get_severity_label, get_severity_score, normalize
+from interaction_screen import InteractionScreen, get_screen
+
+LOCAL_CONFIDENCE = 0.9  # mergeApiResults confidence for local rules
+API_CONFIDENCE = 0.7
+API_RECOMMENDED_ACTION = "Review interaction with healthcare provider"
+
+
+def api_pair(result: Dict[str, Any]) -> Tuple[str, str]:
+    """The two sides of a provider result: ApiInteractionResult or already local-shaped"""
+    if "medication1" in result:
+        return result["medication1"], result["medication2"]
+    return result["medication"], result["primary"]
+
+
+def _absorb(entry: Dict[str, Any], severity: str, source: str, confidence: float):
+    """Fold another report of the same interaction into entry"""
+    if get_severity_score(severity) > get_severity_score(entry["severity"]):
+        entry["severity"] = severity
+        entry["severityLabel"] = get_severity_label(severity)
+    if source not in entry["sources"]:
+        entry["sources"].append(source)
+    entry["confidence"] = max(entry["confidence"], confidence)
+
+
+def merge_interaction_results(local_results: List[Dict[str, Any]], api_results: List[Dict[str, Any]],
+                              screen: Optional[InteractionScreen] = None) -> List[Dict[str, Any]]:
+    """MergedResult list: local hits first, then provider-only pairs, highest severity first"""
+    screen = screen or get_screen()
+    merged: List[Dict[str, Any]] = []
+    by_key: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    for local in local_results:
+        key = (normalize(local["medication"]), normalize(local["primary"]))
+        entry = by_key.get(key)
+        if entry is None:
+            entry = by_key[key] = {**local, "sources": [local["source"]], "confidence": LOCAL_CONFIDENCE}
+            merged.append(entry)
+        else:
+            _absorb(entry, local["severity"], local["source"], LOCAL_CONFIDENCE)
+
+    for api in api_results:
+        first, second = api_pair(api)
+        first_key, second_key = normalize(first), normalize(second)
+        keys = [(first_key, second_key), (second_key, first_key)]
+        keys += [(first_key, group) for group in screen.primary_groups(second)]
+        keys += [(second_key, group) for group in screen.primary_groups(first)]
+        severity = api.get("severity", "LOW")
+        source = api.get("source", "API")
+        confidence = api.get("confidence") or API_CONFIDENCE
+
+        entry = next((by_key[key] for key in keys if key in by_key), None)
+        if entry is not None:
+            _absorb(entry, severity, source, confidence)
+            continue
+        entry = {
+            "medication": first,
+            "primary": second,
+            "severity": severity,
+            "severityLabel": get_severity_label(severity),
+            "rationale": api.get("description", api.get("rationale")),
+            "recommended_action": api.get("recommended_action", API_RECOMMENDED_ACTION),
+            "source": source,
+            "match_type": "api",
+            "sources": [source],
+            "confidence": confidence,
+        }
+        if api.get("apiProvider"):
+            entry["apiProvider"] = api["apiProvider"]
+        merged.append(entry)
+        # Both orientations, so the same pair reported the other way round is a duplicate
+        by_key.setdefault(keys[0], entry)
+        by_key.setdefault(keys[1], entry)
+
+    merged.sort(key=lambda result: get_severity_score(result["severity"]), reverse=True)
+    return merged
+
+
+if __name__ == "__main__":
+    import random
+    from drug_rules import get_rule_index
+
+    index = get_rule_index()
+    primaries = index.available_primary_groups()[:4]
+    medications = sorted({example for rule in index.rules for example in rule.get("examples", [])})
+    local = index.find_interactions(primaries, medications)
+    rng = random.Random(1)
+    api = [{"medication1": rng.choice(medications), "medication2": rng.choice(medications + ["estradiol", "sertraline"]),
+            "severity": rng.choice(["HIGH", "MODERATE", "LOW"]), "description": "Provider-reported interaction",
+            "source": "RxNorm/NLM", "confidence": 0.8} for _ in range(500)]
+    started = time.perf_counter()
+    merged = merge_interaction_results(local, api)
+    elapsed = (time.perf_counter() - started) * 1000
+    joined = sum(1 for result in merged if len(result["sources"]) > 1)
+    print(f"📊 {len(local)} local + {len(api)} provider results -> {len(merged)} merged "
+          f"({joined} reported by both) in {elapsed:.2f} ms")
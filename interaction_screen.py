@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Interaction Screen - all-pairs screening of a full medication list
+findInteractionsForSelection only checks primary groups against current
+medications. Here every medicine is mapped once to a bitmask of its classes
+(the rule primaries and interaction_with classes of drug_interactions.json,
+plus the optional_medicines.json categories), and a class-interaction matrix
+is precomputed as one "interacts with" mask per class. Screening a list is
+then an OR of those masks per medicine and an AND per medicine pair, so every
+pair among 30 medicines is checked without touching the rules; only the pairs
+that hit are expanded into rule details.
+"""
+
+import json
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from drug_rules import (DEFAULT_RULES_PATH, LOCAL_SOURCE, get_severity_label, get_severity_score,
+                        load_local_rules, normalize)
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_OPTIONAL_MEDICINES_PATH = APP_ROOT / "assets" / "rules" / "optional_medicines.json"
+
+# interaction_with values that name a patient condition rather than a drug class;
+# their examples are drugs of the rule's own primary group
+CONDITION_CLASSES = {"breast cancer"}
+
+# shortest medication name that is substring-matched against class names
+MIN_CLASS_MATCH_LENGTH = 3
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Indexes of the set bits of mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def load_optional_medicines(path=DEFAULT_OPTIONAL_MEDICINES_PATH) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["medicines"]
+
+
+class InteractionScreen:
+    """Class bitmasks per medicine and a class-interaction matrix over one rule list"""
+
+    def __init__(self, rules: List[Dict], optional_medicines: Optional[List[Dict]] = None):
+        self.classes: List[str] = []
+        self.class_keys: List[str] = []
+        # classes that are rule primary groups
+        self.primary_mask = 0
+        # classes that appear as a rule's interaction_with
+        self.partner_mask = 0
+        self._class_bits: Dict[str, int] = {}
+        # class index -> mask of the classes it has a rule with (either direction)
+        self.interacts: List[int] = []
+        # (class index, class index) -> rules for that pair, in file order
+        self.pair_rules: Dict[Tuple[int, int], List[Dict]] = {}
+        # normalized medicine name -> class mask
+        self.medicine_masks: Dict[str, int] = {}
+
+        for rule in rules:
+            primary = self._class_index(rule["primary"])
+            self.primary_mask |= 1 << primary
+            partner_name = rule["interaction_with"]
+            if normalize(partner_name) in CONDITION_CLASSES:
+                member_class = primary
+            else:
+                partner = self._class_index(partner_name)
+                member_class = partner
+                self.partner_mask |= 1 << partner
+                self.interacts[primary] |= 1 << partner
+                self.interacts[partner] |= 1 << primary
+                self.pair_rules.setdefault((primary, partner), []).append(rule)
+                if partner != primary:
+                    self.pair_rules.setdefault((partner, primary), []).append(rule)
+            self._add(rule["primary"], 1 << primary)
+            for example in rule.get("examples", []):
+                self._add(example, 1 << member_class)
+
+        for medicine in optional_medicines or ():
+            # The optional medicine inherits whatever the rules say about its id or key
+            mask = 1 << self._class_index(medicine["category"])
+            for name in (medicine["id"], medicine["key"]):
+                mask |= self.medicine_masks.get(normalize(name), 0) | self._class_name_mask(normalize(name))
+            for name in (medicine["id"], medicine["key"], medicine.get("displayName", ""), *medicine.get("aliases", ())):
+                if name:
+                    self._add(name, mask)
+
+        self._mask = lru_cache(maxsize=65536)(self._mask_uncached)
+
+    def _class_index(self, name: str) -> int:
+        key = normalize(name)
+        index = self._class_bits.get(key)
+        if index is None:
+            index = self._class_bits[key] = len(self.classes)
+            self.classes.append(name)
+            self.class_keys.append(key)
+            self.interacts.append(0)
+        return index
+
+    def _add(self, name: str, mask: int):
+        key = normalize(name)
+        self.medicine_masks[key] = self.medicine_masks.get(key, 0) | mask
+
+    def _class_name_mask(self, med_key: str) -> int:
+        """drugRules.ts category step: an interaction_with class containing the medication or vice versa"""
+        mask = 0
+        if len(med_key) < MIN_CLASS_MATCH_LENGTH:
+            return mask
+        for index in iter_bits(self.partner_mask):
+            class_key = self.class_keys[index]
+            if class_key in med_key or med_key in class_key:
+                mask |= 1 << index
+        return mask
+
+    def _mask_uncached(self, med_key: str) -> int:
+        mask = self.medicine_masks.get(med_key)
+        if mask is None:
+            mask = self._class_name_mask(med_key)
+        return mask
+
+    def mask(self, medication: str) -> int:
+        """Class mask of a medication name; unknown names fall back to class-name matching"""
+        return self._mask(normalize(medication))
+
+    def class_names(self, mask: int) -> List[str]:
+        return [self.classes[index] for index in iter_bits(mask)]
+
+    def primary_groups(self, medication: str) -> List[str]:
+        """Normalized rule primary groups a medication belongs to"""
+        return [self.class_keys[index] for index in iter_bits(self.mask(medication) & self.primary_mask)]
+
+    def interacting_pairs(self, medications: List[str]) -> List[Tuple[int, int]]:
+        """Index pairs (i < j) of the medications with at least one interacting class pair"""
+        masks = [self.mask(medication) for medication in medications]
+        reach = []
+        for mask in masks:
+            partners = 0
+            for index in iter_bits(mask):
+                partners |= self.interacts[index]
+            reach.append(partners)
+        pairs = []
+        for i in range(len(masks)):
+            partners = reach[i]
+            if not partners:
+                continue
+            for j in range(i + 1, len(masks)):
+                if partners & masks[j]:
+                    pairs.append((i, j))
+        return pairs
+
+    def _pair_rules(self, mask_a: int, mask_b: int) -> List[Dict]:
+        rules = []
+        for a in iter_bits(mask_a):
+            for b in iter_bits(self.interacts[a] & mask_b):
+                for rule in self.pair_rules[(a, b)]:
+                    if rule not in rules:
+                        rules.append(rule)
+        return rules
+
+    def screen(self, medications: List[str]) -> Dict:
+        """Every interacting pair in the list, highest severity first"""
+        started = time.perf_counter()
+        first_seen: Dict[str, str] = {}
+        for medication in medications:
+            first_seen.setdefault(normalize(medication), medication)
+        first_seen.pop("", None)
+        unique = list(first_seen.values())
+        masks = [self.mask(medication) for medication in unique]
+
+        interactions = []
+        for i, j in self.interacting_pairs(unique):
+            rules = self._pair_rules(masks[i], masks[j])
+            rules.sort(key=lambda rule: get_severity_score(rule["severity"]), reverse=True)
+            severity = rules[0]["severity"]
+            interactions.append({
+                "medications": [unique[i], unique[j]],
+                "severity": severity,
+                "severityLabel": get_severity_label(severity),
+                "rules": [{
+                    "primary": rule["primary"],
+                    "interaction_with": rule["interaction_with"],
+                    "severity": rule["severity"],
+                    "rationale": rule["rationale"],
+                    "recommended_action": rule["recommended_action"],
+                } for rule in rules],
+                "source": LOCAL_SOURCE,
+            })
+        interactions.sort(key=lambda result: get_severity_score(result["severity"]), reverse=True)
+
+        return {
+            "interactions": interactions,
+            "classes": {medication: self.class_names(mask) for medication, mask in zip(unique, masks)},
+            "unrecognized": [medication for medication, mask in zip(unique, masks) if not mask],
+            "pairsScreened": len(unique) * (len(unique) - 1) // 2,
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "classes": len(self.classes),
+            "interactingClassPairs": len(self.pair_rules),
+            "knownMedicines": len(self.medicine_masks),
+        }
+
+
+_SCREENS: Dict[Tuple[str, str], InteractionScreen] = {}
+
+
+def get_screen(rules_path=DEFAULT_RULES_PATH,
+               optional_medicines_path=DEFAULT_OPTIONAL_MEDICINES_PATH) -> InteractionScreen:
+    """Screen for a rule file, built once per process"""
+    key = (str(rules_path), str(optional_medicines_path))
+    if key not in _SCREENS:
+        _SCREENS[key] = InteractionScreen(load_local_rules(rules_path), load_optional_medicines(optional_medicines_path))
+    return _SCREENS[key]
+
+
+def screen_medications(medications: List[str]) -> Dict:
+    return get_screen().screen(medications)
+
+
+if __name__ == "__main__":
+    screen = get_screen()
+    medications = sys.argv[1:] or [
+        "estradiol", "warfarin", "sertraline", "ibuprofen", "omeprazole", "atorvastatin", "metformin",
+        "levothyroxine", "lisinopril", "amlodipine", "fluconazole", "st john's wort", "alendronate",
+        "calcium carbonate", "tamoxifen", "gabapentin", "clonidine", "rifampin", "carbamazepine", "valproate",
+        "ginkgo", "apixaban", "naproxen", "insulin", "atenolol", "amoxicillin", "azithromycin", "coumadin",
+        "advil", "paracetamol",
+    ]
+    report = screen.screen(medications)
+    runs = 2000
+    started = time.perf_counter()
+    for _ in range(runs):
+        screen.interacting_pairs(medications)
+    per_screen = (time.perf_counter() - started) / runs * 1e6
+    print(f"📊 {len(medications)} medications, {report['pairsScreened']} pairs, "
+          f"{len(report['interactions'])} interacting ({screen.stats()['classes']} classes)")
+    for result in report["interactions"][:10]:
+        print(f"  {result['severity']:<8} {' + '.join(result['medications'])}")
+    if report["unrecognized"]:
+        print(f"⚠️  Unrecognized: {', '.join(report['unrecognized'])}")
+    print(f"⏱️  {per_screen:.1f} µs per pair screen, {report['elapsedMs']} ms with rule details")
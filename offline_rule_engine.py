@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Offline Rule Engine - Python implementation of utils/offlineRuleEngine.ts
+Evaluates the knowledge pack rules (all/any conditions with equals,
+greaterThan, lessThan and contains) and knowledge pack drug interactions
+against a patient assessment and builds the ranked treatment plan. Uses
+the default knowledge pack from utils/knowledgeManager.ts unless another
+pack is supplied.
+"""
+
+import copy
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from rule_trace import RuleTrace, active_trace
+
+NAMS_2022 = {
+    "title": "NAMS 2022 Hormone Therapy Position Statement",
+    "url": "https://www.menopause.org/docs/default-source/professional/namspositionstatement2022.pdf",
+    "version": "2022",
+    "date": "2022-01-01",
+    "type": "guideline",
+}
+ACOG_2014 = {
+    "title": "ACOG Practice Bulletin on Hormone Therapy",
+    "url": "https://www.acog.org/clinical/clinical-guidance/practice-bulletin/articles/2014/01/hormone-therapy",
+    "version": "2014",
+    "date": "2014-01-01",
+    "type": "guideline",
+}
+AHA_ACC_2019 = {
+    "title": "AHA/ACC Cardiovascular Risk Guidelines",
+    "url": "https://www.acc.org/guidelines/about-guidelines-and-clinical-documents/clinical-practice-guidelines",
+    "version": "2019",
+    "date": "2019-01-01",
+    "type": "guideline",
+}
+NATURAL_MEDICINES = {
+    "title": "Natural Medicines Database",
+    "url": "https://naturalmedicines.therapeuticresearch.com/",
+    "version": "2024",
+    "date": "2024-01-01",
+    "type": "interaction",
+}
+INTERACTION_DATABASE = {
+    "title": "Drug Interaction Database",
+    "url": "https://reference.medscape.com/drug-interactionchecker",
+    "version": "2024",
+    "date": "2024-01-01",
+    "type": "interaction",
+}
+
+# KnowledgeManager.createDefaultKnowledgePack
+DEFAULT_KNOWLEDGE_PACK: Dict[str, Any] = {
+    "version": "1.0.0",
+    "sources": [NAMS_2022, ACOG_2014, AHA_ACC_2019],
+    "rules": [
+        {
+            "id": "rule-hrt-vte-contraindication",
+            "condition": {"all": [
+                {"field": "medicineType", "equals": "HRT"},
+                {"field": "history.VTE", "equals": True},
+            ]},
+            "action": {
+                "type": "Urgent",
+                "text": "HRT is contraindicated due to prior VTE — refer to hematology/clinician for risk stratification.",
+                "rationale": "VTE history increases thrombosis risk on estrogen-containing therapy.",
+                "evidence": [NAMS_2022],
+                "priority": 1,
+                "confidence": 0.95,
+                "contraindications": ["VTE history"],
+            },
+        },
+        {
+            "id": "rule-hrt-breast-cancer-contraindication",
+            "condition": {"all": [
+                {"field": "medicineType", "equals": "HRT"},
+                {"field": "history.breastCancer_active", "equals": True},
+            ]},
+            "action": {
+                "type": "Urgent",
+                "text": "HRT is contraindicated due to active breast cancer — refer to oncology immediately.",
+                "rationale": "Active breast cancer is an absolute contraindication for hormone therapy.",
+                "evidence": [ACOG_2014],
+                "priority": 1,
+                "confidence": 0.98,
+                "contraindications": ["Active breast cancer"],
+            },
+        },
+        {
+            "id": "rule-lifestyle-first-low-risk",
+            "condition": {"all": [
+                {"field": "riskScores.ASCVD", "lessThan": 7.5},
+                {"field": "symptoms.severity", "lessThan": 6},
+            ]},
+            "action": {
+                "type": "Lifestyle",
+                "text": "Consider lifestyle modifications as first-line approach for mild-moderate symptoms in low cardiovascular risk patients.",
+                "rationale": "Low-risk patients with mild symptoms may benefit from conservative management before pharmacological intervention.",
+                "evidence": [NAMS_2022],
+                "priority": 5,
+                "confidence": 0.75,
+            },
+        },
+        {
+            "id": "rule-cardiology-consult-high-ascvd",
+            "condition": {"all": [
+                {"field": "medicineType", "equals": "HRT"},
+                {"field": "riskScores.ASCVD", "greaterThan": 10},
+            ]},
+            "action": {
+                "type": "Refer",
+                "text": "Consider cardiology consultation before HRT initiation due to elevated cardiovascular risk.",
+                "rationale": "High ASCVD score indicates increased cardiovascular risk requiring specialist evaluation.",
+                "evidence": [AHA_ACC_2019],
+                "priority": 3,
+                "confidence": 0.85,
+            },
+        },
+        {
+            "id": "rule-herb-drug-interaction",
+            "condition": {"all": [
+                {"field": "medicineType", "equals": "HerbalSupplement"},
+                {"field": "currentMedications", "contains": "warfarin"},
+            ]},
+            "action": {
+                "type": "Urgent",
+                "text": "Potential herb-drug interaction with warfarin detected — discuss with clinician before starting herbal supplements.",
+                "rationale": "Many herbal supplements can affect anticoagulant medications and increase bleeding risk.",
+                "evidence": [NATURAL_MEDICINES],
+                "priority": 2,
+                "confidence": 0.90,
+                "interactions": ["warfarin-herbs"],
+            },
+        },
+    ],
+    "interactions": [
+        {
+            "drug1": "warfarin",
+            "drug2": "herbal_supplements",
+            "severity": "major",
+            "description": "Herbal supplements may affect warfarin metabolism and increase bleeding risk",
+        },
+        {
+            "drug1": "HRT",
+            "drug2": "warfarin",
+            "severity": "moderate",
+            "description": "Estrogen may increase clotting factors and affect warfarin effectiveness",
+        },
+    ],
+    "contraindications": [
+        {
+            "medication": "HRT",
+            "condition": "active_breast_cancer",
+            "severity": "absolute",
+            "description": "Active breast cancer is an absolute contraindication for hormone therapy",
+        },
+        {
+            "medication": "HRT",
+            "condition": "VTE_history",
+            "severity": "absolute",
+            "description": "History of venous thromboembolism is an absolute contraindication for oral HRT",
+        },
+    ],
+}
+
+TYPE_PRIORITY = {"Urgent": 1, "Refer": 2, "Pharm": 3, "NonPharm": 4, "Lifestyle": 5}
+REQUIRED_FIELDS = ["age", "gender"]
+RECOMMENDED_FIELDS = ["symptoms.severity", "history.VTE", "history.breastCancer_active", "currentMedications"]
+NUMERIC_FIELDS = [
+    "age", "symptoms.severity", "symptoms.vasomotorSymptoms",
+    "symptoms.sleepDisturbances", "riskScores.ASCVD", "riskScores.FRAX",
+]
+
+
+def _js_truthy(value: Any) -> bool:
+    """JavaScript truthiness: empty lists and dicts are truthy"""
+    if isinstance(value, (list, dict)):
+        return True
+    return bool(value)
+
+
+def get_nested_value(obj: Any, path: str) -> Any:
+    """getNestedValue: falsy intermediate or final values read as undefined"""
+    for key in path.split("."):
+        if not isinstance(obj, dict) or not _js_truthy(obj.get(key)):
+            return None
+        obj = obj[key]
+    return obj
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def evaluate_condition(condition: Dict[str, Any], patient: Dict[str, Any]) -> bool:
+    """KnowledgeManager.evaluateCondition"""
+    value = get_nested_value(patient, condition["field"])
+    if "equals" in condition:
+        expected = condition["equals"]
+        if isinstance(value, bool) or isinstance(expected, bool):
+            return isinstance(value, bool) and isinstance(expected, bool) and value == expected
+        return value == expected
+    if "greaterThan" in condition:
+        return _is_number(value) and value > condition["greaterThan"]
+    if "lessThan" in condition:
+        return _is_number(value) and value < condition["lessThan"]
+    if "contains" in condition and isinstance(value, (list, str)):
+        return condition["contains"] in value
+    return False
+
+
+def validate_condition(condition: Dict[str, Any], patient: Dict[str, Any]) -> bool:
+    """KnowledgeManager.validateCondition"""
+    if condition.get("all") is not None:
+        return all(evaluate_condition(c, patient) for c in condition["all"])
+    if condition.get("any") is not None:
+        return any(evaluate_condition(c, patient) for c in condition["any"])
+    return False
+
+
+class OfflineRuleEngine:
+    """generateTreatmentPlan over one knowledge pack"""
+
+    def __init__(self, knowledge_pack: Optional[Dict[str, Any]] = None):
+        self.knowledge_pack = knowledge_pack or DEFAULT_KNOWLEDGE_PACK
+
+    @classmethod
+    def from_file(cls, path) -> "OfflineRuleEngine":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def validate_assessment(self, assessment: Dict[str, Any]) -> Dict[str, Any]:
+        missing = [field for field in REQUIRED_FIELDS if get_nested_value(assessment, field) in (None, "")]
+        warnings = [
+            f"Missing recommended field: {field}"
+            for field in RECOMMENDED_FIELDS if get_nested_value(assessment, field) is None
+        ]
+        for field in NUMERIC_FIELDS:
+            value = get_nested_value(assessment, field)
+            if value is not None and not _is_number(value):
+                warnings.append(f"Field {field} should be numeric, got {type(value).__name__}")
+        return {
+            "isValid": not missing,
+            "missingRequired": missing,
+            "canProceedWithCaveats": len(missing) <= 1,
+            "warnings": warnings,
+        }
+
+    def _create_recommendation(self, rule: Dict[str, Any], validation: Dict[str, Any]) -> Dict[str, Any]:
+        action = rule["action"]
+        recommendation = {
+            "type": action["type"],
+            "priority": action["priority"],
+            "text": action["text"],
+            "rationale": action["rationale"],
+            "evidence": action["evidence"],
+            "confidenceScore": action["confidence"],
+            "contraindications": action.get("contraindications"),
+            "interactions": action.get("interactions"),
+        }
+        if not validation["isValid"]:
+            recommendation["requiresMoreData"] = True
+            recommendation["confidenceScore"] *= 0.7
+            recommendation["text"] = f"{recommendation['text']} (Requires complete assessment data for full evaluation)"
+        return recommendation
+
+    def check_drug_interactions(self, assessment: Dict[str, Any]) -> List[Dict[str, Any]]:
+        current = assessment.get("currentMedications") or []
+        proposed = assessment.get("medicineType")
+        if not current or not proposed:
+            return []
+
+        recommendations = []
+        proposed_lower = proposed.lower()
+        for interaction in self.knowledge_pack["interactions"]:
+            drug1 = interaction["drug1"].lower()
+            drug2 = interaction["drug2"].lower()
+            has_current = any(med.lower() in drug1 or drug1 in med.lower() for med in current)
+            has_proposed = drug2 in proposed_lower or proposed_lower in drug2
+            if not (has_current and has_proposed):
+                continue
+            major = interaction["severity"] == "major"
+            recommendations.append({
+                "type": "Urgent" if major else "Refer",
+                "priority": 1 if major else 3,
+                "text": (f"{interaction['severity'].upper()} drug interaction detected between "
+                         f"{interaction['drug1']} and {interaction['drug2']} — discuss with clinician."),
+                "rationale": interaction["description"],
+                "evidence": [INTERACTION_DATABASE],
+                "confidenceScore": 0.95 if major else 0.80,
+                "interactions": [f"{interaction['drug1']}-{interaction['drug2']}"],
+            })
+        return recommendations
+
+    @staticmethod
+    def _traced_validate(trace: RuleTrace, rule: Dict[str, Any], assessment: Dict[str, Any]) -> bool:
+        condition = rule["condition"]
+        with trace.rule("offline_rule_engine", rule["id"]) as record:
+            def checks(conditions):
+                for c in conditions:
+                    expected = {key: value for key, value in c.items() if key != "field"}
+                    yield record.check(c["field"], expected, get_nested_value(assessment, c["field"]),
+                                       evaluate_condition(c, assessment))
+            if condition.get("all") is not None:
+                record.matched = all(checks(condition["all"]))
+            elif condition.get("any") is not None:
+                record.matched = any(checks(condition["any"]))
+        return record.matched
+
+    def generate_treatment_plan(self, assessment: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        validation = self.validate_assessment(assessment)
+        trace = active_trace()
+
+        candidates: List[Dict[str, Any]] = []
+        rules_matched: List[str] = []
+        evidence_used: List[Dict[str, str]] = []
+        for rule in self.knowledge_pack["rules"]:
+            if (validate_condition(rule["condition"], assessment) if trace is None
+                    else self._traced_validate(trace, rule, assessment)):
+                candidates.append(self._create_recommendation(rule, validation))
+                rules_matched.append(rule["id"])
+                evidence_used.extend(rule["action"]["evidence"])
+        candidates.extend(self.check_drug_interactions(assessment))
+
+        recommendations = sorted(
+            candidates, key=lambda r: (TYPE_PRIORITY[r["type"]], r["priority"], -r["confidenceScore"]))
+
+        return {
+            "planId": str(uuid.uuid4()),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "inputSnapshot": copy.deepcopy(assessment),
+            "recommendations": recommendations,
+            "summary": self.generate_summary(assessment, recommendations),
+            "flags": {
+                "urgent": any(r["type"] == "Urgent" for r in recommendations),
+                "contraindicated": [c for r in recommendations for c in r.get("contraindications") or []],
+                "missingData": validation["missingRequired"],
+            },
+            "generalPlan": self.generate_general_plan(recommendations),
+            "specificOptions": [r for r in recommendations if r["type"] in ("NonPharm", "Pharm")][:5],
+            "auditTrail": {
+                "rulesMatched": rules_matched,
+                "evidenceUsed": self.deduplicate_evidence(evidence_used),
+                "evaluationTime": (time.perf_counter() - start) * 1000,
+                "knowledgeVersion": self.knowledge_pack["version"],
+            },
+        }
+
+    @staticmethod
+    def generate_general_plan(recommendations: List[Dict[str, Any]]) -> List[str]:
+        plan = ["Consider lifestyle modifications including regular exercise, balanced diet, and stress management techniques."]
+        top = recommendations[0] if recommendations else None
+        if top is None:
+            plan.append("Regular monitoring and follow-up with healthcare provider for symptom assessment.")
+        elif top["type"] == "Urgent":
+            plan.append("Urgent clinical evaluation required - contact healthcare provider immediately.")
+        elif top["type"] == "Refer":
+            plan.append("Specialist consultation recommended for comprehensive evaluation and treatment planning.")
+        else:
+            plan.append("Consider evidence-based treatment options appropriate for individual risk profile.")
+        plan.append("Schedule regular follow-up appointments to monitor treatment response and adjust plan as needed.")
+        return plan
+
+    @staticmethod
+    def generate_summary(assessment: Dict[str, Any], recommendations: List[Dict[str, Any]]) -> str:
+        age = assessment.get("age") or "unknown age"
+        urgent = sum(1 for r in recommendations if r["type"] == "Urgent")
+        summary = f"Treatment plan generated for {age}-year-old patient. "
+        if urgent:
+            summary += f"⚠️ {urgent} urgent recommendation(s) requiring immediate attention. "
+        summary += f"{len(recommendations)} evidence-based recommendations provided. "
+        summary += "All recommendations are advisory and require healthcare provider discussion before implementation."
+        return summary
+
+    @staticmethod
+    def deduplicate_evidence(evidence: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        seen = set()
+        unique = []
+        for item in evidence:
+            key = f"{item['title']}-{item['version']}"
+            if key not in seen:
+                seen.add(key)
+                unique.append(item)
+        return unique
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Population Baselines - Python implementation of utils/populationBaselines.ts
+getASCVDBaseline, getFRAXBaseline, getGailBaseline and calculatePercentileRank
+with the same age-group lookups and out-of-range fallbacks. Every baseline is
+also precomputed once per data version into a dense age x sex x ethnicity
+table, so baselines and percentile ranks for a whole cohort are array
+lookups instead of per-patient scans of the baseline lists.
+"""
+
+import hashlib
+import json
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (age group, female, male) - 10-year ASCVD risk %
+ASCVD_POPULATION_BASELINES = [
+    ("40-44", 2.0, 5.9), ("45-49", 2.8, 8.1), ("50-54", 4.1, 11.0), ("55-59", 5.7, 14.3),
+    ("60-64", 7.9, 17.8), ("65-69", 10.7, 21.4), ("70-74", 14.2, 25.0), ("75-79", 18.4, 28.4),
+]
+
+# (age group, female major, male major, female hip, male hip) - 10-year fracture risk %
+FRAX_POPULATION_BASELINES = [
+    ("50-54", 3.2, 2.8, 0.4, 0.3), ("55-59", 5.1, 4.2, 0.7, 0.5), ("60-64", 7.8, 6.1, 1.2, 0.8),
+    ("65-69", 11.2, 8.7, 2.1, 1.4), ("70-74", 15.8, 12.3, 3.8, 2.5), ("75-79", 22.1, 17.2, 6.9, 4.2),
+    ("80-84", 29.8, 23.1, 12.2, 7.1),
+]
+
+# (age group, average, white, black, hispanic, asian) - 5-year breast cancer risk %
+GAIL_POPULATION_BASELINES = [
+    ("35-39", 0.4, 0.4, 0.5, 0.3, 0.2), ("40-44", 0.7, 0.7, 0.8, 0.5, 0.4), ("45-49", 1.0, 1.0, 1.1, 0.7, 0.5),
+    ("50-54", 1.4, 1.4, 1.3, 0.9, 0.7), ("55-59", 1.7, 1.7, 1.5, 1.1, 0.9), ("60-64", 2.0, 2.0, 1.7, 1.3, 1.0),
+    ("65-69", 2.3, 2.3, 1.8, 1.5, 1.2), ("70-74", 2.6, 2.6, 2.0, 1.7, 1.4), ("75-85", 2.9, 2.9, 2.1, 1.8, 1.5),
+]
+
+ASCVD_BREAKPOINTS = [40, 45, 50, 55, 60, 65, 70, 75]
+FRAX_BREAKPOINTS = [50, 55, 60, 65, 70, 75, 80]
+GAIL_BREAKPOINTS = [35, 40, 45, 50, 55, 60, 65, 70, 75]
+
+# calculatePercentileRank: ratio <= edge gives the rank at the same position, above the last edge 95
+PERCENTILE_RATIO_EDGES = [0.5, 0.8, 1.2, 1.5, 2.0, 3.0]
+PERCENTILE_RANKS = [25, 40, 50, 65, 75, 85, 95]
+
+SEXES = ("female", "male")
+ETHNICITIES = ("white", "black", "hispanic", "asian", "other")
+METRICS = ("ascvd", "frax_major", "frax_hip", "gail")
+# Every age above this gives the same baseline as this age, every age below 0 the same as 0
+MAX_TABLE_AGE = 120
+
+
+def _age_group(age: float, breakpoints: List[int]) -> str:
+    for low, high in zip(breakpoints, breakpoints[1:]):
+        if low <= age < high:
+            return f"{low}-{high - 1}"
+    last = breakpoints[-1]
+    if age >= last:
+        return f"{last}-{last + 4}"
+    return f"{breakpoints[0] - 5}-{breakpoints[0] - 1}"
+
+
+def _find(baselines: List[tuple], group: str) -> Optional[tuple]:
+    return next((row for row in baselines if row[0] == group), None)
+
+
+def get_ascvd_baseline(age: float, gender: str) -> float:
+    """Population 10-year ASCVD risk for an age and gender"""
+    baseline = _find(ASCVD_POPULATION_BASELINES, _age_group(age, ASCVD_BREAKPOINTS))
+    if baseline is None:
+        if age < 40:
+            return 1.0 if gender == "female" else 3.0
+        if age >= 80:
+            return 22.0 if gender == "female" else 32.0
+        return 8.0 if gender == "female" else 15.0
+    return baseline[1] if gender == "female" else baseline[2]
+
+
+def get_frax_baseline(age: float, gender: str) -> Dict[str, float]:
+    """Population 10-year major and hip fracture risk"""
+    baseline = _find(FRAX_POPULATION_BASELINES, _age_group(age, FRAX_BREAKPOINTS))
+    if baseline is None:
+        if age < 50:
+            return {"majorFracture": 2.0, "hipFracture": 0.2}
+        if age >= 85:
+            return ({"majorFracture": 35.0, "hipFracture": 18.0} if gender == "female"
+                    else {"majorFracture": 28.0, "hipFracture": 10.0})
+        return ({"majorFracture": 12.0, "hipFracture": 3.0} if gender == "female"
+                else {"majorFracture": 10.0, "hipFracture": 2.0})
+    female = gender == "female"
+    return {"majorFracture": baseline[1] if female else baseline[2],
+            "hipFracture": baseline[3] if female else baseline[4]}
+
+
+def get_gail_baseline(age: float, ethnicity: str = "white") -> float:
+    """Population 5-year breast cancer risk for women"""
+    baseline = _find(GAIL_POPULATION_BASELINES, _age_group(age, GAIL_BREAKPOINTS))
+    if baseline is None:
+        if age < 35:
+            return 0.2
+        if age >= 85:
+            return 3.2
+        return 1.5
+    column = {"white": 2, "black": 3, "hispanic": 4, "asian": 5}.get(ethnicity, 1)
+    return baseline[column]
+
+
+def calculate_percentile_rank(patient_risk: float, population_mean: float) -> int:
+    """Approximate percentile of a patient's risk against the population mean"""
+    try:
+        ratio = patient_risk / population_mean
+    except ZeroDivisionError:
+        ratio = math.nan if patient_risk == 0 else math.copysign(math.inf, patient_risk)
+    for edge, rank in zip(PERCENTILE_RATIO_EDGES, PERCENTILE_RANKS):
+        if ratio <= edge:
+            return rank
+    return PERCENTILE_RANKS[-1]
+
+
+def _scalar_baseline(metric: str, age: float, sex: str, ethnicity: str) -> float:
+    if metric == "ascvd":
+        return get_ascvd_baseline(age, sex)
+    if metric == "frax_major":
+        return get_frax_baseline(age, sex)["majorFracture"]
+    if metric == "frax_hip":
+        return get_frax_baseline(age, sex)["hipFracture"]
+    return get_gail_baseline(age, ethnicity)
+
+
+def baseline_version() -> str:
+    """Content hash of the baseline data; tables and their HTTP caches are keyed by it"""
+    data = [ASCVD_POPULATION_BASELINES, FRAX_POPULATION_BASELINES, GAIL_POPULATION_BASELINES,
+            ASCVD_BREAKPOINTS, FRAX_BREAKPOINTS, GAIL_BREAKPOINTS, PERCENTILE_RATIO_EDGES, PERCENTILE_RANKS]
+    return hashlib.sha256(json.dumps(data, separators=(",", ":")).encode("utf-8")).hexdigest()[:16]
+
+
+class BaselineTables:
+    """Dense baseline tables: metric -> float array [age slot, sex, ethnicity]
+
+    Age slots 0..MAX_TABLE_AGE hold whole years (every breakpoint is a whole
+    year, so a fractional age shares its floor's baseline); the extra last
+    slot holds the value for a missing (NaN) age.
+    """
+
+    def __init__(self):
+        self.version = baseline_version()
+        self.ages = np.arange(MAX_TABLE_AGE + 1, dtype=np.float64)
+        self.missing_slot = MAX_TABLE_AGE + 1
+        self.tables: Dict[str, np.ndarray] = {}
+        for metric in METRICS:
+            table = np.empty((MAX_TABLE_AGE + 2, len(SEXES), len(ETHNICITIES)), dtype=np.float64)
+            for slot, age in enumerate(list(self.ages) + [math.nan]):
+                for s, sex in enumerate(SEXES):
+                    for e, ethnicity in enumerate(ETHNICITIES):
+                        table[slot, s, e] = _scalar_baseline(metric, age, sex, ethnicity)
+            table.setflags(write=False)
+            self.tables[metric] = table
+        self._edges = np.array(PERCENTILE_RATIO_EDGES, dtype=np.float64)
+        self._ranks = np.array(PERCENTILE_RANKS, dtype=np.int64)
+
+    def age_slots(self, ages: Iterable) -> np.ndarray:
+        ages = np.asarray(ages, dtype=np.float64)
+        slots = np.clip(np.floor(np.nan_to_num(ages, nan=0.0, posinf=MAX_TABLE_AGE, neginf=0.0)),
+                        0, MAX_TABLE_AGE).astype(np.intp)
+        slots[np.isnan(ages)] = self.missing_slot
+        return slots
+
+    @staticmethod
+    def sex_codes(sexes: Iterable) -> np.ndarray:
+        """Anything but "female" is looked up as male, as in the TypeScript"""
+        return np.where(np.asarray(sexes) == "female", 0, 1).astype(np.intp)
+
+    @staticmethod
+    def ethnicity_codes(ethnicities: Iterable) -> np.ndarray:
+        """Unknown ethnicities use the population average column ("other")"""
+        ethnicities = np.asarray(ethnicities)
+        codes = np.full(ethnicities.shape, ETHNICITIES.index("other"), dtype=np.intp)
+        for i, name in enumerate(ETHNICITIES):
+            codes[ethnicities == name] = i
+        return codes
+
+    def baselines(self, metric: str, ages: Iterable, sexes: Sequence, ethnicities: Optional[Sequence] = None
+                  ) -> np.ndarray:
+        """Population baseline per patient; ethnicities default to "white" like getGailBaseline"""
+        if metric not in self.tables:
+            raise ValueError(f"Unknown baseline metric '{metric}' (expected one of {', '.join(METRICS)})")
+        slots = self.age_slots(ages)
+        sex = self.sex_codes(sexes)
+        ethnicity = self.ethnicity_codes(ethnicities if ethnicities is not None else ["white"] * len(slots))
+        return self.tables[metric][slots, sex, ethnicity]
+
+    def percentile_ranks(self, risks: Iterable, means: Iterable) -> np.ndarray:
+        """calculatePercentileRank over arrays"""
+        risks = np.asarray(risks, dtype=np.float64)
+        means = np.asarray(means, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            ratios = risks / means
+        return self._ranks[np.searchsorted(self._edges, ratios, side="left")]
+
+    def cohort_percentiles(self, metric: str, patients: List[Dict[str, Any]]) -> Dict[str, List]:
+        """Baselines and percentile ranks for [{age, gender, ethnicity?, risk}, ...]"""
+        ages = [_number(patient.get("age")) for patient in patients]
+        sexes = [patient.get("gender", patient.get("sex")) for patient in patients]
+        ethnicities = [patient.get("ethnicity", "white") for patient in patients]
+        risks = [_number(patient.get("risk")) for patient in patients]
+        baselines = self.baselines(metric, ages, sexes, ethnicities)
+        return {"baselines": baselines.tolist(), "percentiles": self.percentile_ranks(risks, baselines).tolist()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The tables in the shape served by /api/baselines"""
+        return {
+            "version": self.version,
+            "ages": {"min": 0, "max": MAX_TABLE_AGE, "missingSlot": self.missing_slot},
+            "sexes": list(SEXES),
+            "ethnicities": list(ETHNICITIES),
+            "percentile": {"ratioEdges": PERCENTILE_RATIO_EDGES, "ranks": PERCENTILE_RANKS},
+            "tables": {metric: table.tolist() for metric, table in self.tables.items()},
+        }
+
+
+COHORT_FIELDS = ("age", "gender", "sex", "ethnicity", "risk")
+
+
+def cohort_patient_error(patient: Any) -> Optional[str]:
+    """Why cohort_percentiles() cannot take this patient, or None when it can"""
+    if not isinstance(patient, dict):
+        return "patient must be an object"
+    for field in COHORT_FIELDS:
+        value = patient.get(field)
+        if value is not None and not isinstance(value, (bool, int, float, str)):
+            return f"{field} must be a number or string"
+    return None
+
+
+def _number(value: Any) -> float:
+    if value is None or isinstance(value, bool):
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+_tables: Optional[BaselineTables] = None
+_payload: Optional[Tuple[str, bytes]] = None
+_tables_lock = threading.Lock()
+
+
+def get_tables() -> BaselineTables:
+    """Process-wide tables, built once"""
+    global _tables
+    with _tables_lock:
+        if _tables is None:
+            _tables = BaselineTables()
+        return _tables
+
+
+def tables_payload() -> Tuple[str, bytes]:
+    """(ETag, serialized JSON) for /api/baselines, serialized once per process"""
+    global _payload
+    tables = get_tables()
+    with _tables_lock:
+        if _payload is None or _payload[0] != f'"{tables.version}"':
+            body = json.dumps(tables.to_dict(), separators=(",", ":")).encode("utf-8")
+            _payload = (f'"{tables.version}"', body)
+        return _payload
+
+
+if __name__ == "__main__":
+    import time
+
+    started = time.perf_counter()
+    tables = get_tables()
+    print(f"📊 Baseline tables {tables.version} built in {(time.perf_counter() - started) * 1000:.1f} ms")
+    rng = np.random.default_rng(1)
+    n = 1_000_000
+    ages = rng.uniform(20, 100, n)
+    sexes = np.where(rng.random(n) < 0.5, "female", "male")
+    risks = rng.gamma(2.0, 4.0, n)
+    started = time.perf_counter()
+    ranks = tables.percentile_ranks(risks, tables.baselines("ascvd", ages, sexes))
+    print(f"✅ {n:,} ASCVD percentile ranks in {(time.perf_counter() - started) * 1000:.1f} ms "
+          f"(median rank {int(np.median(ranks))})")
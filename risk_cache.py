@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Risk Cache - memoized risk_calculators results keyed on canonical inputs
+The risk screens recompute every calculator whenever they open, yet the
+inputs of a patient rarely change between views, and the screens enter most
+of them as whole numbers (parseInt) or booleans. The inputs are reduced to
+the fields the requested calculators read and the result is cached in an
+LRU under (calculator ids, canonical input tuple, coefficient version).
+
+The canonical form only drops what cannot change a result: fields the
+calculators do not read, and the truthy value of boolean flags (the
+calculators only test them for truth). Numbers are kept exactly, with their
+type, so two inputs share a key only when every calculator gives them the
+same result; values are never rounded, since rounding moves a patient across
+age and category cut-offs. Results are computed from the caller's inputs.
+"""
+
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+import risk_calculators
+from risk_calculators import CALCULATORS, PatientInputs, RiskResult
+
+DEFAULT_MAX_ENTRIES = 4096
+
+# Flags the calculators only test for truth
+BOOLEAN_FIELDS = {
+    "smoking", "diabetes", "hypertension", "atypicalHyperplasia", "familyHistoryBreastCancer",
+    "personalHistoryBreastCancer", "personalHistoryDVT", "activeCancer", "prolongedImmobility",
+    "personalHistoryFracture", "parentHistoryHipFracture", "glucocorticoids", "rheumatoidArthritis", "alcoholIntake",
+}
+
+# Inputs each calculator reads; anything else does not change its result
+CALCULATOR_FIELDS = {
+    "ascvd": ("age", "sex", "totalCholesterol", "hdlCholesterol", "systolicBP", "hypertension", "smoking",
+              "diabetes"),
+    "framingham": ("age", "sex", "totalCholesterol", "hdlCholesterol", "systolicBP", "smoking", "diabetes"),
+    "gail": ("age", "race", "ageAtMenarche", "ageAtFirstBirth", "numberOfBiopsies", "atypicalHyperplasia",
+             "familyHistoryBreastCancer"),
+    "tyrer_cuzick": ("age", "familyHistoryBreastCancer", "personalHistoryBreastCancer"),
+    "wells": ("personalHistoryDVT", "activeCancer", "prolongedImmobility"),
+    "frax": ("age", "sex", "weight", "height", "personalHistoryFracture", "parentHistoryHipFracture", "smoking",
+             "glucocorticoids", "rheumatoidArthritis", "alcoholIntake"),
+    "bmi": ("weight", "height"),
+    "bsa": ("weight", "height"),
+    "egfr": ("age", "sex", "serumCreatinine"),
+    "hrt": ("age", "smoking", "personalHistoryBreastCancer", "personalHistoryDVT", "activeCancer"),
+}
+
+# Absent fields are kept apart from explicit values so .get() defaults still apply
+_ABSENT = ("absent",)
+
+
+def coefficient_version() -> str:
+    """Hash of the calculator source: any coefficient change starts a fresh key space"""
+    return hashlib.sha256(inspect.getsource(risk_calculators).encode("utf-8")).hexdigest()[:16]
+
+
+def _exact(value: Any) -> Any:
+    """Key part that equals another only for the same type and value (40 != 40.0 != True, 0.0 != -0.0)"""
+    if type(value) is float:
+        return float, value.hex()
+    return type(value), value
+
+
+def _canonicalizer(field: str):
+    return bool if field in BOOLEAN_FIELDS else _exact
+
+
+_plans: Dict[Tuple[str, ...], Tuple] = {}
+
+
+def _plan(calculator_ids: Tuple[str, ...]) -> Tuple:
+    """(field, canonicalizer) pairs for every input read by any of the calculators"""
+    plan = _plans.get(calculator_ids)
+    if plan is None:
+        for calculator_id in calculator_ids:
+            if calculator_id not in CALCULATORS:
+                raise KeyError(f"Unknown calculator '{calculator_id}'")
+        fields = sorted({field for calculator_id in calculator_ids for field in CALCULATOR_FIELDS[calculator_id]})
+        plan = _plans[calculator_ids] = tuple((field, _canonicalizer(field)) for field in fields)
+    return plan
+
+
+def input_key(calculator_ids: Tuple[str, ...], inputs: PatientInputs) -> Tuple:
+    """Canonical value (or the absent marker) of every input the calculators read"""
+    return tuple([canonical(inputs[field]) if field in inputs else _ABSENT
+                  for field, canonical in _plan(calculator_ids)])
+
+
+class RiskResultCache:
+    """Thread-safe LRU of calculator results with hit-rate metrics
+
+    One entry holds the results of every calculator requested together, so a
+    screen that shows several calculators costs one lookup on a repeat view.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, version: Optional[str] = None):
+        self.max_entries = max_entries
+        self.version = version or coefficient_version()
+        self._entries: "OrderedDict[Hashable, Dict[str, RiskResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self.evictions = 0
+        self.uncacheable = 0
+
+    def calculate_many(self, calculator_ids: Iterable[str], inputs: PatientInputs) -> Dict[str, RiskResult]:
+        """Each calculator's result for inputs, from the cache when possible"""
+        calculator_ids = tuple(dict.fromkeys(calculator_ids))
+        values = input_key(calculator_ids, inputs)
+        key = (calculator_ids, values, self.version)
+        label = "+".join(calculator_ids)
+        with self._lock:
+            try:
+                cached = self._entries.get(key)
+            except TypeError:
+                # Unhashable input values (lists, dicts) are computed but never cached
+                self.uncacheable += 1
+                key = None
+            else:
+                if cached is not None:
+                    self._entries.move_to_end(key)
+                    self._hits[label] = self._hits.get(label, 0) + 1
+                    return {calculator_id: dict(result) for calculator_id, result in cached.items()}
+                self._misses[label] = self._misses.get(label, 0) + 1
+
+        # Computed outside the lock; failures (missing inputs, domain errors) are not cached
+        results = {calculator_id: CALCULATORS[calculator_id](inputs) for calculator_id in calculator_ids}
+        if key is None:
+            return results
+        with self._lock:
+            self._entries[key] = {calculator_id: dict(result) for calculator_id, result in results.items()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return results
+
+    def calculate(self, calculator_id: str, inputs: PatientInputs) -> RiskResult:
+        return self.calculate_many((calculator_id,), inputs)[calculator_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Overall and per calculator-set hit rates"""
+        with self._lock:
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+            per_set = {}
+            for label in sorted(set(self._hits) | set(self._misses)):
+                h, m = self._hits.get(label, 0), self._misses.get(label, 0)
+                per_set[label] = {"hits": h, "misses": m, "hitRate": round(h / (h + m), 4)}
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": hits,
+                "misses": misses,
+                "hitRate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "evictions": self.evictions,
+                "uncacheable": self.uncacheable,
+                "calculators": per_set,
+            }
+
+
+_cache: Optional[RiskResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> RiskResultCache:
+    """Process-wide cache shared by the backend endpoints"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RiskResultCache()
+        return _cache
+
+
+def calculate(calculator_id: str, inputs: PatientInputs) -> RiskResult:
+    return get_cache().calculate(calculator_id, inputs)
+
+
+def calculate_many(calculator_ids: Iterable[str], inputs: PatientInputs) -> Dict[str, RiskResult]:
+    return get_cache().calculate_many(calculator_ids, inputs)
+
+
+def check_cache_agrees(cache: Optional[RiskResultCache] = None) -> int:
+    """Compare cached (cold and warm) with direct calculator results across cut-offs; returns mismatches"""
+    cache = cache or RiskResultCache()
+    patient = {"sex": "female", "race": "white", "totalCholesterol": 213, "hdlCholesterol": 50.5,
+               "systolicBP": 129.5, "hypertension": 1, "smoking": 0, "diabetes": False, "weight": 68.03885,
+               "height": 165.1, "ageAtMenarche": 12.5, "ageAtFirstBirth": 29.5, "numberOfBiopsies": 1,
+               "serumCreatinine": 0.95, "familyHistoryBreastCancer": "yes"}
+    ages = [round(start + step / 10, 1) for start in (19, 34, 39, 44, 49, 54, 59, 64, 69, 74, 79, 84, 89)
+            for step in range(21)]
+    mismatches = 0
+    for age in ages + [40, 40.0, -0.0, 0.0]:
+        inputs = dict(patient, age=age)
+        for calculator_id in CALCULATORS:
+            try:
+                expected = CALCULATORS[calculator_id](inputs)
+            except (KeyError, TypeError, ValueError) as e:
+                expected = type(e)
+            for _ in range(2):
+                try:
+                    actual = cache.calculate(calculator_id, inputs)
+                except (KeyError, TypeError, ValueError) as e:
+                    actual = type(e)
+                if actual != expected:
+                    mismatches += 1
+                    print(f"❌ {calculator_id} at age {age!r}: cached {actual} != direct {expected}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    import sys
+
+    mismatches = check_cache_agrees()
+    if mismatches:
+        sys.exit(1)
+    print("✅ Cached results match the calculators at every age and category cut-off checked")
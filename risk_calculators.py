@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Risk Calculators - Python implementation of utils/riskCalculators.ts
+ASCVD, Framingham, Gail, Tyrer-Cuzick, Wells, FRAX, BMI, BSA, eGFR and the
+local HRT risk index. Inputs use the PatientInputs field names from the
+TypeScript library; results carry the same fields as RiskResult except the
+lastUpdated timestamp, so equal inputs give equal results. FRAX also
+returns hipFractureRisk, which the TypeScript version only reports inside
+its interpretation text.
+"""
+
+import math
+from typing import Any, Dict
+
+PatientInputs = Dict[str, Any]
+RiskResult = Dict[str, Any]
+
+
+def js_round(value: float, digits: int = 0) -> float:
+    """Math.round(value * 10**digits) / 10**digits"""
+    scale = 10 ** digits
+    rounded = math.floor(value * scale + 0.5) / scale
+    return int(rounded) if digits == 0 else rounded
+
+
+def js_str(value: float) -> str:
+    """Number formatting of template literals (2.0 -> "2")"""
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _result(value: float, interpretation: str, category: str, color: str, unit: str,
+            source: str, population_baseline: float = None) -> RiskResult:
+    result = {
+        "value": value,
+        "interpretation": interpretation,
+        "category": category,
+        "color": color,
+        "unit": unit,
+        "source": source,
+    }
+    if population_baseline is not None:
+        result["populationBaseline"] = population_baseline
+    return result
+
+
+def calculate_ascvd(inputs: PatientInputs) -> RiskResult:
+    """ASCVD Risk Calculator (2013 ACC/AHA Guidelines), 10-year risk"""
+    age = inputs["age"]
+    if age < 40 or age > 79:
+        return _result(0, "ASCVD calculator is validated for ages 40-79", "low", "yellow", "%",
+                       "2013 ACC/AHA Guidelines")
+
+    total_chol = math.log(inputs["totalCholesterol"])
+    hdl = math.log(inputs["hdlCholesterol"])
+    sbp = math.log(inputs["systolicBP"])
+    if inputs["sex"] == "female":
+        total = (-29.799 + math.log(age) * 0.106501 + total_chol * 0.432440 + hdl * -0.374707
+                 + sbp * (0.314120 if inputs.get("hypertension") else 0.481760))
+        if inputs.get("smoking"):
+            total += 0.691160
+        if inputs.get("diabetes"):
+            total += 0.874155
+        beta0 = total - -29.18
+    else:
+        total = (-22.1 + math.log(age) * 0.064200 + total_chol * 0.549867 + hdl * -0.634861
+                 + sbp * (0.330795 if inputs.get("hypertension") else 0.549867))
+        if inputs.get("smoking"):
+            total += 0.842209
+        if inputs.get("diabetes"):
+            total += 0.706757
+        beta0 = total - -21.06
+
+    risk = (1 - math.pow(0.9144, math.exp(beta0))) * 100
+    if risk < 5:
+        category, color, interpretation = "low", "green", "Low risk - lifestyle modifications recommended"
+    elif risk < 7.5:
+        category, color, interpretation = "borderline", "yellow", "Borderline risk - consider risk-benefit of statin therapy"
+    elif risk < 20:
+        category, color, interpretation = "intermediate", "orange", "Intermediate risk - statin recommended if risk enhancers present"
+    else:
+        category, color, interpretation = "high", "red", "High risk - high-intensity statin recommended"
+
+    return _result(js_round(risk, 1), interpretation, category, color, "%",
+                   "2013 ACC/AHA Pooled Cohort Equations", 8.2 if inputs["sex"] == "female" else 12.8)
+
+
+# (lowest age, highest age, points) bands for Framingham
+_FRAMINGHAM_AGE_POINTS = {
+    "female": [(20, 34, -7), (35, 39, -3), (40, 44, 0), (45, 49, 3), (50, 54, 6),
+               (55, 59, 8), (60, 64, 10), (65, 69, 12), (70, 74, 14), (75, 79, 16)],
+    "male": [(20, 34, -9), (35, 39, -4), (40, 44, 0), (45, 49, 3), (50, 54, 6),
+             (55, 59, 8), (60, 64, 10), (65, 69, 11), (70, 74, 12), (75, 79, 13)],
+}
+
+
+def calculate_framingham(inputs: PatientInputs) -> RiskResult:
+    """Framingham Risk Calculator (2008 Update), 10-year CHD risk"""
+    age = inputs["age"]
+    female = inputs["sex"] == "female"
+    total_chol = inputs["totalCholesterol"]
+    hdl = inputs["hdlCholesterol"]
+    sbp = inputs["systolicBP"]
+
+    points = 0
+    for low, high, age_points in _FRAMINGHAM_AGE_POINTS["female" if female else "male"]:
+        if low <= age <= high:
+            points += age_points
+            break
+
+    chol_points = (0, 4, 8, 11, 13) if female else (0, 4, 7, 9, 11)
+    if total_chol < 160:
+        points += chol_points[0]
+    elif total_chol < 200:
+        points += chol_points[1]
+    elif total_chol < 240:
+        points += chol_points[2]
+    elif total_chol < 280:
+        points += chol_points[3]
+    else:
+        points += chol_points[4]
+
+    if hdl >= 60:
+        points += -1
+    elif hdl >= 50:
+        points += 0
+    elif hdl >= 40:
+        points += 1
+    else:
+        points += 2
+
+    if sbp >= 160:
+        points += 2
+    elif sbp >= 130:
+        points += 1
+
+    if inputs.get("smoking"):
+        points += 4
+    if inputs.get("diabetes"):
+        points += 4
+
+    if female:
+        bands = [(12, 1), (15, 2), (18, 3), (21, 4), (24, 5)]
+    else:
+        bands = [(4, 1), (7, 2), (9, 3), (11, 4), (13, 6), (15, 8), (17, 10)]
+    risk = next((band_risk for limit, band_risk in bands if points < limit), 30)
+
+    if risk < 6:
+        category, color, interpretation = "low", "green", "Low 10-year CHD risk"
+    elif risk < 10:
+        category, color, interpretation = "borderline", "yellow", "Borderline 10-year CHD risk"
+    elif risk < 20:
+        category, color, interpretation = "intermediate", "orange", "Intermediate 10-year CHD risk"
+    else:
+        category, color, interpretation = "high", "red", "High 10-year CHD risk"
+
+    return _result(risk, interpretation, category, color, "%", "Framingham Heart Study (2008)",
+                   6.4 if female else 10.2)
+
+
+def calculate_gail(inputs: PatientInputs) -> RiskResult:
+    """Gail Model breast cancer risk, 5-year and lifetime"""
+    age = inputs["age"]
+    race = inputs.get("race") or "white"
+    menarche = inputs["ageAtMenarche"]
+    first_birth = inputs.get("ageAtFirstBirth")
+    biopsies = inputs["numberOfBiopsies"]
+    atypical = inputs.get("atypicalHyperplasia")
+
+    age_factor = 1.0 if age >= 50 else 0.7 if age >= 40 else 0.3
+    race_factor = {"black": 0.7, "hispanic": 0.8, "asian": 0.5}.get(race, 1.0)
+    menarche_factor = 1.0 if menarche >= 14 else 1.1 if menarche >= 12 else 1.2
+    if not first_birth:
+        first_birth_factor = 1.2  # nulliparous
+    elif first_birth >= 30:
+        first_birth_factor = 1.1
+    elif first_birth >= 25:
+        first_birth_factor = 1.0
+    else:
+        first_birth_factor = 0.9
+    if biopsies >= 2:
+        biopsy_factor = 2.0 if atypical else 1.4
+    elif biopsies == 1:
+        biopsy_factor = 1.8 if atypical else 1.2
+    else:
+        biopsy_factor = 1.0
+    family_factor = 1.4 if inputs.get("familyHistoryBreastCancer") else 1.0
+
+    five_year = 1.5 * age_factor * race_factor * menarche_factor * first_birth_factor * biopsy_factor * family_factor
+    lifetime = five_year * 8
+
+    if five_year < 1.67:
+        category, color, interpretation = "low", "green", "Low breast cancer risk"
+    elif five_year < 2.5:
+        category, color, interpretation = "borderline", "yellow", "Borderline breast cancer risk"
+    elif five_year < 4.0:
+        category, color, interpretation = "intermediate", "orange", "Intermediate breast cancer risk - consider enhanced screening"
+    else:
+        category, color, interpretation = "high", "red", "High breast cancer risk - discuss prevention strategies"
+
+    rounded = js_round(five_year, 1)
+    return _result(rounded, f"{interpretation} (5-year: {js_str(rounded)}%, lifetime: ~{js_round(lifetime)}%)",
+                   category, color, "% (5-year)", "Gail Model (NCI)", 1.67)
+
+
+def calculate_tyrer_cuzick(inputs: PatientInputs) -> RiskResult:
+    """Simplified Tyrer-Cuzick (IBIS) breast cancer risk"""
+    if inputs.get("personalHistoryBreastCancer"):
+        return _result(0, "Personal history of breast cancer - risk assessment not applicable",
+                       "high", "red", "%", "Tyrer-Cuzick Model (IBIS)")
+
+    age = inputs["age"]
+    risk = 2.0 * (1.5 if age >= 60 else 1.2 if age >= 50 else 1.0 if age >= 40 else 0.5)
+    if inputs.get("familyHistoryBreastCancer"):
+        risk *= 2.0
+
+    if risk < 3:
+        category, color, interpretation = "low", "green", "Low breast cancer risk"
+    elif risk < 8:
+        category, color, interpretation = "borderline", "yellow", "Moderate breast cancer risk"
+    elif risk < 17:
+        category, color, interpretation = "intermediate", "orange", "High breast cancer risk - enhanced screening recommended"
+    else:
+        category, color, interpretation = "high", "red", "Very high breast cancer risk - genetic counseling recommended"
+
+    return _result(js_round(risk, 1), interpretation, category, color, "% (10-year)",
+                   "Tyrer-Cuzick Model (IBIS) - Simplified", 3.0)
+
+
+def calculate_wells(inputs: PatientInputs) -> RiskResult:
+    """Simplified Wells score for PE/DVT"""
+    score = 0
+    if inputs.get("personalHistoryDVT"):
+        score += 1.5
+    if inputs.get("activeCancer"):
+        score += 1
+    if inputs.get("prolongedImmobility"):
+        score += 1.5
+
+    if score < 2:
+        category, color, interpretation = "low", "green", "Low probability of PE/DVT"
+    elif score < 6:
+        category, color, interpretation = "intermediate", "orange", "Moderate probability of PE/DVT - consider d-dimer"
+    else:
+        category, color, interpretation = "high", "red", "High probability of PE/DVT - imaging recommended"
+
+    return _result(score, interpretation, category, color, "points", "Wells Score for PE/DVT", 1.0)
+
+
+# risk factor -> (major fracture multiplier, hip fracture multiplier)
+_FRAX_FACTORS = [
+    ("personalHistoryFracture", 1.8, 2.0),
+    ("parentHistoryHipFracture", 1.4, 2.3),
+    ("smoking", 1.2, 1.6),
+    ("glucocorticoids", 1.4, 1.8),
+    ("rheumatoidArthritis", 1.3, 1.7),
+    ("alcoholIntake", 1.2, 1.7),
+]
+
+
+def calculate_frax(inputs: PatientInputs) -> RiskResult:
+    """Simplified FRAX 10-year major osteoporotic and hip fracture risk"""
+    age = inputs["age"]
+    bmi = inputs["weight"] / math.pow(inputs["height"] / 100, 2)
+    major, hip = 5.0, 1.0
+
+    if age >= 80:
+        major, hip = major * 3.0, hip * 5.0
+    elif age >= 70:
+        major, hip = major * 2.0, hip * 3.0
+    elif age >= 60:
+        major, hip = major * 1.5, hip * 2.0
+
+    if inputs["sex"] == "female":
+        major, hip = major * 1.2, hip * 1.1
+
+    if bmi < 20:
+        major, hip = major * 1.3, hip * 1.5
+    elif bmi > 30:
+        major, hip = major * 0.8, hip * 0.7
+
+    for field, major_factor, hip_factor in _FRAX_FACTORS:
+        if inputs.get(field):
+            major, hip = major * major_factor, hip * hip_factor
+
+    major = min(major, 60)
+    hip = min(hip, 40)
+
+    if major < 10:
+        category, color, interpretation = "low", "green", "Low fracture risk"
+    elif major < 20:
+        category, color, interpretation = "borderline", "yellow", "Moderate fracture risk - consider lifestyle modifications"
+    elif major < 30:
+        category, color, interpretation = "intermediate", "orange", "High fracture risk - consider treatment"
+    else:
+        category, color, interpretation = "high", "red", "Very high fracture risk - treatment recommended"
+
+    result = _result(js_round(major, 1),
+                     f"{interpretation} (Major: {js_str(js_round(major, 1))}%, Hip: {js_str(js_round(hip, 1))}%)",
+                     category, color, "% (10-year)", "FRAX Fracture Risk Assessment Tool", 8.5)
+    result["hipFractureRisk"] = js_round(hip, 1)
+    return result
+
+
+def calculate_bmi(inputs: PatientInputs) -> RiskResult:
+    bmi = inputs["weight"] / math.pow(inputs["height"] / 100, 2)
+    if bmi < 18.5:
+        category, color, interpretation = "low", "yellow", "Underweight"
+    elif bmi < 25:
+        category, color, interpretation = "low", "green", "Normal weight"
+    elif bmi < 30:
+        category, color, interpretation = "borderline", "yellow", "Overweight"
+    elif bmi < 35:
+        category, color, interpretation = "intermediate", "orange", "Obese Class I"
+    else:
+        category, color, interpretation = "high", "red", "Obese Class II+"
+    return _result(js_round(bmi, 1), interpretation, category, color, "kg/m²", "WHO BMI Classification", 24.5)
+
+
+def calculate_bsa(inputs: PatientInputs) -> RiskResult:
+    """Body surface area (Mosteller formula)"""
+    bsa = math.sqrt(inputs["weight"] * inputs["height"] / 3600)
+    return _result(js_round(bsa, 2), "Body surface area for drug dosing", "low", "green", "m²",
+                   "Mosteller Formula", 1.7)
+
+
+def calculate_egfr(inputs: PatientInputs) -> RiskResult:
+    """eGFR (CKD-EPI 2021 race-free)"""
+    female = inputs["sex"] == "female"
+    creatinine = inputs.get("serumCreatinine", 1.0)
+    kappa = 0.7 if female else 0.9
+    alpha = -0.241 if female else -0.302
+    ratio = creatinine / kappa
+    egfr = (142 * math.pow(min(ratio, 1), alpha) * math.pow(max(ratio, 1), -1.200)
+            * math.pow(0.9938, inputs["age"]) * (1.012 if female else 1))
+
+    if egfr >= 90:
+        category, color, interpretation = "low", "green", "Normal kidney function"
+    elif egfr >= 60:
+        category, color, interpretation = "borderline", "yellow", "Mild decrease in kidney function"
+    elif egfr >= 30:
+        category, color, interpretation = "intermediate", "orange", "Moderate decrease - nephrology referral consider"
+    else:
+        category, color, interpretation = "high", "red", "Severe decrease - nephrology referral needed"
+
+    return _result(js_round(egfr), interpretation, category, color, "mL/min/1.73m²",
+                   "CKD-EPI 2021 Race-Free Equation", 90)
+
+
+def calculate_hrt_risk(inputs: PatientInputs) -> RiskResult:
+    """Local HRT contraindication risk index"""
+    age = inputs["age"]
+    score = 0
+    contraindications = []
+    if inputs.get("personalHistoryBreastCancer"):
+        score += 10
+        contraindications.append("Personal history of breast cancer")
+    if inputs.get("personalHistoryDVT"):
+        score += 10
+        contraindications.append("Personal history of VTE")
+    if inputs.get("activeCancer"):
+        score += 8
+        contraindications.append("Active cancer")
+    if inputs.get("smoking") and age > 35:
+        score += 3
+        contraindications.append("Smoking over age 35")
+    if age > 60:
+        score += 2
+
+    if score >= 10:
+        category, color, interpretation = "high", "red", "HRT contraindicated - alternatives recommended"
+    elif score >= 5:
+        category, color, interpretation = "intermediate", "orange", "HRT use with caution - enhanced monitoring"
+    elif score >= 2:
+        category, color, interpretation = "borderline", "yellow", "HRT acceptable with standard monitoring"
+    else:
+        category, color, interpretation = "low", "green", "HRT appropriate - low contraindication risk"
+
+    if contraindications:
+        interpretation = f"{interpretation}. Contraindications: {', '.join(contraindications)}"
+    return _result(score, interpretation, category, color, "risk points", "Local HRT Risk Assessment Algorithm", 2)
+
+
+CALCULATORS = {
+    "ascvd": calculate_ascvd,
+    "framingham": calculate_framingham,
+    "gail": calculate_gail,
+    "tyrer_cuzick": calculate_tyrer_cuzick,
+    "wells": calculate_wells,
+    "frax": calculate_frax,
+    "bmi": calculate_bmi,
+    "bsa": calculate_bsa,
+    "egfr": calculate_egfr,
+    "hrt": calculate_hrt_risk,
+}
+
+_POPULATION_BASELINES = {
+    "ascvd": {
+        "female_40-49": 2.3, "female_50-59": 5.3, "female_60-69": 12.8,
+        "male_40-49": 6.7, "male_50-59": 12.8, "male_60-69": 21.5,
+    },
+    "framingham": {
+        "female_40-49": 2.8, "female_50-59": 5.8, "female_60-69": 8.9,
+        "male_40-49": 5.2, "male_50-59": 9.4, "male_60-69": 13.2,
+    },
+}
+
+
+def get_population_baseline(calculator_name: str, age: float, sex: str) -> float:
+    age_group = "40-49" if age < 50 else "50-59" if age < 60 else "60-69"
+    return _POPULATION_BASELINES.get(calculator_name, {}).get(f"{sex}_{age_group}", 0)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Risk Surface - what-if sweeps of the risk calculators for counselling
+Takes a patient and one or two swept inputs ("systolicBP from 160 to 130",
+"smoking: yes/no") and evaluates every grid point of every requested
+calculator in one vectorized batch. Each calculator comes back as a compact
+array shaped like the grid, next to its value at the patient's own inputs.
+"""
+
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from risk_calculators import CALCULATORS
+from risk_cache import BOOLEAN_FIELDS
+from risk_vectorized import CATEGORIES, VECTORIZED
+
+MAX_AXES = 2
+MAX_AXIS_POINTS = 500
+MAX_GRID_POINTS = 250000
+
+
+def axis_values(variable: Dict[str, Any]) -> np.ndarray:
+    """Grid values for {"field", "values"} or {"field", "start", "stop", "steps" | "step"}"""
+    field = variable.get("field")
+    if not isinstance(field, str) or not field:
+        raise ValueError("Every swept variable needs a field name")
+    if "values" in variable:
+        values = variable["values"]
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"values for {field} must be a non-empty list")
+        # One kind per axis: numbers (finite), booleans, or category names such as sex
+        if not (all(isinstance(value, bool) for value in values)
+                or all(isinstance(value, str) for value in values)
+                or all(isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+                       for value in values)):
+            raise ValueError(f"values for {field} must all be finite numbers, all booleans or all strings")
+        values = np.array(values)
+    elif "start" in variable and "stop" in variable:
+        start, stop = float(variable["start"]), float(variable["stop"])
+        if not math.isfinite(start) or not math.isfinite(stop):
+            raise ValueError(f"start and stop for {field} must be finite numbers")
+        if "step" in variable:
+            step = abs(float(variable["step"])) * (1 if stop >= start else -1)
+            if step == 0 or not math.isfinite(step):
+                raise ValueError(f"step for {field} must be a finite number other than 0")
+            # Size the axis before numpy allocates it (the quotient may overflow to inf)
+            intervals = (stop - start) / step
+            if not intervals + 1.5 < MAX_AXIS_POINTS + 1:
+                raise ValueError(f"{field} must have between 1 and {MAX_AXIS_POINTS} points")
+            values = np.arange(start, stop + step / 2, step)
+        else:
+            steps = int(variable.get("steps", 50))
+            if not 1 <= steps <= MAX_AXIS_POINTS:
+                raise ValueError(f"steps for {field} must be between 1 and {MAX_AXIS_POINTS}")
+            values = np.linspace(start, stop, steps)
+    elif field in BOOLEAN_FIELDS:
+        values = np.array([False, True])
+    else:
+        raise ValueError(f"Give values or start/stop for {field}")
+    if not 1 <= len(values) <= MAX_AXIS_POINTS:
+        raise ValueError(f"{field} must have between 1 and {MAX_AXIS_POINTS} points")
+    return values
+
+
+def _finite_list(values: np.ndarray) -> list:
+    """values.tolist() with inf and NaN (e.g. height 0, negative cholesterol) as None, which JSON can carry"""
+    if values.dtype.kind == "f" and not np.isfinite(values).all():
+        values = np.where(np.isfinite(values), values, None)
+    return values.tolist()
+
+
+def _baseline(calculator: str, inputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The patient's own result, when their inputs are complete without the swept values"""
+    try:
+        result = CALCULATORS[calculator](inputs)
+    except (KeyError, TypeError, ValueError, ArithmeticError):
+        return None
+    value = result["value"]
+    if isinstance(value, float) and not math.isfinite(value):
+        value = None
+    return {"value": value, "category": result["category"]}
+
+
+def risk_surface(inputs: Dict[str, Any], variables: List[Dict[str, Any]],
+                 calculators: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Each calculator's value and category over the grid of the swept variables
+
+    Without an explicit calculator list, calculators whose inputs are missing
+    are listed under "skipped" instead of failing the sweep.
+    """
+    if not 1 <= len(variables) <= MAX_AXES:
+        raise ValueError(f"Sweep between 1 and {MAX_AXES} variables")
+    explicit = bool(calculators)
+    calculators = list(calculators or VECTORIZED)
+    unknown = [calculator for calculator in calculators if calculator not in VECTORIZED]
+    if unknown:
+        raise ValueError(f"Unknown calculators: {', '.join(map(str, unknown))}")
+
+    started = time.perf_counter()
+    axes = [axis_values(variable) for variable in variables]
+    fields = [variable["field"] for variable in variables]
+    if len(set(fields)) != len(fields):
+        raise ValueError("Swept variables must be different fields")
+    shape = tuple(len(axis) for axis in axes)
+    size = int(np.prod(shape))
+    if size > MAX_GRID_POINTS:
+        raise ValueError(f"Grid of {size} points exceeds {MAX_GRID_POINTS}")
+
+    batch = dict(inputs)
+    for field, grid in zip(fields, np.meshgrid(*axes, indexing="ij")):
+        batch[field] = grid.ravel()
+
+    results = {}
+    skipped = {}
+    for calculator in calculators:
+        try:
+            surface = VECTORIZED[calculator](batch, size)
+        except KeyError as e:
+            if explicit:
+                raise
+            skipped[calculator] = f"missing input {e}"
+            continue
+        results[calculator] = {
+            "values": _finite_list(surface["value"].reshape(shape)),
+            "categories": _finite_list(surface["category"].reshape(shape)),
+            "baseline": _baseline(calculator, inputs),
+        }
+
+    return {
+        "axes": [{"field": field, "values": axis.tolist()} for field, axis in zip(fields, axes)],
+        "shape": list(shape),
+        "categories": list(CATEGORIES),
+        "results": results,
+        "skipped": skipped,
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    patient = {"age": 62, "sex": "female", "totalCholesterol": 230, "hdlCholesterol": 48, "systolicBP": 160,
+               "hypertension": True, "smoking": True, "diabetes": False, "weight": 72, "height": 163}
+    surface = risk_surface(patient, [{"field": "systolicBP", "start": 160, "stop": 130, "steps": 100},
+                                     {"field": "totalCholesterol", "start": 260, "stop": 160, "steps": 100}])
+    print(f"📊 {surface['shape'][0]}x{surface['shape'][1]} grid, {len(surface['results'])} calculators "
+          f"in {surface['elapsedMs']} ms")
+    ascvd = surface["results"]["ascvd"]["values"]
+    print(f"ASCVD {ascvd[0][0]}% at SBP 160 / TC 260 -> {ascvd[-1][-1]}% at SBP 130 / TC 160")
+    smoking = risk_surface(patient, [{"field": "smoking"}], ["ascvd", "hrt"])
+    print(f"Quitting smoking: ASCVD {smoking['results']['ascvd']['values'][1]}% -> "
+          f"{smoking['results']['ascvd']['values'][0]}%, HRT index {smoking['results']['hrt']['values'][1]} -> "
+          f"{smoking['results']['hrt']['values'][0]}")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Risk Uncertainty - Monte Carlo confidence bands for ASCVD, FRAX and Gail
+Approximate inputs (an office blood pressure, a remembered cholesterol value)
+are sampled from measurement-error distributions and every sample is pushed
+through the vectorized calculators in one NumPy batch. The response gives the
+point estimate next to percentile bands and the share of samples in each
+risk category.
+"""
+
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from risk_calculators import CALCULATORS
+from risk_vectorized import CATEGORIES, VECTORIZED
+
+DEFAULT_SAMPLES = 4000
+MAX_SAMPLES = 50000
+DEFAULT_PERCENTILES = (2.5, 25, 50, 75, 97.5)
+UNCERTAINTY_CALCULATORS = ("ascvd", "frax", "gail")
+
+# Typical measurement error of a single clinic reading; override per request
+DEFAULT_ERRORS = {
+    "systolicBP": {"distribution": "normal", "sd": 8},
+    "totalCholesterol": {"distribution": "normal", "cv": 0.06},
+    "hdlCholesterol": {"distribution": "normal", "cv": 0.06},
+    "weight": {"distribution": "normal", "sd": 1.0},
+    "height": {"distribution": "normal", "sd": 1.0},
+}
+
+# Samples are clipped to physiologically possible values so logs and ratios stay finite
+LOWER_BOUNDS = {
+    "age": 0, "systolicBP": 50, "totalCholesterol": 50, "hdlCholesterol": 5, "weight": 20, "height": 100,
+    "ageAtMenarche": 6, "ageAtFirstBirth": 0, "numberOfBiopsies": 0,
+}
+
+DISTRIBUTIONS = ("normal", "uniform", "lognormal")
+SPREAD_KEYS = ("sd", "cv", "halfWidth", "sigma")
+
+
+def _error_problem(error: Any) -> Optional[str]:
+    """Why an error model cannot be sampled, or None"""
+    if not isinstance(error, dict):
+        return "must be an object such as {\"distribution\": \"normal\", \"sd\": 5}"
+    for key in SPREAD_KEYS:
+        if key in error:
+            value = error[key]
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+                return f"{key} must be a finite number of at least 0"
+    return None
+
+
+def _spread(error: Dict[str, Any], nominal: float) -> float:
+    """Absolute spread: "sd" / "halfWidth" as given, "cv" relative to the nominal value"""
+    if "cv" in error:
+        return abs(nominal) * float(error["cv"])
+    return float(error.get("sd", error.get("halfWidth", 0)))
+
+
+def sample_inputs(inputs: Dict[str, Any], errors: Dict[str, Dict[str, Any]], samples: int,
+                  rng: np.random.Generator) -> Dict[str, Any]:
+    """Inputs with each field named in errors replaced by an array of draws"""
+    batch = dict(inputs)
+    for field, error in errors.items():
+        if field not in inputs or inputs[field] is None:
+            continue
+        nominal = float(inputs[field])
+        if not math.isfinite(nominal):
+            raise ValueError(f"{field} must be a finite number to sample around it")
+        distribution = error.get("distribution", "normal")
+        spread = _spread(error, nominal)
+        if distribution == "normal":
+            draws = rng.normal(nominal, spread, samples)
+        elif distribution == "uniform":
+            draws = rng.uniform(nominal - spread, nominal + spread, samples)
+        elif distribution == "lognormal":
+            # Multiplicative error: sigma on the log scale (a cv is close to it for small errors)
+            draws = nominal * rng.lognormal(0.0, float(error.get("sigma", error.get("cv", 0))), samples)
+        else:
+            raise ValueError(f"Unknown distribution '{distribution}' for {field} (expected {', '.join(DISTRIBUTIONS)})")
+        if error.get("round"):
+            draws = np.round(draws)
+        batch[field] = np.maximum(draws, LOWER_BOUNDS.get(field, 0))
+    return batch
+
+
+def uncertainty_bands(inputs: Dict[str, Any], calculators: Optional[List[str]] = None,
+                      errors: Optional[Dict[str, Dict[str, Any]]] = None, samples: int = DEFAULT_SAMPLES,
+                      percentiles=DEFAULT_PERCENTILES, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Point estimate, percentile bands and category shares per calculator"""
+    if calculators is not None and (not isinstance(calculators, list)
+                                    or not all(isinstance(c, str) for c in calculators)):
+        raise ValueError("calculators must be a list of calculator ids")
+    if errors is not None:
+        if not isinstance(errors, dict):
+            raise ValueError("errors must be an object of distributions")
+        for field, error in errors.items():
+            problem = _error_problem(error)
+            if problem:
+                raise ValueError(f"errors.{field} {problem}")
+    calculators = list(calculators or UNCERTAINTY_CALCULATORS)
+    unknown = [calculator for calculator in calculators if calculator not in UNCERTAINTY_CALCULATORS]
+    if unknown:
+        raise ValueError(f"No uncertainty model for: {', '.join(map(str, unknown))}")
+    if not 1 <= samples <= MAX_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_SAMPLES}")
+    errors = DEFAULT_ERRORS if errors is None else errors
+    percentiles = [float(p) for p in percentiles]
+
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    batch = sample_inputs(inputs, errors, samples, rng)
+    results = {}
+    for calculator in calculators:
+        try:
+            point = CALCULATORS[calculator](inputs)
+        except ArithmeticError as e:
+            raise ValueError(f"Inputs out of range for {calculator}: {e}") from e
+        sampled = VECTORIZED[calculator](batch, samples)
+        entry = {
+            "point": _finite(point["value"]),
+            "category": point["category"],
+            "mean": _finite(round(float(sampled["value"].mean()), 2)),
+            "percentiles": _percentiles(sampled["value"], percentiles),
+            "categoryShare": _category_share(sampled["category"], samples),
+        }
+        if "hipFractureRisk" in sampled:
+            entry["hipFracture"] = {"point": _finite(point.get("hipFractureRisk")),
+                                    "percentiles": _percentiles(sampled["hipFractureRisk"], percentiles)}
+        results[calculator] = entry
+
+    return {
+        "results": results,
+        "samples": samples,
+        "errors": {field: error for field, error in errors.items() if field in inputs},
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _finite(value: Any) -> Any:
+    """None for inf/NaN (e.g. a zero height), which JSON cannot carry"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _percentiles(values: np.ndarray, percentiles: List[float]) -> Dict[str, Optional[float]]:
+    bands = np.percentile(values, percentiles)
+    return {f"p{p:g}": _finite(round(float(band), 2)) for p, band in zip(percentiles, bands)}
+
+
+def _category_share(categories: np.ndarray, samples: int) -> Dict[str, float]:
+    counts = np.bincount(categories.astype(np.intp), minlength=len(CATEGORIES))
+    return {name: round(int(count) / samples, 4) for name, count in zip(CATEGORIES, counts)}
+
+
+if __name__ == "__main__":
+    patient = {"age": 58, "sex": "female", "totalCholesterol": 215, "hdlCholesterol": 52, "systolicBP": 142,
+               "hypertension": True, "smoking": False, "diabetes": False, "weight": 66, "height": 162,
+               "ageAtMenarche": 12, "ageAtFirstBirth": 28, "numberOfBiopsies": 1, "race": "white"}
+    report = uncertainty_bands(patient, seed=1)
+    for calculator, entry in report["results"].items():
+        print(f"📊 {calculator:<6} point {entry['point']:>6}  {entry['percentiles']}  {entry['categoryShare']}")
+    print(f"⏱️  {report['samples']} samples in {report['elapsedMs']} ms")
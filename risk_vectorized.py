@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Vectorized Risk Calculators - NumPy batch versions of risk_calculators
+Each function evaluates one calculator for n input rows at once. Inputs use
+the PatientInputs field names; every field may be a scalar (shared by all
+rows) or an array of length n. Results are {"value": float array,
+"category": index into CATEGORIES} with the same rounding and category
+cut-offs as the scalar calculators, so row i equals risk_calculators' result
+for the inputs of row i; `python risk_vectorized.py` checks that on 20k
+random rows.
+"""
+
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from risk_calculators import _FRAMINGHAM_AGE_POINTS, _FRAX_FACTORS, CALCULATORS
+
+CATEGORIES = ("low", "borderline", "intermediate", "high")
+
+Batch = Dict[str, Any]
+BatchResult = Dict[str, np.ndarray]
+
+
+def js_round(values: np.ndarray, digits: int = 0) -> np.ndarray:
+    """risk_calculators.js_round over an array"""
+    scale = 10 ** digits
+    return np.floor(values * scale + 0.5) / scale
+
+
+def number(inputs: Batch, field: str, n: int, default: Any = None) -> np.ndarray:
+    value = inputs.get(field, default)
+    if value is None:
+        raise KeyError(field)
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (n,))
+
+
+def flag(inputs: Batch, field: str, n: int) -> np.ndarray:
+    """Truthiness of a field, as `if inputs.get(field)` in the scalar calculators"""
+    value = inputs.get(field)
+    if isinstance(value, np.ndarray):
+        return np.broadcast_to(value.astype(bool), (n,))
+    return np.full(n, bool(value))
+
+
+def female(inputs: Batch, n: int) -> np.ndarray:
+    return np.broadcast_to(np.asarray(inputs["sex"]) == "female", (n,))
+
+
+def categorize(values: np.ndarray, edges) -> np.ndarray:
+    """Category index for `value < edges[0]` low, `< edges[1]` borderline, ..."""
+    return np.searchsorted(np.asarray(edges, dtype=np.float64), values, side="right").astype(np.int8)
+
+
+def ascvd(inputs: Batch, n: int) -> BatchResult:
+    """calculate_ascvd: 2013 ACC/AHA pooled cohort equations"""
+    age = number(inputs, "age", n)
+    is_female = female(inputs, n)
+    hypertension = flag(inputs, "hypertension", n)
+    smoking = flag(inputs, "smoking", n)
+    diabetes = flag(inputs, "diabetes", n)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        log_age = np.log(age)
+        total_chol = np.log(number(inputs, "totalCholesterol", n))
+        hdl = np.log(number(inputs, "hdlCholesterol", n))
+        sbp = np.log(number(inputs, "systolicBP", n))
+
+        female_total = (-29.799 + log_age * 0.106501 + total_chol * 0.432440 + hdl * -0.374707
+                        + sbp * np.where(hypertension, 0.314120, 0.481760)
+                        + np.where(smoking, 0.691160, 0.0) + np.where(diabetes, 0.874155, 0.0))
+        male_total = (-22.1 + log_age * 0.064200 + total_chol * 0.549867 + hdl * -0.634861
+                      + sbp * np.where(hypertension, 0.330795, 0.549867)
+                      + np.where(smoking, 0.842209, 0.0) + np.where(diabetes, 0.706757, 0.0))
+        beta0 = np.where(is_female, female_total - -29.18, male_total - -21.06)
+        risk = (1 - np.power(0.9144, np.exp(beta0))) * 100
+
+    in_range = (age >= 40) & (age <= 79)
+    return {"value": np.where(in_range, js_round(risk, 1), 0.0),
+            "category": np.where(in_range, categorize(risk, (5, 7.5, 20)), 0).astype(np.int8)}
+
+
+def framingham(inputs: Batch, n: int) -> BatchResult:
+    """calculate_framingham: 2008 point score, 10-year CHD risk"""
+    age = number(inputs, "age", n)
+    is_female = female(inputs, n)
+    total_chol = number(inputs, "totalCholesterol", n)
+    hdl = number(inputs, "hdlCholesterol", n)
+    sbp = number(inputs, "systolicBP", n)
+
+    points = np.zeros(n)
+    for sex_mask, bands in ((is_female, _FRAMINGHAM_AGE_POINTS["female"]), (~is_female, _FRAMINGHAM_AGE_POINTS["male"])):
+        for low, high, age_points in bands:
+            points += np.where(sex_mask & (age >= low) & (age <= high), age_points, 0)
+
+    chol_band = np.searchsorted([160.0, 200.0, 240.0, 280.0], total_chol, side="right")
+    points += np.where(is_female, np.array([0, 4, 8, 11, 13])[chol_band], np.array([0, 4, 7, 9, 11])[chol_band])
+    points += np.select([hdl >= 60, hdl >= 50, hdl >= 40], [-1, 0, 1], 2)
+    points += np.select([sbp >= 160, sbp >= 130], [2, 1], 0)
+    points += np.where(flag(inputs, "smoking", n), 4, 0) + np.where(flag(inputs, "diabetes", n), 4, 0)
+
+    female_risk = np.array([1, 2, 3, 4, 5, 30.0])[np.searchsorted([12.0, 15, 18, 21, 24], points, side="right")]
+    male_risk = np.array([1, 2, 3, 4, 6, 8, 10, 30.0])[np.searchsorted([4.0, 7, 9, 11, 13, 15, 17], points, side="right")]
+    risk = np.where(is_female, female_risk, male_risk)
+    return {"value": risk, "category": categorize(risk, (6, 10, 20))}
+
+
+def frax(inputs: Batch, n: int) -> BatchResult:
+    """calculate_frax: simplified major osteoporotic and hip fracture risk"""
+    age = number(inputs, "age", n)
+    bmi = number(inputs, "weight", n) / np.power(number(inputs, "height", n) / 100, 2)
+
+    major = np.select([age >= 80, age >= 70, age >= 60], [15.0, 10.0, 7.5], 5.0)
+    hip = np.select([age >= 80, age >= 70, age >= 60], [5.0, 3.0, 2.0], 1.0)
+    is_female = female(inputs, n)
+    major = np.where(is_female, major * 1.2, major)
+    hip = np.where(is_female, hip * 1.1, hip)
+    major = np.select([bmi < 20, bmi > 30], [major * 1.3, major * 0.8], major)
+    hip = np.select([bmi < 20, bmi > 30], [hip * 1.5, hip * 0.7], hip)
+    for field, major_factor, hip_factor in _FRAX_FACTORS:
+        present = flag(inputs, field, n)
+        major = np.where(present, major * major_factor, major)
+        hip = np.where(present, hip * hip_factor, hip)
+
+    major = np.minimum(major, 60)
+    hip = np.minimum(hip, 40)
+    return {"value": js_round(major, 1), "category": categorize(major, (10, 20, 30)),
+            "hipFractureRisk": js_round(hip, 1)}
+
+
+def gail(inputs: Batch, n: int) -> BatchResult:
+    """calculate_gail: 5-year breast cancer risk"""
+    age = number(inputs, "age", n)
+    menarche = number(inputs, "ageAtMenarche", n)
+    biopsies = number(inputs, "numberOfBiopsies", n)
+    atypical = flag(inputs, "atypicalHyperplasia", n)
+    race = np.broadcast_to(np.asarray(inputs.get("race"), dtype=object), (n,))
+
+    age_factor = np.select([age >= 50, age >= 40], [1.0, 0.7], 0.3)
+    # A missing race falls through to the default factor, like "white"
+    race_factor = np.select([race == "black", race == "hispanic", race == "asian"], [0.7, 0.8, 0.5], 1.0)
+    menarche_factor = np.select([menarche >= 14, menarche >= 12], [1.0, 1.1], 1.2)
+
+    first_birth = inputs.get("ageAtFirstBirth")
+    if first_birth is None:
+        first_birth_factor = np.full(n, 1.2)
+    else:
+        first_birth = np.broadcast_to(np.asarray(first_birth, dtype=np.float64), (n,))
+        # 0 means nulliparous, like the falsy check in the scalar calculator
+        first_birth_factor = np.select([first_birth == 0, first_birth >= 30, first_birth >= 25],
+                                       [1.2, 1.1, 1.0], 0.9)
+    biopsy_factor = np.select([biopsies >= 2, biopsies == 1],
+                              [np.where(atypical, 2.0, 1.4), np.where(atypical, 1.8, 1.2)], 1.0)
+    family_factor = np.where(flag(inputs, "familyHistoryBreastCancer", n), 1.4, 1.0)
+
+    five_year = 1.5 * age_factor * race_factor * menarche_factor * first_birth_factor * biopsy_factor * family_factor
+    return {"value": js_round(five_year, 1), "category": categorize(five_year, (1.67, 2.5, 4.0))}
+
+
+def tyrer_cuzick(inputs: Batch, n: int) -> BatchResult:
+    """calculate_tyrer_cuzick: simplified 10-year breast cancer risk"""
+    age = number(inputs, "age", n)
+    risk = 2.0 * np.select([age >= 60, age >= 50, age >= 40], [1.5, 1.2, 1.0], 0.5)
+    risk = np.where(flag(inputs, "familyHistoryBreastCancer", n), risk * 2.0, risk)
+    # A personal history makes the model not applicable: 0%, reported as high
+    history = flag(inputs, "personalHistoryBreastCancer", n)
+    return {"value": np.where(history, 0.0, js_round(risk, 1)),
+            "category": np.where(history, 3, categorize(risk, (3, 8, 17))).astype(np.int8)}
+
+
+def wells(inputs: Batch, n: int) -> BatchResult:
+    """calculate_wells: simplified PE/DVT score (no borderline band)"""
+    score = (np.where(flag(inputs, "personalHistoryDVT", n), 1.5, 0) + np.where(flag(inputs, "activeCancer", n), 1, 0)
+             + np.where(flag(inputs, "prolongedImmobility", n), 1.5, 0))
+    return {"value": score, "category": np.select([score < 2, score < 6], [0, 2], 3).astype(np.int8)}
+
+
+def bmi(inputs: Batch, n: int) -> BatchResult:
+    value = number(inputs, "weight", n) / np.power(number(inputs, "height", n) / 100, 2)
+    # Underweight and normal weight are both "low"
+    return {"value": js_round(value, 1), "category": categorize(value, (25, 30, 35))}
+
+
+def bsa(inputs: Batch, n: int) -> BatchResult:
+    """calculate_bsa: Mosteller formula"""
+    value = np.sqrt(number(inputs, "weight", n) * number(inputs, "height", n) / 3600)
+    return {"value": js_round(value, 2), "category": np.zeros(n, dtype=np.int8)}
+
+
+def egfr(inputs: Batch, n: int) -> BatchResult:
+    """calculate_egfr: CKD-EPI 2021 race-free"""
+    is_female = female(inputs, n)
+    ratio = number(inputs, "serumCreatinine", n, default=1.0) / np.where(is_female, 0.7, 0.9)
+    alpha = np.where(is_female, -0.241, -0.302)
+    value = (142 * np.power(np.minimum(ratio, 1), alpha) * np.power(np.maximum(ratio, 1), -1.200)
+             * np.power(0.9938, number(inputs, "age", n)) * np.where(is_female, 1.012, 1))
+    # Higher is better: >= 90 low, >= 60 borderline, >= 30 intermediate
+    return {"value": js_round(value), "category": (3 - categorize(value, (30, 60, 90))).astype(np.int8)}
+
+
+def hrt(inputs: Batch, n: int) -> BatchResult:
+    """calculate_hrt_risk: local contraindication risk index"""
+    age = number(inputs, "age", n)
+    score = (np.where(flag(inputs, "personalHistoryBreastCancer", n), 10, 0)
+             + np.where(flag(inputs, "personalHistoryDVT", n), 10, 0)
+             + np.where(flag(inputs, "activeCancer", n), 8, 0)
+             + np.where(flag(inputs, "smoking", n) & (age > 35), 3, 0)
+             + np.where(age > 60, 2, 0)).astype(np.float64)
+    return {"value": score, "category": categorize(score, (2, 5, 10))}
+
+
+VECTORIZED: Dict[str, Callable[[Batch, int], BatchResult]] = {
+    "ascvd": ascvd,
+    "framingham": framingham,
+    "gail": gail,
+    "tyrer_cuzick": tyrer_cuzick,
+    "wells": wells,
+    "frax": frax,
+    "bmi": bmi,
+    "bsa": bsa,
+    "egfr": egfr,
+    "hrt": hrt,
+}
+
+
+def evaluate(calculator_id: str, inputs: Batch, n: int) -> BatchResult:
+    if calculator_id not in VECTORIZED:
+        raise KeyError(f"No vectorized calculator '{calculator_id}'")
+    return VECTORIZED[calculator_id](inputs, n)
+
+
+def random_rows(rows: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Column arrays of plausible PatientInputs, with the booleans and optional fields varied"""
+    rng = np.random.default_rng(seed)
+    columns: Dict[str, np.ndarray] = {
+        "age": rng.integers(20, 91, rows).astype(np.float64),
+        "sex": rng.choice(np.array(["female", "male"], dtype=object), rows),
+        "race": rng.choice(np.array(["white", "black", "hispanic", "asian", None], dtype=object), rows),
+        "totalCholesterol": rng.uniform(120, 320, rows).round(1),
+        "hdlCholesterol": rng.uniform(20, 100, rows).round(1),
+        "systolicBP": rng.uniform(90, 200, rows).round(),
+        "weight": rng.uniform(40, 150, rows).round(1),
+        "height": rng.uniform(140, 200, rows).round(1),
+        "ageAtMenarche": rng.integers(9, 17, rows).astype(np.float64),
+        # 0 is nulliparous; a per-row None has no float form
+        "ageAtFirstBirth": rng.choice(np.array([0, 16, 22, 28, 33, 40], dtype=np.float64), rows),
+        "numberOfBiopsies": rng.integers(0, 4, rows).astype(np.float64),
+        "serumCreatinine": rng.uniform(0.4, 3.0, rows).round(2),
+    }
+    for field in ("hypertension", "smoking", "diabetes", "atypicalHyperplasia", "familyHistoryBreastCancer",
+                  "personalHistoryBreastCancer", "personalHistoryDVT", "activeCancer", "prolongedImmobility"):
+        columns[field] = rng.random(rows) < 0.3
+    return columns
+
+
+def check_matches_scalar(rows: int = 20000, seed: int = 0) -> int:
+    """Compare every vectorized calculator with its scalar version row by row; returns mismatches"""
+    columns = random_rows(rows, seed)
+    mismatches = 0
+    for calculator_id, vectorized in VECTORIZED.items():
+        scalar = CALCULATORS[calculator_id]
+        result = vectorized(columns, rows)
+        for row in range(rows):
+            inputs = {field: values[row].item() if isinstance(values[row], np.generic) else values[row]
+                      for field, values in columns.items()}
+            expected = scalar(inputs)
+            actual_value = float(result["value"][row])
+            actual_category = CATEGORIES[result["category"][row]]
+            if actual_value != expected["value"] or actual_category != expected["category"]:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"❌ {calculator_id} row {row}: vectorized {actual_value} {actual_category} "
+                          f"!= scalar {expected['value']} {expected['category']}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    import sys
+
+    mismatches = check_matches_scalar()
+    if mismatches:
+        print(f"❌ {mismatches} mismatching rows")
+        sys.exit(1)
+    print(f"✅ {len(VECTORIZED)} vectorized calculators match the scalar ones on 20000 random rows")
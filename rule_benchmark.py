@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+"""
+Rule Engine Benchmark for MHT Assessment App
+Replays the bundled clinical case corpora through the Python decision,
+interaction, treatment-plan and calculator evaluators, checks each case
+against its expected outputs (mustFire, expected recommendations,
+expectedChecks, calculator tolerances) and reports cases per second with
+per-case latency percentiles. The run fails when throughput drops below the
+stored baseline by more than the tolerance, or when a case that passed in
+the baseline now fails.
+
+Throughput is timed in several samples and the median is kept. Before each
+sample a fixed pure-Python calibration loop is timed in the same process,
+and the gate compares the ratio of workload to calibration throughput, so a
+baseline recorded on one machine still holds on a slower one. Throughput is
+measured in process CPU time, so other load on the machine does not count
+against the engines; per-case latencies stay wall-clock.
+
+Usage:
+    python rule_benchmark.py
+    python rule_benchmark.py --workload treatment_plan_engine --rounds 500
+    python rule_benchmark.py --update-baseline
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import clinical_calculators
+import risk_calculators
+from decision_engine import SUITABILITY_PRIORITY, DecisionEngine, TieredEvaluator
+from drug_rules import DrugRuleIndex, get_severity_score, load_local_rules
+from offline_rule_engine import OfflineRuleEngine
+from treatment_plan_engine import TreatmentPlanEngine, check_must_fire
+from treatment_plan_rules import TreatmentPlanRuleEngine
+from verification_fixtures import load_json
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_BASELINE = APP_ROOT / "rule_benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_ROUNDS = 200
+DEFAULT_SAMPLES = 7
+# Each timed sample (and each calibration run) lasts at least this long
+MIN_SAMPLE_SECONDS = 0.15
+MIN_CALIBRATION_SECONDS = 0.05
+
+
+class Workload:
+    """One corpus replayed through one evaluator"""
+
+    def __init__(self, name: str, corpus: str, cases: List[Dict[str, Any]],
+                 evaluate: Callable[[Any], Any], check: Callable[[Dict[str, Any], Any], List[str]]):
+        self.name = name
+        self.corpus = corpus
+        self.cases = cases
+        self.evaluate = evaluate
+        self.check = check
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def _calibration_pass(patient: Dict[str, Any]) -> int:
+    """Dict lookups, comparisons, string and list work in the proportions of a rule evaluation"""
+    fired = []
+    for field, value in patient.items():
+        if isinstance(value, (int, float)) and 40 <= value < 60:
+            fired.append(field.lower())
+        elif isinstance(value, str) and value.startswith("f"):
+            fired.append(f"{field}:{value}")
+    return len(sorted(fired))
+
+
+def calibration_rate(min_seconds: float = MIN_CALIBRATION_SECONDS) -> float:
+    """Calibration passes per second on this interpreter and machine, right now"""
+    patient = {"age": 52, "sex": "female", "bmi": 27.4, "systolicBP": 132, "smoking": False,
+               "yearsSinceMenopause": 3, "hdlCholesterol": 55, "familyHistory": "first-degree"}
+    clock = time.process_time
+    passes = 0
+    start = clock()
+    while True:
+        for _ in range(1000):
+            _calibration_pass(patient)
+        passes += 1000
+        elapsed = clock() - start
+        if elapsed >= min_seconds:
+            return passes / elapsed
+
+
+# --- treatment plan engine: data/example_cases.json ---------------------------------------
+
+def treatment_plan_engine_workload() -> Workload:
+    engine = TreatmentPlanEngine()
+    corpus = "data/example_cases.json"
+    cases = [{"id": case["id"], "input": case["inputs"], "expected": case["expected"]}
+             for case in load_json(corpus)["cases"]]
+
+    def check(case, result):
+        failures = []
+        ok, missing = check_must_fire(result, case["expected"].get("mustFire", []))
+        if not ok:
+            failures.append(f"mustFire missing {missing}")
+        if result["primaryRecommendation"]["strength"] not in ("Strong", "Conditional", "Not recommended"):
+            failures.append(f"unexpected strength {result['primaryRecommendation']['strength']!r}")
+        if not result["primaryRecommendation"]["text"]:
+            failures.append("empty primary recommendation")
+        return failures
+
+    return Workload("treatment_plan_engine", corpus, cases, engine.evaluate_treatment, check)
+
+
+# --- treatmentPlanRules engine: data/treatmentPlanTestCases.json --------------------------
+
+def treatment_plan_rules_workload() -> Workload:
+    engine = TreatmentPlanRuleEngine()
+    corpus = "data/treatmentPlanTestCases.json"
+    cases = [{"id": case["id"], "input": case["input"], "expected": case}
+             for case in load_json(corpus)["testCases"]]
+
+    def check(case, plan):
+        expected = case["expected"]
+        recommendations = plan["primaryRecommendations"]
+        # The corpus quotes recommendations without their closing full stop
+        texts = {r["recommendation"].rstrip(". ") for r in recommendations}
+        failures = [f"missing recommendation {text!r}"
+                    for text in expected.get("expectedRecommendations", []) if text.rstrip(". ") not in texts]
+        if not recommendations:
+            return failures + ["no recommendations"]
+        top = recommendations[0]
+        if "expectedConfidence" in expected and top["confidence"] != expected["expectedConfidence"]:
+            failures.append(f"top confidence {top['confidence']} != {expected['expectedConfidence']}")
+        if "expectedUrgency" in expected and top["urgency"] != expected["expectedUrgency"]:
+            failures.append(f"top urgency {top['urgency']} != {expected['expectedUrgency']}")
+        return failures
+
+    return Workload("treatment_plan_rules", corpus, cases, engine.generate_treatment_plan, check)
+
+
+# --- offline rule engine: data/treatment_plan_testcases.json ------------------------------
+
+def _offline_checks(case, plan) -> List[str]:
+    """The expectedChecks assertions of utils/__tests__/offlineRuleEngine.test.ts"""
+    checks = case["expected"]
+    recommendations = plan["recommendations"]
+    top = recommendations[0] if recommendations else None
+    failures = []
+
+    def expect(condition: bool, message: str):
+        if not condition:
+            failures.append(message)
+
+    if checks.get("hasLifestyleRecommendation"):
+        expect(any(r["type"] == "Lifestyle" for r in recommendations), "no Lifestyle recommendation")
+    if "urgentRecommendations" in checks:
+        urgent = sum(1 for r in recommendations if r["type"] == "Urgent")
+        expect(urgent == checks["urgentRecommendations"],
+               f"{urgent} urgent recommendations, expected {checks['urgentRecommendations']}")
+    if "topRecommendationType" in checks:
+        actual = top["type"] if top else None
+        expect(actual == checks["topRecommendationType"],
+               f"top type {actual}, expected {checks['topRecommendationType']}")
+    if "confidenceRange" in checks:
+        low, high = checks["confidenceRange"]
+        confidence = top["confidenceScore"] if top else None
+        expect(confidence is not None and low <= confidence <= high,
+               f"top confidence {confidence} outside {checks['confidenceRange']}")
+    if "generalPlanLength" in checks:
+        expect(len(plan["generalPlan"]) == checks["generalPlanLength"],
+               f"general plan has {len(plan['generalPlan'])} bullets")
+    if checks.get("hasContraindication"):
+        expect(bool(plan["flags"]["contraindicated"]), "no contraindication flagged")
+    if "containsText" in checks:
+        text = top["text"].lower() if top else ""
+        expect(checks["containsText"] in text, f"top text lacks {checks['containsText']!r}")
+    if "flagsUrgent" in checks:
+        expect(plan["flags"]["urgent"] == checks["flagsUrgent"], f"flags.urgent is {plan['flags']['urgent']}")
+    if checks.get("hasInteractionWarning"):
+        expect(any(r.get("interactions") for r in recommendations), "no interaction warning")
+    if checks.get("avoidsHRT"):
+        expect(not any(r["type"] == "Pharm" and "hrt" in r["text"].lower() for r in recommendations),
+               "HRT recommended")
+    if "validationFails" in checks:
+        expect(bool(plan["flags"]["missingData"]) == checks["validationFails"], "validation outcome differs")
+    if "missingFields" in checks:
+        expect(plan["flags"]["missingData"] == checks["missingFields"],
+               f"missing fields {plan['flags']['missingData']}")
+    if checks.get("hasDataRequirementWarning"):
+        expect(any(r.get("requiresMoreData") for r in recommendations), "no data requirement warning")
+    if checks.get("noDefaultedValues"):
+        expect("age" not in plan["inputSnapshot"], "age was defaulted")
+    if checks.get("flagsMissingData"):
+        expect(bool(plan["flags"]["missingData"]), "missing data not flagged")
+    if checks.get("inputSnapshotMatches"):
+        expect(plan["inputSnapshot"] == case["input"], "input snapshot differs")
+    if checks.get("hasCardiologyReferral"):
+        expect(any(r["type"] == "Refer" and "cardiology" in r["text"].lower() for r in recommendations),
+               "no cardiology referral")
+    if "recommendationsCount" in checks:
+        low, high = checks["recommendationsCount"]
+        expect(low <= len(recommendations) <= high, f"{len(recommendations)} recommendations")
+    if "specificOptionsCount" in checks:
+        low, high = checks["specificOptionsCount"]
+        expect(low <= len(plan["specificOptions"]) <= high, f"{len(plan['specificOptions'])} specific options")
+    if checks.get("evidenceProvided"):
+        expect(all(r["evidence"] for r in recommendations), "recommendation without evidence")
+    if checks.get("auditTrailComplete"):
+        audit = plan["auditTrail"]
+        expect(all(key in audit for key in ("rulesMatched", "evidenceUsed", "evaluationTime", "knowledgeVersion")),
+               "incomplete audit trail")
+    return failures
+
+
+def offline_rule_engine_workload() -> Workload:
+    engine = OfflineRuleEngine()
+    corpus = "data/treatment_plan_testcases.json"
+    cases = [{"id": case["id"], "input": case["input"], "expected": case["expectedChecks"]}
+             for case in load_json(corpus)["testCases"]]
+    return Workload("offline_rule_engine", corpus, cases, engine.generate_treatment_plan, _offline_checks)
+
+
+# --- mht_rules decision engine: mht_rules/examples.json -----------------------------------
+
+def decision_engine_workload() -> Workload:
+    engine = DecisionEngine()
+    corpus = "mht_rules/examples.json"
+    cases = [{"id": case["id"], "input": case["input"], "expected": {}} for case in load_json(corpus)]
+
+    def check(case, result):
+        # The corpus has no expected outputs; check the result is well formed
+        failures = []
+        if result["suitability"] not in SUITABILITY_PRIORITY:
+            failures.append(f"unknown suitability {result['suitability']!r}")
+        if not result["primary"]:
+            failures.append("empty primary recommendation")
+        return failures
+
+    return Workload("mht_decision_engine", corpus, cases, engine.evaluate, check)
+
+
+def tiered_evaluator_workload() -> Workload:
+    engine = DecisionEngine()
+    evaluator = TieredEvaluator(engine)
+    corpus = "mht_rules/examples.json"
+    cases = [{"id": case["id"], "input": case["input"], "expected": engine.evaluate(case["input"])}
+             for case in load_json(corpus)]
+
+    def check(case, result):
+        # The compiled tiers must agree with the reference evaluate() exactly
+        return [] if result == case["expected"] else [f"differs from evaluate(): {result!r}"]
+
+    return Workload("mht_tiered_evaluator", corpus, cases, evaluator.evaluate, check)
+
+
+# --- drug interaction matching: medications from every corpus -----------------------------
+
+def drug_interaction_workload() -> Workload:
+    index = DrugRuleIndex(load_local_rules())
+    primaries = index.available_primary_groups()
+    sources = [
+        ("data/example_cases.json", lambda data: [c["inputs"].get("current_medications", []) for c in data["cases"]]),
+        ("data/treatment_plan_testcases.json", lambda data: [c["input"].get("currentMedications", [])
+                                                            for c in data["testCases"]]),
+        ("data/treatmentPlanTestCases.json", lambda data: [c["input"].get("currentMedications", [])
+                                                          for c in data["testCases"]]),
+        ("mht_rules/examples.json", lambda data: [c["input"].get("meds", []) for c in data]),
+    ]
+    cases = []
+    for corpus, extract in sources:
+        for position, meds in enumerate(extract(load_json(corpus))):
+            if meds:
+                cases.append({"id": f"{corpus}#{position}", "input": meds, "expected": {}})
+
+    def evaluate(meds):
+        # Screen the patient's medications against every therapy group
+        return index.find_interactions(primaries, meds)
+
+    def check(case, results):
+        order = [get_severity_score(r["severity"]) for r in results]
+        return [] if order == sorted(order, reverse=True) else ["results not sorted by severity"]
+
+    return Workload("drug_interactions", "medication lists of all corpora", cases, evaluate, check)
+
+
+# --- risk calculators: utils/testVectors.json ---------------------------------------------
+
+def _ascvd_inputs(vector: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "age": vector["age"], "sex": vector["gender"], "totalCholesterol": vector["totalCholesterol"],
+        "hdlCholesterol": vector["hdlCholesterol"], "systolicBP": vector["systolicBP"],
+        "hypertension": vector.get("hypertensionTreated", False), "smoking": vector["smoking"],
+        "diabetes": vector["diabetes"],
+    }
+
+
+def _frax_inputs(vector: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "age": vector["age"], "sex": vector["gender"], "weight": vector["weight"], "height": vector["height"],
+        "personalHistoryFracture": vector["priorFracture"],
+        "parentHistoryHipFracture": vector["parentalHipFracture"], "smoking": vector["smoking"],
+        "glucocorticoids": vector["glucocorticoids"], "rheumatoidArthritis": vector["rheumatoidArthritis"],
+        "alcoholIntake": vector.get("alcoholUnits", 0) > 3,
+    }
+
+
+def _gail_inputs(vector: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "age": vector["age"], "race": vector.get("ethnicity"), "ageAtMenarche": vector["ageAtMenarche"],
+        "ageAtFirstBirth": vector.get("ageAtFirstBirth"), "numberOfBiopsies": vector["breastBiopsies"],
+        "atypicalHyperplasia": vector["atypicalHyperplasia"],
+        "familyHistoryBreastCancer": vector["firstDegreeRelativesBC"] > 0,
+    }
+
+
+def _within(actual: float, expected: float, tolerance: float) -> bool:
+    return abs(actual - expected) <= tolerance
+
+
+def risk_calculator_workload() -> Workload:
+    corpus = "utils/testVectors.json"
+    vectors = load_json(corpus)["testCases"]
+    cases = []
+    for kind, adapt, calculator in (("ascvd", _ascvd_inputs, risk_calculators.calculate_ascvd),
+                                    ("frax", _frax_inputs, risk_calculators.calculate_frax),
+                                    ("gail", _gail_inputs, risk_calculators.calculate_gail)):
+        for vector in vectors[kind]:
+            cases.append({"id": f"{kind}: {vector['name']}", "input": (calculator, adapt(vector["input"])),
+                          "expected": dict(vector, kind=kind)})
+
+    def evaluate(case_input):
+        calculator, inputs = case_input
+        return calculator(inputs)
+
+    def check(case, result):
+        # Only values are compared: the vectors use Low/Moderate/High labels,
+        # the calculators low/borderline/intermediate/high categories
+        expected = case["expected"]
+        tolerance = expected["tolerance"]
+        failures = []
+        if expected["kind"] == "ascvd" and not _within(result["value"], expected["expectedRisk"], tolerance):
+            failures.append(f"risk {result['value']} vs {expected['expectedRisk']}±{tolerance}")
+        if expected["kind"] == "frax":
+            if not _within(result["value"], expected["expectedMajorFracture"], tolerance):
+                failures.append(f"major {result['value']} vs {expected['expectedMajorFracture']}±{tolerance}")
+            if not _within(result["hipFractureRisk"], expected["expectedHipFracture"], tolerance):
+                failures.append(f"hip {result['hipFractureRisk']} vs {expected['expectedHipFracture']}±{tolerance}")
+        if expected["kind"] == "gail" and not _within(result["value"], expected["expectedFiveYear"], tolerance):
+            failures.append(f"5-year {result['value']} vs {expected['expectedFiveYear']}±{tolerance}")
+        return failures
+
+    return Workload("risk_calculators", corpus, cases, evaluate, check)
+
+
+# --- clinical calculators: utils/testVectorsExtended.json ---------------------------------
+
+def clinical_calculator_workload() -> Workload:
+    corpus = "utils/testVectorsExtended.json"
+    vectors = load_json(corpus)["testCases"]
+    calls = {
+        "bmi": lambda i: clinical_calculators.calculate_bmi(i["weight"], i["height"]),
+        "bsa": lambda i: clinical_calculators.calculate_bsa(i["weight"], i["height"]),
+        "egfr": lambda i: clinical_calculators.calculate_egfr(i["age"], i["gender"], i["creatinine"]),
+        "hrt": lambda i: clinical_calculators.calculate_hrt_risk(
+            i["age"], i["timeSinceMenopause"], i["personalHistoryBC"], i["familyHistoryBC"],
+            i["personalHistoryVTE"], i["smoking"], i["hypertension"], i["diabetes"], i["bmi"]),
+    }
+    cases = [{"id": f"{kind}: {vector['name']}", "input": (calls[kind], vector["input"]),
+              "expected": dict(vector, kind=kind)}
+             for kind in calls for vector in vectors.get(kind, [])]
+
+    def evaluate(case_input):
+        call, inputs = case_input
+        return call(inputs)
+
+    def check(case, result):
+        # Same comparisons as utils/testRunnerExtended.js
+        e = case["expected"]
+        tolerance = e["tolerance"]
+        failures = []
+        if e["kind"] == "bmi":
+            if not _within(result["bmi"], e["expectedBMI"], tolerance):
+                failures.append(f"BMI {result['bmi']} vs {e['expectedBMI']}")
+            if result["category"] != e["expectedCategory"] or result["healthRisk"] != e["expectedHealthRisk"]:
+                failures.append(f"category {result['category']}/{result['healthRisk']}")
+        elif e["kind"] == "bsa":
+            if not _within(result["bsa"], e["expectedBSA"], tolerance) or result["method"] != e["expectedMethod"]:
+                failures.append(f"BSA {result['bsa']} ({result['method']}) vs {e['expectedBSA']}")
+        elif e["kind"] == "egfr":
+            if not _within(result["egfr"], e["expectedeGFR"], tolerance):
+                failures.append(f"eGFR {result['egfr']} vs {e['expectedeGFR']}")
+            if result["stage"] != e["expectedStage"] or result["category"] != e["expectedCategory"]:
+                failures.append(f"stage {result['stage']}/{result['category']}")
+        elif e["kind"] == "hrt":
+            if result["overallRisk"] != e["expectedOverallRisk"]:
+                failures.append(f"overall risk {result['overallRisk']}")
+            for field, expected_field in (("breastCancerRisk", "expectedBreastCancerRisk"),
+                                          ("vteRisk", "expectedVTERisk"), ("strokeRisk", "expectedStrokeRisk")):
+                if not _within(result[field], e[expected_field], tolerance):
+                    failures.append(f"{field} {result[field]} vs {e[expected_field]}")
+            if len(result["contraindications"]) != e["expectedContraindications"]:
+                failures.append(f"{len(result['contraindications'])} contraindications")
+        return failures
+
+    return Workload("clinical_calculators", corpus, cases, evaluate, check)
+
+
+WORKLOADS = {
+    "treatment_plan_engine": treatment_plan_engine_workload,
+    "treatment_plan_rules": treatment_plan_rules_workload,
+    "offline_rule_engine": offline_rule_engine_workload,
+    "mht_decision_engine": decision_engine_workload,
+    "mht_tiered_evaluator": tiered_evaluator_workload,
+    "drug_interactions": drug_interaction_workload,
+    "risk_calculators": risk_calculator_workload,
+    "clinical_calculators": clinical_calculator_workload,
+}
+
+
+def run_workload(workload: Workload, rounds: int, samples: int = DEFAULT_SAMPLES, warmup: int = 5) -> Dict[str, Any]:
+    """Check every case once, then time `samples` samples of at least `rounds` replays of the corpus"""
+    failures: Dict[str, List[str]] = {}
+    for case in workload.cases:
+        try:
+            problems = workload.check(case, workload.evaluate(case["input"]))
+        except Exception as e:
+            problems = [f"{type(e).__name__}: {e}"]
+        if problems:
+            failures[case["id"]] = problems
+
+    evaluate = workload.evaluate
+    inputs = [case["input"] for case in workload.cases]
+    for _ in range(warmup):
+        for case_input in inputs:
+            try:
+                evaluate(case_input)
+            except Exception:
+                pass
+
+    latencies: List[float] = []
+    rates: List[float] = []
+    relatives: List[float] = []
+    clock = time.perf_counter
+    cpu_clock = time.process_time
+    total_elapsed = 0.0
+    for _ in range(max(1, samples)):
+        calibration = calibration_rate()
+        sample_evaluations = 0
+        replays = 0
+        start = cpu_clock()
+        while replays < rounds or cpu_clock() - start < MIN_SAMPLE_SECONDS:
+            for case_input in inputs:
+                case_start = clock()
+                try:
+                    evaluate(case_input)
+                except Exception:
+                    pass
+                latencies.append(clock() - case_start)
+            sample_evaluations += len(inputs)
+            replays += 1
+        elapsed = cpu_clock() - start
+        total_elapsed += elapsed
+        rate = sample_evaluations / elapsed if elapsed else 0.0
+        rates.append(rate)
+        relatives.append(rate / calibration)
+
+    latencies.sort()
+    evaluations = len(latencies)
+    return {
+        "corpus": workload.corpus,
+        "cases": len(workload.cases),
+        "evaluations": evaluations,
+        "samples": len(rates),
+        "cpu_s": round(total_elapsed, 6),
+        "cases_per_second": round(statistics.median(rates), 1),
+        "cases_per_second_spread": [round(min(rates), 1), round(max(rates), 1)],
+        # Median ratio to the calibration loop; comparable across machines
+        "relative_throughput": round(statistics.median(relatives), 6),
+        "latency_us": {
+            "p50": round(percentile(latencies, 50) * 1e6, 2),
+            "p95": round(percentile(latencies, 95) * 1e6, 2),
+            "p99": round(percentile(latencies, 99) * 1e6, 2),
+            "max": round(latencies[-1] * 1e6, 2) if latencies else 0.0,
+            "mean": round(sum(latencies) / evaluations * 1e6, 2) if evaluations else 0.0,
+        },
+        "passed": len(workload.cases) - len(failures),
+        "failed": len(failures),
+        "failures": failures,
+    }
+
+
+def compare_to_baseline(results: Dict[str, Dict], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Throughput and correctness regressions relative to the stored baseline"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get("workloads", {}).get(name)
+        if not reference:
+            continue
+        expected = reference.get("relative_throughput")
+        if expected and result["relative_throughput"] < expected * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput relative to the calibration loop is "
+                f"{result['relative_throughput'] / expected - 1:+.0%} against the baseline "
+                f"(allowed -{tolerance:.0%}; {result['cases_per_second']:,.0f} cases/s now)")
+        newly_failing = sorted(set(result["failures"]) - set(reference.get("failures", [])))
+        for case_id in newly_failing:
+            regressions.append(f"{name}: case {case_id} no longer passes ({'; '.join(result['failures'][case_id])})")
+    return regressions
+
+
+def write_baseline(path, results: Dict[str, Dict], rounds: int):
+    baseline = {
+        "rounds": rounds,
+        "python": sys.version.split()[0],
+        "workloads": {
+            name: {
+                "relative_throughput": result["relative_throughput"],
+                "cases_per_second": result["cases_per_second"],
+                "latency_us": result["latency_us"],
+                "failures": sorted(result["failures"]),
+            }
+            for name, result in results.items()
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def print_report(results: Dict[str, Dict], baseline: Optional[Dict[str, Any]]):
+    print(f"{'Workload':<24}{'cases':>6}{'cases/s':>13}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}"
+          f"{'baseline':>12}{'checks':>10}")
+    for name, result in results.items():
+        latency = result["latency_us"]
+        reference = (baseline or {}).get("workloads", {}).get(name)
+        change = ""
+        if reference and reference.get("relative_throughput"):
+            change = f"{(result['relative_throughput'] / reference['relative_throughput'] - 1) * 100:+.1f}%"
+        checks = f"{result['passed']}/{result['cases']}"
+        print(f"{name:<24}{result['cases']:>6}{result['cases_per_second']:>13,.0f}{latency['p50']:>10.1f}"
+              f"{latency['p95']:>10.1f}{latency['p99']:>10.1f}{change:>12}{checks:>10}")
+
+    for name, result in results.items():
+        if result["failures"]:
+            print(f"\n⚠️  {name}: {result['failed']} case(s) do not match their expected outputs")
+            for case_id, problems in result["failures"].items():
+                print(f"   {case_id}: {'; '.join(problems)}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the rule engines over the clinical case corpora")
+    parser.add_argument("--workload", action="append", choices=sorted(WORKLOADS),
+                        help="Workload to run (repeatable); default: all")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help="Minimum timed replays of each corpus per sample")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                        help="Timed samples per workload; the median is compared")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON path")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed throughput drop relative to the baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--output", help="Write the full results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    names = args.workload or list(WORKLOADS)
+
+    print("=" * 70)
+    print("MHT Assessment App - Rule Engine Benchmark")
+    print("=" * 70)
+
+    results = {}
+    for name in names:
+        results[name] = run_workload(WORKLOADS[name](), args.rounds, args.samples)
+
+    baseline = None
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists() and not args.update_baseline:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rounds": args.rounds, "samples": args.samples, "workloads": results}, f, indent=2)
+        print(f"\n💾 Results: {args.output}")
+
+    if args.update_baseline:
+        write_baseline(baseline_path, results, args.rounds)
+        print(f"\n💾 Baseline updated: {baseline_path}")
+        return 0
+
+    if baseline is None:
+        print(f"\n⚠️  No baseline at {baseline_path}; run with --update-baseline to create one")
+        return 0
+
+    stale = [name for name in results if name in baseline.get("workloads", {})
+             and "relative_throughput" not in baseline["workloads"][name]]
+    if stale:
+        print(f"\n⚠️  Baseline has no calibrated throughput for {', '.join(stale)}; "
+              f"rerun with --update-baseline")
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    print()
+    if regressions:
+        for regression in regressions:
+            print(f"❌ {regression}")
+        return 1
+    print(f"✅ No regressions against the baseline (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
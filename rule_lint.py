@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Rule Lint - consistency checks for the interaction and decision rule files
+Indexes drug_interactions.json and decision_rules.json once and reports, with
+the rule references involved:
+
+- malformed rules (wrong field types, conditions that are not condition
+  objects), which are reported as schema errors and left out of the other checks
+- duplicate (primary, interaction_with) pairs and duplicate decision rule ids
+- examples claimed by two rules of one primary group with different severities
+- numeric bands in decision rules (e.g. the ASCVD_percent bands) that overlap,
+  leave a gap, or can never match, among rules whose other conditions agree
+
+Duplicates and example conflicts use hash maps; overlapping bands are found
+with an interval tree per (field, context) group, so the whole lint stays
+roughly linear and gates a 100k-rule update in seconds.
+
+Usage:
+    python rule_lint.py
+    python rule_lint.py --drug-rules drug_interactions.json --decision-rules proposed.json --strict
+"""
+
+import argparse
+import bisect
+import json
+import math
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from clinical_rules import DEFAULT_DECISION_RULES_PATH, load_decision_rules
+from drug_rules import DEFAULT_RULES_PATH, load_local_rules, normalize
+
+APP_ROOT = Path(__file__).parent
+MAX_FINDINGS_PER_CHECK = 500
+
+RANGE_OPS = (">", ">=", "<", "<=", "=", "==")
+
+# Interval bounds are (value, tie) pairs so open and closed ends compare correctly:
+# a lower bound is (v, 0) when closed and (v, 1) when open, an upper bound
+# (v, 1) when closed and (v, 0) when open. Two intervals share a point iff
+# max(lower) < min(upper).
+Bound = Tuple[float, int]
+NO_LOWER: Bound = (-math.inf, 0)
+NO_UPPER: Bound = (math.inf, 1)
+
+
+def _bounds(op: str, value: float) -> Tuple[Bound, Bound]:
+    if op == ">":
+        return (value, 1), NO_UPPER
+    if op == ">=":
+        return (value, 0), NO_UPPER
+    if op == "<":
+        return NO_LOWER, (value, 0)
+    if op == "<=":
+        return NO_LOWER, (value, 1)
+    return (value, 0), (value, 1)
+
+
+def format_interval(lower: Bound, upper: Bound) -> str:
+    left = "(-inf" if lower[0] == -math.inf else ("[" if lower[1] == 0 else "(") + f"{lower[0]:g}"
+    right = "inf)" if upper[0] == math.inf else f"{upper[0]:g}" + ("]" if upper[1] == 1 else ")")
+    return f"{left}, {right}"
+
+
+class IntervalTree:
+    """Static augmented interval tree over intervals sorted by lower bound
+
+    The sorted array is the in-order walk of an implicit balanced tree; each
+    node keeps the largest upper bound of its subtree so overlap queries skip
+    subtrees that end too early.
+    """
+
+    def __init__(self, intervals: List[Tuple[Bound, Bound, Any]]):
+        self.items = sorted(intervals, key=lambda item: item[0])
+        self.max_upper: List[Bound] = [NO_LOWER] * len(self.items)
+        self._build(0, len(self.items) - 1)
+
+    def _build(self, lo: int, hi: int) -> Bound:
+        if lo > hi:
+            return NO_LOWER
+        mid = (lo + hi) // 2
+        self.max_upper[mid] = max(self.items[mid][1], self._build(lo, mid - 1), self._build(mid + 1, hi))
+        return self.max_upper[mid]
+
+    def overlapping(self, lower: Bound, upper: Bound) -> Iterator[Tuple[int, Tuple[Bound, Bound, Any]]]:
+        """(position, interval) of every stored interval sharing a point with [lower, upper]"""
+        stack = [(0, len(self.items) - 1)]
+        while stack:
+            lo, hi = stack.pop()
+            if lo > hi:
+                continue
+            mid = (lo + hi) // 2
+            if not lower < self.max_upper[mid]:
+                continue  # everything below here ends before the query starts
+            stack.append((lo, mid - 1))
+            item = self.items[mid]
+            if item[0] < upper:
+                if lower < item[1]:
+                    yield mid, item
+                # Later items start no earlier than this one, so they may still overlap
+                stack.append((mid + 1, hi))
+
+
+def overlap_count(items: List[Tuple[Bound, Bound, Any]]) -> int:
+    """Pairs of intervals sharing a point, for intervals sorted by lower bound, in O(n log n)
+
+    An earlier interval overlaps a later one iff it ends after the later one
+    starts, and every interval ending at or before that start sorts earlier.
+    """
+    uppers = sorted(item[1] for item in items)
+    return sum(position - bisect.bisect_right(uppers, lower) for position, (lower, _, _) in enumerate(items))
+
+
+class Report:
+    """Findings grouped by check, capped per check but fully counted"""
+
+    def __init__(self, max_per_check: int = MAX_FINDINGS_PER_CHECK):
+        self.max_per_check = max_per_check
+        self.findings: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = {}
+        self.levels: Dict[str, str] = {}
+
+    def full(self, check: str) -> bool:
+        """True once check has as many findings as are listed; callers then only tally"""
+        return self.counts.get(check, 0) >= self.max_per_check
+
+    def tally(self, check: str, level: str, count: int = 1):
+        self.counts[check] = self.counts.get(check, 0) + count
+        self.levels[check] = level
+
+    def add(self, check: str, level: str, message: str, rules: List[str], **details):
+        self.tally(check, level)
+        if self.counts[check] <= self.max_per_check:
+            self.findings.append({"check": check, "level": level, "message": message, "rules": rules, **details})
+
+    def total(self, level: str) -> int:
+        return sum(count for check, count in self.counts.items() if self.levels[check] == level)
+
+
+def _drug_ref(source: str, index: int, rule: Dict[str, Any]) -> str:
+    return f"{source}#{index} ({rule.get('primary')} / {rule.get('interaction_with')})"
+
+
+def _drug_rule_error(rule: Any) -> Optional[str]:
+    """Why a drug rule cannot be linted, or None"""
+    if not isinstance(rule, dict):
+        return "rule must be an object"
+    for field in ("primary", "interaction_with"):
+        if not isinstance(rule.get(field), str):
+            return f"{field} must be a string"
+    if not isinstance(rule.get("severity"), (str, type(None))):
+        return "severity must be a string"
+    examples = rule.get("examples")
+    if examples is not None and (not isinstance(examples, list)
+                                 or not all(isinstance(example, str) for example in examples)):
+        return "examples must be a list of strings"
+    return None
+
+
+def lint_drug_rules(rules: List[Dict[str, Any]], report: Report, source: str = "drug_interactions.json"):
+    pairs: Dict[Tuple[str, str], List[int]] = {}
+    # (primary, example) -> {severity: [rule index]}
+    claims: Dict[Tuple[str, str], Dict[str, List[int]]] = {}
+    # Group and drug names repeat across rules; normalize each distinct one once
+    key = lru_cache(maxsize=None)(normalize)
+    for index, rule in enumerate(rules):
+        error = _drug_rule_error(rule)
+        if error:
+            ref = _drug_ref(source, index, rule) if isinstance(rule, dict) else f"{source}#{index}"
+            report.add("schema", "error", f"{ref}: {error}", [ref])
+            continue
+        primary = key(rule.get("primary", ""))
+        pairs.setdefault((primary, key(rule.get("interaction_with", ""))), []).append(index)
+        for example in rule.get("examples") or ():
+            claims.setdefault((primary, key(example)), {}).setdefault(rule.get("severity"), []).append(index)
+
+    for indexes in pairs.values():
+        if len(indexes) > 1:
+            first = rules[indexes[0]]
+            report.add("duplicate-pair", "error",
+                       f"{first.get('primary')} / {first.get('interaction_with')} is defined {len(indexes)} times",
+                       [_drug_ref(source, index, rules[index]) for index in indexes])
+
+    for (primary, example), by_severity in claims.items():
+        if len(by_severity) > 1:
+            indexes = [index for severity_indexes in by_severity.values() for index in severity_indexes]
+            severities = ", ".join(f"{severity} ({len(group)})" for severity, group in by_severity.items())
+            report.add("example-severity-conflict", "warning",
+                       f"'{example}' is an example for {rules[indexes[0]].get('primary')} with severities {severities}",
+                       [_drug_ref(source, index, rules[index]) for index in sorted(indexes)])
+
+
+def _canonical(condition: Dict[str, Any]) -> str:
+    return json.dumps(condition, sort_keys=True, separators=(",", ":"))
+
+
+def _numeric_ranges(conditions: List[Dict[str, Any]]) -> Tuple[Dict[str, List[int]], Dict[str, Tuple[Bound, Bound]]]:
+    """Positions of range conditions per field, and each field's intersected interval"""
+    positions: Dict[str, List[int]] = {}
+    ranges: Dict[str, Tuple[Bound, Bound]] = {}
+    for position, condition in enumerate(conditions):
+        value = condition.get("value")
+        if (condition.get("op") not in RANGE_OPS or isinstance(value, bool)
+                or not isinstance(value, (int, float)) or "field" not in condition):
+            continue
+        field = condition["field"]
+        lower, upper = _bounds(condition["op"], float(value))
+        if field in ranges:
+            lower, upper = max(lower, ranges[field][0]), min(upper, ranges[field][1])
+        ranges[field] = (lower, upper)
+        positions.setdefault(field, []).append(position)
+    return positions, ranges
+
+
+def _decision_rule_error(rule: Any) -> Optional[str]:
+    """Why a decision rule cannot be linted, or None"""
+    if not isinstance(rule, dict):
+        return "rule must be an object"
+    rule_id = rule.get("id")
+    if rule_id is not None and (isinstance(rule_id, bool) or not isinstance(rule_id, (str, int))):
+        return "id must be a string"
+    conditions = rule.get("conditions")
+    if conditions is None:
+        return None
+    if not isinstance(conditions, dict):
+        return "conditions must be an object"
+    for group in ("all", "any", "none"):
+        group_conditions = conditions.get(group)
+        if group_conditions is None:
+            continue
+        if not isinstance(group_conditions, list):
+            return f"conditions.{group} must be a list"
+        for position, condition in enumerate(group_conditions):
+            if not isinstance(condition, dict):
+                return f"conditions.{group}[{position}] must be an object"
+            if not isinstance(condition.get("field"), str):
+                return f"conditions.{group}[{position}].field must be a string"
+            if not isinstance(condition.get("op"), (str, type(None))):
+                return f"conditions.{group}[{position}].op must be a string"
+    return None
+
+
+def lint_decision_rules(rules: List[Dict[str, Any]], report: Report, source: str = "decision_rules.json"):
+    ids: Dict[Any, List[int]] = {}
+    # (field, context) -> [(lower, upper, rule id)]
+    groups: Dict[Tuple[str, str], List[Tuple[Bound, Bound, str]]] = {}
+    for index, rule in enumerate(rules):
+        error = _decision_rule_error(rule)
+        if error:
+            rule_id = rule.get("id") if isinstance(rule, dict) and isinstance(rule.get("id"), str) else None
+            ref = rule_id or f"{source}#{index}"
+            report.add("schema", "error", f"{ref}: {error}", [ref])
+            continue
+        rule_id = rule.get("id", f"{source}#{index}")
+        ids.setdefault(rule_id, []).append(index)
+        conditions = rule.get("conditions") or {}
+        all_conditions = conditions.get("all") or []
+        positions, ranges = _numeric_ranges(all_conditions)
+        for field, (lower, upper) in ranges.items():
+            if not lower < upper:
+                report.add("unsatisfiable-range", "error", f"{rule_id}: no value of {field} satisfies its conditions",
+                           [rule_id], field=field)
+                continue
+            # Rules are comparable on a field when everything else about them agrees
+            skip = set(positions[field])
+            context = json.dumps([sorted(_canonical(c) for i, c in enumerate(all_conditions) if i not in skip),
+                                  sorted(_canonical(c) for c in conditions.get("any") or ()),
+                                  sorted(_canonical(c) for c in conditions.get("none") or ())])
+            groups.setdefault((field, context), []).append((lower, upper, rule_id))
+
+    for rule_id, indexes in ids.items():
+        if len(indexes) > 1:
+            report.add("duplicate-id", "error", f"Rule id {rule_id} is used {len(indexes)} times",
+                       [f"{source}#{index}" for index in indexes])
+
+    for (field, _), intervals in groups.items():
+        if len(intervals) < 2:
+            continue
+        tree = IntervalTree(intervals)
+        listed = 0
+        for position, (lower, upper, rule_id) in enumerate(tree.items):
+            if report.full("overlapping-range"):
+                break
+            for other_position, (other_lower, other_upper, other_id) in tree.overlapping(lower, upper):
+                if other_position <= position:
+                    continue
+                if report.full("overlapping-range"):
+                    break
+                report.add("overlapping-range", "error",
+                           f"{field} bands overlap: {rule_id} {format_interval(lower, upper)} and "
+                           f"{other_id} {format_interval(other_lower, other_upper)}",
+                           [rule_id, other_id], field=field)
+                listed += 1
+        # Past the cap only the count matters; nested bands overlap pairwise, so never enumerate them
+        unlisted = overlap_count(tree.items) - listed
+        if unlisted:
+            report.tally("overlapping-range", "error", unlisted)
+        # Gaps between the union segments of the bands
+        covered_upper, covered_by = tree.items[0][1], tree.items[0][2]
+        for lower, upper, rule_id in tree.items[1:]:
+            if not covered_upper < lower:
+                if covered_upper < upper:
+                    covered_upper, covered_by = upper, rule_id
+                continue
+            if report.full("range-gap"):
+                report.tally("range-gap", "warning")
+            else:
+                report.add("range-gap", "warning",
+                           f"{field} has no band between {covered_by} and {rule_id} "
+                           f"({format_interval(covered_upper, lower)})",
+                           [covered_by, rule_id], field=field)
+            covered_upper, covered_by = upper, rule_id
+
+def lint_rules(drug_rules: Optional[List[Dict[str, Any]]] = None, decision_rules: Optional[List[Dict[str, Any]]] = None,
+               drug_source: str = "drug_interactions.json", decision_source: str = "decision_rules.json",
+               max_per_check: int = MAX_FINDINGS_PER_CHECK) -> Dict[str, Any]:
+    """Lint report for the given rule lists"""
+    started = time.perf_counter()
+    report = Report(max_per_check)
+    if drug_rules is not None:
+        lint_drug_rules(drug_rules, report, drug_source)
+    if decision_rules is not None:
+        lint_decision_rules(decision_rules, report, decision_source)
+    return {
+        "errors": report.total("error"),
+        "warnings": report.total("warning"),
+        "counts": report.counts,
+        "findings": report.findings,
+        "rulesChecked": len(drug_rules or ()) + len(decision_rules or ()),
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def lint_files(drug_rules_path=DEFAULT_RULES_PATH, decision_rules_path=DEFAULT_DECISION_RULES_PATH,
+               max_per_check: int = MAX_FINDINGS_PER_CHECK) -> Dict[str, Any]:
+    return lint_rules(load_local_rules(drug_rules_path) if drug_rules_path else None,
+                      load_decision_rules(decision_rules_path) if decision_rules_path else None,
+                      Path(drug_rules_path).name if drug_rules_path else "",
+                      Path(decision_rules_path).name if decision_rules_path else "", max_per_check)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check the rule files for duplicates and conflicting ranges")
+    parser.add_argument("--drug-rules", type=Path, default=DEFAULT_RULES_PATH)
+    parser.add_argument("--decision-rules", type=Path, default=DEFAULT_DECISION_RULES_PATH)
+    parser.add_argument("--no-drug-rules", action="store_true")
+    parser.add_argument("--no-decision-rules", action="store_true")
+    parser.add_argument("--strict", action="store_true", help="fail on warnings as well as errors")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    parser.add_argument("--max-per-check", type=int, default=MAX_FINDINGS_PER_CHECK)
+    args = parser.parse_args(argv)
+
+    report = lint_files(None if args.no_drug_rules else args.drug_rules,
+                        None if args.no_decision_rules else args.decision_rules, args.max_per_check)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        for finding in report["findings"]:
+            mark = "❌" if finding["level"] == "error" else "⚠️ "
+            print(f"{mark} [{finding['check']}] {finding['message']}")
+            for rule in finding["rules"]:
+                print(f"     {rule}")
+        print("=" * 70)
+        print(f"🔍 {report['rulesChecked']} rules, {report['errors']} errors, {report['warnings']} warnings "
+              f"in {report['elapsedMs']} ms")
+        for check, count in sorted(report["counts"].items()):
+            print(f"   {check:<28}{count:>6}")
+    failed = report["errors"] or (args.strict and report["warnings"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
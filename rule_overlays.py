@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Rule Overlays - per-institution overrides of the interaction and decision rules
+A tenant directory under assets/rules/tenants/<tenant>/ holds overlay files
+named like the base files, listing only the entries it changes:
+
+    drug_interactions.json  {"overrides": [{"primary": ..., "interaction_with": ...,
+                                            "severity": ..., "rationale": ..., "recommended_action": ...}]}
+    decision_rules.json     {"overrides": [{"id": "R003", "severity": ..., "severity_priority": ...,
+                                            "title": ..., "message": ..., "action": ..., "source": ...}]}
+
+Overlays are applied copy-on-write: a tenant's index is a view over the base
+index that shares every lookup table and every rule it does not override;
+only the overridden rules are copied. Resolved views are cached per tenant and
+rebuilt when an overlay file changes, so one backend can serve hundreds of
+tenants for little more than the size of their overrides.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from clinical_rules import DEFAULT_DECISION_RULES_PATH, ClinicalRuleIndex, SEVERITY_ORDER, get_clinical_rules
+from drug_rules import DEFAULT_RULES_PATH, SEVERITY_SCORES, DrugRuleIndex, get_rule_index, normalize
+
+APP_ROOT = Path(__file__).parent
+TENANTS_DIR = Path(os.environ.get("RULE_TENANTS_DIR", APP_ROOT / "assets" / "rules" / "tenants"))
+DRUG_OVERLAY_FILE = "drug_interactions.json"
+DECISION_OVERLAY_FILE = "decision_rules.json"
+MAX_RESIDENT_TENANTS = 1024
+# Overlay files are stat'ed at most this often per tenant
+RELOAD_CHECK_SECONDS = 2.0
+
+# Only wording and severity can be overridden; matching fields stay as in the base rules
+DRUG_OVERRIDE_FIELDS = ("severity", "rationale", "recommended_action")
+DECISION_OVERRIDE_FIELDS = ("severity", "severity_priority", "title", "message", "action", "source")
+
+_TENANT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+def _read_overrides(path: Path) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        overrides = json.load(f).get("overrides", [])
+    if not isinstance(overrides, list) or not all(isinstance(entry, dict) for entry in overrides):
+        raise ValueError(f"{path}: overrides must be a list of objects")
+    return overrides
+
+
+def _patch(entry: Dict[str, Any], key_fields: Tuple[str, ...], fields: Tuple[str, ...], where: str) -> Dict[str, Any]:
+    unknown = set(entry) - set(key_fields) - set(fields)
+    if unknown:
+        raise ValueError(f"{where}: cannot override {', '.join(sorted(unknown))}")
+    return {field: entry[field] for field in fields if field in entry}
+
+
+def drug_replacements(base: DrugRuleIndex, overrides: List[Dict[str, Any]], where: str = "overlay") -> Dict[int, Dict]:
+    """id(base rule) -> overridden copy, for DrugRuleIndex.overlay"""
+    by_pair = {(normalize(rule["primary"]), normalize(rule["interaction_with"])): rule for rule in base.rules}
+    replacements: Dict[int, Dict] = {}
+    for entry in overrides:
+        pair = (normalize(entry.get("primary", "")), normalize(entry.get("interaction_with", "")))
+        rule = by_pair.get(pair)
+        if rule is None:
+            raise ValueError(f"{where}: no base rule {entry.get('primary')} / {entry.get('interaction_with')}")
+        patch = _patch(entry, ("primary", "interaction_with"), DRUG_OVERRIDE_FIELDS, where)
+        if "severity" in patch and patch["severity"] not in SEVERITY_SCORES:
+            raise ValueError(f"{where}: severity must be one of {', '.join(SEVERITY_SCORES)}")
+        replacements[id(rule)] = {**replacements.get(id(rule), rule), **patch}
+    return replacements
+
+
+def decision_replacements(base: ClinicalRuleIndex, overrides: List[Dict[str, Any]],
+                          where: str = "overlay") -> Dict[str, Dict[str, Any]]:
+    """rule id -> overridden copy, for ClinicalRuleIndex.overlay"""
+    replacements: Dict[str, Dict[str, Any]] = {}
+    for entry in overrides:
+        rule = base.by_id.get(entry.get("id"))
+        if rule is None:
+            raise ValueError(f"{where}: no base rule {entry.get('id')}")
+        patch = _patch(entry, ("id",), DECISION_OVERRIDE_FIELDS, where)
+        if "severity" in patch and patch["severity"] not in SEVERITY_ORDER:
+            raise ValueError(f"{where}: severity must be one of {', '.join(SEVERITY_ORDER)}")
+        if "severity_priority" in patch and (isinstance(patch["severity_priority"], bool)
+                                             or not isinstance(patch["severity_priority"], (int, float))):
+            raise ValueError(f"{where}: severity_priority must be a number")
+        replacements[rule["id"]] = {**replacements.get(rule["id"], rule), **patch}
+    return replacements
+
+
+class TenantRules:
+    """A tenant's resolved drug and decision rule indexes"""
+
+    def __init__(self, tenant: Optional[str], drug_index: DrugRuleIndex, clinical_index: ClinicalRuleIndex,
+                 drug_overrides: int = 0, decision_overrides: int = 0, stamp: Tuple = ()):
+        self.tenant = tenant
+        self.drug_index = drug_index
+        self.clinical_index = clinical_index
+        self.drug_overrides = drug_overrides
+        self.decision_overrides = decision_overrides
+        self.stamp = stamp
+        self.checked_at = time.monotonic()
+
+
+class RuleOverlays:
+    """Base rule indexes plus cached copy-on-write views per tenant"""
+
+    def __init__(self, tenants_dir=TENANTS_DIR, drug_rules_path=DEFAULT_RULES_PATH,
+                 decision_rules_path=DEFAULT_DECISION_RULES_PATH, max_resident: int = MAX_RESIDENT_TENANTS):
+        self.tenants_dir = Path(tenants_dir)
+        self.base = TenantRules(None, get_rule_index(drug_rules_path), get_clinical_rules(decision_rules_path))
+        self.max_resident = max_resident
+        self._resolved: "OrderedDict[str, TenantRules]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tenants(self) -> List[str]:
+        if not self.tenants_dir.is_dir():
+            return []
+        return sorted(path.name for path in self.tenants_dir.iterdir()
+                      if path.is_dir() and _TENANT_NAME.match(path.name))
+
+    def _stamp(self, directory: Path) -> Tuple:
+        stamp = []
+        for name in (DRUG_OVERLAY_FILE, DECISION_OVERLAY_FILE):
+            path = directory / name
+            stamp.append(path.stat().st_mtime_ns if path.exists() else None)
+        return tuple(stamp)
+
+    def _build(self, tenant: str, directory: Path, stamp: Tuple) -> TenantRules:
+        drug_index, clinical_index = self.base.drug_index, self.base.clinical_index
+        drug_count = decision_count = 0
+        if stamp[0] is not None:
+            path = directory / DRUG_OVERLAY_FILE
+            replacements = drug_replacements(drug_index, _read_overrides(path), f"{tenant}/{DRUG_OVERLAY_FILE}")
+            drug_index, drug_count = drug_index.overlay(replacements), len(replacements)
+        if stamp[1] is not None:
+            path = directory / DECISION_OVERLAY_FILE
+            replacements = decision_replacements(clinical_index, _read_overrides(path),
+                                                 f"{tenant}/{DECISION_OVERLAY_FILE}")
+            clinical_index, decision_count = clinical_index.overlay(replacements), len(replacements)
+        return TenantRules(tenant, drug_index, clinical_index, drug_count, decision_count, stamp)
+
+    def resolve(self, tenant: Optional[str] = None) -> TenantRules:
+        """The tenant's rules (the base rules for no tenant)
+
+        Raises ValueError for a malformed name or overlay and KeyError for an
+        unknown tenant.
+        """
+        if not tenant:
+            return self.base
+        with self._lock:
+            resolved = self._resolved.get(tenant)
+            if resolved is not None and time.monotonic() - resolved.checked_at < RELOAD_CHECK_SECONDS:
+                self._resolved.move_to_end(tenant)
+                return resolved
+        if not _TENANT_NAME.match(tenant):
+            raise ValueError(f"Invalid tenant name '{tenant}'")
+        directory = self.tenants_dir / tenant
+        if not directory.is_dir():
+            raise KeyError(tenant)
+        stamp = self._stamp(directory)
+        if resolved is not None and resolved.stamp == stamp:
+            resolved.checked_at = time.monotonic()
+            return resolved
+        resolved = self._build(tenant, directory, stamp)
+        with self._lock:
+            self._resolved[tenant] = resolved
+            self._resolved.move_to_end(tenant)
+            while len(self._resolved) > self.max_resident:
+                self._resolved.popitem(last=False)
+        return resolved
+
+    def drug_index(self, tenant: Optional[str] = None) -> DrugRuleIndex:
+        return self.resolve(tenant).drug_index
+
+    def clinical_rules(self, tenant: Optional[str] = None) -> ClinicalRuleIndex:
+        return self.resolve(tenant).clinical_index
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            resident = {tenant: {"drugOverrides": rules.drug_overrides, "decisionOverrides": rules.decision_overrides}
+                        for tenant, rules in self._resolved.items()}
+        return {"tenants": self.tenants(), "resident": resident, "maxResident": self.max_resident}
+
+
+_overlays: Optional[RuleOverlays] = None
+_overlays_lock = threading.Lock()
+
+
+def get_overlays() -> RuleOverlays:
+    """Process-wide overlays used by the backend"""
+    global _overlays
+    with _overlays_lock:
+        if _overlays is None:
+            _overlays = RuleOverlays()
+        return _overlays
+
+
+if __name__ == "__main__":
+    overlays = get_overlays()
+    tenants = sys.argv[1:] or overlays.tenants()
+    for tenant in tenants:
+        try:
+            rules = overlays.resolve(tenant)
+        except KeyError:
+            print(f"❌ {tenant}: no overlay directory in {overlays.tenants_dir}")
+            continue
+        except ValueError as e:
+            print(f"❌ {e}")
+            continue
+        print(f"✅ {tenant}: {rules.drug_overrides} interaction and {rules.decision_overrides} decision overrides")
+    if not tenants:
+        print(f"⚠️  No tenant overlays in {overlays.tenants_dir}")
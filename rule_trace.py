@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Rule Trace - opt-in per-rule tracing and profiling for the Python rule engines
+While a trace is active (tracing() / request_trace()), the engines record for
+every rule they visit the predicates evaluated with their actual and expected
+values, the match result and the time spent. With no active trace an engine
+pays one context-variable lookup per call and runs its normal code path.
+
+Traces are returned to the caller (e.g. with an API response) or, when
+RULE_TRACE_LOG is set, a RULE_TRACE_SAMPLE_RATE fraction of requests is
+appended to that JSON-lines log; `python rule_trace.py profile <log>`
+aggregates a log into per-rule timings.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_active: ContextVar[Optional["RuleTrace"]] = ContextVar("rule_trace", default=None)
+
+
+def active_trace() -> Optional["RuleTrace"]:
+    """The trace engines should record into, or None (the fast path)"""
+    return _active.get()
+
+
+def _jsonable(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    return repr(value)
+
+
+class RuleRecord:
+    """One rule visit: the predicates checked, in order, and the outcome"""
+
+    __slots__ = ("engine", "rule_id", "predicates", "matched", "elapsed_us", "_start")
+
+    def __init__(self, engine: str, rule_id: Any):
+        self.engine = engine
+        self.rule_id = rule_id
+        self.predicates: List[Dict[str, Any]] = []
+        self.matched = False
+        self.elapsed_us = 0.0
+
+    def check(self, field: str, expected: Any, actual: Any, result: bool) -> bool:
+        """Record one predicate and pass its result through"""
+        self.predicates.append({"field": field, "expected": _jsonable(expected),
+                                "actual": _jsonable(actual), "result": bool(result)})
+        return result
+
+    def __enter__(self) -> "RuleRecord":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed_us = (time.perf_counter() - self._start) * 1e6
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"engine": self.engine, "rule": self.rule_id, "matched": bool(self.matched),
+                "elapsed_us": round(self.elapsed_us, 2), "predicates": self.predicates}
+
+
+class RuleTrace:
+    """Everything the engines recorded during one traced call"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.started_at = datetime.now().isoformat()
+        self.records: List[RuleRecord] = []
+        self._start = time.perf_counter()
+        self.elapsed_ms = 0.0
+
+    def rule(self, engine: str, rule_id: Any) -> RuleRecord:
+        """Context manager timing one rule; set .matched on it before leaving"""
+        record = RuleRecord(engine, rule_id)
+        self.records.append(record)
+        return record
+
+    def finish(self):
+        self.elapsed_ms = (time.perf_counter() - self._start) * 1000
+
+    def why(self, rule_id: Any) -> List[Dict[str, Any]]:
+        """Every visit of one rule, e.g. to answer "why did R001 fire?" """
+        return [record.to_dict() for record in self.records if record.rule_id == rule_id]
+
+    def profile(self) -> List[Dict[str, Any]]:
+        """Per-rule totals, slowest first"""
+        return aggregate(record.to_dict() for record in self.records)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "startedAt": self.started_at,
+            "elapsedMs": round(self.elapsed_ms, 3),
+            "rulesEvaluated": len(self.records),
+            "rulesMatched": sum(1 for record in self.records if record.matched),
+            "rules": [record.to_dict() for record in self.records],
+        }
+
+
+def aggregate(records) -> List[Dict[str, Any]]:
+    totals: Dict[tuple, Dict[str, Any]] = {}
+    for record in records:
+        key = (record["engine"], record["rule"])
+        entry = totals.setdefault(key, {"engine": key[0], "rule": key[1], "visits": 0, "matched": 0,
+                                        "total_us": 0.0, "max_us": 0.0})
+        entry["visits"] += 1
+        entry["matched"] += 1 if record["matched"] else 0
+        entry["total_us"] += record["elapsed_us"]
+        entry["max_us"] = max(entry["max_us"], record["elapsed_us"])
+    for entry in totals.values():
+        entry["mean_us"] = round(entry["total_us"] / entry["visits"], 2)
+        entry["total_us"] = round(entry["total_us"], 2)
+    return sorted(totals.values(), key=lambda entry: entry["total_us"], reverse=True)
+
+
+class TraceLog:
+    """Sampled, append-only JSON-lines trace log"""
+
+    def __init__(self, path=None, sample_rate: float = 0.0):
+        self.path = Path(path) if path else None
+        self.sample_rate = sample_rate if self.path else 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TraceLog":
+        return cls(os.environ.get("RULE_TRACE_LOG") or None, float(os.environ.get("RULE_TRACE_SAMPLE_RATE", "0")))
+
+    def sampled(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def write(self, trace: RuleTrace):
+        line = json.dumps(trace.to_dict(), separators=(",", ":"))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+trace_log = TraceLog.from_env()
+
+
+@contextmanager
+def tracing(label: str = "") -> Iterator[RuleTrace]:
+    """Trace every rule evaluated inside the block"""
+    trace = RuleTrace(label)
+    token = _active.set(trace)
+    try:
+        yield trace
+    finally:
+        _active.reset(token)
+        trace.finish()
+
+
+@contextmanager
+def request_trace(requested: bool, label: str = "") -> Iterator[Optional[RuleTrace]]:
+    """Trace when the caller asked for it or the request is sampled for the log
+
+    Yields the trace only when it was requested, for returning with the response.
+    """
+    sampled = trace_log.sampled()
+    if not requested and not sampled:
+        yield None
+        return
+    with tracing(label) as trace:
+        yield trace if requested else None
+    if sampled:
+        trace_log.write(trace)
+
+
+def attach(response: Dict[str, Any], trace: Optional[RuleTrace]) -> Dict[str, Any]:
+    """Add the trace to a response when one was requested"""
+    if trace is not None:
+        response["trace"] = trace.to_dict()
+    return response
+
+
+def load_log(path) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarise a sampled rule trace log")
+    parser.add_argument("command", choices=["profile", "why"])
+    parser.add_argument("log", help="JSON-lines trace log (RULE_TRACE_LOG)")
+    parser.add_argument("rule", nargs="?", help="Rule id for 'why'")
+    parser.add_argument("--top", type=int, default=20, help="Rules to show for 'profile'")
+    args = parser.parse_args(argv)
+
+    traces = load_log(args.log)
+    records = [record for trace in traces for record in trace["rules"]]
+    print(f"📊 {len(traces)} traces, {len(records)} rule visits")
+
+    if args.command == "profile":
+        print(f"{'engine':<22}{'rule':<34}{'visits':>8}{'matched':>9}{'total µs':>12}{'mean µs':>10}{'max µs':>10}")
+        for entry in aggregate(records)[:args.top]:
+            print(f"{entry['engine']:<22}{str(entry['rule']):<34}{entry['visits']:>8}{entry['matched']:>9}"
+                  f"{entry['total_us']:>12.1f}{entry['mean_us']:>10.1f}{entry['max_us']:>10.1f}")
+        return 0
+
+    if not args.rule:
+        parser.error("'why' needs a rule id")
+    visits = [record for record in records if str(record["rule"]) == args.rule]
+    if not visits:
+        print(f"❌ {args.rule} was not evaluated in any trace")
+        return 1
+    fired = [record for record in visits if record["matched"]]
+    print(f"{args.rule}: matched {len(fired)}/{len(visits)} visits")
+    for record in (fired or visits)[:5]:
+        outcome = "✅ fired" if record["matched"] else "❌ did not fire"
+        print(f"  {outcome} ({record['elapsed_us']:.1f} µs)")
+        for predicate in record["predicates"]:
+            mark = "✓" if predicate["result"] else "✗"
+            print(f"    {mark} {predicate['field']}: actual={predicate['actual']!r} expected={predicate['expected']!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
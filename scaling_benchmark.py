@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Scaling Benchmark - load time, memory and query latency against rule set size
+Generates synthetic rule sets (synthetic_rules.py) at each requested size and
+measures, for the interaction matcher (DrugRuleIndex), the bitset screen
+(InteractionScreen), the decision rule engine (ClinicalRuleIndex) and the
+linter:
+
+- load: JSON parse of the rule file and index build, in seconds
+- memory: bytes the built index retains (tracemalloc, measured on a second build)
+- latency: p50/p95/p99 per synthetic patient query, in microseconds
+
+and the log-log slope of each metric across sizes, so a matcher that is
+quietly O(n) per query shows up as a slope near 1.
+
+Usage:
+    python scaling_benchmark.py
+    python scaling_benchmark.py --sizes 10000,100000,1000000 --queries 500 --output scaling.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from clinical_rules import ClinicalRuleIndex, load_decision_rules
+from drug_rules import DrugRuleIndex, load_local_rules
+from interaction_screen import InteractionScreen
+from rule_benchmark import percentile
+from rule_lint import lint_rules
+from synthetic_rules import DEFAULT_SEED, SyntheticWorld, write_json
+
+DEFAULT_SIZES = (10000, 100000)
+DEFAULT_QUERIES = 1000
+# Per-size time budget for one latency measurement; slow engines run fewer queries
+QUERY_BUDGET_SECONDS = 5.0
+MIN_QUERIES = 20
+
+
+def timed(fn: Callable[[], Any]):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def retained_bytes(build: Callable[[], Any]) -> int:
+    """Memory still allocated by build() once it returns"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        built = build()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del built
+    return retained
+
+
+def query_latency(query: Callable[[Any], Any], inputs: List[Any],
+                  budget: float = QUERY_BUDGET_SECONDS) -> Dict[str, float]:
+    """Latency percentiles over inputs, stopping early once the time budget is spent"""
+    latencies: List[float] = []
+    clock = time.perf_counter
+    deadline = clock() + budget
+    for query_input in inputs:
+        started = clock()
+        query(query_input)
+        finished = clock()
+        latencies.append(finished - started)
+        if finished > deadline and len(latencies) >= MIN_QUERIES:
+            break
+    latencies.sort()
+    return {
+        "queries": len(latencies),
+        "p50": round(percentile(latencies, 50) * 1e6, 2),
+        "p95": round(percentile(latencies, 95) * 1e6, 2),
+        "p99": round(percentile(latencies, 99) * 1e6, 2),
+    }
+
+
+def measure_size(size: int, queries: int, seed: int, workdir: Path) -> Dict[str, Any]:
+    world = SyntheticWorld(size, seed)
+    drug_path = workdir / f"drug_interactions_{size}.json"
+    decision_path = workdir / f"decision_rules_{size}.json"
+    write_json(drug_path, world.drug_rules())
+    write_json(decision_path, world.decision_rules())
+    patients = list(world.patients(queries))
+
+    result: Dict[str, Any] = {"rules": size, "drugs": len(world.vocabulary.drugs),
+                              "classes": len(world.vocabulary.classes)}
+
+    drug_rules, parse_s = timed(lambda: load_local_rules(drug_path))
+    index, build_s = timed(lambda: DrugRuleIndex(drug_rules))
+    result["drug_index"] = {
+        "parse_s": round(parse_s, 4),
+        "build_s": round(build_s, 4),
+        "memory_bytes": retained_bytes(lambda: DrugRuleIndex(drug_rules)),
+        "latency_us": query_latency(lambda p: index.find_interactions(p["primary_therapies"],
+                                                                      p["selected_medications"]), patients),
+    }
+    del index
+
+    screen, build_s = timed(lambda: InteractionScreen(drug_rules))
+    result["interaction_screen"] = {
+        "parse_s": round(parse_s, 4),
+        "build_s": round(build_s, 4),
+        "memory_bytes": retained_bytes(lambda: InteractionScreen(drug_rules)),
+        "latency_us": query_latency(lambda p: screen.screen(p["primary_therapies"] + p["selected_medications"]),
+                                    patients),
+    }
+    del screen
+
+    decision_rules, parse_s = timed(lambda: load_decision_rules(decision_path))
+    clinical, build_s = timed(lambda: ClinicalRuleIndex(decision_rules))
+    result["clinical_rules"] = {
+        "parse_s": round(parse_s, 4),
+        "build_s": round(build_s, 4),
+        "memory_bytes": retained_bytes(lambda: ClinicalRuleIndex(decision_rules)),
+        "latency_us": query_latency(clinical.evaluate, patients),
+    }
+    del clinical
+
+    report, lint_s = timed(lambda: lint_rules(drug_rules, decision_rules))
+    result["rule_lint"] = {"run_s": round(lint_s, 4), "errors": report["errors"], "warnings": report["warnings"]}
+    return result
+
+
+def slope(sizes: List[int], values: List[float]) -> Optional[float]:
+    """Least-squares log-log slope: ~0 constant, ~1 linear in the rule count"""
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, values) if value > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / spread, 2) if spread else None
+
+
+METRICS = [
+    ("parse_s", "parse s", lambda m: m.get("parse_s")),
+    ("build_s", "build s", lambda m: m.get("build_s")),
+    ("run_s", "run s", lambda m: m.get("run_s")),
+    ("memory_bytes", "memory MB", lambda m: m["memory_bytes"] / 1e6 if "memory_bytes" in m else None),
+    ("p50_us", "p50 µs", lambda m: m["latency_us"]["p50"] if "latency_us" in m else None),
+    ("p99_us", "p99 µs", lambda m: m["latency_us"]["p99"] if "latency_us" in m else None),
+]
+ENGINES = ("drug_index", "interaction_screen", "clinical_rules", "rule_lint")
+
+
+def scaling_summary(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Optional[float]]]:
+    sizes = [result["rules"] for result in results]
+    summary = {}
+    for engine in ENGINES:
+        summary[engine] = {}
+        for key, _, read in METRICS:
+            values = [read(result[engine]) for result in results]
+            if all(value is not None for value in values):
+                summary[engine][key] = slope(sizes, values)
+    return summary
+
+
+def print_report(results: List[Dict[str, Any]], summary: Dict[str, Dict[str, Optional[float]]]):
+    sizes = [result["rules"] for result in results]
+    header = f"{'':<34}" + "".join(f"{size:>14,}" for size in sizes) + f"{'slope':>9}"
+    for engine in ENGINES:
+        print(f"\n{engine}")
+        print(header)
+        for key, label, read in METRICS:
+            values = [read(result[engine]) for result in results]
+            if any(value is None for value in values):
+                continue
+            cells = "".join(f"{value:>14,.2f}" if value < 1000 else f"{value:>14,.0f}" for value in values)
+            trend = summary[engine].get(key)
+            print(f"  {label:<32}{cells}{'' if trend is None else f'{trend:>9.2f}'}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure how the rule engines scale with rule set size")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated rule counts")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES, help="synthetic patients queried per size")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", help="write the full results as JSON")
+    args = parser.parse_args(argv)
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+
+    print("=" * 70)
+    print("MHT Assessment App - Rule Engine Scaling Benchmark")
+    print("=" * 70)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            started = time.perf_counter()
+            results.append(measure_size(size, args.queries, args.seed, Path(workdir)))
+            print(f"⏱️  {size:,} rules measured in {time.perf_counter() - started:.1f}s")
+    summary = scaling_summary(results)
+    print_report(results, summary)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"queries": args.queries, "seed": args.seed, "sizes": results, "slopes": summary}, f, indent=2)
+        print(f"\n💾 Results: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
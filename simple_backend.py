@@ -2,11 +2,43 @@
 """
 Simple FastAPI backend for MHT Assessment preview
 """
-from fastapi import FastAPI
+import json
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from fastapi import Body, FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-app = FastAPI(title="MHT Assessment API", version="1.0.0")
+from analysis_jobs import get_jobs
+from api_batch import run_batch, validate_batch
+from decision_engine import get_evaluator, patient_error
+from drug_api_proxy import DEFAULT_TIMEOUT_MS, PROVIDERS, get_proxy
+from drug_rules import get_rule_index
+from guidelines_service import (IMMUTABLE_CACHE_CONTROL, MANIFEST_CACHE_CONTROL, SECTION_CACHE_CONTROL,
+                                get_guidelines)
+from interaction_merge import merge_interaction_results
+from interaction_screen import get_screen
+from population_baselines import METRICS, cohort_patient_error, get_tables, tables_payload
+from risk_cache import get_cache
+from risk_calculators import CALCULATORS
+from risk_surface import risk_surface
+from rule_lint import lint_files, lint_rules
+from rule_overlays import get_overlays
+from risk_uncertainty import DEFAULT_PERCENTILES, DEFAULT_SAMPLES, uncertainty_bands
+from treatment_plan_engine import treatment_input_error
+from treatment_plan_service import get_service
+from rule_trace import attach, request_trace
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    get_jobs().cancel_all()
+    # Close the drug API connection pool
+    await get_proxy().aclose()
+
+app = FastAPI(title="MHT Assessment API", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -38,5 +70,330 @@ async def get_patients():
         ]
     }
 
+@app.post("/api/batch")
+async def batch(payload: Dict[str, Any] = Body(...)):
+    """Several API calls in one round trip: {"requests": [{"id", "method", "path", "body"?, "dependsOn"?}]}"""
+    try:
+        requests = validate_batch(payload.get("requests"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await run_batch(app, requests)
+
+def _names(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def _tenant_rules(tenant: Optional[str]):
+    """A tenant's overlaid rules; the base rules without a tenant"""
+    try:
+        return get_overlays().resolve(tenant)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant '{tenant}'")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/interactions/check")
+async def check_interactions(payload: Dict[str, Any] = Body(...), trace: bool = False,
+                             tenant: Optional[str] = None):
+    """findInteractionsForSelection; ?trace=true returns the per-rule trace, ?tenant= applies an overlay"""
+    primaries = payload.get("primaries")
+    medications = payload.get("medications")
+    if not _names(primaries) or not _names(medications):
+        raise HTTPException(status_code=400, detail="primaries and medications must be lists of names")
+    index = _tenant_rules(tenant).drug_index
+    with request_trace(trace, "interactions/check") as rule_trace:
+        interactions = index.find_interactions(primaries, medications)
+    return attach({"interactions": interactions}, rule_trace)
+
+@app.post("/api/clinical-rules/evaluate")
+async def evaluate_clinical_rules(payload: Dict[str, Any] = Body(...), tenant: Optional[str] = None):
+    """ClinicalRuleEngine over decision_rules.json for {"patient": PatientContext}"""
+    patient = payload.get("patient")
+    if not isinstance(patient, dict):
+        raise HTTPException(status_code=400, detail="Expected a patient object")
+    return {"results": _tenant_rules(tenant).clinical_index.evaluate(patient)}
+
+def _job(job_id: str):
+    job = get_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return job
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(payload: Dict[str, Any] = Body(...)):
+    """Start {"kind": "clinical-rules" | "interactions" | "treatment-plan", "items": [...], "tenant": ...}"""
+    tenant = payload.get("tenant")
+    try:
+        job = get_jobs().submit(payload.get("kind"), payload.get("items"), tenant)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant '{tenant}'")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**job.progress(), "statusUrl": f"/api/jobs/{job.id}", "eventsUrl": f"/api/jobs/{job.id}/events"}
+
+@app.get("/api/jobs")
+async def list_jobs():
+    return {"jobs": get_jobs().summary()}
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str, results: bool = False):
+    """Progress snapshot; ?results=true adds the per-item results gathered so far"""
+    job = _job(job_id)
+    status = job.progress()
+    if results:
+        status["results"] = job.results()
+    return status
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Server-sent events: result per item, coalesced progress, done; resumes from Last-Event-ID"""
+    job = _job(job_id)
+    last_event_id = request.headers.get("last-event-id", "0")
+    cursor = int(last_event_id) if last_event_id.isdigit() else 0
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(job.stream(cursor), media_type="text/event-stream", headers=headers)
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = _job(job_id)
+    await job.stop()
+    return job.progress()
+
+@app.get("/api/tenants")
+async def list_tenants():
+    return get_overlays().summary()
+
+@app.get("/api/rules/lint")
+async def lint_rule_files():
+    """Consistency report for the deployed rule files"""
+    return lint_files()
+
+@app.post("/api/rules/lint")
+def lint_proposed_rules(payload: Dict[str, Any] = Body(...)):
+    """Consistency report for a proposed {"drugInteractions": ..., "decisionRules": [...]} update"""
+    drug_rules = payload.get("drugInteractions")
+    if isinstance(drug_rules, dict):
+        drug_rules = drug_rules.get("rules")
+    decision_rules = payload.get("decisionRules")
+    for name, rules in (("drugInteractions", drug_rules), ("decisionRules", decision_rules)):
+        if rules is not None and (not isinstance(rules, list) or not all(isinstance(r, dict) for r in rules)):
+            raise HTTPException(status_code=400, detail=f"{name} must be a list of rule objects")
+    if drug_rules is None and decision_rules is None:
+        raise HTTPException(status_code=400, detail="drugInteractions or decisionRules is required")
+    return lint_rules(drug_rules, decision_rules)
+
+@app.post("/api/interactions/screen")
+async def screen_interactions(payload: Dict[str, Any] = Body(...)):
+    """All interacting pairs among {"medications": [...]}, via class bitmasks"""
+    medications = payload.get("medications")
+    if not isinstance(medications, list) or not all(isinstance(m, str) for m in medications):
+        raise HTTPException(status_code=400, detail="medications must be a list of names")
+    return get_screen().screen(medications)
+
+def _timeout_ms(payload: Dict[str, Any]) -> float:
+    timeout_ms = payload.get("timeoutMs", DEFAULT_TIMEOUT_MS)
+    if not isinstance(timeout_ms, (int, float)) or not 0 < timeout_ms <= 60000:
+        raise HTTPException(status_code=400, detail="timeoutMs must be between 1 and 60000")
+    return timeout_ms
+
+@app.post("/api/interactions/online")
+async def check_interactions_online(payload: Dict[str, Any] = Body(...), refresh: bool = False):
+    """checkDrugInteractionsOnline through the pooled, cached proxy; falls back to the local rules"""
+    medications = payload.get("medications")
+    provider = payload.get("provider")
+    if not isinstance(medications, list) or not all(isinstance(m, str) for m in medications):
+        raise HTTPException(status_code=400, detail="medications must be a list of names")
+    if provider not in PROVIDERS:
+        raise HTTPException(status_code=400, detail=f"provider must be one of {', '.join(PROVIDERS)}")
+    return await get_proxy().check(medications, provider, _timeout_ms(payload), refresh)
+
+@app.post("/api/interactions/merge")
+async def merge_interactions(payload: Dict[str, Any] = Body(...)):
+    """mergeApiResults for {"local": [InteractionResult], "api": [ApiInteractionResult]}"""
+    local, api = payload.get("local", []), payload.get("api", [])
+    if not isinstance(local, list) or not isinstance(api, list):
+        raise HTTPException(status_code=400, detail="local and api must be lists")
+    try:
+        return {"results": merge_interaction_results(local, api)}
+    except (KeyError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Malformed interaction result: {e}")
+
+@app.post("/api/interactions/analyze")
+async def analyze_interactions(payload: Dict[str, Any] = Body(...)):
+    """analyzeInteractionsWithLogging: local rules, optional provider check, merged"""
+    primaries = payload.get("primaries")
+    medications = payload.get("medications")
+    provider = payload.get("provider") or "None"
+    if not _names(primaries) or not _names(medications):
+        raise HTTPException(status_code=400, detail="primaries and medications must be lists of names")
+    if provider != "None" and provider not in PROVIDERS:
+        raise HTTPException(status_code=400, detail=f"provider must be None or one of {', '.join(PROVIDERS)}")
+    local = get_rule_index().find_interactions(primaries, medications)
+    api_response = None
+    api_results = []
+    if provider != "None":
+        api_response = await get_proxy().check(medications, provider, _timeout_ms(payload))
+        # Only provider answers are merged, not the proxy's own local-rules fallback
+        if api_response["source"] != "local":
+            api_results = api_response["results"]
+    return {"results": merge_interaction_results(local, api_results), "apiResponse": api_response,
+            "localResultsCount": len(local)}
+
+@app.get("/api/interactions/online/stats")
+async def online_interaction_stats():
+    return get_proxy().stats()
+
+@app.post("/api/decision/evaluate")
+async def evaluate_decision(payload: Dict[str, Any] = Body(...), trace: bool = False):
+    """mht_rules treatment suitability for {"patient": {...}} or {"patients": [...]}"""
+    patients = payload.get("patients")
+    patient = payload.get("patient")
+    if isinstance(patients, list):
+        for position, item in enumerate(patients):
+            error = patient_error(item)
+            if error:
+                raise HTTPException(status_code=400, detail=f"patients[{position}]: {error}")
+    elif isinstance(patient, dict):
+        error = patient_error(patient)
+        if error:
+            raise HTTPException(status_code=400, detail=f"patient: {error}")
+    else:
+        raise HTTPException(status_code=400, detail="Expected a patient object or a patients list")
+    evaluator = get_evaluator()
+    with request_trace(trace, "decision/evaluate") as rule_trace:
+        if isinstance(patients, list):
+            response = {"results": evaluator.evaluate_batch(patients)}
+        else:
+            response = {"result": evaluator.evaluate(patient)}
+    return attach(response, rule_trace)
+
+@app.get("/api/baselines")
+async def get_baselines(request: Request):
+    """Dense population baseline tables; immutable per version, so clients revalidate by ETag"""
+    etag, body = tables_payload()
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/api/guidelines")
+async def get_guidelines_manifest(request: Request):
+    """Table of contents: section ids, titles, icons and content hashes, without bodies"""
+    sections = get_guidelines().current()
+    headers = {"ETag": sections.manifest_etag, "Cache-Control": MANIFEST_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == sections.manifest_etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=sections.manifest_body, media_type="application/json", headers=headers)
+
+@app.get("/api/guidelines/sections/{section_id}")
+async def get_guidelines_section(section_id: str, request: Request, v: Optional[str] = None):
+    """One section; the ?v=<hash> URL from the manifest is immutable"""
+    section = get_guidelines().current().section(section_id)
+    if section is None:
+        raise HTTPException(status_code=404, detail=f"Unknown guidelines section '{section_id}'")
+    digest, body = section
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL if v == digest else SECTION_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.post("/api/baselines/percentiles")
+async def baseline_percentiles(payload: Dict[str, Any] = Body(...)):
+    """Baselines and percentile ranks for {"metric": ..., "patients": [{age, gender, ethnicity, risk}]}"""
+    metric = payload.get("metric")
+    patients = payload.get("patients")
+    if metric not in METRICS or not isinstance(patients, list):
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(METRICS)} and patients a list")
+    for position, patient in enumerate(patients):
+        error = cohort_patient_error(patient)
+        if error:
+            raise HTTPException(status_code=400, detail=f"patients[{position}]: {error}")
+    tables = get_tables()
+    return dict(tables.cohort_percentiles(metric, patients), metric=metric, version=tables.version)
+
+@app.post("/api/risk/calculate")
+async def calculate_risk(payload: Dict[str, Any] = Body(...)):
+    """Risk calculators for {"inputs": {...}, "calculators": [...]} (default: all), served from the result cache"""
+    inputs = payload.get("inputs")
+    calculators = payload.get("calculators") or list(CALCULATORS)
+    if not isinstance(inputs, dict) or not _names(calculators):
+        raise HTTPException(status_code=400, detail="inputs must be an object and calculators a list of ids")
+    unknown = [calculator for calculator in calculators if calculator not in CALCULATORS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown calculators: {', '.join(map(str, unknown))}")
+    cache = get_cache()
+    try:
+        results = cache.calculate_many(calculators, inputs)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Missing input {e}")
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid inputs: {e}")
+    return {"results": results, "version": cache.version}
+
+@app.get("/api/risk/cache")
+async def risk_cache_stats():
+    return get_cache().stats()
+
+@app.post("/api/risk/uncertainty")
+async def risk_uncertainty(payload: Dict[str, Any] = Body(...)):
+    """Monte Carlo bands for {"inputs", "calculators"?, "errors"?, "samples"?, "percentiles"?, "seed"?}"""
+    inputs = payload.get("inputs")
+    errors = payload.get("errors")
+    if not isinstance(inputs, dict) or not (errors is None or isinstance(errors, dict)):
+        raise HTTPException(status_code=400, detail="inputs must be an object and errors an object of distributions")
+    try:
+        return uncertainty_bands(inputs, payload.get("calculators"), errors,
+                                 int(payload.get("samples", DEFAULT_SAMPLES)),
+                                 payload.get("percentiles", DEFAULT_PERCENTILES), payload.get("seed"))
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Missing input {e}")
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/risk/surface")
+async def risk_what_if(payload: Dict[str, Any] = Body(...)):
+    """What-if grid for {"inputs", "variables": [{"field", "start", "stop", "steps"} | {"field", "values"}], "calculators"?}"""
+    inputs = payload.get("inputs")
+    variables = payload.get("variables")
+    if not isinstance(inputs, dict) or not isinstance(variables, list) \
+            or not all(isinstance(variable, dict) for variable in variables):
+        raise HTTPException(status_code=400, detail="inputs must be an object and variables a list of objects")
+    try:
+        surface = risk_surface(inputs, variables, payload.get("calculators"))
+        # A 100x100 grid is ~200k floats; jsonable_encoder would take far longer than the sweep
+        return Response(content=json.dumps(surface, allow_nan=False), media_type="application/json")
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Missing input {e}")
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/treatment-plan")
+async def treatment_plan(payload: Dict[str, Any] = Body(...), refresh: bool = False):
+    """evaluateTreatment for {"inputs": {...}}, memoized by canonical input hash"""
+    # Every stored input is kept for audits, so only TreatmentInputs objects are memoized
+    error = treatment_input_error(payload.get("inputs"))
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    return get_service().generate(payload["inputs"], refresh)
+
+@app.post("/api/treatment-plan/audit")
+def audit_treatment_plans(update: bool = False, all: bool = False):
+    """Re-evaluate stored plans made under older rules; ?update=true saves them (runs in the threadpool)"""
+    return get_service().audit(update=update, include_current=all)
+
+@app.get("/api/treatment-plan/{input_hash}")
+async def get_treatment_plan(input_hash: str):
+    stored = get_service().get(input_hash)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="No stored plan for this input hash")
+    return stored
+
+@app.post("/api/treatment-plan/{input_hash}/regenerate")
+async def regenerate_treatment_plan(input_hash: str):
+    result = get_service().regenerate(input_hash)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No stored plan for this input hash")
+    return result
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
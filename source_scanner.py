@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Source Scanner - incremental pattern index over the app's TypeScript sources
+The AsyncStorage verification suites ask "does this file mention X" with
+lowercase substring checks, optionally ignoring spaces or punctuation. Each
+file is read and normalized once per process, and every answer is stored in
+an on-disk index keyed by the file's content hash, so unchanged files are
+answered from the index without being read. Changed files are rescanned in
+parallel.
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+APP_ROOT = Path(__file__).parent
+CACHE_PATH = APP_ROOT / ".source_scan_cache.json"
+CACHE_VERSION = 1
+SOURCE_DIRS = ("screens", "utils", "store", "components")
+SOURCE_SUFFIXES = (".ts", ".tsx", ".js", ".jsx")
+
+
+def _resolve(path) -> Path:
+    resolved = Path(path)
+    if not resolved.is_absolute():
+        resolved = APP_ROOT / resolved
+    return resolved
+
+
+def _cache_key(path: Path) -> str:
+    """Paths under the app root are stored relative so the index survives moves"""
+    try:
+        return path.relative_to(APP_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def _query_key(needle: str, strip: str) -> str:
+    return f"{strip}\x00{needle}"
+
+
+class SourceDocument:
+    """One file's lowercased text plus the normalized forms queried so far"""
+
+    def __init__(self, text: str, sha256: str):
+        self.sha256 = sha256
+        self.text = text.lower()
+        self._forms: Dict[str, str] = {"": self.text}
+
+    def form(self, strip: str) -> str:
+        if strip not in self._forms:
+            self._forms[strip] = self.text.translate(str.maketrans("", "", strip))
+        return self._forms[strip]
+
+    def contains(self, needle: str, strip: str) -> bool:
+        return needle in self.form(strip)
+
+
+def _load_document(path: Path) -> Tuple[os.stat_result, SourceDocument]:
+    stat = path.stat()
+    data = path.read_bytes()
+    return stat, SourceDocument(data.decode("utf-8"), hashlib.sha256(data).hexdigest())
+
+
+class SourceScanner:
+    """Answers substring queries over source files from a content-hash index"""
+
+    def __init__(self, cache_path: Optional[Path] = CACHE_PATH, workers: Optional[int] = None):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = workers or min(8, (os.cpu_count() or 1) + 4)
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict] = {}
+        self._documents: Dict[str, SourceDocument] = {}
+        self._validated: set = set()
+        self._dirty = False
+        self.stats = {"queries": 0, "index_hits": 0, "files_read": 0, "files_rescanned": 0}
+        self._load_cache()
+
+    def _load_cache(self):
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self._entries = data.get("files", {})
+
+    def save(self):
+        """Write the index if anything changed; the write is atomic"""
+        with self._lock:
+            if not self._dirty or not self.cache_path:
+                return
+            payload = {"version": CACHE_VERSION, "files": self._entries}
+            self._dirty = False
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, self.cache_path)
+
+    def _store_document(self, key: str, stat: os.stat_result, document: SourceDocument):
+        """Record a freshly read file; answers survive only if the content hash is unchanged"""
+        entry = self._entries.get(key)
+        if entry is None or entry.get("sha256") != document.sha256:
+            entry = {"sha256": document.sha256, "queries": {}}
+            self._entries[key] = entry
+            self.stats["files_rescanned"] += 1
+        entry["mtime_ns"] = stat.st_mtime_ns
+        entry["size"] = stat.st_size
+        self._documents[key] = document
+        self._validated.add(key)
+        self.stats["files_read"] += 1
+        self._dirty = True
+
+    def refresh(self, paths: Iterable) -> List[str]:
+        """Validate files against the index, reading changed ones in parallel; returns changed keys"""
+        resolved = {_cache_key(path): path for path in map(_resolve, paths)}
+        stale = []
+        with self._lock:
+            for key, path in resolved.items():
+                if key in self._validated:
+                    continue
+                entry = self._entries.get(key)
+                stat = path.stat()
+                if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+                    self._validated.add(key)
+                else:
+                    stale.append(key)
+        if not stale:
+            return []
+
+        if len(stale) == 1:
+            loaded = [_load_document(resolved[stale[0]])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(stale))) as pool:
+                loaded = list(pool.map(_load_document, (resolved[key] for key in stale)))
+
+        changed = []
+        with self._lock:
+            for key, (stat, document) in zip(stale, loaded):
+                previous = self._entries.get(key, {}).get("sha256")
+                self._store_document(key, stat, document)
+                if previous != document.sha256:
+                    changed.append(key)
+        return changed
+
+    def _document(self, key: str, path: Path) -> SourceDocument:
+        document = self._documents.get(key)
+        if document is None:
+            stat, document = _load_document(path)
+            self._store_document(key, stat, document)
+        return document
+
+    def found(self, path, patterns: Iterable[str], strip: str = "") -> List[str]:
+        """Patterns present in the file (case-insensitive), ignoring the characters in strip"""
+        path = _resolve(path)
+        key = _cache_key(path)
+        self.refresh([path])
+        table = str.maketrans("", "", strip)
+        result = []
+        with self._lock:
+            queries = self._entries[key]["queries"]
+            for pattern in patterns:
+                needle = pattern.lower().translate(table)
+                query = _query_key(needle, strip)
+                self.stats["queries"] += 1
+                if query in queries:
+                    self.stats["index_hits"] += 1
+                else:
+                    answer = self._document(key, path).contains(needle, strip)
+                    queries = self._entries[key]["queries"]
+                    queries[query] = answer
+                    self._dirty = True
+                if queries[query]:
+                    result.append(pattern)
+        return result
+
+    def missing(self, path, patterns: Iterable[str], strip: str = "") -> List[str]:
+        """Patterns absent from the file, in the order given"""
+        patterns = list(patterns)
+        present = set(self.found(path, patterns, strip))
+        return [pattern for pattern in patterns if pattern not in present]
+
+    def contains(self, path, pattern: str, strip: str = "") -> bool:
+        return bool(self.found(path, [pattern], strip))
+
+    def search(self, pattern: str, paths: Iterable, strip: str = "") -> List[str]:
+        """Files (as index keys) that contain the pattern"""
+        paths = [_resolve(path) for path in paths]
+        self.refresh(paths)
+        return [_cache_key(path) for path in paths if self.found(path, [pattern], strip)]
+
+    def invalidate(self):
+        """Forget which files were validated so the next query re-stats them"""
+        with self._lock:
+            self._validated.clear()
+            self._documents.clear()
+
+
+def source_files(dirs: Iterable[str] = SOURCE_DIRS) -> List[Path]:
+    files = []
+    for directory in dirs:
+        root = _resolve(directory)
+        if root.is_dir():
+            files.extend(sorted(p for p in root.rglob("*") if p.suffix in SOURCE_SUFFIXES and p.is_file()))
+    return files
+
+
+_scanner: Optional[SourceScanner] = None
+_scanner_lock = threading.Lock()
+
+
+def get_scanner() -> SourceScanner:
+    """Process-wide scanner shared by the suites; the index is saved at exit"""
+    global _scanner
+    with _scanner_lock:
+        if _scanner is None:
+            _scanner = SourceScanner()
+            atexit.register(_scanner.save)
+        return _scanner
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scan app sources into the pattern index")
+    parser.add_argument("patterns", nargs="*", help="Patterns to search for (case-insensitive)")
+    parser.add_argument("--dir", action="append", dest="dirs", help=f"Directories to scan (default: {', '.join(SOURCE_DIRS)})")
+    parser.add_argument("--ignore-spaces", action="store_true", help="Ignore spaces when matching")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the on-disk index")
+    args = parser.parse_args(argv)
+
+    scanner = SourceScanner(cache_path=None if args.no_cache else CACHE_PATH)
+    files = source_files(args.dirs or SOURCE_DIRS)
+    strip = " " if args.ignore_spaces else ""
+
+    started = time.perf_counter()
+    changed = scanner.refresh(files)
+    for pattern in args.patterns:
+        matches = scanner.search(pattern, files, strip)
+        print(f"🔍 {pattern}: {len(matches)} file(s)")
+        for match in matches:
+            print(f"   {match}")
+    elapsed = time.perf_counter() - started
+    scanner.save()
+
+    print(f"💾 {len(files)} files, {len(changed)} changed, {scanner.stats['files_read']} read, "
+          f"{scanner.stats['index_hits']}/{scanner.stats['queries']} queries from index "
+          f"in {elapsed * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
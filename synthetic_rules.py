@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Synthetic Rules - large, schema-valid rule files and patient cohorts
+Generates drug_interactions.json, decision_rules.json and a JSON-lines
+patient cohort at any size, so the matchers can be measured against a big
+formulary before one is loaded. Popularity is skewed like the real data: a
+few therapy groups own most of the interaction rules, a few drugs appear in
+most examples and medication lists (Zipf weights), and decision rules come in
+families of contiguous severity bands over one numeric field, the way
+R001/R002 split ASCVD_percent. The output passes rule_lint.py.
+
+Patients carry the PatientContext fields the decision rules read, the
+selected_medications and primary therapies the interaction matchers take,
+and the ASCVD/FRAX/GAIL/Wells scores cohort_stratification.py bands.
+
+Usage:
+    python synthetic_rules.py --rules 100000 --patients 1000000 --output synthetic/
+    python synthetic_rules.py --rules 1000000 --decision-rules 50000 --patients 0 --seed 7
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_OUTPUT_DIR = APP_ROOT / "synthetic"
+DEFAULT_SEED = 42
+ZIPF_EXPONENT = 1.1
+PATIENT_CHUNK = 65536
+
+# (interaction class label, drug name suffix)
+DRUG_CLASSES = [
+    ("Statins", "vastatin"), ("ACE inhibitors", "pril"), ("Beta blockers", "olol"), ("ARBs", "sartan"),
+    ("Azole antifungals", "conazole"), ("SSRIs", "oxetine"), ("Anticoagulants", "xaban"),
+    ("Benzodiazepines", "azepam"), ("Proton pump inhibitors", "prazole"), ("Macrolides", "thromycin"),
+    ("Fluoroquinolones", "floxacin"), ("Corticosteroids", "sone"), ("Kinase inhibitors", "tinib"),
+    ("Monoclonal antibodies", "mab"), ("Calcium channel blockers", "dipine"), ("Antivirals", "vir"),
+    ("Anticonvulsants", "tamide"), ("Diuretics", "thiazide"), ("Opioids", "codone"), ("Herbal supplements", "root"),
+]
+PRIMARY_LABELS = ["Hormone therapy", "Antidepressant therapy", "Anticoagulant therapy", "Oncology regimen",
+                  "Cardiovascular therapy", "Bone protection", "Contraceptive", "Antiepileptic therapy"]
+GENERIC_PRIMARY = "Generic interactions (fallback)"
+SYLLABLES = ["ra", "lo", "me", "ti", "va", "zo", "ne", "ba", "cu", "di", "fe", "ga", "ho", "ki", "lu", "mo",
+             "pa", "qui", "ro", "sa", "te", "vi", "xa", "ze", "an", "el", "or", "um"]
+
+SEVERITY_TEXT = {
+    "HIGH": ("High-risk interaction: combination may lead to serious adverse events.",
+             "Avoid combination if possible; consult specialist and monitor closely."),
+    "MODERATE": ("Moderate interaction: clinically relevant effect on exposure or response.",
+                 "Use with caution; consider dose adjustment and monitoring."),
+    "LOW": ("Low-risk interaction: minor or theoretical effect.",
+            "No action usually required; monitor if symptoms occur."),
+}
+DRUG_SEVERITY_WEIGHTS = {"LOW": 0.64, "MODERATE": 0.25, "HIGH": 0.11}  # as in drug_interactions.json
+EXAMPLE_COUNT_WEIGHTS = {1: 0.07, 2: 0.45, 3: 0.41, 4: 0.07}
+
+DECISION_SEVERITIES = ("Minor", "Moderate", "Major", "Critical")
+SEVERITY_PRIORITY = {"Critical": 3, "Major": 2, "Moderate": 1, "Minor": 0}
+
+# field -> (band cut range low, high, decimals, higher values are worse)
+NUMERIC_FIELDS = {
+    "age": (45, 85, 0, True),
+    "ASCVD_percent": (5, 30, 1, True),
+    "systolic_bp": (130, 180, 0, True),
+    "egfr": (15, 60, 0, False),
+    "alt_level": (40, 200, 0, True),
+    "potassium_level": (5.0, 6.5, 1, True),
+    "frax_major_fracture": (10, 30, 1, True),
+    "frax_hip_fracture": (2, 6, 1, True),
+    "gail_score": (1.2, 3.0, 2, True),
+    "wells_score": (2, 6, 0, True),
+    "medication_count": (4, 12, 0, True),
+    "bmi": (30, 45, 1, True),
+}
+# field -> prevalence
+BOOLEAN_FIELDS = {
+    "smoking": 0.15, "pregnancy_status": 0.01, "breastfeeding": 0.01, "breast_cancer_history": 0.05,
+    "seizure_history": 0.02, "fall_history": 0.10, "peptic_ulcer_disease": 0.05,
+    "family_history_breast_cancer": 0.12, "acute_vte_risk": 0.02, "severe_depression": 0.04,
+}
+
+
+def zipf_weights(count: int, exponent: float = ZIPF_EXPONENT) -> np.ndarray:
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+class Vocabulary:
+    """Interaction classes, their member drugs and the therapy groups, with popularity weights"""
+
+    def __init__(self, rng: np.random.Generator, classes: int, drugs_per_class: int, primaries: int):
+        self.classes = [DRUG_CLASSES[i % len(DRUG_CLASSES)][0] + ("" if i < len(DRUG_CLASSES)
+                                                                else f" (group {i // len(DRUG_CLASSES)})")
+                        for i in range(classes)]
+        self.class_weights = zipf_weights(classes)
+        self.primaries = [f"{PRIMARY_LABELS[i % len(PRIMARY_LABELS)]} {i:05d}" for i in range(primaries)]
+        self.primary_weights = zipf_weights(primaries)
+
+        # Bigger classes are also the more popular ones
+        sizes = np.maximum(1, np.round(drugs_per_class * classes * self.class_weights)).astype(int)
+        seen = set()
+        self.members: List[List[str]] = []
+        for i, size in enumerate(sizes):
+            suffix = DRUG_CLASSES[i % len(DRUG_CLASSES)][1]
+            names = []
+            while len(names) < size:
+                syllables = int(rng.integers(1, 4)) + len(seen) // (len(SYLLABLES) ** 3)
+                name = "".join(rng.choice(SYLLABLES, syllables)) + suffix
+                if name not in seen:
+                    seen.add(name)
+                    names.append(name)
+            self.members.append(names)
+        self.member_weights = [zipf_weights(len(names)) for names in self.members]
+        self.drugs = [name for names in self.members for name in names]
+        # A drug's popularity follows its class's and its rank within the class
+        self.drug_weights = np.concatenate([self.class_weights[i] * weights
+                                            for i, weights in enumerate(self.member_weights)])
+        self.drug_weights /= self.drug_weights.sum()
+
+    @classmethod
+    def for_rules(cls, rng: np.random.Generator, rules: int) -> "Vocabulary":
+        classes = max(len(DRUG_CLASSES), int(math.sqrt(rules) * 2))
+        return cls(rng, classes, drugs_per_class=8, primaries=max(len(PRIMARY_LABELS), rules // (classes // 2)))
+
+
+def _choice(rng: np.random.Generator, weights: Dict[Any, float], size: int) -> List[Any]:
+    keys = list(weights)
+    return [keys[i] for i in rng.choice(len(keys), size, p=np.array(list(weights.values())) / sum(weights.values()))]
+
+
+def generate_drug_rules(vocabulary: Vocabulary, count: int, rng: np.random.Generator,
+                        generic_fraction: float = 0.02) -> Dict[str, Any]:
+    """drug_interactions.json with `count` unique (primary, interaction_with) rules"""
+    classes = len(vocabulary.classes)
+    generic = min(classes, int(count * generic_fraction))
+    # Rules per therapy group: Zipf shares, capped at one rule per class, overflow spread over the rest
+    per_primary = rng.multinomial(count - generic, vocabulary.primary_weights)
+    overflow = int(np.maximum(per_primary - classes, 0).sum())
+    per_primary = np.minimum(per_primary, classes)
+    for i in range(len(per_primary)):
+        if not overflow:
+            break
+        room = min(classes - per_primary[i], overflow)
+        per_primary[i] += room
+        overflow -= room
+    if overflow:
+        raise ValueError(f"{count} rules do not fit {len(vocabulary.primaries)} groups x {classes} classes")
+
+    severities = iter(_choice(rng, DRUG_SEVERITY_WEIGHTS, count))
+    example_counts = iter(_choice(rng, EXAMPLE_COUNT_WEIGHTS, count))
+    # Gumbel top-k: per-group class choice weighted by popularity, without replacement
+    log_weights = np.log(vocabulary.class_weights)
+    rules = []
+    groups = [(vocabulary.primaries[i], int(n)) for i, n in enumerate(per_primary) if n] + [(GENERIC_PRIMARY, generic)]
+    for primary, n in groups:
+        picked = np.argpartition(-(log_weights + rng.gumbel(size=classes)), n - 1)[:n] if n < classes \
+            else np.arange(classes)
+        for class_id in picked:
+            members = vocabulary.members[class_id]
+            k = min(next(example_counts), len(members))
+            examples = rng.choice(len(members), k, replace=False, p=vocabulary.member_weights[class_id])
+            severity = next(severities)
+            rationale, action = SEVERITY_TEXT[severity]
+            rules.append({
+                "primary": primary,
+                "interaction_with": vocabulary.classes[class_id],
+                "examples": [members[i] for i in sorted(examples)],
+                "severity": severity,
+                "rationale": rationale,
+                "recommended_action": action,
+            })
+    return {
+        "meta": {"main_medicines": len(groups), "optional_medicines": 0, "rules_total": len(rules),
+                 "note": "Synthetic rule set generated by synthetic_rules.py"},
+        "rules": rules,
+    }
+
+
+def _weighted_draws(rng: np.random.Generator, weights: np.ndarray, batch: int = 65536) -> Iterator[int]:
+    """Endless weighted draws with replacement, sampled a batch at a time"""
+    while True:
+        yield from rng.choice(len(weights), batch, p=weights).tolist()
+
+
+def _context(vocabulary: Vocabulary, rng: np.random.Generator, drug_draws: Iterator[int]) -> List[Dict[str, Any]]:
+    drugs = vocabulary.drugs
+    picks = sorted({drugs[next(drug_draws)] for _ in range(int(rng.integers(1, 5)))})
+    if len(picks) == 1:
+        context = [{"field": "selected_medications", "contains": picks[0]}]
+    else:
+        context = [{"field": "selected_medications", "contains_any": picks}]
+    if rng.random() < 0.3:
+        flag = list(BOOLEAN_FIELDS)[int(rng.integers(len(BOOLEAN_FIELDS)))]
+        context.append({"field": flag, "op": "=", "value": True})
+    return context
+
+
+def _band_family(field: str, cuts: List[float], higher_is_worse: bool,
+                 context: List[Dict[str, Any]]) -> List[Tuple[List[Dict[str, Any]], str]]:
+    """Contiguous bands over field, worst band most severe: [(all conditions, band text)]"""
+    bands = []
+    for i, cut in enumerate(cuts):
+        conditions = []
+        if higher_is_worse:
+            conditions.append({"field": field, "op": ">=", "value": cut})
+            if i + 1 < len(cuts):
+                conditions.append({"field": field, "op": "<", "value": cuts[i + 1]})
+            text = f"{field} ≥{cut:g}" + (f" and <{cuts[i + 1]:g}" if i + 1 < len(cuts) else "")
+        else:
+            conditions.append({"field": field, "op": "<", "value": cut})
+            if i + 1 < len(cuts):
+                conditions.append({"field": field, "op": ">=", "value": cuts[i + 1]})
+            text = f"{field} <{cut:g}" + (f" and ≥{cuts[i + 1]:g}" if i + 1 < len(cuts) else "")
+        bands.append((conditions + context, text))
+    return bands
+
+
+def generate_decision_rules(vocabulary: Vocabulary, count: int, rng: np.random.Generator,
+                            band_fraction: float = 0.7) -> List[Dict[str, Any]]:
+    """decision_rules.json with `count` rules; band families never overlap or leave gaps"""
+    rules: List[Dict[str, Any]] = []
+    seen = set()
+    fields = list(NUMERIC_FIELDS)
+    drug_draws = _weighted_draws(rng, vocabulary.drug_weights)
+
+    def add(conditions: Dict[str, Any], severity: str, title: str, message: str):
+        rules.append({
+            "id": f"S{len(rules) + 1:07d}",
+            "conditions": conditions,
+            "severity": severity,
+            "severity_priority": SEVERITY_PRIORITY[severity],
+            "title": title,
+            "message": message,
+            "action": "Review therapy" if SEVERITY_PRIORITY[severity] < 2 else "Avoid combination; specialist review",
+            "source": "Synthetic rules",
+        })
+
+    while len(rules) < count:
+        context = _context(vocabulary, rng, drug_draws)
+        drugs = context[0].get("contains") or ", ".join(context[0]["contains_any"])
+        if rng.random() < band_fraction:
+            field = fields[int(rng.integers(len(fields)))]
+            key = json.dumps([field, context], sort_keys=True)
+            if key in seen:
+                continue
+            seen.add(key)
+            low, high, decimals, higher_is_worse = NUMERIC_FIELDS[field]
+            bands = min(int(rng.integers(1, 5)), count - len(rules))
+            cuts = sorted({round(float(value), decimals) for value in rng.uniform(low, high, bands)},
+                          reverse=not higher_is_worse)
+            top = int(rng.integers(len(cuts) - 1, len(DECISION_SEVERITIES)))
+            for i, (conditions, text) in enumerate(_band_family(field, cuts, higher_is_worse, context)):
+                severity = DECISION_SEVERITIES[max(0, top - (len(cuts) - 1 - i))]
+                add({"all": conditions}, severity, f"{text} with {drugs}", f"{severity} risk: {text} with {drugs}.")
+        else:
+            key = json.dumps(context, sort_keys=True)
+            if key in seen:
+                continue
+            seen.add(key)
+            severity = DECISION_SEVERITIES[int(rng.integers(len(DECISION_SEVERITIES)))]
+            add({"all": context}, severity, f"Interaction with {drugs}", f"{severity} interaction with {drugs}.")
+    return rules
+
+
+def generate_patients(vocabulary: Vocabulary, count: int, rng: np.random.Generator,
+                      chunk_size: int = PATIENT_CHUNK) -> Iterator[Dict[str, Any]]:
+    """PatientContext dicts, generated a chunk of columns at a time"""
+    drugs = np.array(vocabulary.drugs)
+    primaries = vocabulary.primaries
+    for start in range(0, count, chunk_size):
+        n = min(chunk_size, count - start)
+        columns = {
+            "age": np.clip(rng.normal(58, 9, n), 40, 90).round(),
+            "ASCVD_percent": np.clip(np.exp(rng.normal(1.7, 0.8, n)), 0.5, 60).round(1),
+            "systolic_bp": np.clip(rng.normal(132, 18, n), 90, 220).round(),
+            "egfr": np.clip(rng.normal(80, 20, n), 10, 130).round(),
+            "alt_level": np.clip(np.exp(rng.normal(3.2, 0.5, n)), 5, 400).round(),
+            "potassium_level": np.clip(rng.normal(4.3, 0.45, n), 2.5, 7).round(1),
+            "frax_major_fracture": np.clip(np.exp(rng.normal(2.0, 0.6, n)), 1, 60).round(1),
+            "frax_hip_fracture": np.clip(np.exp(rng.normal(0.3, 0.8, n)), 0.1, 30).round(1),
+            "gail_score": np.clip(np.exp(rng.normal(0.4, 0.4, n)), 0.3, 10).round(2),
+            "wells_score": rng.choice(7, n, p=[0.35, 0.25, 0.15, 0.1, 0.07, 0.05, 0.03]),
+            "bmi": np.clip(rng.normal(28, 5, n), 16, 55).round(1),
+        }
+        flags = {field: rng.random(n) < prevalence for field, prevalence in BOOLEAN_FIELDS.items()}
+        med_counts = np.minimum(rng.poisson(3.5, n), 15)
+        med_ids = rng.choice(len(drugs), int(med_counts.sum()), p=vocabulary.drug_weights)
+        therapy_counts = rng.choice(3, n, p=[0.2, 0.6, 0.2])
+        therapy_ids = rng.choice(len(primaries), int(therapy_counts.sum()), p=vocabulary.primary_weights)
+        med_offset = therapy_offset = 0
+        for row in range(n):
+            meds = list(dict.fromkeys(drugs[med_ids[med_offset:med_offset + med_counts[row]]].tolist()))
+            med_offset += med_counts[row]
+            therapies = list(dict.fromkeys(primaries[i] for i in therapy_ids[therapy_offset:
+                                                                            therapy_offset + therapy_counts[row]]))
+            therapy_offset += therapy_counts[row]
+            patient = {"id": f"P{start + row + 1:07d}"}
+            for field, values in columns.items():
+                value = values[row].item()
+                patient[field] = int(value) if NUMERIC_FIELDS[field][2] == 0 else value
+            for field, values in flags.items():
+                patient[field] = bool(values[row])
+            patient["selected_medications"] = meds
+            patient["medication_count"] = len(meds)
+            patient["primary_therapies"] = therapies
+            # Score names read by cohort_stratification.py
+            patient["ASCVD"] = patient["ASCVD_percent"]
+            patient["FRAX_major"] = patient["frax_major_fracture"]
+            patient["FRAX_hip"] = patient["frax_hip_fracture"]
+            patient["GAIL_5yr"] = patient["gail_score"]
+            patient["Wells"] = patient["wells_score"]
+            yield patient
+
+
+class SyntheticWorld:
+    """One seeded vocabulary and the rule files and patients drawn from it"""
+
+    def __init__(self, rules: int, seed: int = DEFAULT_SEED):
+        self.seed = seed
+        self.rules = rules
+        self.vocabulary = Vocabulary.for_rules(np.random.default_rng(seed), rules)
+
+    def drug_rules(self, count: Optional[int] = None) -> Dict[str, Any]:
+        return generate_drug_rules(self.vocabulary, count or self.rules, np.random.default_rng(self.seed + 1))
+
+    def decision_rules(self, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        return generate_decision_rules(self.vocabulary, count or self.rules, np.random.default_rng(self.seed + 2))
+
+    def patients(self, count: int) -> Iterator[Dict[str, Any]]:
+        return generate_patients(self.vocabulary, count, np.random.default_rng(self.seed + 3))
+
+
+def write_json(path: Path, data: Any):
+    # json.dumps runs the C encoder; json.dump to a file streams through the Python one
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+
+
+def write_patients(path: Path, patients: Iterator[Dict[str, Any]]) -> int:
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for patient in patients:
+            f.write(json.dumps(patient, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            written += 1
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate large synthetic rule files and patient cohorts")
+    parser.add_argument("--rules", type=int, default=100000, help="interaction rules")
+    parser.add_argument("--decision-rules", type=int, help="decision rules (default: same as --rules)")
+    parser.add_argument("--patients", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT_DIR)
+    args = parser.parse_args(argv)
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    world = SyntheticWorld(args.rules, args.seed)
+    print(f"🧬 {len(world.vocabulary.drugs):,} drugs in {len(world.vocabulary.classes):,} classes, "
+          f"{len(world.vocabulary.primaries):,} therapy groups")
+
+    started = time.perf_counter()
+    drug_rules = world.drug_rules()
+    write_json(args.output / "drug_interactions.json", drug_rules)
+    print(f"✅ {len(drug_rules['rules']):,} interaction rules in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    decision_rules = world.decision_rules(args.decision_rules)
+    write_json(args.output / "decision_rules.json", decision_rules)
+    print(f"✅ {len(decision_rules):,} decision rules in {time.perf_counter() - started:.1f}s")
+
+    if args.patients:
+        started = time.perf_counter()
+        written = write_patients(args.output / "patients.jsonl", world.patients(args.patients))
+        print(f"✅ {written:,} patients in {time.perf_counter() - started:.1f}s")
+    print(f"💾 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Treatment Plan Engine - Python implementation of utils/treatmentPlanEngine.ts
+Applies data/contraindications.json, data/interactions.json and
+data/thresholds.json in the precedence order from thresholds.json:
+absolute contraindications block immediately, high-severity interactions
+block, risk thresholds add safety actions, symptom guidance comes last.
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from rule_trace import active_trace
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_DATA_DIR = APP_ROOT / "data"
+
+NOT_RECOMMENDED = "Not recommended"
+CONDITIONAL = "Conditional"
+
+# TreatmentInputs fields by type; each may also be null
+NUMBER_INPUTS = ("age", "weight", "height", "ASCVD", "Framingham", "FRAX_major", "FRAX_hip", "GAIL_5yr", "Wells",
+                 "systolic_bp", "total_cholesterol", "hdl_cholesterol")
+STRING_INPUTS = ("sex", "selected_medicine", "ASCVD_source", "Framingham_source", "FRAX_major_source",
+                 "FRAX_hip_source", "GAIL_5yr_source", "Wells_source")
+BOOLEAN_INPUTS = ("smoking_status", "diabetes", "family_history_mi")
+LIST_INPUTS = ("current_medications", "conditions")
+
+
+def normalize_drug(name: str) -> str:
+    """normalizeDrug: lowercase, trim and drop parentheses"""
+    return name.lower().strip().replace("(", "").replace(")", "")
+
+
+def treatment_input_error(inputs: Any) -> Optional[str]:
+    """Why evaluate_treatment cannot take these inputs (a TreatmentInputs object), or None when it can"""
+    if not isinstance(inputs, dict):
+        return "inputs must be an object"
+    unknown = sorted(set(inputs) - set(NUMBER_INPUTS + STRING_INPUTS + BOOLEAN_INPUTS + LIST_INPUTS))
+    if unknown:
+        return f"unknown input fields: {', '.join(unknown)}"
+    for field, value in inputs.items():
+        if value is None:
+            continue
+        if field in NUMBER_INPUTS and (isinstance(value, bool) or not isinstance(value, (int, float))
+                                       or not math.isfinite(value)):
+            return f"{field} must be a finite number"
+        if field in STRING_INPUTS and not isinstance(value, str):
+            return f"{field} must be a string"
+        if field in BOOLEAN_INPUTS and not isinstance(value, bool):
+            return f"{field} must be true or false"
+        if field in LIST_INPUTS and (not isinstance(value, list) or not all(isinstance(item, str) for item in value)):
+            return f"{field} must be a list of strings"
+    return None
+
+
+def _fired(rule_id: str, description: str, source_file: str, rule_type: str, severity: str) -> Dict[str, str]:
+    return {
+        "id": rule_id,
+        "description": description,
+        "sourceFile": source_file,
+        "type": rule_type,
+        "severity": severity,
+    }
+
+
+def _js_number(value: float) -> str:
+    """Format numbers the way template literals do (22.0 -> 22)"""
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+class TreatmentPlanEngine:
+    """evaluateTreatment over one set of data files"""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        data_dir = Path(data_dir)
+        self.thresholds = self._load(data_dir / "thresholds.json")
+        self.contraindications = self._load(data_dir / "contraindications.json")["contraindications"]
+        self.interactions = self._load(data_dir / "interactions.json")["interactions"]
+
+    @staticmethod
+    def _load(path: Path) -> Any:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _response(self, inputs: Dict, fired_rules: List[Dict], text: str, strength: str,
+                  alternatives: List[str], monitoring: List[str], review: bool) -> Dict[str, Any]:
+        return {
+            "summaryInputs": inputs,
+            "firedRules": fired_rules,
+            "primaryRecommendation": {"text": text, "strength": strength},
+            "alternatives": alternatives,
+            "monitoring": monitoring,
+            "clinicianReviewRequired": review,
+        }
+
+    def evaluate_treatment(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        fired_rules: List[Dict] = []
+        alternatives: List[str] = []
+        monitoring: List[str] = []
+        review = False
+        primary = ""
+        strength = CONDITIONAL
+
+        if not inputs.get("selected_medicine"):
+            return self._insufficient_data(inputs)
+
+        for rule_type in self.thresholds["precedence"]:
+            if rule_type == "absolute_contraindications":
+                result = self.check_contraindications(inputs)
+                fired_rules.extend(result["firedRules"])
+                if result["hasAbsolute"]:
+                    return self._response(inputs, fired_rules, result["message"], NOT_RECOMMENDED,
+                                          result["alternatives"], [], True)
+                if result["hasRelative"]:
+                    review = True
+                    primary = result["message"]
+                    strength = CONDITIONAL
+                    alternatives.extend(result["alternatives"])
+
+            elif rule_type == "interactions_high":
+                result = self.check_interactions(inputs)
+                fired_rules.extend(result["firedRules"])
+                if result["hasHigh"]:
+                    return self._response(inputs, fired_rules, result["message"], NOT_RECOMMENDED,
+                                          result["alternatives"], result["monitoring"], True)
+                if result["hasModerate"]:
+                    primary = result["message"]
+                    strength = CONDITIONAL
+                    monitoring.extend(result["monitoring"])
+
+            elif rule_type in ("risk_high", "risk_moderate"):
+                result = self.check_risk_thresholds(inputs, rule_type == "risk_high")
+                fired_rules.extend(result["firedRules"])
+                if result["hasHighRisk"]:
+                    if not primary:
+                        primary = result["message"]
+                        strength = NOT_RECOMMENDED if result["blocksTreatment"] else CONDITIONAL
+                    alternatives.extend(result["alternatives"])
+                    monitoring.extend(result["monitoring"])
+                    review = True
+
+            elif rule_type == "symptom_guided":
+                if not primary and not fired_rules:
+                    primary = "Consider individual patient factors and symptom severity for treatment selection."
+                    strength = CONDITIONAL
+
+            if strength == NOT_RECOMMENDED:
+                break
+
+        if not primary:
+            primary = self.thresholds["defaults"]["insufficient_data"]
+            strength = CONDITIONAL
+            review = True
+
+        return self._response(inputs, fired_rules, primary, strength, alternatives, monitoring, review)
+
+    def check_contraindications(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        fired_rules, alternatives = [], []
+        has_absolute = has_relative = False
+        message = ""
+        conditions = inputs.get("conditions") or []
+        trace = active_trace()
+
+        for contra in self.contraindications:
+            present = contra["condition"] in conditions
+            if trace is not None:
+                with trace.rule("treatment_plan_engine", contra["id"]) as record:
+                    record.matched = record.check("conditions", contra["condition"], conditions, present)
+            if not present:
+                continue
+            fired_rules.append(_fired(contra["id"], contra["message"], "contraindications.json",
+                                      "contraindication", contra["type"]))
+            if contra["type"] == "absolute":
+                has_absolute = True
+                message = contra["message"]
+                alternatives.append("Seek alternative non-hormonal therapy")
+            elif contra["type"] == "relative":
+                has_relative = True
+                if not message:
+                    message = contra["message"]
+                alternatives.append("Consider careful monitoring or alternative approach")
+
+        return {"firedRules": fired_rules, "hasAbsolute": has_absolute, "hasRelative": has_relative,
+                "message": message, "alternatives": alternatives}
+
+    def check_interactions(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        fired_rules, alternatives, monitoring = [], [], []
+        has_high = has_moderate = False
+        message = ""
+        selected = inputs.get("selected_medicine")
+        current = {normalize_drug(med) for med in inputs.get("current_medications") or []}
+        trace = active_trace()
+
+        for interaction in self.interactions:
+            interacts = (
+                (interaction["drug_a"] == selected and normalize_drug(interaction["drug_b"]) in current)
+                or (interaction["drug_b"] == selected and normalize_drug(interaction["drug_a"]) in current)
+            )
+            if trace is not None:
+                with trace.rule("treatment_plan_engine", interaction["id"]) as record:
+                    record.matched = record.check(
+                        "selected_medicine + current_medications",
+                        [interaction["drug_a"], interaction["drug_b"]], [selected, sorted(current)], interacts)
+            if not interacts:
+                continue
+            fired_rules.append(_fired(interaction["id"], interaction["message"], "interactions.json",
+                                      "interaction", interaction["severity"]))
+            if interaction["severity"] == "high":
+                has_high = True
+                message = interaction["message"]
+                alternatives.append("Select alternative medication without interaction")
+            elif interaction["severity"] == "moderate":
+                has_moderate = True
+                if not message:
+                    message = interaction["message"]
+                monitoring.append("Enhanced monitoring required" if interaction.get("action") == "monitor"
+                                  else "Counsel patient on risks")
+
+        return {"firedRules": fired_rules, "hasHigh": has_high, "hasModerate": has_moderate,
+                "message": message, "alternatives": alternatives, "monitoring": monitoring}
+
+    def check_risk_thresholds(self, inputs: Dict[str, Any], high_risk_only: bool) -> Dict[str, Any]:
+        risk = self.thresholds["risk_thresholds"]
+        actions = self.thresholds["actions"]
+        fired_rules: List[Dict] = []
+        alternatives: List[str] = []
+        has_high_risk = blocks = False
+        message = ""
+
+        def fire(rule_id: str, description: str, severity: str, action_key: str, first: bool = False):
+            nonlocal has_high_risk, message
+            fired_rules.append(_fired(rule_id, description, "thresholds.json", "risk_threshold", severity))
+            has_high_risk = True
+            if first or not message:
+                message = "; ".join(actions[action_key])
+            alternatives.extend(actions[action_key])
+
+        ascvd = inputs.get("ASCVD")
+        if ascvd is not None:
+            cutoffs = risk["ASCVD"]["cutoffs"]
+            if ascvd >= cutoffs["high"]:
+                fire("ASCVD_high", f"High ASCVD risk ({_js_number(ascvd)}% ≥ {_js_number(cutoffs['high'])}%)",
+                     "high", "ASCVD_high", first=True)
+                blocks = True
+            elif not high_risk_only and ascvd >= cutoffs["low"]:
+                fire("ASCVD_intermediate",
+                     f"Intermediate ASCVD risk ({_js_number(ascvd)}% ≥ {_js_number(cutoffs['low'])}%)",
+                     "moderate", "ASCVD_intermediate")
+
+        frax = inputs.get("FRAX_major")
+        if frax is not None:
+            high = risk["FRAX_major"]["cutoffs"]["high"]
+            if frax >= high:
+                fire("FRAX_high", f"High fracture risk (FRAX major {_js_number(frax)}% ≥ {_js_number(high)}%)",
+                     "high", "FRAX_high")
+
+        gail = inputs.get("GAIL_5yr")
+        if gail is not None:
+            elevated = risk["GAIL_5yr"]["cutoffs"]["elevated_5yr"]
+            if gail >= elevated:
+                fire("GAIL_elevated",
+                     f"Elevated breast cancer risk (GAIL 5-year {_js_number(gail)}% ≥ {_js_number(elevated)}%)",
+                     "moderate", "GAIL_elevated")
+
+        wells = inputs.get("Wells")
+        if wells is not None:
+            high = risk["WELLS_VTE"]["cutoffs"]["high"]
+            if wells >= high:
+                fire("WELLS_high", f"High VTE risk (Wells score {_js_number(wells)} ≥ {_js_number(high)})",
+                     "high", "WELLS_high")
+                blocks = True
+
+        return {"firedRules": fired_rules, "hasHighRisk": has_high_risk, "message": message,
+                "alternatives": alternatives, "monitoring": [], "blocksTreatment": blocks}
+
+    def _insufficient_data(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return self._response(inputs, [], self.thresholds["defaults"]["insufficient_data"], CONDITIONAL,
+                              ["Gather additional clinical data", "Comprehensive patient assessment"], [], True)
+
+    def get_rule_by_id(self, rule_id: str) -> Any:
+        for contra in self.contraindications:
+            if contra["id"] == rule_id:
+                return dict(contra, sourceFile="contraindications.json")
+        for interaction in self.interactions:
+            if interaction["id"] == rule_id:
+                return dict(interaction, sourceFile="interactions.json")
+        if rule_id in self.thresholds["actions"]:
+            return {"id": rule_id, "actions": self.thresholds["actions"][rule_id], "sourceFile": "thresholds.json"}
+        return None
+
+
+def check_must_fire(result: Dict[str, Any], must_fire: List[str]) -> Tuple[bool, List[str]]:
+    """Whether every expected rule id fired; returns the missing ids"""
+    fired = {rule["id"] for rule in result["firedRules"]}
+    missing = [rule_id for rule_id in must_fire if rule_id not in fired]
+    return not missing, missing
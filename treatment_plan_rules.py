@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Treatment Plan Rules - Python implementation of the treatmentPlanRules.json engine
+Evaluates the dotted-path rule conditions in data/treatmentPlanRules.json
+(">N"/"<N" thresholds, any-of lists, strict equality) against patient data
+and builds a plan sorted by urgency and confidence, as
+utils/treatmentPlanRuleEngine.ts.bak does. Plans are returned, not stored.
+EvaluationSession keeps one patient's fired rules live as form fields change,
+re-evaluating only the rules that read the changed field.
+"""
+
+import copy
+import json
+import math
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from rule_trace import RuleTrace, active_trace
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_RULES_PATH = APP_ROOT / "data" / "treatmentPlanRules.json"
+
+URGENCY_ORDER = {"high": 3, "medium": 2, "low": 1}
+REQUIRED_FIELDS = ["age", "gender"]
+COMPLETENESS_FIELDS = [
+    "age", "gender", "medicineType",
+    "riskScores.ASCVD", "riskScores.Framingham", "riskScores.FRAX",
+    "history.VTE", "history.breastCancer_active",
+    "symptoms.severity",
+]
+
+
+def get_nested_value(obj: Any, path: str) -> Any:
+    """path.split('.').reduce((current, key) => current?.[key], obj)"""
+    for key in path.split("."):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def js_round(value: float) -> int:
+    """Math.round: halves round up, not to even"""
+    return math.floor(value + 0.5)
+
+
+def strict_equals(actual: Any, expected: Any) -> bool:
+    """=== for JSON values: booleans never equal numbers"""
+    if isinstance(actual, bool) or isinstance(expected, bool):
+        return isinstance(actual, bool) and isinstance(expected, bool) and actual == expected
+    return actual == expected
+
+
+def evaluate_condition(key: str, expected: Any, patient: Dict[str, Any]) -> bool:
+    actual = get_nested_value(patient, key)
+
+    if isinstance(expected, str) and expected.startswith(">"):
+        return _is_number(actual) and actual > float(expected[1:])
+    if isinstance(expected, str) and expected.startswith("<"):
+        return _is_number(actual) and actual < float(expected[1:])
+    if isinstance(expected, list):
+        return isinstance(actual, list) and any(item in actual for item in expected)
+    return strict_equals(actual, expected)
+
+
+Getter = Callable[[Any], Any]
+Check = Callable[[Dict[str, Any]], bool]
+
+
+def compile_getter(path: str) -> Getter:
+    """get_nested_value with the path split once"""
+    keys = path.split(".")
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda obj: obj.get(key) if isinstance(obj, dict) else None
+
+    def get(obj):
+        for key in keys:
+            if not isinstance(obj, dict):
+                return None
+            obj = obj.get(key)
+        return obj
+    return get
+
+
+def compile_condition(key: str, expected: Any) -> Check:
+    """evaluate_condition specialised for one rule condition"""
+    get = compile_getter(key)
+    if isinstance(expected, str) and expected[:1] in (">", "<"):
+        try:
+            threshold = float(expected[1:])
+        except ValueError:
+            return lambda patient: evaluate_condition(key, expected, patient)
+        if expected[0] == ">":
+            def above(patient):
+                actual = get(patient)
+                return _is_number(actual) and actual > threshold
+            return above
+
+        def below(patient):
+            actual = get(patient)
+            return _is_number(actual) and actual < threshold
+        return below
+    if isinstance(expected, list):
+        def any_of(patient):
+            actual = get(patient)
+            return isinstance(actual, list) and any(item in actual for item in expected)
+        return any_of
+    return lambda patient: strict_equals(get(patient), expected)
+
+
+class PathIndex:
+    """Dotted path -> dependents, answering "what reads this field"
+
+    A change to a path affects whatever reads that path, anything below it
+    (replacing "history" changes "history.VTE") and anything above it
+    (changing "history.VTE" changes the "history" object).
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Any]]):
+        self._exact: Dict[str, Set[Any]] = {}
+        self._under: Dict[str, Set[Any]] = {}
+        for path, dependent in entries:
+            self._exact.setdefault(path, set()).add(dependent)
+            parts = path.split(".")
+            for depth in range(1, len(parts) + 1):
+                self._under.setdefault(".".join(parts[:depth]), set()).add(dependent)
+
+    def dependents(self, path: str) -> Set[Any]:
+        affected = set(self._under.get(path, ()))
+        parts = path.split(".")
+        for depth in range(1, len(parts)):
+            affected.update(self._exact.get(".".join(parts[:depth]), ()))
+        return affected
+
+
+_COMPLETENESS_INDEX = PathIndex((field, field) for field in COMPLETENESS_FIELDS)
+
+
+def set_nested_value(obj: Dict[str, Any], path: str, value: Any):
+    """Assign a dotted path, replacing non-object intermediates with {}"""
+    keys = path.split(".")
+    for key in keys[:-1]:
+        child = obj.get(key)
+        if not isinstance(child, dict):
+            child = obj[key] = {}
+        obj = child
+    obj[keys[-1]] = value
+
+
+class RuleNetwork:
+    """Compiled rule conditions plus the field -> dependent rules index"""
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        self.checks: List[List[Check]] = [
+            [compile_condition(key, value) for key, value in rule["conditions"].items()] for rule in rules
+        ]
+        self.index = PathIndex((path, position) for position, rule in enumerate(rules) for path in rule["conditions"])
+
+    def evaluate(self, position: int, patient: Dict[str, Any]) -> bool:
+        return all(check(patient) for check in self.checks[position])
+
+    def dependents(self, path: str) -> Set[int]:
+        return self.index.dependents(path)
+
+
+class TreatmentPlanRuleEngine:
+    """generateTreatmentPlan over one treatmentPlanRules.json"""
+
+    def __init__(self, path=DEFAULT_RULES_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.rules: List[Dict] = data["rules"]
+        self.config: Dict[str, Any] = data.get("config", {})
+        self._network: Optional[RuleNetwork] = None
+
+    def network(self) -> RuleNetwork:
+        if self._network is None:
+            self._network = RuleNetwork(self.rules)
+        return self._network
+
+    def session(self, patient: Optional[Dict[str, Any]] = None) -> "EvaluationSession":
+        return EvaluationSession(self, patient)
+
+    def evaluate_rule(self, rule: Dict, patient: Dict[str, Any]) -> bool:
+        return all(evaluate_condition(key, value, patient) for key, value in rule["conditions"].items())
+
+    def validate_patient_data(self, patient: Dict[str, Any]) -> Dict[str, Any]:
+        missing = [field for field in REQUIRED_FIELDS if not patient.get(field)]
+        return {"isValid": not missing, "missingFields": missing}
+
+    def calculate_data_completeness(self, patient: Dict[str, Any]) -> int:
+        completed = sum(
+            1 for field in COMPLETENESS_FIELDS
+            if get_nested_value(patient, field) not in (None, "")
+        )
+        return js_round(completed / len(COMPLETENESS_FIELDS) * 100)
+
+    @staticmethod
+    def create_recommendation(rule: Dict) -> Dict[str, Any]:
+        action = rule["action"]
+        return {
+            "id": str(uuid.uuid4()),
+            "recommendation": action["recommendation"],
+            "rationale": action["rationale"],
+            "confidence": action["confidence"],
+            "urgency": action.get("urgency") or "medium",
+            "category": action.get("category") or "general",
+            "alternatives": action.get("alternatives") or [],
+            "references": action.get("references") or [],
+            "ruleId": rule["id"],
+        }
+
+    def fired_rules(self, patient: Dict[str, Any]) -> List[Dict]:
+        """Rules whose conditions all hold, in file order"""
+        trace = active_trace()
+        if trace is not None:
+            return self._fired_rules_traced(patient, trace)
+        return [rule for rule in self.rules if self.evaluate_rule(rule, patient)]
+
+    def _fired_rules_traced(self, patient: Dict[str, Any], trace: RuleTrace) -> List[Dict]:
+        fired = []
+        for rule in self.rules:
+            with trace.rule("treatment_plan_rules", rule["id"]) as record:
+                record.matched = all(
+                    record.check(key, expected, get_nested_value(patient, key),
+                                 evaluate_condition(key, expected, patient))
+                    for key, expected in rule["conditions"].items()
+                )
+            if record.matched:
+                fired.append(rule)
+        return fired
+
+    def generate_treatment_plan(self, patient: Dict[str, Any]) -> Dict[str, Any]:
+        validation = self.validate_patient_data(patient)
+        if not validation["isValid"]:
+            raise ValueError(f"Incomplete data: {', '.join(validation['missingFields'])}")
+
+        enriched = dict(patient, dataCompleteness=self.calculate_data_completeness(patient))
+        return self.build_plan(enriched, self.fired_rules(enriched))
+
+    def build_plan(self, enriched: Dict[str, Any], fired: List[Dict]) -> Dict[str, Any]:
+        """Plan for an enriched patient from the rules that fired for it"""
+        recommendations = [self.create_recommendation(rule) for rule in fired]
+        recommendations.sort(key=lambda r: (URGENCY_ORDER[r["urgency"]], r["confidence"]), reverse=True)
+
+        return {
+            "planId": str(uuid.uuid4()),
+            "generatedAt": datetime.now(timezone.utc).isoformat(),
+            "patientData": enriched,
+            "primaryRecommendations": recommendations,
+            "alternativeTherapies": self.generate_alternatives(recommendations),
+            "clinicalSummary": self.generate_clinical_summary(enriched, recommendations),
+            "actionItems": self.generate_action_items(recommendations),
+            "urgentFlags": [r["recommendation"] for r in recommendations if r["urgency"] == "high"],
+            "auditTrail": {
+                "inputSnapshot": enriched,
+                "firedRules": [rule["id"] for rule in fired],
+                "overallConfidence": self.calculate_overall_confidence(recommendations),
+            },
+        }
+
+    @staticmethod
+    def generate_alternatives(recommendations: List[Dict]) -> List[str]:
+        alternatives: Dict[str, None] = {}
+        for rec in recommendations:
+            for alternative in rec["alternatives"]:
+                alternatives[alternative] = None
+        alternatives["Lifestyle modifications (diet, exercise, stress management)"] = None
+        alternatives["Regular follow-up with healthcare provider"] = None
+        return list(alternatives)
+
+    @staticmethod
+    def generate_clinical_summary(patient: Dict[str, Any], recommendations: List[Dict]) -> str:
+        high_count = sum(1 for r in recommendations if r["urgency"] == "high")
+        summary = f"Patient assessment for {patient.get('age')}-year-old {patient.get('gender')}. "
+        if high_count:
+            summary += f"⚠️ {high_count} high-priority recommendation(s) requiring immediate attention. "
+        if recommendations:
+            average = js_round(sum(r["confidence"] for r in recommendations) / len(recommendations))
+        else:
+            average = "NaN"
+        summary += f"Generated {len(recommendations)} recommendations with average confidence of {average}%. "
+        summary += "All recommendations are advisory and require clinician review."
+        return summary
+
+    @staticmethod
+    def generate_action_items(recommendations: List[Dict]) -> List[str]:
+        items = []
+        if any(r["urgency"] == "high" for r in recommendations):
+            items.append("🔴 URGENT: Schedule immediate clinician consultation")
+        if any(r["urgency"] == "medium" for r in recommendations):
+            items.append("🟡 Schedule clinician review within 2 weeks")
+        items.append("📋 Discuss all recommendations with healthcare provider")
+        items.append("📊 Complete any missing assessments or laboratory tests")
+        return items
+
+    @staticmethod
+    def calculate_overall_confidence(recommendations: List[Dict]) -> int:
+        if not recommendations:
+            return 0
+        weights = [URGENCY_ORDER[r["urgency"]] for r in recommendations]
+        weighted = sum(r["confidence"] * w for r, w in zip(recommendations, weights))
+        return js_round(weighted / sum(weights))
+
+
+class EvaluationSession:
+    """One patient's fired rules, kept live as fields change
+
+    update() re-evaluates only the rules that read the changed paths (and
+    those reading dataCompleteness when a completeness field changes) and
+    returns what started and stopped firing. Values are stored as given.
+    """
+
+    def __init__(self, engine: TreatmentPlanRuleEngine, patient: Optional[Dict[str, Any]] = None):
+        self.engine = engine
+        self.network = engine.network()
+        self.patient: Dict[str, Any] = copy.deepcopy(patient) if patient else {}
+        self.patient["dataCompleteness"] = engine.calculate_data_completeness(self.patient)
+        self._fired = [self.network.evaluate(position, self.patient) for position in range(len(engine.rules))]
+
+    def update(self, path: str, value: Any) -> Dict[str, Any]:
+        return self.update_many({path: value})
+
+    def update_many(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply {dotted path: value} changes; returns the fired/unfired diff"""
+        affected: Set[int] = set()
+        completeness_changed = False
+        for path, value in changes.items():
+            set_nested_value(self.patient, path, value)
+            affected |= self.network.dependents(path)
+            completeness_changed = completeness_changed or bool(_COMPLETENESS_INDEX.dependents(path))
+            if path.split(".")[0] == "dataCompleteness":
+                completeness_changed = True
+
+        if completeness_changed:
+            # generateTreatmentPlan always overwrites dataCompleteness with the computed value
+            completeness = self.engine.calculate_data_completeness(self.patient)
+            if self.patient.get("dataCompleteness") != completeness:
+                self.patient["dataCompleteness"] = completeness
+                affected |= self.network.dependents("dataCompleteness")
+
+        fired, unfired = [], []
+        for position in sorted(affected):
+            now = self.network.evaluate(position, self.patient)
+            if now != self._fired[position]:
+                self._fired[position] = now
+                rule = self.engine.rules[position]
+                if now:
+                    fired.append(self.engine.create_recommendation(rule))
+                else:
+                    unfired.append(rule["id"])
+        return {"fired": fired, "unfired": unfired, "evaluated": len(affected)}
+
+    def fired_rules(self) -> List[Dict]:
+        """Rules currently firing, in file order"""
+        return [rule for rule, fired in zip(self.engine.rules, self._fired) if fired]
+
+    def plan(self) -> Dict[str, Any]:
+        """generate_treatment_plan for the current state, without re-evaluating"""
+        validation = self.engine.validate_patient_data(self.patient)
+        if not validation["isValid"]:
+            raise ValueError(f"Incomplete data: {', '.join(validation['missingFields'])}")
+        return self.engine.build_plan(copy.deepcopy(self.patient), self.fired_rules())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Treatment Plan Service - server-side evaluateTreatment with a persistent plan memo
+Plans from TreatmentPlanEngine are deterministic in (inputs, rule files), so
+each one is stored in a SQLite memo table under the SHA-256 of its canonical
+inputs together with the rules version (a hash of contraindications.json,
+interactions.json and thresholds.json). Repeat requests are answered from the
+table across restarts; after a rule change the stored inputs let saved plans
+be regenerated one at a time or audited in bulk, reporting which plans now
+come out differently.
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from treatment_plan_engine import DEFAULT_DATA_DIR, TreatmentPlanEngine
+
+APP_ROOT = Path(__file__).parent
+PLAN_STORE_PATH = APP_ROOT / "treatment_plans.db"
+RULE_FILES = ("contraindications.json", "interactions.json", "thresholds.json")
+# Changed plans listed in an audit report; the rest are only counted
+MAX_AUDIT_CHANGES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    input_hash TEXT PRIMARY KEY,
+    rules_version TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plans_rules_version ON plans (rules_version);
+"""
+
+
+def canonical_json(value: Any) -> str:
+    """Key order never matters to the engine; list order can (it shows in firedRules), so it is kept"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def input_hash(inputs: Dict[str, Any]) -> str:
+    return hashlib.sha256(canonical_json(inputs).encode("utf-8")).hexdigest()
+
+
+def rules_version(data_dir=DEFAULT_DATA_DIR) -> str:
+    """Hash of the parsed rule files, so whitespace-only edits keep the version"""
+    digest = hashlib.sha256()
+    for name in RULE_FILES:
+        with open(Path(data_dir) / name, "r", encoding="utf-8") as f:
+            digest.update(canonical_json(json.load(f)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def plan_summary(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a plan a clinician acts on, for audit diffs"""
+    return {
+        "recommendation": plan["primaryRecommendation"]["text"],
+        "strength": plan["primaryRecommendation"]["strength"],
+        "firedRules": [rule["id"] for rule in plan["firedRules"]],
+        "clinicianReviewRequired": plan["clinicianReviewRequired"],
+    }
+
+
+class TreatmentPlanService:
+    """TreatmentPlanEngine behind a canonical-input-hash memo table"""
+
+    def __init__(self, db_path=PLAN_STORE_PATH, data_dir=DEFAULT_DATA_DIR):
+        self.db_path = Path(db_path)
+        self.data_dir = Path(data_dir)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._rule_stamp = None
+        self.engine: Optional[TreatmentPlanEngine] = None
+        self.version = ""
+        self.stats = {"hits": 0, "misses": 0, "stale": 0}
+        self._reload_if_changed()
+
+    def _reload_if_changed(self):
+        """Pick up edited rule files without a restart"""
+        stamp = tuple((self.data_dir / name).stat().st_mtime_ns for name in RULE_FILES)
+        if stamp != self._rule_stamp:
+            self.engine = TreatmentPlanEngine(self.data_dir)
+            self.version = rules_version(self.data_dir)
+            self._rule_stamp = stamp
+
+    def _store(self, key: str, inputs: Dict[str, Any], plan: Dict[str, Any], version: Optional[str] = None):
+        now = datetime.now().isoformat()
+        self._conn.execute(
+            "INSERT INTO plans (input_hash, rules_version, inputs, plan, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(input_hash) DO UPDATE SET "
+            "rules_version = excluded.rules_version, plan = excluded.plan, updated_at = excluded.updated_at",
+            (key, version or self.version, canonical_json(inputs), json.dumps(plan, ensure_ascii=False), now, now))
+
+    def _response(self, key: str, plan: Dict[str, Any], cached: bool) -> Dict[str, Any]:
+        return {"inputHash": key, "rulesVersion": self.version, "cached": cached, "plan": plan}
+
+    def generate(self, inputs: Dict[str, Any], refresh: bool = False) -> Dict[str, Any]:
+        """evaluateTreatment for inputs, from the memo when the stored plan used the current rules"""
+        key = input_hash(inputs)
+        with self._lock:
+            self._reload_if_changed()
+            row = self._conn.execute("SELECT rules_version, plan FROM plans WHERE input_hash = ?", (key,)).fetchone()
+            if row and row[0] == self.version and not refresh:
+                self.stats["hits"] += 1
+                return self._response(key, json.loads(row[1]), True)
+            self.stats["misses"] += 1
+            if row and row[0] != self.version:
+                self.stats["stale"] += 1
+            plan = self.engine.evaluate_treatment(inputs)
+            self._store(key, inputs, plan)
+            self._conn.commit()
+            return self._response(key, plan, False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """A stored plan as saved, with whether it was made under the current rules"""
+        with self._lock:
+            self._reload_if_changed()
+            row = self._conn.execute("SELECT rules_version, inputs, plan, created_at, updated_at "
+                                     "FROM plans WHERE input_hash = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        version, inputs, plan, created_at, updated_at = row
+        return {"inputHash": key, "rulesVersion": version, "current": version == self.version,
+                "inputs": json.loads(inputs), "plan": json.loads(plan), "createdAt": created_at,
+                "updatedAt": updated_at}
+
+    def regenerate(self, key: str) -> Optional[Dict[str, Any]]:
+        """Re-evaluate one stored plan under the current rules and save it"""
+        with self._lock:
+            self._reload_if_changed()
+            row = self._conn.execute("SELECT rules_version, inputs, plan FROM plans WHERE input_hash = ?",
+                                     (key,)).fetchone()
+            if row is None:
+                return None
+            previous_version, inputs, previous = row[0], json.loads(row[1]), json.loads(row[2])
+            plan = self.engine.evaluate_treatment(inputs)
+            self._store(key, inputs, plan)
+            self._conn.commit()
+        before, after = plan_summary(previous), plan_summary(plan)
+        return {"inputHash": key, "previousRulesVersion": previous_version, "rulesVersion": self.version,
+                "changed": before != after, "before": before, "after": after, "plan": plan}
+
+    def audit(self, update: bool = False, include_current: bool = False, batch_size: int = 500,
+              max_changes: int = MAX_AUDIT_CHANGES) -> Dict[str, Any]:
+        """Re-evaluate saved plans made under older rules (or all) and report the ones that change
+
+        With update=True the re-evaluated plans replace the stored ones. Plans
+        are read a page at a time in input_hash order and the lock is only held
+        for the reads and writes, so requests for single plans keep being
+        answered during a long audit. At most max_changes changed plans are
+        listed; "changed" counts all of them.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self._reload_if_changed()
+            engine, version = self.engine, self.version
+            total = self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+        query = "SELECT input_hash, rules_version, inputs, plan FROM plans WHERE input_hash > ?"
+        if not include_current:
+            query += " AND rules_version != ?"
+        query += " ORDER BY input_hash LIMIT ?"
+        audited, changed, updated = 0, 0, 0
+        changes = []
+        last_key = ""
+        while True:
+            params = (last_key, version, batch_size) if not include_current else (last_key, batch_size)
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            if not rows:
+                break
+            last_key = rows[-1][0]
+            refreshed = []
+            for key, stored_version, inputs, stored in rows:
+                inputs = json.loads(inputs)
+                plan = engine.evaluate_treatment(inputs)
+                audited += 1
+                before, after = plan_summary(json.loads(stored)), plan_summary(plan)
+                if before != after:
+                    changed += 1
+                    if len(changes) < max_changes:
+                        changes.append({"inputHash": key, "rulesVersion": stored_version,
+                                        "before": before, "after": after})
+                if update:
+                    refreshed.append((key, inputs, plan))
+            if refreshed:
+                with self._lock:
+                    for key, inputs, plan in refreshed:
+                        self._store(key, inputs, plan, version)
+                    self._conn.commit()
+                updated += len(refreshed)
+        return {
+            "rulesVersion": version,
+            "storedPlans": total,
+            "audited": audited,
+            "changed": changed,
+            "updated": updated,
+            "changes": changes,
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            self._reload_if_changed()
+            versions = dict(self._conn.execute("SELECT rules_version, COUNT(*) FROM plans GROUP BY rules_version"))
+        return {"rulesVersion": self.version, "storedPlans": sum(versions.values()),
+                "currentPlans": versions.get(self.version, 0), "byRulesVersion": versions, **self.stats}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_service: Optional[TreatmentPlanService] = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> TreatmentPlanService:
+    """Process-wide service used by the backend"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TreatmentPlanService()
+        return _service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and audit the stored treatment plans")
+    parser.add_argument("command", choices=["stats", "audit", "generate"])
+    parser.add_argument("--db", type=Path, default=PLAN_STORE_PATH)
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--update", action="store_true", help="audit: save the re-evaluated plans")
+    parser.add_argument("--all", action="store_true", help="audit: include plans made under the current rules")
+    parser.add_argument("--cases", type=Path, default=APP_ROOT / "data" / "example_cases.json",
+                        help="generate: case file whose inputs are evaluated and stored")
+    args = parser.parse_args(argv)
+
+    service = TreatmentPlanService(args.db, args.data_dir)
+    try:
+        if args.command == "generate":
+            with open(args.cases, "r", encoding="utf-8") as f:
+                cases = json.load(f)["cases"]
+            for case in cases:
+                result = service.generate(case["inputs"])
+                mark = "💾" if result["cached"] else "✅"
+                print(f"{mark} {case['id']:<10} {result['inputHash'][:12]} "
+                      f"{result['plan']['primaryRecommendation']['strength']}")
+        elif args.command == "audit":
+            report = service.audit(update=args.update, include_current=args.all)
+            print(f"🔍 Audited {report['audited']} of {report['storedPlans']} plans against rules "
+                  f"{report['rulesVersion']} in {report['elapsedMs']} ms")
+            for change in report["changes"]:
+                print(f"⚠️  {change['inputHash'][:12]}: {change['before']['strength']} -> {change['after']['strength']}"
+                      f" ({', '.join(change['after']['firedRules']) or 'no rules'})")
+            if report["changed"] > len(report["changes"]):
+                print(f"   ... and {report['changed'] - len(report['changes'])} more")
+            print(f"{'💾' if args.update else '📊'} {report['changed']} changed, {report['updated']} updated")
+        print(json.dumps(service.summary(), indent=2))
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
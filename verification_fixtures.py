@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the Python verification suites
+Parsed rule JSON and source files are loaded once per process and shared
+between suites and worker threads. Returned objects are shared: treat them
+as read-only.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+APP_ROOT = Path(__file__).parent
+
+_lock = threading.Lock()
+_cache: Dict[Tuple[str, str], Any] = {}
+_stats = {"hits": 0, "misses": 0}
+
+
+def _resolve(path) -> str:
+    resolved = Path(path)
+    if not resolved.is_absolute():
+        resolved = APP_ROOT / resolved
+    return str(resolved)
+
+
+def _cached(kind: str, path, loader):
+    key = (kind, _resolve(path))
+    with _lock:
+        if key in _cache:
+            _stats["hits"] += 1
+            return _cache[key]
+    value = loader(key[1])
+    with _lock:
+        _stats["misses"] += 1
+        return _cache.setdefault(key, value)
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _read_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_text(path) -> str:
+    """Read a source file once; relative paths resolve against the app root"""
+    return _cached("text", path, _read_text)
+
+
+def load_json(path) -> Any:
+    """Parse a JSON file once; relative paths resolve against the app root"""
+    return _cached("json", path, _read_json)
+
+
+def load_rules(path="assets/rules/drug_interactions.json") -> Dict:
+    """Parsed drug interaction rule file (drugRules.ts loadLocalRules equivalent)"""
+    return load_json(path)
+
+
+def cache_stats() -> Dict[str, int]:
+    with _lock:
+        return dict(_stats, entries=len(_cache))
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _stats["hits"] = _stats["misses"] = 0
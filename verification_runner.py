@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Parallel Verification Runner for MHT Assessment App
+Discovers the test_* methods of every Python verification suite, runs them
+concurrently in a worker pool and writes JSON/JUnit reports with per-test
+durations. Shared fixtures (parsed rule JSON, source files) come from
+verification_fixtures and are loaded once for the whole run.
+
+Usage:
+    python verification_runner.py
+    python verification_runner.py --suite drug_interaction --workers 8 --junit report.xml
+    python verification_runner.py --start-backend -k health
+"""
+
+import argparse
+import importlib
+import inspect
+import io
+import json
+import sys
+import threading
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from verification_fixtures import cache_stats
+
+APP_ROOT = Path(__file__).parent
+DEFAULT_JSON_REPORT = APP_ROOT / "verification_report.json"
+
+# suite name -> (module, class)
+SUITES = {
+    "backend": ("backend_test", "BackendTester"),
+    "asyncstorage": ("asyncstorage_test", "AsyncStorageTestSuite"),
+    "asyncstorage_crash": ("asyncstorage_crash_test", "AsyncStorageCrashFixTester"),
+    "drug_interaction": ("drug_interaction_test", "DrugInteractionTester"),
+    "drug_debug": ("advanced_drug_debug", "AdvancedDrugInteractionDebugger"),
+}
+
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """Routes print() from worker threads into per-test buffers"""
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def capture(self, buffer: Optional[io.StringIO]):
+        self._local.buffer = buffer
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._fallback).write(text)
+
+    def flush(self):
+        self._fallback.flush()
+
+
+class VerificationCase:
+    def __init__(self, suite: str, cls: type, method: str):
+        self.suite = suite
+        self.cls = cls
+        self.method = method
+        self.status = "NOT_RUN"
+        self.duration = 0.0
+        self.message = ""
+        self.output = ""
+
+    @property
+    def name(self) -> str:
+        return f"{self.suite}::{self.method}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "suite": self.suite,
+            "class": self.cls.__name__,
+            "test": self.method,
+            "status": self.status,
+            "duration_s": round(self.duration, 6),
+            "message": self.message,
+        }
+
+
+def _outcome(logged: List[Dict], returned: Any) -> str:
+    """Normalise the suites' different result conventions to PASS/WARN/FAIL"""
+    statuses = []
+    for result in logged:
+        if "success" in result:
+            statuses.append("PASS" if result["success"] else "FAIL")
+        else:
+            statuses.append(result.get("status", "PASS"))
+
+    if returned is False or (isinstance(returned, tuple) and returned and returned[0] is False):
+        statuses.append("FAIL")
+    if "FAIL" in statuses:
+        return "FAIL"
+    if "WARN" in statuses:
+        return "WARN"
+    return "PASS"
+
+
+def _summary_message(logged: List[Dict]) -> str:
+    return "; ".join(
+        f"{result.get('test')}: {result.get('message', result.get('details', ''))}"
+        for result in logged
+    )
+
+
+def discover(suite_names: List[str], keyword: Optional[str] = None) -> Tuple[List[VerificationCase], Dict[str, str]]:
+    """Import each suite and list its test_* methods in definition order"""
+    cases: List[VerificationCase] = []
+    import_errors: Dict[str, str] = {}
+
+    for suite in suite_names:
+        module_name, class_name = SUITES[suite]
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+        except Exception as e:
+            import_errors[suite] = f"{type(e).__name__}: {e}"
+            continue
+
+        methods = [
+            (name, member) for name, member in inspect.getmembers(cls, inspect.isfunction)
+            if name.startswith("test_")
+        ]
+        methods.sort(key=lambda item: item[1].__code__.co_firstlineno)
+        for name, _ in methods:
+            if keyword and keyword.lower() not in f"{suite}::{name}".lower():
+                continue
+            cases.append(VerificationCase(suite, cls, name))
+
+    return cases, import_errors
+
+
+def run_case(case: VerificationCase, stdout: _ThreadLocalStdout) -> VerificationCase:
+    """Run one test method on a fresh suite instance"""
+    buffer = io.StringIO()
+    stdout.capture(buffer)
+    start = time.perf_counter()
+    try:
+        instance = case.cls()
+        returned = getattr(instance, case.method)()
+        logged = getattr(instance, "test_results", [])
+        case.status = _outcome(logged, returned)
+        case.message = _summary_message(logged)
+    except Exception as e:
+        case.status = "ERROR"
+        case.message = f"{type(e).__name__}: {e}"
+        buffer.write(traceback.format_exc())
+    finally:
+        case.duration = time.perf_counter() - start
+        stdout.capture(None)
+        case.output = buffer.getvalue()
+    return case
+
+
+def run_all(cases: List[VerificationCase], workers: int) -> float:
+    """Run all cases in a thread pool; returns wall-clock seconds"""
+    real_stdout = sys.stdout
+    stdout = _ThreadLocalStdout(real_stdout)
+    sys.stdout = stdout
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for case in pool.map(lambda c: run_case(c, stdout), cases):
+                icon = {"PASS": "✅", "WARN": "⚠️", "FAIL": "❌", "ERROR": "💥"}.get(case.status, "?")
+                real_stdout.write(f"{icon} {case.status:<5} {case.duration * 1000:9.1f} ms  {case.name}\n")
+    finally:
+        sys.stdout = real_stdout
+    return time.perf_counter() - start
+
+
+def write_json_report(path, cases: List[VerificationCase], import_errors: Dict[str, str], wall_time: float):
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "wall_time_s": round(wall_time, 6),
+        "cpu_time_s": round(sum(case.duration for case in cases), 6),
+        "counts": {status: sum(1 for c in cases if c.status == status)
+                   for status in ("PASS", "WARN", "FAIL", "ERROR")},
+        "import_errors": import_errors,
+        "fixture_cache": cache_stats(),
+        "tests": [case.to_dict() for case in cases],
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def write_junit_report(path, cases: List[VerificationCase], import_errors: Dict[str, str]):
+    root = ET.Element("testsuites")
+    by_suite: Dict[str, List[VerificationCase]] = {}
+    for case in cases:
+        by_suite.setdefault(case.suite, []).append(case)
+
+    for suite, suite_cases in by_suite.items():
+        element = ET.SubElement(root, "testsuite", {
+            "name": suite,
+            "tests": str(len(suite_cases)),
+            "failures": str(sum(1 for c in suite_cases if c.status == "FAIL")),
+            "errors": str(sum(1 for c in suite_cases if c.status == "ERROR")),
+            "time": f"{sum(c.duration for c in suite_cases):.6f}",
+        })
+        for case in suite_cases:
+            testcase = ET.SubElement(element, "testcase", {
+                "classname": f"{SUITES[suite][0]}.{case.cls.__name__}",
+                "name": case.method,
+                "time": f"{case.duration:.6f}",
+            })
+            if case.status == "FAIL":
+                ET.SubElement(testcase, "failure", {"message": case.message[:500]}).text = case.output
+            elif case.status == "ERROR":
+                ET.SubElement(testcase, "error", {"message": case.message[:500]}).text = case.output
+            elif case.output:
+                ET.SubElement(testcase, "system-out").text = case.output
+
+    for suite, error in import_errors.items():
+        element = ET.SubElement(root, "testsuite", {"name": suite, "tests": "1", "errors": "1", "failures": "0"})
+        testcase = ET.SubElement(element, "testcase", {"classname": SUITES[suite][0], "name": "import"})
+        ET.SubElement(testcase, "error", {"message": error})
+
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Python verification suites in parallel")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="Suite to run (repeatable); default: all")
+    parser.add_argument("-k", dest="keyword", help="Only run tests whose suite::name contains this text")
+    parser.add_argument("--workers", type=int, default=16, help="Worker threads")
+    parser.add_argument("--json", default=str(DEFAULT_JSON_REPORT), help="JSON report path")
+    parser.add_argument("--junit", help="JUnit XML report path")
+    parser.add_argument("--slowest", type=int, default=5, help="Show the N slowest tests")
+    parser.add_argument("--verbose", action="store_true", help="Print captured output of failing tests")
+    parser.add_argument("--start-backend", action="store_true",
+                        help="Start simple_backend on port 8001 for the backend suite")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main runner execution"""
+    args = parse_args(argv)
+    suites = args.suite or list(SUITES)
+
+    print("=" * 70)
+    print("MHT Assessment App - Parallel Verification Runner")
+    print("=" * 70)
+
+    cases, import_errors = discover(suites, args.keyword)
+    for suite, error in import_errors.items():
+        print(f"💥 Could not import suite '{suite}': {error}")
+    print(f"Discovered {len(cases)} tests in {len(suites) - len(import_errors)} suites, "
+          f"running with {args.workers} workers\n")
+
+    backend = None
+    if args.start_backend and any(case.suite == "backend" for case in cases):
+        from backend_load_test import start_backend
+        backend = start_backend("127.0.0.1", 8001)
+    try:
+        wall_time = run_all(cases, args.workers)
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=10)
+
+    counts = {status: sum(1 for c in cases if c.status == status) for status in ("PASS", "WARN", "FAIL", "ERROR")}
+    print("\n" + "=" * 70)
+    print(f"SUMMARY: {counts['PASS']} passed, {counts['WARN']} warnings, {counts['FAIL']} failed, "
+          f"{counts['ERROR']} errors in {wall_time:.2f}s "
+          f"(serial time {sum(c.duration for c in cases):.2f}s)")
+    print("=" * 70)
+
+    if args.slowest and cases:
+        print(f"\nSlowest {min(args.slowest, len(cases))} tests:")
+        for case in sorted(cases, key=lambda c: c.duration, reverse=True)[:args.slowest]:
+            print(f"   {case.duration * 1000:9.1f} ms  {case.name}")
+
+    if args.verbose:
+        for case in cases:
+            if case.status in ("FAIL", "ERROR"):
+                print(f"\n--- {case.name} ({case.status}) ---\n{case.output}")
+
+    write_json_report(args.json, cases, import_errors, wall_time)
+    print(f"\n💾 JSON report: {args.json}")
+    if args.junit:
+        write_junit_report(args.junit, cases, import_errors)
+        print(f"💾 JUnit report: {args.junit}")
+
+    return 0 if counts["FAIL"] == counts["ERROR"] == 0 and not import_errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())